@@ -9,6 +9,7 @@ from typing import List, Dict, Optional
 from enum import Enum
 
 from app.integrations.betfair_client import BetfairClient, BetfairMode
+from app.integrations.betfair_poller import MarketBookCache
 from app.oracle.services.oracle_analyzer import OracleAnalyzer
 from app.playbooks.playbook_orchestrator import create_playbook_orchestrator
 
@@ -126,13 +127,20 @@ class BetfairExecutionAgent:
         betfair_client: BetfairClient,
         bankroll_manager: BankrollManager,
         min_minutes_to_off: int = 10,
-        max_minutes_to_off: int = 1
+        max_minutes_to_off: int = 1,
+        book_cache: Optional[MarketBookCache] = None,
+        max_book_age_seconds: float = 5.0
     ):
         self.betfair = betfair_client
         self.bankroll = bankroll_manager
         self.min_minutes_to_off = min_minutes_to_off
         self.max_minutes_to_off = max_minutes_to_off
         
+        # Books published by a MarketBookPoller; the API is only called
+        # when the cached book is missing or stale
+        self.book_cache = book_cache
+        self.max_book_age_seconds = max_book_age_seconds
+        
         # Initialize intelligence systems
         self.oracle = OracleAnalyzer()
         self.playbooks = create_playbook_orchestrator()
@@ -158,8 +166,12 @@ class BetfairExecutionAgent:
         """
         logger.info(f"=== PRE-RACE CYCLE: {race_id} ===")
         
-        # 1. Pull Betfair prices
-        market_book = self.betfair.get_market_book([betfair_mapping['market_id']])
+        # 1. Pull Betfair prices (poller cache first)
+        market_book = {}
+        if self.book_cache is not None:
+            market_book = self.book_cache.get_many([betfair_mapping['market_id']], self.max_book_age_seconds)
+        if not market_book:
+            market_book = self.betfair.get_market_book([betfair_mapping['market_id']])
         
         if not market_book:
             logger.error(f"Failed to get market book for {betfair_mapping['market_id']}")
@@ -53,7 +53,7 @@ async def predict_full(
     """
     Full prediction with all intelligence layers
     
-    - Loads all 4 models
+    - Scores against the warm model pool (all 4 models)
     - Runs all intelligence layers
     - Returns comprehensive prediction
     """
@@ -62,9 +62,9 @@ async def predict_full(
     try:
         # Load UMA
         from app.engine.uma import UMA
+        from app.engine.model_pool import get_model_pool
         
-        uma = UMA()
-        uma.load_models()
+        uma = UMA(model_pool=get_model_pool())
         
         # Generate prediction
         prediction = uma.predict(
@@ -7,6 +7,8 @@ import os
 from typing import Optional, Tuple
 import logging
 
+from src.data.racing_dataset import RACING_DATASET_PATH, is_parquet_path, load_racing_dataset_table
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,6 +16,7 @@ logger = logging.getLogger(__name__)
 DATASET_PATHS = {
     "racing_full_1_7m": "storage/velo-datasets/racing_full_1_7m.csv",
     "racing_full_parquet": "storage/velo-datasets/racing_full_1_7m.parquet",
+    "racing_full_dataset": RACING_DATASET_PATH,
     "backtest_50k": "data/backtest_50k_clean.csv",
     "train_sample": "data/train_sample_clean.csv",
     "train_5k": "data/train_5k_clean.csv"
@@ -67,10 +70,11 @@ def load_racing_dataset(
     logger.info(f"Loading dataset: {dataset_name} from {path}")
     
     # Load based on file type
-    if path.endswith('.parquet'):
-        df = pd.read_parquet(path)
-        if nrows:
-            df = df.head(nrows)
+    if is_parquet_path(path):
+        # Date range and nrows are pushed into the scan
+        start_date, end_date = date_range if date_range else (None, None)
+        df = load_racing_dataset_table(path, nrows=nrows, start_date=start_date, end_date=end_date)
+        date_range = None
     elif path.endswith('.csv'):
         df = pd.read_csv(path, nrows=nrows, low_memory=False)
     else:
@@ -118,16 +122,17 @@ def get_dataset_info(dataset_name: str = "racing_full_1_7m") -> dict:
             "error": "File not found"
         }
     
-    file_size = os.path.getsize(path)
-    
     # Quick row count for CSV
     if path.endswith('.csv'):
+        file_size = os.path.getsize(path)
         with open(path, 'r') as f:
             row_count = sum(1 for _ in f) - 1  # Subtract header
     else:
-        # For parquet, need to load to get row count
-        df = pd.read_parquet(path)
-        row_count = len(df)
+        # Parquet footers carry row counts; no data pages are read
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(path, format='parquet', partitioning='hive')
+        file_size = sum(os.path.getsize(f) for f in dataset.files)
+        row_count = dataset.count_rows()
     
     return {
         "name": dataset_name,
@@ -135,7 +140,7 @@ def get_dataset_info(dataset_name: str = "racing_full_1_7m") -> dict:
         "exists": True,
         "size_mb": file_size / (1024 ** 2),
         "row_count": row_count,
-        "format": "parquet" if path.endswith('.parquet') else "csv"
+        "format": "csv" if path.endswith('.csv') else "parquet"
     }
 
 
@@ -11,21 +11,34 @@ try:
 except ImportError:
     PYARROW_AVAILABLE = False
 
+from src.data.racing_dataset import (
+    RACING_DATASET_PATH,
+    load_racing_dataset_table,
+)
+
 
 def load_racing_dataset_parquet(
-    path: str = "storage/velo-datasets/racing_full_1_7m.parquet",
+    path: str = RACING_DATASET_PATH,
     nrows: Optional[int] = None,
     columns: Optional[List[str]] = None,
-    filters: Optional[List] = None
+    filters: Optional[List] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
 ) -> pd.DataFrame:
     """
-    Load racing dataset from Parquet (4-5x faster than CSV)
+    Load racing dataset from Parquet (partitioned dataset or single file)
+    
+    Date ranges, column projection, filters and nrows are all pushed into
+    the scan: partitions and row groups outside the range are skipped and
+    the scan stops once nrows rows are read.
     
     Args:
-        path: Path to Parquet file
+        path: Dataset directory or Parquet file
         nrows: Number of rows to load (None = all)
         columns: Specific columns to load (None = all)
         filters: PyArrow filters for predicate pushdown
+        start_date: First race date to load (inclusive)
+        end_date: Last race date to load (inclusive)
         
     Returns:
         DataFrame
@@ -35,31 +48,22 @@ def load_racing_dataset_parquet(
         df = load_racing_dataset_parquet(nrows=10000)
         
         # Load specific columns
-        df = load_racing_dataset_parquet(columns=['speed', 'rating', 'pos'])
+        df = load_racing_dataset_parquet(columns=['date', 'horse', 'sp_decimal'])
         
-        # Load with filter
-        df = load_racing_dataset_parquet(
-            filters=[('year', '>=', 2020)]
-        )
+        # Load a date range
+        df = load_racing_dataset_parquet(start_date='2020-01-01', end_date='2023-12-31')
     """
     if not PYARROW_AVAILABLE:
         raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
     
-    # Read Parquet
-    table = pq.read_table(
+    return load_racing_dataset_table(
         path,
+        nrows=nrows,
         columns=columns,
+        start_date=start_date,
+        end_date=end_date,
         filters=filters
     )
-    
-    # Convert to pandas
-    df = table.to_pandas()
-    
-    # Limit rows if requested
-    if nrows is not None:
-        df = df.head(nrows)
-    
-    return df
 
 
 def get_parquet_metadata(path: str) -> dict:
@@ -89,11 +93,8 @@ if __name__ == "__main__":
         df = load_racing_dataset_parquet(nrows=1000)
         print(f"✅ Loaded {len(df)} rows, {len(df.columns)} columns")
         
-        # Get metadata
-        metadata = get_parquet_metadata("storage/velo-datasets/racing_full_1_7m.parquet")
-        print(f"✅ Total rows in file: {metadata['num_rows']:,}")
-        print(f"✅ Total columns: {metadata['num_columns']}")
+        print(f"✅ Columns: {df.columns.tolist()}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
-        print("Note: Run convert_to_parquet_v2.py first to create Parquet file")
+        print("Note: Run convert_to_parquet_v2.py --dataset first to build the Parquet dataset")
@@ -12,86 +12,18 @@ Date: 2026-01-09
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Any, Sequence, Tuple
 from datetime import date
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
 
-async def get_features_for_racecard(
-    db,
-    race_id: str,
-    as_of_date: Optional[str] = None
-) -> pd.DataFrame:
-    """
-    Returns complete feature set for all runners in a race.
-    
-    Features are computed deterministically using the as_of_date parameter.
-    If no as_of_date is provided, it defaults to the race's import_date.
-    
-    Args:
-        db: Database client (async Supabase client or similar)
-        race_id: UUID of the race
-        as_of_date: Date to use for feature lookup (defaults to race import_date)
-                   Format: 'YYYY-MM-DD' or date object
-    
-    Returns:
-        pd.DataFrame with columns:
-            - runner_id: UUID of runner
-            - horse_name: Name of horse
-            - trainer: Trainer name
-            - jockey: Jockey name
-            - course: Race course
-            - distance: Race distance
-            - trainer_win_pct_14d: Trainer win % in last 14 days
-            - trainer_win_pct_30d: Trainer win % in last 30 days
-            - trainer_win_pct_90d: Trainer win % in last 90 days
-            - trainer_starts_30d: Trainer starts in last 30 days
-            - jockey_win_pct_14d: Jockey win % in last 14 days
-            - jockey_win_pct_30d: Jockey win % in last 30 days
-            - jockey_win_pct_90d: Jockey win % in last 90 days
-            - jt_combo_win_pct_365d: Jockey-Trainer combo win % in last 365 days
-            - jt_combo_starts: Jockey-Trainer combo starts
-            - course_avg_odds: Average winning odds at course/distance
-            - course_volatility: Odds volatility at course/distance
-    
-    Example:
-        >>> df = await get_features_for_racecard(db, race_id, as_of_date='2026-01-07')
-        >>> print(df[['horse_name', 'trainer_win_pct_30d', 'jockey_win_pct_30d']])
-    """
-    
-    # If no as_of_date provided, get it from race
-    if not as_of_date:
-        logger.info(f"No as_of_date provided, fetching from race {race_id}")
-        race_query = """
-        SELECT import_date 
-        FROM races 
-        WHERE id = $1
-        """
-        
-        # Handle both asyncpg and Supabase clients
-        if hasattr(db, 'fetchrow'):
-            # asyncpg style
-            race_result = await db.fetchrow(race_query, race_id)
-            as_of_date = race_result['import_date'] if race_result else None
-        else:
-            # Supabase style
-            race_result = db.table('races').select('import_date').eq('id', race_id).execute()
-            as_of_date = race_result.data[0]['import_date'] if race_result.data else None
-        
-        if not as_of_date:
-            raise ValueError(f"Race {race_id} not found")
-        
-        logger.info(f"Using race import_date as as_of_date: {as_of_date}")
-    
-    # Ensure as_of_date is a string for query
-    if isinstance(as_of_date, date):
-        as_of_date = as_of_date.isoformat()
-    
-    # Query with deterministic as_of_date
-    query = """
-    SELECT
+# Feature mart lookup for runners; $1 selects races, $2 is the as_of_date
+_FEATURE_QUERY_TEMPLATE = """
+    SELECT{extra_columns}
         r.id as runner_id,
         r.horse_name,
         r.trainer,
@@ -184,10 +116,100 @@ async def get_features_for_racecard(
             (ra.distance !~ '^\\d+$' AND cd.distance_band = 'Unknown')
         )
     
-    WHERE ra.id = $1
-    ORDER BY r.cloth_no
+    WHERE {race_filter}
+    ORDER BY {order_by}
+    """
+
+RACECARD_FEATURE_QUERY = _FEATURE_QUERY_TEMPLATE.format(
+    extra_columns='',
+    race_filter='ra.id = $1',
+    order_by='r.cloth_no',
+)
+
+# Multi-race variant: one round trip for a list of races ($1 is an array)
+RACECARDS_FEATURE_QUERY = _FEATURE_QUERY_TEMPLATE.format(
+    extra_columns='\n        r.race_id,',
+    race_filter='ra.id = ANY($1)',
+    order_by='r.race_id, r.cloth_no',
+)
+
+# Races per ANY($1) query
+RACECARDS_BATCH_SIZE = 1000
+
+
+async def get_features_for_racecard(
+    db,
+    race_id: str,
+    as_of_date: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Returns complete feature set for all runners in a race.
+    
+    Features are computed deterministically using the as_of_date parameter.
+    If no as_of_date is provided, it defaults to the race's import_date.
+    
+    Args:
+        db: Database client (async Supabase client or similar)
+        race_id: UUID of the race
+        as_of_date: Date to use for feature lookup (defaults to race import_date)
+                   Format: 'YYYY-MM-DD' or date object
+    
+    Returns:
+        pd.DataFrame with columns:
+            - runner_id: UUID of runner
+            - horse_name: Name of horse
+            - trainer: Trainer name
+            - jockey: Jockey name
+            - course: Race course
+            - distance: Race distance
+            - trainer_win_pct_14d: Trainer win % in last 14 days
+            - trainer_win_pct_30d: Trainer win % in last 30 days
+            - trainer_win_pct_90d: Trainer win % in last 90 days
+            - trainer_starts_30d: Trainer starts in last 30 days
+            - jockey_win_pct_14d: Jockey win % in last 14 days
+            - jockey_win_pct_30d: Jockey win % in last 30 days
+            - jockey_win_pct_90d: Jockey win % in last 90 days
+            - jt_combo_win_pct_365d: Jockey-Trainer combo win % in last 365 days
+            - jt_combo_starts: Jockey-Trainer combo starts
+            - course_avg_odds: Average winning odds at course/distance
+            - course_volatility: Odds volatility at course/distance
+    
+    Example:
+        >>> df = await get_features_for_racecard(db, race_id, as_of_date='2026-01-07')
+        >>> print(df[['horse_name', 'trainer_win_pct_30d', 'jockey_win_pct_30d']])
     """
     
+    # If no as_of_date provided, get it from race
+    if not as_of_date:
+        logger.info(f"No as_of_date provided, fetching from race {race_id}")
+        race_query = """
+        SELECT import_date 
+        FROM races 
+        WHERE id = $1
+        """
+        
+        # Handle both asyncpg and Supabase clients
+        if hasattr(db, 'fetchrow'):
+            # asyncpg style
+            race_result = await db.fetchrow(race_query, race_id)
+            as_of_date = race_result['import_date'] if race_result else None
+        else:
+            # Supabase style
+            race_result = db.table('races').select('import_date').eq('id', race_id).execute()
+            as_of_date = race_result.data[0]['import_date'] if race_result.data else None
+        
+        if not as_of_date:
+            raise ValueError(f"Race {race_id} not found")
+        
+        logger.info(f"Using race import_date as as_of_date: {as_of_date}")
+    
+    # Ensure as_of_date is a string for query
+    if isinstance(as_of_date, date):
+        as_of_date = as_of_date.isoformat()
+    
+    # Query with deterministic as_of_date
+    query = RACECARD_FEATURE_QUERY
+    
     # Execute query
     try:
         if hasattr(db, 'fetch'):
@@ -205,8 +227,7 @@ async def get_features_for_racecard(
         df = pd.DataFrame(data)
         
         # Fill NaN values with 0 for numeric columns (no history available)
-        numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
-        df[numeric_columns] = df[numeric_columns].fillna(0)
+        _fill_missing_stats(df)
         
         logger.info(f"Extracted {len(df)} runners with {len(df.columns)} features for race {race_id} (as_of_date={as_of_date})")
         
@@ -217,7 +238,160 @@ async def get_features_for_racecard(
         raise
 
 
-async def build_feature_mart_for_batch(db, batch_id: str) -> Dict[str, Any]:
+def _fill_missing_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Fill NaN window stats with 0 in place (no history available)."""
+    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
+    if len(numeric_columns):
+        df[numeric_columns] = df[numeric_columns].fillna(0)
+    return df
+
+
+@dataclass
+class RacecardFeatures:
+    """
+    Features for many races in one columnar frame.
+    
+    Rows are grouped by race in request order (cloth order within a race);
+    race i owns rows ``offsets[i]:offsets[i + 1]`` of ``frame``.
+    """
+    frame: pd.DataFrame
+    race_ids: List[str]
+    offsets: np.ndarray
+    
+    def __post_init__(self):
+        self._positions = {race_id: i for i, race_id in enumerate(self.race_ids)}
+    
+    def __len__(self) -> int:
+        return len(self.race_ids)
+    
+    def __iter__(self) -> Iterator[Tuple[str, pd.DataFrame]]:
+        for race_id in self.race_ids:
+            yield race_id, self.race(race_id)
+    
+    @property
+    def runner_counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+    
+    def race(self, race_id: str) -> pd.DataFrame:
+        """Runners for one race (same shape as get_features_for_racecard)."""
+        i = self._positions[str(race_id)]
+        runners = self.frame.iloc[self.offsets[i]:self.offsets[i + 1]]
+        return runners.drop(columns='race_id', errors='ignore').reset_index(drop=True)
+    
+    def to_arrow(self):
+        """The frame as a pyarrow Table (race offsets in the schema metadata)."""
+        import pyarrow as pa
+        
+        table = pa.Table.from_pandas(self.frame, preserve_index=False)
+        return table.replace_schema_metadata({
+            **(table.schema.metadata or {}),
+            b'race_offsets': ','.join(map(str, self.offsets.tolist())).encode(),
+        })
+
+
+async def get_features_for_racecards(
+    db,
+    race_ids: Sequence[str],
+    as_of_date,
+    batch_size: int = RACECARDS_BATCH_SIZE
+) -> RacecardFeatures:
+    """
+    Returns features for all runners of many races in a few round trips.
+    
+    Same features as get_features_for_racecard, fetched with
+    ``race_id = ANY($1)`` for up to ``batch_size`` races per query, so a
+    2,000-race manifest needs 2 queries instead of 2,000.
+    
+    Args:
+        db: asyncpg-style database client
+        race_ids: Races to fetch (duplicates are ignored)
+        as_of_date: Date to use for feature lookup ('YYYY-MM-DD' or date);
+                   required, since races may have different import dates
+        batch_size: Races per query
+    
+    Returns:
+        RacecardFeatures with rows grouped by race in ``race_ids`` order;
+        races with no runners get an empty slice
+    
+    Example:
+        >>> batch = await get_features_for_racecards(db, race_ids, as_of_date='2026-01-07')
+        >>> for race_id, runners in batch:
+        ...     rank(runners)
+    """
+    if not as_of_date:
+        raise ValueError("as_of_date is required for multi-race feature fetch")
+    if not hasattr(db, 'fetch'):
+        raise NotImplementedError("Feature extraction requires asyncpg-style database client")
+    
+    if isinstance(as_of_date, date):
+        as_of_date = as_of_date.isoformat()
+    
+    race_ids = list(dict.fromkeys(str(race_id) for race_id in race_ids))
+    
+    rows = []
+    try:
+        for start in range(0, len(race_ids), batch_size):
+            chunk = race_ids[start:start + batch_size]
+            results = await db.fetch(RACECARDS_FEATURE_QUERY, chunk, as_of_date)
+            rows.extend(dict(row) for row in results)
+    except Exception as e:
+        logger.error(f"Error extracting features for {len(race_ids)} races: {e}")
+        raise
+    
+    df = pd.DataFrame(rows)
+    if df.empty:
+        return RacecardFeatures(df, race_ids, np.zeros(len(race_ids) + 1, dtype=np.int64))
+    
+    # Group rows by request order; the stable sort keeps cloth order
+    position = pd.Index(race_ids).get_indexer(df['race_id'].astype(str))
+    order = np.argsort(position, kind='stable')
+    order = order[position[order] >= 0]
+    df = df.iloc[order].reset_index(drop=True)
+    df['race_id'] = df['race_id'].astype(str)
+    
+    counts = np.bincount(position[order], minlength=len(race_ids))
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    
+    _fill_missing_stats(df)
+    
+    logger.info(
+        f"Extracted {len(df)} runners for {len(race_ids)} races in "
+        f"{-(-len(race_ids) // batch_size)} queries (as_of_date={as_of_date})"
+    )
+    
+    return RacecardFeatures(df, race_ids, offsets)
+
+
+async def build_feature_mart_range(db, start_date, end_date) -> Dict[str, int]:
+    """
+    Backfill the feature mart for every as_of_date from start_date to end_date.
+    
+    Incremental equivalent of calling build_feature_mart once per date: the
+    source rows are read once and the windows slide day by day
+    (workers/ingestion_spine/feature_mart.py), then rows are upserted in bulk.
+    
+    Args:
+        db: Database client (asyncpg or Supabase)
+        start_date: First as_of_date (inclusive)
+        end_date: Last as_of_date (inclusive)
+    
+    Returns:
+        Rows written per feature mart table
+    """
+    from workers.ingestion_spine import feature_mart
+    
+    if hasattr(db, 'executemany'):
+        # asyncpg style
+        return await feature_mart.backfill_feature_mart_range(db, start_date, end_date)
+    
+    # Supabase style
+    source_start, source_end = feature_mart.source_date_range(start_date, end_date)
+    source = feature_mart.fetch_feature_mart_source_supabase(db, source_start, source_end)
+    tables = feature_mart.backfill_feature_mart(source, start_date, end_date)
+    return feature_mart.upsert_feature_mart_supabase(db, tables)
+
+
+async def build_feature_mart_for_batch(db, batch_id: str, backfill_from: Optional[str] = None) -> Dict[str, Any]:
     """
     Build feature mart for a batch after validation.
     
@@ -227,6 +401,8 @@ async def build_feature_mart_for_batch(db, batch_id: str) -> Dict[str, Any]:
     Args:
         db: Database client
         batch_id: UUID of the batch
+        backfill_from: Also backfill every as_of_date from this date up to
+            the batch's import_date (incremental, bulk-written)
     
     Returns:
         dict with build status and stats
@@ -254,6 +430,18 @@ async def build_feature_mart_for_batch(db, batch_id: str) -> Dict[str, Any]:
         
         logger.info(f"Building feature mart for import_date: {import_date}")
         
+        if backfill_from is not None:
+            written = await build_feature_mart_range(db, backfill_from, import_date)
+            logger.info(f"✅ Feature mart backfilled for batch {batch_id} ({backfill_from} → {import_date})")
+            return {
+                "status": "success",
+                "batch_id": batch_id,
+                "import_date": import_date,
+                "backfill_from": backfill_from,
+                "rows_written": written,
+                "features_built": True
+            }
+        
         # Call build_feature_mart function
         if hasattr(db, 'execute'):
             # asyncpg style
@@ -0,0 +1,145 @@
+"""
+VÉLØ Oracle - Model Pool
+Process-wide warm model cache with registry-driven hot swap
+"""
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_MODEL_PATHS = {
+    'sqpe_v14': 'models/sqpe_v14/sqpe_v14.pkl',
+    'tie_v9': 'models/tie_v9/tie_v9.pkl',
+    'longshot_v6': 'models/longshot_v6/longshot_v6.pkl',
+    'overlay_v5': 'models/overlay_v5/overlay_v5.pkl'
+}
+
+
+class ModelPool:
+    """
+    Warm, process-wide set of UMA models
+
+    Models are unpickled once and shared by every request. The registry
+    entry for each model (its pickle plus the sibling metadata.json) is
+    fingerprinted by mtime and size; refresh() reloads only entries whose
+    fingerprint changed and swaps the whole model map in one assignment,
+    so readers never see a half-updated set.
+    """
+
+    def __init__(self, model_paths: Dict[str, str] = None):
+        self.model_paths = dict(model_paths or DEFAULT_MODEL_PATHS)
+        self._models: Dict[str, Any] = {}
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.loaded = False
+
+    @property
+    def models(self) -> Dict[str, Any]:
+        """Current model map (treat as read-only; replaced on swap)"""
+        return self._models
+
+    def load(self) -> Dict[str, Any]:
+        """Load every model (idempotent)"""
+        if not self.loaded:
+            self.refresh(force=True)
+        return self._models
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload models whose registry entry changed
+
+        Args:
+            force: Reload every model regardless of fingerprint
+
+        Returns:
+            True if the model map was swapped
+        """
+        with self._lock:
+            changed = {
+                name: fingerprint
+                for name, fingerprint in (
+                    (name, self._fingerprint(path)) for name, path in self.model_paths.items()
+                )
+                if force or self._fingerprints.get(name) != fingerprint
+            }
+
+            if not changed:
+                return False
+
+            models = dict(self._models)
+            for name, fingerprint in changed.items():
+                models[name] = self._load_model(name, self.model_paths[name])
+                self._fingerprints[name] = fingerprint
+
+            self._models = models
+            self.generation += 1
+            self.loaded = True
+
+        logger.info(
+            f"✅ Model pool generation {self.generation}: "
+            f"{len([m for m in models.values() if m is not None])}/{len(models)} models warm "
+            f"(reloaded: {', '.join(changed)})"
+        )
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        """Pool state for system endpoints"""
+        return {
+            'generation': self.generation,
+            'models': {name: model is not None for name, model in self._models.items()}
+        }
+
+    @staticmethod
+    def _fingerprint(path: str) -> Tuple:
+        entries = []
+        for candidate in (Path(path), Path(path).parent / 'metadata.json'):
+            try:
+                stat = candidate.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                entries.append(None)
+        return tuple(entries)
+
+    @staticmethod
+    def _load_model(name: str, path: str) -> Optional[Any]:
+        try:
+            with open(path, 'rb') as f:
+                model = pickle.load(f)
+            logger.info(f"  ✅ Loaded {name}")
+            return model
+        except Exception as e:
+            logger.warning(f"  ⚠️  Failed to load {name}: {e}")
+            return None
+
+
+# ============================================================================
+# POOL SINGLETON
+# ============================================================================
+
+_model_pool: Optional[ModelPool] = None
+_model_pool_lock = threading.Lock()
+
+
+def get_model_pool() -> ModelPool:
+    """Get or create the process-wide model pool (loaded on first use)"""
+    global _model_pool
+
+    if _model_pool is None:
+        with _model_pool_lock:
+            if _model_pool is None:
+                pool = ModelPool()
+                pool.load()
+                _model_pool = pool
+
+    return _model_pool
+
+
+def get_refresh_interval() -> float:
+    """Seconds between registry checks (MODEL_POOL_REFRESH_SECONDS, 0 disables)"""
+    return float(os.getenv("MODEL_POOL_REFRESH_SECONDS", "30"))
@@ -42,7 +42,12 @@ class UMA:
     Output: Single final probability + edge + confidence
     """
     
-    def __init__(self):
+    def __init__(self, model_pool=None):
+        """
+        Args:
+            model_pool: Optional warm ModelPool; when given, models are read
+                from the pool on every call so hot swaps take effect
+        """
         self.models = {}
         self.weights = {
             'sqpe_v14': 0.40,
@@ -50,7 +55,8 @@ class UMA:
             'longshot_v6': 0.15,
             'overlay_v5': 0.20
         }
-        self.loaded = False
+        self.model_pool = model_pool
+        self.loaded = model_pool is not None
     
     def load_models(
         self,
@@ -99,8 +105,10 @@ class UMA:
         if not self.loaded:
             raise RuntimeError("UMA not loaded. Call load_models() first.")
         
+        models = self._active_models()
+        
         # 1. Get base model predictions
-        model_preds = self._get_model_predictions(features)
+        model_preds = self._get_model_predictions(features, models)
         
         # 2. Get intelligence signals
         intel_signals = self._get_intelligence_signals(features, race_context)
@@ -130,7 +138,7 @@ class UMA:
         
         # 9. Metadata
         metadata = {
-            'models_used': list(self.models.keys()),
+            'models_used': list(models.keys()),
             'market_odds': market_odds,
             'race_id': race_context.get('race_id') if race_context else None
         }
@@ -144,14 +152,128 @@ class UMA:
             metadata=metadata
         )
     
-    def _get_model_predictions(self, features: Dict[str, Any]) -> Dict[str, float]:
+    def predict_batch(
+        self,
+        features: List[Dict[str, Any]],
+        market_odds: List[Optional[float]] = None,
+        race_context: Dict[str, Any] = None
+    ) -> List[UMAPrediction]:
+        """
+        Generate unified predictions for many runners at once
+        
+        Each model is invoked once with the whole feature matrix; fusion,
+        intelligence adjustments, edge and confidence run as array ops.
+        Results match calling predict() per runner.
+        
+        Args:
+            features: Runner feature dicts (same keys in the same order)
+            market_odds: Market odds per runner
+            race_context: Race metadata shared by all runners
+            
+        Returns:
+            UMAPrediction per runner, in input order
+        """
+        if not self.loaded:
+            raise RuntimeError("UMA not loaded. Call load_models() first.")
+        
+        n = len(features)
+        if n == 0:
+            return []
+        
+        if market_odds is None:
+            market_odds = [None] * n
+        
+        models = self._active_models()
+        
+        # 1. One predict_proba call per model
+        model_preds = self._get_model_predictions_batch(features, models)
+        
+        # 2. Intelligence signals
+        intel_signals = [self._get_intelligence_signals(f, race_context) for f in features]
+        
+        # 3. Fuse predictions
+        base_probs = self._fuse_predictions_batch(model_preds, n)
+        
+        # 4. Apply intelligence adjustments
+        adjusted = self._apply_intelligence_batch(base_probs, intel_signals)
+        
+        # 5. Calculate edge
+        odds = np.array([np.nan if o is None else o for o in market_odds], dtype=float)
+        valid_odds = odds > 1.0
+        edges = np.where(valid_odds, adjusted - 1.0 / np.where(valid_odds, odds, 1.0), 0.0)
+        
+        # 6. Calculate confidence
+        confidences = self._calculate_confidence_batch(model_preds, intel_signals, n)
+        
+        race_id = race_context.get('race_id') if race_context else None
+        models_used = list(models.keys())
+        
+        predictions = []
+        for i in range(n):
+            runner_preds = {name: float(preds[i]) for name, preds in model_preds.items()}
+            predictions.append(UMAPrediction(
+                probability=float(adjusted[i]),
+                edge=float(edges[i]),
+                confidence=float(confidences[i]),
+                risk_band=self._classify_risk(edges[i], confidences[i]),
+                signals={
+                    'models': runner_preds,
+                    'intelligence': intel_signals[i],
+                    'base_probability': float(base_probs[i]),
+                    'adjusted_probability': float(adjusted[i])
+                },
+                metadata={
+                    'models_used': models_used,
+                    'market_odds': market_odds[i],
+                    'race_id': race_id
+                }
+            ))
+        
+        return predictions
+    
+    def predict_races(self, races: List[Dict[str, Any]]) -> List[List[UMAPrediction]]:
+        """
+        Score every runner of several races (e.g. a meeting) in one batch
+        
+        Args:
+            races: Race dicts with 'race_id' and 'runners', each runner
+                carrying 'features' and optional 'market_odds'
+            
+        Returns:
+            Predictions grouped per race, in input order
+        """
+        features, odds, offsets = [], [], [0]
+        for race in races:
+            for runner in race.get('runners', []):
+                features.append(runner.get('features', {}))
+                odds.append(runner.get('market_odds'))
+            offsets.append(len(features))
+        
+        flat = self.predict_batch(features, odds)
+        
+        grouped = []
+        for race, start, end in zip(races, offsets[:-1], offsets[1:]):
+            for prediction in flat[start:end]:
+                prediction.metadata['race_id'] = race.get('race_id')
+            grouped.append(flat[start:end])
+        
+        return grouped
+    
+    def _active_models(self) -> Dict[str, Any]:
+        """Models for this call: the pool's current map, or locally loaded ones"""
+        if self.model_pool is not None:
+            return self.model_pool.models
+        return self.models
+    
+    def _get_model_predictions(self, features: Dict[str, Any], models: Dict[str, Any] = None) -> Dict[str, float]:
         """Get predictions from all base models"""
         preds = {}
+        models = self.models if models is None else models
         
         # Convert features to array (simplified)
         feature_array = np.array(list(features.values())).reshape(1, -1)
         
-        for name, model in self.models.items():
+        for name, model in models.items():
             if model is not None:
                 try:
                     prob = model.predict_proba(feature_array)[0, 1]
@@ -163,6 +285,30 @@ class UMA:
         
         return preds
     
+    def _get_model_predictions_batch(
+        self,
+        features: List[Dict[str, Any]],
+        models: Dict[str, Any]
+    ) -> Dict[str, np.ndarray]:
+        """Get predictions from all base models for a feature matrix"""
+        n = len(features)
+        
+        # Column order follows the first runner, as in the single-runner path
+        columns = list(features[0].keys())
+        feature_matrix = np.array([[f.get(c, 0.0) for c in columns] for f in features])
+        
+        preds = {}
+        for name, model in models.items():
+            if model is not None:
+                try:
+                    preds[name] = np.asarray(model.predict_proba(feature_matrix)[:, 1], dtype=float)
+                except Exception:
+                    preds[name] = np.full(n, 0.15)  # Fallback
+            else:
+                preds[name] = np.full(n, 0.15)  # Fallback
+        
+        return preds
+    
     def _get_intelligence_signals(
         self,
         features: Dict[str, Any],
@@ -214,6 +360,64 @@ class UMA:
         
         return weighted_sum / total_weight if total_weight > 0 else 0.15
     
+    def _fuse_predictions_batch(self, model_preds: Dict[str, np.ndarray], n: int) -> np.ndarray:
+        """Vectorized weighted average of model predictions"""
+        weighted_sum = np.zeros(n)
+        total_weight = 0.0
+        
+        for model_name, preds in model_preds.items():
+            weight = self.weights.get(model_name, 0.25)
+            weighted_sum += preds * weight
+            total_weight += weight
+        
+        return weighted_sum / total_weight if total_weight > 0 else np.full(n, 0.15)
+    
+    def _apply_intelligence_batch(
+        self,
+        base_probs: np.ndarray,
+        intel_signals: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """Vectorized intelligence adjustments (same factors as _apply_intelligence)"""
+        pace = np.array([s['pace']['score'] for s in intel_signals])
+        narrative = np.array([s['narrative']['score'] for s in intel_signals])
+        manip_risk = np.array([s['manipulation']['risk_score'] for s in intel_signals])
+        volatility = np.array([s['volatility']['volatility_score'] for s in intel_signals])
+        stability = np.array([s['stability']['stability_score'] for s in intel_signals])
+        
+        adjusted = base_probs * (0.9 + 0.2 * pace)
+        adjusted = adjusted * (0.95 + 0.1 * narrative)
+        adjusted = np.where(manip_risk > 50, adjusted * 0.9, adjusted)
+        adjusted = np.where(volatility > 70, adjusted * 0.95, adjusted)
+        adjusted = adjusted * (0.95 + 0.1 * stability)
+        
+        return np.clip(adjusted, 0.01, 0.99)
+    
+    def _calculate_confidence_batch(
+        self,
+        model_preds: Dict[str, np.ndarray],
+        intel_signals: List[Dict[str, Any]],
+        n: int
+    ) -> np.ndarray:
+        """Vectorized prediction confidence"""
+        if model_preds:
+            model_variance = np.var(np.vstack(list(model_preds.values())), axis=0)
+        else:
+            model_variance = np.full(n, np.nan)
+        model_confidence = 1.0 / (1.0 + model_variance * 10)
+        
+        intel_confidence = np.array([
+            np.mean([
+                s['pace']['score'],
+                s['narrative']['score'],
+                s['manipulation']['score'],
+                s['volatility']['score'],
+                s['stability']['score']
+            ])
+            for s in intel_signals
+        ])
+        
+        return 0.6 * model_confidence + 0.4 * intel_confidence
+    
     def _apply_intelligence(
         self,
         base_prob: float,
@@ -3,10 +3,14 @@ VÉLØ Oracle - Odds Feed Integration
 Capture and process real-time odds data
 """
 import json
+from collections import deque
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, List, Optional
 import logging
 
+from app.feeds.tick_store import OddsTickStore
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -16,22 +20,30 @@ class OddsFeed:
     Real-time odds feed integration
     
     Capabilities:
-    - Capture odds snapshots
+    - Capture odds snapshots into a columnar tick store
     - Normalize to internal format
-    - Compute steam/drift volatility
-    - Save 2K+ snapshots/day
+    - Compute steam/drift volatility over time windows
+    - Save 2K+ snapshots/day as per-race Parquet segments
     """
     
-    def __init__(self, storage_path: str = "data/odds_snapshots"):
+    def __init__(
+        self,
+        storage_path: str = "data/odds_snapshots",
+        max_ticks_per_runner: Optional[int] = None,
+        max_recent_snapshots: int = 1000
+    ):
         self.storage_path = storage_path
-        self.snapshots = []
+        self.ticks = OddsTickStore(max_ticks_per_runner=max_ticks_per_runner)
+        # Bounded raw snapshot log for inspection; analytics use self.ticks
+        self.snapshots = deque(maxlen=max_recent_snapshots)
         self.current_odds = {}
     
     def capture_snapshot(
         self,
         race_id: str,
         runners: List[Dict[str, Any]],
-        source: str = "betfair"
+        source: str = "betfair",
+        timestamp: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Capture odds snapshot
@@ -40,18 +52,27 @@ class OddsFeed:
             race_id: Unique race identifier
             runners: List of runner odds data
             source: Odds source (betfair, sportsbet, etc.)
+            timestamp: Capture time (defaults to now, UTC)
             
         Returns:
             Snapshot metadata
         """
+        timestamp = timestamp or datetime.utcnow()
+        
         snapshot = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': timestamp.isoformat(),
             'race_id': race_id,
             'source': source,
             'runners': runners,
-            'snapshot_id': f"{race_id}_{datetime.utcnow().timestamp()}"
+            'snapshot_id': f"{race_id}_{timestamp.timestamp()}"
         }
         
+        for runner in runners:
+            odds = runner.get('odds_decimal')
+            if runner.get('runner_id') is None or odds is None:
+                continue
+            self.ticks.append(race_id, runner['runner_id'], timestamp, odds, runner.get('volume', 0))
+        
         self.snapshots.append(snapshot)
         self.current_odds[race_id] = runners
         
@@ -66,29 +87,30 @@ class OddsFeed:
     def get_odds_history(
         self,
         race_id: str,
-        runner_id: str = None
+        runner_id: str = None,
+        window_minutes: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Get odds history for a race/runner"""
-        
-        history = [s for s in self.snapshots if s['race_id'] == race_id]
-        
-        if runner_id:
-            # Filter for specific runner
-            filtered = []
-            for snapshot in history:
-                runner_data = next(
-                    (r for r in snapshot['runners'] if r.get('runner_id') == runner_id),
-                    None
-                )
-                if runner_data:
-                    filtered.append({
-                        'timestamp': snapshot['timestamp'],
-                        'odds': runner_data.get('odds_decimal'),
-                        'volume': runner_data.get('volume', 0)
-                    })
-            return filtered
-        
-        return history
+        """
+        Get odds history for a race/runner
+        
+        With runner_id, returns that runner's ticks (optionally only the
+        trailing window_minutes). Without it, returns the recent raw
+        snapshots for the race.
+        """
+        if runner_id is None:
+            return [s for s in self.snapshots if s['race_id'] == race_id]
+        
+        window_seconds = window_minutes * 60 if window_minutes is not None else None
+        timestamps, odds, volume = self.ticks.history(race_id, runner_id, window_seconds)
+        
+        return [
+            {
+                'timestamp': datetime.utcfromtimestamp(ts).isoformat(),
+                'odds': float(price),
+                'volume': float(vol)
+            }
+            for ts, price, vol in zip(timestamps, odds, volume)
+        ]
     
     def compute_odds_movement(
         self,
@@ -97,32 +119,26 @@ class OddsFeed:
         window_minutes: int = 60
     ) -> Dict[str, float]:
         """
-        Compute odds movement over time window
+        Compute odds movement over the trailing time window
         
         Returns:
             Movement statistics
         """
-        history = self.get_odds_history(race_id, runner_id)
+        stats = self.ticks.window_stats(race_id, runner_id, window_minutes * 60)
         
-        if len(history) < 2:
+        if stats['count'] < 2:
             return {
                 'movement_percent': 0.0,
                 'volatility': 0.0,
                 'trend': 'stable'
             }
         
-        # Get first and last odds
-        first_odds = history[0]['odds']
-        last_odds = history[-1]['odds']
+        first_odds = stats['first_odds']
+        last_odds = stats['last_odds']
         
         # Calculate movement
         movement_percent = ((last_odds - first_odds) / first_odds * 100) if first_odds > 0 else 0.0
         
-        # Calculate volatility (std dev of odds)
-        odds_values = [h['odds'] for h in history]
-        import numpy as np
-        volatility = float(np.std(odds_values))
-        
         # Determine trend
         if movement_percent < -5:
             trend = 'steaming'  # Odds shortening (backing)
@@ -133,11 +149,11 @@ class OddsFeed:
         
         return {
             'movement_percent': movement_percent,
-            'volatility': volatility,
+            'volatility': stats['std'],
             'trend': trend,
             'first_odds': first_odds,
             'last_odds': last_odds,
-            'snapshots_count': len(history)
+            'snapshots_count': stats['count']
         }
     
     def detect_steam_move(
@@ -164,24 +180,62 @@ class OddsFeed:
         
         return is_steam
     
-    def save_snapshots(self, filepath: str = None):
-        """Save snapshots to file"""
-        if filepath is None:
-            filepath = f"{self.storage_path}/snapshots_{datetime.utcnow().date()}.json"
+    def close_race(self, race_id: str, persist: bool = True) -> Optional[str]:
+        """
+        Release a race's ticks after the off
+        
+        Args:
+            persist: Write the race's Parquet segment before evicting
+            
+        Returns:
+            Segment path if persisted
+        """
+        segment = None
+        if persist and self.ticks.runners(race_id):
+            segment = str(self.ticks.save_race(race_id, self._segment_dir()))
+        
+        removed = self.ticks.evict_race(race_id)
+        self.current_odds.pop(race_id, None)
+        
+        logger.info(f"✅ Closed {race_id}: evicted {removed} ticks")
+        return segment
+    
+    def save_snapshots(self, directory: str = None) -> List[str]:
+        """Save every race's ticks as per-race Parquet segments"""
+        directory = directory or self._segment_dir()
         
-        with open(filepath, 'w') as f:
-            json.dump(self.snapshots, f, indent=2)
+        segments = [str(self.ticks.save_race(race_id, directory)) for race_id in self.ticks.races()]
         
-        logger.info(f"✅ Saved {len(self.snapshots)} snapshots to {filepath}")
+        logger.info(f"✅ Saved {len(self.ticks)} ticks in {len(segments)} segments to {directory}")
+        return segments
     
-    def load_snapshots(self, filepath: str):
-        """Load snapshots from file"""
+    def load_snapshots(self, path: str):
+        """
+        Load ticks from a segment directory, a single segment, or a
+        legacy JSON snapshot dump
+        """
         try:
-            with open(filepath, 'r') as f:
-                self.snapshots = json.load(f)
-            logger.info(f"✅ Loaded {len(self.snapshots)} snapshots from {filepath}")
+            path = Path(path)
+            if path.is_dir():
+                for segment in sorted(path.glob("*.parquet")):
+                    self.ticks.load_race(str(segment))
+            elif path.suffix == ".json":
+                with open(path, 'r') as f:
+                    for snapshot in json.load(f):
+                        self.capture_snapshot(
+                            snapshot['race_id'],
+                            snapshot['runners'],
+                            source=snapshot.get('source', 'betfair'),
+                            timestamp=datetime.fromisoformat(snapshot['timestamp'])
+                        )
+            else:
+                self.ticks.load_race(str(path))
+            logger.info(f"✅ Loaded {len(self.ticks)} ticks from {path}")
         except Exception as e:
             logger.error(f"❌ Failed to load snapshots: {e}")
+    
+    def _segment_dir(self) -> str:
+        return f"{self.storage_path}/{datetime.utcnow().date()}"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,321 @@
+"""
+VÉLØ Oracle - Odds Tick Store
+Columnar, time-indexed storage for per-runner odds ticks
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _to_epoch(timestamp) -> float:
+    """Convert datetime / ISO string / epoch seconds to epoch seconds (naive = UTC)"""
+    if isinstance(timestamp, (int, float, np.floating, np.integer)):
+        return float(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+class TickSeries:
+    """
+    Append-only tick buffer for one (race, runner) pair
+
+    Ticks live in contiguous numpy arrays ordered by timestamp. Prefix sums
+    of odds (shifted by the first observed price to limit cancellation)
+    make window mean / std O(1) once the window bounds are found by binary
+    search. Eviction advances a head pointer; storage is compacted lazily.
+    """
+
+    __slots__ = ('_ts', '_odds', '_volume', '_c1', '_c2', '_head', '_end', '_ref', 'max_ticks')
+
+    def __init__(self, max_ticks: Optional[int] = None, capacity: int = 64):
+        self.max_ticks = max_ticks
+        self._ts = np.empty(capacity, dtype=np.float64)
+        self._odds = np.empty(capacity, dtype=np.float64)
+        self._volume = np.empty(capacity, dtype=np.float64)
+        # Prefix sums: _c1[i] = sum of (odds - ref) over positions < i
+        self._c1 = np.zeros(capacity + 1, dtype=np.float64)
+        self._c2 = np.zeros(capacity + 1, dtype=np.float64)
+        self._head = 0
+        self._end = 0
+        self._ref = None
+
+    def __len__(self) -> int:
+        return self._end - self._head
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._ts[self._head:self._end]
+
+    @property
+    def odds(self) -> np.ndarray:
+        return self._odds[self._head:self._end]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._volume[self._head:self._end]
+
+    def append(self, ts: float, odds: float, volume: float = 0.0):
+        """Append a tick; out-of-order ticks trigger a (rare) re-sort"""
+        if self._ref is None:
+            self._ref = odds
+
+        if self._end == len(self._ts):
+            self._grow()
+
+        i = self._end
+        self._ts[i] = ts
+        self._odds[i] = odds
+        self._volume[i] = volume
+        shifted = odds - self._ref
+        self._c1[i + 1] = self._c1[i] + shifted
+        self._c2[i + 1] = self._c2[i] + shifted * shifted
+        self._end += 1
+
+        if i > self._head and ts < self._ts[i - 1]:
+            self._resort()
+
+        if self.max_ticks is not None and len(self) > self.max_ticks:
+            self.evict(len(self) - self.max_ticks)
+
+    def extend(self, ts: np.ndarray, odds: np.ndarray, volume: np.ndarray):
+        """Append a block of ticks in one vectorized step"""
+        n = len(ts)
+        if n == 0:
+            return
+        if self._ref is None:
+            self._ref = float(odds[0])
+
+        live = len(self)
+        if self._end + n > len(self._ts):
+            self._compact(max(64, 2 * (live + n)))
+
+        e = self._end
+        self._ts[e:e + n] = ts
+        self._odds[e:e + n] = odds
+        self._volume[e:e + n] = volume
+        shifted = self._odds[e:e + n] - self._ref
+        self._c1[e + 1:e + n + 1] = self._c1[e] + np.cumsum(shifted)
+        self._c2[e + 1:e + n + 1] = self._c2[e] + np.cumsum(shifted * shifted)
+        self._end += n
+
+        if np.any(np.diff(self._ts[max(e - 1, self._head):self._end]) < 0):
+            self._resort()
+
+        if self.max_ticks is not None and len(self) > self.max_ticks:
+            self.evict(len(self) - self.max_ticks)
+
+    def evict(self, n: int):
+        """Drop the oldest n ticks (ring-buffer semantics)"""
+        self._head = min(self._head + n, self._end)
+
+    def window_bounds(self, start_ts: float) -> Tuple[int, int]:
+        """Absolute [i, j) positions of ticks with timestamp >= start_ts"""
+        i = self._head + int(np.searchsorted(self._ts[self._head:self._end], start_ts, side='left'))
+        return i, self._end
+
+    def window(self, window_seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(timestamps, odds, volume) views for the trailing window"""
+        if window_seconds is None or len(self) == 0:
+            i, j = self._head, self._end
+        else:
+            i, j = self.window_bounds(self._ts[self._end - 1] - window_seconds)
+        return self._ts[i:j], self._odds[i:j], self._volume[i:j]
+
+    def window_stats(self, window_seconds: Optional[float] = None) -> Dict[str, float]:
+        """
+        First/last odds, count and population std over the trailing window
+
+        The window is anchored at the latest tick, so replayed feeds behave
+        the same as live ones.
+        """
+        if len(self) == 0:
+            return {'count': 0}
+
+        if window_seconds is None:
+            i, j = self._head, self._end
+        else:
+            i, j = self.window_bounds(self._ts[self._end - 1] - window_seconds)
+
+        n = j - i
+        s1 = self._c1[j] - self._c1[i]
+        s2 = self._c2[j] - self._c2[i]
+        variance = max(s2 / n - (s1 / n) ** 2, 0.0)
+
+        return {
+            'count': n,
+            'first_odds': float(self._odds[i]),
+            'last_odds': float(self._odds[j - 1]),
+            'std': float(np.sqrt(variance)),
+        }
+
+    def _grow(self):
+        live = len(self)
+        # Compact instead of growing when most of the buffer is evicted
+        if self._head > 0 and live <= len(self._ts) // 2:
+            self._compact(len(self._ts))
+            return
+        self._compact(max(64, 2 * len(self._ts)))
+
+    def _compact(self, capacity: int):
+        live = len(self)
+        h, e = self._head, self._end
+
+        ts = np.empty(capacity, dtype=np.float64)
+        odds = np.empty(capacity, dtype=np.float64)
+        volume = np.empty(capacity, dtype=np.float64)
+        ts[:live] = self._ts[h:e]
+        odds[:live] = self._odds[h:e]
+        volume[:live] = self._volume[h:e]
+
+        c1 = np.zeros(capacity + 1, dtype=np.float64)
+        c2 = np.zeros(capacity + 1, dtype=np.float64)
+        c1[:live + 1] = self._c1[h:e + 1] - self._c1[h]
+        c2[:live + 1] = self._c2[h:e + 1] - self._c2[h]
+
+        self._ts, self._odds, self._volume, self._c1, self._c2 = ts, odds, volume, c1, c2
+        self._head, self._end = 0, live
+
+    def _resort(self):
+        h, e = self._head, self._end
+        order = np.argsort(self._ts[h:e], kind='stable')
+        self._ts[h:e] = self._ts[h:e][order]
+        self._odds[h:e] = self._odds[h:e][order]
+        self._volume[h:e] = self._volume[h:e][order]
+
+        shifted = self._odds[h:e] - self._ref
+        self._c1[h + 1:e + 1] = self._c1[h] + np.cumsum(shifted)
+        self._c2[h + 1:e + 1] = self._c2[h] + np.cumsum(shifted * shifted)
+
+
+class OddsTickStore:
+    """
+    Odds ticks keyed by (race_id, runner_id)
+
+    Capabilities:
+    - Amortized O(1) appends into numpy-backed buffers
+    - O(log n) trailing-window queries, O(1) window statistics
+    - Per-runner ring-buffer cap and whole-race eviction after the off
+    - Segmented Parquet persistence (one file per race)
+    """
+
+    def __init__(self, max_ticks_per_runner: Optional[int] = None):
+        self.max_ticks_per_runner = max_ticks_per_runner
+        self._series: Dict[Tuple[str, str], TickSeries] = {}
+        self._race_runners: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(series) for series in self._series.values())
+
+    def races(self) -> List[str]:
+        return list(self._race_runners)
+
+    def runners(self, race_id: str) -> List[str]:
+        return list(self._race_runners.get(race_id, []))
+
+    def series(self, race_id: str, runner_id: str) -> Optional[TickSeries]:
+        return self._series.get((race_id, runner_id))
+
+    def append(self, race_id: str, runner_id: str, timestamp, odds: float, volume: float = 0.0):
+        """Append a single tick"""
+        series = self._get_or_create(race_id, runner_id)
+        series.append(_to_epoch(timestamp), float(odds), float(volume or 0.0))
+
+    def _get_or_create(self, race_id: str, runner_id: str) -> TickSeries:
+        key = (race_id, runner_id)
+        series = self._series.get(key)
+        if series is None:
+            series = TickSeries(max_ticks=self.max_ticks_per_runner)
+            self._series[key] = series
+            self._race_runners.setdefault(race_id, []).append(runner_id)
+        return series
+
+    def history(
+        self,
+        race_id: str,
+        runner_id: str,
+        window_seconds: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(timestamps, odds, volume) arrays, optionally for the trailing window"""
+        series = self._series.get((race_id, runner_id))
+        if series is None:
+            empty = np.empty(0, dtype=np.float64)
+            return empty, empty, empty
+
+        return series.window(window_seconds)
+
+    def window_stats(self, race_id: str, runner_id: str, window_seconds: Optional[float] = None) -> Dict[str, float]:
+        series = self._series.get((race_id, runner_id))
+        if series is None:
+            return {'count': 0}
+        return series.window_stats(window_seconds)
+
+    def evict_race(self, race_id: str) -> int:
+        """Drop all ticks for a race; returns number of ticks removed"""
+        removed = 0
+        for runner_id in self._race_runners.pop(race_id, []):
+            removed += len(self._series.pop((race_id, runner_id)))
+        return removed
+
+    def save_race(self, race_id: str, directory: str) -> Path:
+        """Persist one race's ticks as a Parquet segment"""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+
+        runner_ids, timestamps, odds, volume = [], [], [], []
+        for runner_id in self._race_runners.get(race_id, []):
+            series = self._series[(race_id, runner_id)]
+            runner_ids.extend([runner_id] * len(series))
+            timestamps.append(series.timestamps)
+            odds.append(series.odds)
+            volume.append(series.volume)
+
+        def _concat(parts):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)
+
+        table = pa.table({
+            'runner_id': pa.array(runner_ids, type=pa.string()),
+            'timestamp': pa.array(_concat(timestamps), type=pa.float64()),
+            'odds': pa.array(_concat(odds), type=pa.float64()),
+            'volume': pa.array(_concat(volume), type=pa.float64()),
+        })
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        segment = path / f"{race_id}.parquet"
+        pq.write_table(table, segment)
+        return segment
+
+    def load_race(self, path: str, race_id: Optional[str] = None) -> str:
+        """Load a Parquet segment written by save_race; returns the race_id"""
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+
+        path = Path(path)
+        race_id = race_id or path.stem
+        table = pq.read_table(path)
+
+        runner_ids = np.asarray(table.column('runner_id').to_pylist(), dtype=object)
+        timestamps = table.column('timestamp').to_numpy()
+        odds = table.column('odds').to_numpy()
+        volume = table.column('volume').to_numpy()
+
+        for runner_id in dict.fromkeys(runner_ids):
+            mask = runner_ids == runner_id
+            self._get_or_create(race_id, runner_id).extend(timestamps[mask], odds[mask], volume[mask])
+
+        return race_id
@@ -0,0 +1,375 @@
+"""
+VÉLØ Oracle - Betfair Market Matching
+Blocking index for mapping internal races/runners to Betfair markets/selections
+
+Markets are indexed once per sync by (normalized venue, off-time bucket),
+so a race only looks at markets of similarly named venues within one
+bucket either side of its off time. Venue similarity is computed once per
+distinct (internal, Betfair) venue pair.
+
+Runners are matched in three tiers:
+1. Normalized-exact name (hash lookup; covers exact names)
+2. Alias table: previously confirmed internal name → selection_id
+3. SequenceMatcher ratio against the Betfair runners not already taken
+   by tiers 1-2, with quick upper bounds pruning hopeless candidates
+
+Fuzzy matches scoring at least AUTO_CONFIRM_RATIO with a unique best
+candidate are recorded as aliases, so a re-sync of those runners skips
+the SequenceMatcher scan; weaker fuzzy matches are re-scored each sync
+until an operator confirms them (AliasTable.confirm). Exact matches need
+no alias and only overwrite one that contradicts them.
+
+Normalized names and per-runner matchers are cached, and the alias table
+persists to JSON, so a re-sync of already-seen runners is all lookups.
+Market and runner choices otherwise equal the pairwise scans in
+scripts/sync_betfair_markets.py (best score, first on ties).
+"""
+import json
+import logging
+from datetime import datetime
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VENUE_WEIGHT = 0.7
+TIME_WEIGHT = 0.3
+
+# Fuzzy runner matches at least this similar are confirmed automatically
+AUTO_CONFIRM_RATIO = 0.95
+
+
+def normalize_venue_name(name: str) -> str:
+    """Normalize venue name for matching"""
+    return name.lower().replace(" ", "").replace("-", "").replace("(aw)", "").strip()
+
+
+def normalize_runner_name(name: str) -> str:
+    """Normalize runner name for matching"""
+    # Remove common suffixes and normalize
+    name = name.lower()
+    name = name.replace("(ire)", "").replace("(fr)", "").replace("(gb)", "")
+    name = name.replace("'", "").replace("-", "").replace(" ", "")
+    return name.strip()
+
+
+def string_similarity(a: str, b: str) -> float:
+    """Calculate string similarity (0-1)"""
+    return SequenceMatcher(None, a, b).ratio()
+
+
+# Names repeat across markets and re-syncs: normalize each once
+_venue_key = lru_cache(maxsize=4096)(normalize_venue_name)
+_runner_key = lru_cache(maxsize=65536)(normalize_runner_name)
+
+
+def _epoch_seconds(moment: datetime) -> float:
+    """Seconds on one axis for naive (wall clock) and aware datetimes"""
+    if moment.tzinfo is not None:
+        return moment.timestamp()
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+class AliasTable:
+    """
+    Persistent table of confirmed runner matches
+
+    Keyed by normalized internal runner name; Betfair selection IDs are
+    stable per horse, so a confirmed match applies to any later market the
+    horse runs in.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: JSON file to load from / save to (None = in-memory only)
+        """
+        self.path = Path(path) if path else None
+        self.runners: Dict[str, int] = {}
+        self._dirty = False
+
+        if self.path and self.path.exists():
+            with open(self.path, 'r') as f:
+                self.runners = {k: int(v) for k, v in json.load(f).get('runners', {}).items()}
+            logger.info(f"Loaded {len(self.runners)} runner aliases from {self.path}")
+
+    def __len__(self) -> int:
+        return len(self.runners)
+
+    def get(self, internal_name: str) -> Optional[int]:
+        return self.runners.get(_runner_key(internal_name))
+
+    def confirm(self, internal_name: str, selection_id: int):
+        """Record a confirmed internal name → selection_id match"""
+        key = _runner_key(internal_name)
+        if self.runners.get(key) != selection_id:
+            self.runners[key] = selection_id
+            self._dirty = True
+
+    def save(self):
+        """Write the table if it changed since load / last save"""
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump({'runners': self.runners}, f, indent=2, sort_keys=True)
+        self._dirty = False
+        logger.info(f"Saved {len(self.runners)} runner aliases to {self.path}")
+
+
+class RunnerIndex:
+    """Hash and fuzzy lookup over the runners of one Betfair market"""
+
+    def __init__(self, betfair_runners: List[Dict]):
+        self.runners = betfair_runners
+        self.names = [_runner_key(r['runner_name']) for r in betfair_runners]
+        self.by_name: Dict[str, int] = {}
+        self.by_selection: Dict[int, int] = {}
+        for i, (name, runner) in enumerate(zip(self.names, betfair_runners)):
+            self.by_name.setdefault(name, i)
+            self.by_selection.setdefault(runner['selection_id'], i)
+        # SequenceMatcher caches its analysis of the second sequence
+        self._matchers: List[Optional[SequenceMatcher]] = [None] * len(betfair_runners)
+
+    def _matcher(self, i: int) -> SequenceMatcher:
+        matcher = self._matchers[i]
+        if matcher is None:
+            matcher = SequenceMatcher(None, '', self.names[i])
+            self._matchers[i] = matcher
+        return matcher
+
+    def best_fuzzy(self, name: str, threshold: float, exclude=()) -> Tuple[Optional[int], float]:
+        """
+        Highest-ratio runner (first on ties) scoring at least threshold
+
+        Returns:
+            (runner position or None, its score)
+        """
+        best, best_score = None, 0.0
+        for i in range(len(self.runners)):
+            if i in exclude:
+                continue
+            matcher = self._matcher(i)
+            matcher.set_seq1(name)
+            # Upper bounds first: skip runners that cannot win or pass
+            floor = max(best_score, threshold)
+            if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                continue
+            score = matcher.ratio()
+            if score > best_score and score >= threshold:
+                best, best_score = i, score
+        return best, best_score
+
+    def is_unique_best(self, name: str, best: int, score: float, exclude=()) -> bool:
+        """No other candidate runner scores as high as the best one"""
+        for i in range(len(self.runners)):
+            if i == best or i in exclude:
+                continue
+            matcher = self._matcher(i)
+            matcher.set_seq1(name)
+            if matcher.real_quick_ratio() >= score and matcher.quick_ratio() >= score and matcher.ratio() >= score:
+                return False
+        return True
+
+    def match(
+        self,
+        internal_runners: List[Dict],
+        threshold: float = 0.8,
+        aliases: Optional[AliasTable] = None,
+        confirm_ratio: float = AUTO_CONFIRM_RATIO
+    ) -> Dict[str, int]:
+        """
+        Match internal runners to selection IDs
+
+        Args:
+            internal_runners: Dicts with 'name'
+            threshold: Minimum name similarity for a fuzzy match
+            aliases: Confirmed matches (consulted and extended)
+            confirm_ratio: Fuzzy matches at least this similar, with a
+                unique best candidate, are recorded in aliases
+
+        Returns:
+            Dict mapping internal runner name → Betfair selection_id
+        """
+        mapping = {}
+        taken = set()
+        unmatched = []
+
+        for internal in internal_runners:
+            name = internal['name']
+            i = self.by_name.get(_runner_key(name))
+            if i is None:
+                unmatched.append(name)
+                continue
+            mapping[name] = self.runners[i]['selection_id']
+            taken.add(i)
+            # Exact names need no alias; just correct a contradicting one
+            if aliases is not None and aliases.get(name) not in (None, mapping[name]):
+                aliases.confirm(name, mapping[name])
+
+        pending = []
+        for name in unmatched:
+            i = None
+            if aliases is not None:
+                selection_id = aliases.get(name)
+                if selection_id is not None:
+                    i = self.by_selection.get(selection_id)
+            if i is None or i in taken:
+                pending.append(name)
+                continue
+            mapping[name] = self.runners[i]['selection_id']
+            taken.add(i)
+
+        for name in pending:
+            key = _runner_key(name)
+            i, score = self.best_fuzzy(key, threshold, exclude=taken)
+            if i is None:
+                logger.warning(f"No match found for '{name}' (threshold: {threshold:.2f})")
+                continue
+            mapping[name] = self.runners[i]['selection_id']
+            if aliases is not None and score >= confirm_ratio and self.is_unique_best(key, i, score, exclude=taken):
+                aliases.confirm(name, mapping[name])
+            logger.debug(
+                f"Matched '{name}' → '{self.runners[i]['runner_name']}' "
+                f"(selection_id: {self.runners[i]['selection_id']}, score: {score:.2f})"
+            )
+
+        return mapping
+
+
+class BetfairMatcher:
+    """
+    Blocking index over a day's Betfair markets
+    """
+
+    def __init__(
+        self,
+        betfair_markets: List[Dict],
+        aliases: Optional[AliasTable] = None,
+        venue_threshold: float = 0.7,
+        time_tolerance_minutes: int = 15,
+        runner_threshold: float = 0.8
+    ):
+        """
+        Args:
+            betfair_markets: Markets with venue, market_start_time, runners
+            aliases: Confirmed runner matches (consulted and extended)
+            venue_threshold: Minimum venue similarity
+            time_tolerance_minutes: Max time difference in minutes
+            runner_threshold: Minimum runner name similarity
+        """
+        self.markets = betfair_markets
+        self.aliases = aliases
+        self.venue_threshold = venue_threshold
+        self.time_tolerance_minutes = time_tolerance_minutes
+        self.runner_threshold = runner_threshold
+
+        self._bucket_seconds = max(time_tolerance_minutes * 60, 1)
+        self._start_times: List[datetime] = []
+        self._venues: Dict[str, List[int]] = {}
+        self._buckets: Dict[Tuple[str, int], List[int]] = {}
+        for i, market in enumerate(betfair_markets):
+            start = datetime.fromisoformat(market['market_start_time'])
+            venue = _venue_key(market['venue'])
+            self._start_times.append(start)
+            self._venues.setdefault(venue, []).append(i)
+            self._buckets.setdefault((venue, self._bucket(start)), []).append(i)
+
+        self._venue_scores: Dict[Tuple[str, str], float] = {}
+        self._runner_indexes: Dict[int, RunnerIndex] = {}
+
+    def _bucket(self, moment: datetime) -> int:
+        return int(_epoch_seconds(moment) // self._bucket_seconds)
+
+    def _venue_score(self, internal: str, betfair: str) -> float:
+        key = (internal, betfair)
+        score = self._venue_scores.get(key)
+        if score is None:
+            score = string_similarity(internal, betfair)
+            self._venue_scores[key] = score
+        return score
+
+    def runner_index(self, market_position: int) -> RunnerIndex:
+        index = self._runner_indexes.get(market_position)
+        if index is None:
+            index = RunnerIndex(self.markets[market_position]['runners'])
+            self._runner_indexes[market_position] = index
+        return index
+
+    def find_market(self, venue: str, off_time: datetime) -> Tuple[Optional[int], float]:
+        """
+        Best market for a race: venue similarity 70%, time proximity 30%
+
+        Returns:
+            (market position or None, combined score)
+        """
+        internal_venue = _venue_key(venue)
+        bucket = self._bucket(off_time)
+
+        candidates = []
+        for betfair_venue in self._venues:
+            venue_score = self._venue_score(internal_venue, betfair_venue)
+            if venue_score < self.venue_threshold:
+                continue
+            for b in (bucket - 1, bucket, bucket + 1):
+                for i in self._buckets.get((betfair_venue, b), ()):
+                    candidates.append((i, venue_score))
+
+        # Market list order, so ties resolve as a full scan would
+        best, best_score = None, 0.0
+        for i, venue_score in sorted(candidates):
+            time_diff_minutes = abs((off_time - self._start_times[i]).total_seconds() / 60)
+            if time_diff_minutes > self.time_tolerance_minutes:
+                continue
+            time_score = max(0, 1 - (time_diff_minutes / self.time_tolerance_minutes))
+            combined_score = (venue_score * VENUE_WEIGHT) + (time_score * TIME_WEIGHT)
+            if combined_score > best_score:
+                best, best_score = i, combined_score
+        return best, best_score
+
+    def match_runners(self, internal_runners: List[Dict], market_position: int) -> Dict[str, int]:
+        """Internal runner name → selection_id for one market"""
+        return self.runner_index(market_position).match(
+            internal_runners, threshold=self.runner_threshold, aliases=self.aliases
+        )
+
+    def sync_race(self, race: Dict) -> Optional[Dict]:
+        """
+        Map an internal race (venue, off_time, runners) to its Betfair market
+
+        Returns:
+            Mapping dict as scripts/sync_betfair_markets.py writes it, or None
+        """
+        race_venue = race['venue']
+        race_time = datetime.fromisoformat(race['off_time'])
+
+        position, score = self.find_market(race_venue, race_time)
+        if position is None:
+            logger.warning(f"No Betfair market found for {race_venue} {race_time.strftime('%H:%M')}")
+            return None
+
+        market = self.markets[position]
+        runner_mappings = self.match_runners(race['runners'], position)
+        if not runner_mappings:
+            logger.warning(f"No runners matched for {race_venue} {race_time.strftime('%H:%M')}")
+            return None
+
+        logger.info(
+            f"✅ Matched {race_venue} {race_time.strftime('%H:%M')} → "
+            f"market {market['market_id']} "
+            f"({len(runner_mappings)}/{len(race['runners'])} runners)"
+        )
+
+        return {
+            'race_id': race.get('race_id'),
+            'market_id': market['market_id'],
+            'event_id': market['event_id'],
+            'venue': market['venue'],
+            'market_start_time': market['market_start_time'],
+            'venue_match_score': score,
+            'runner_mappings': runner_mappings,
+            'matched_runners': len(runner_mappings),
+            'total_runners': len(race['runners'])
+        }
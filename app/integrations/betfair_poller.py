@@ -0,0 +1,356 @@
+"""
+Betfair Market Book Poller
+Async, batched polling of market books into an in-process cache
+
+BetfairClient.get_market_book is a blocking call. The poller drives it
+from asyncio:
+
+- Market ids are batched up to the API's per-request weight limit
+  (200 weight points; EX_BEST_OFFERS costs 5 per market → 40 markets)
+- Batches run on a small thread pool sharing the client (and its pooled
+  HTTP session), capped at max_concurrent_requests in flight
+- Concurrent requests for the same market within a tick share one fetch
+- Tracked markets are re-polled on a schedule keyed by time-to-off,
+  tighter as the off approaches
+- Every fetched book is published to a MarketBookCache that agents read
+  without blocking or touching the API
+
+Works unchanged against BetfairMode.SIM, which is how it is tested.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.integrations.betfair_client import BetfairClient
+
+logger = logging.getLogger(__name__)
+
+# listMarketBook request limit and per-market weight of each price projection
+MAX_REQUEST_WEIGHT = 200
+PRICE_DATA_WEIGHTS = {
+    'SP_AVAILABLE': 3,
+    'SP_TRADED': 7,
+    'EX_BEST_OFFERS': 5,
+    'EX_ALL_OFFERS': 17,
+    'EX_TRADED': 17,
+}
+
+# (minutes to off at or above, seconds between polls), most distant first
+DEFAULT_SCHEDULE: Tuple[Tuple[float, float], ...] = (
+    (60.0, 60.0),
+    (15.0, 15.0),
+    (5.0, 5.0),
+    (1.0, 2.0),
+    (float('-inf'), 1.0),
+)
+
+
+@dataclass
+class CachedBook:
+    """Latest market book for one market"""
+    market_id: str
+    book: Dict
+    fetched_at: datetime
+    polls: int = 1
+
+
+class MarketBookCache:
+    """
+    In-process store of the latest market books
+
+    Written by the poller, read by agents; reads never block or call the API.
+    """
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.utcnow):
+        self.clock = clock
+        self._entries: Dict[str, CachedBook] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, market_id: str) -> bool:
+        return market_id in self._entries
+
+    def publish(self, books: Dict[str, Dict], fetched_at: Optional[datetime] = None):
+        """Store freshly fetched books"""
+        fetched_at = fetched_at or self.clock()
+        for market_id, book in books.items():
+            entry = self._entries.get(market_id)
+            polls = entry.polls + 1 if entry else 1
+            self._entries[market_id] = CachedBook(market_id, book, fetched_at, polls)
+
+    def entry(self, market_id: str) -> Optional[CachedBook]:
+        return self._entries.get(market_id)
+
+    def age_seconds(self, market_id: str) -> Optional[float]:
+        entry = self._entries.get(market_id)
+        if entry is None:
+            return None
+        return (self.clock() - entry.fetched_at).total_seconds()
+
+    def get(self, market_id: str, max_age_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Latest book for a market
+
+        Args:
+            market_id: Betfair market ID
+            max_age_seconds: Treat older books as missing
+
+        Returns:
+            Market book dict (as BetfairClient.get_market_book) or None
+        """
+        entry = self._entries.get(market_id)
+        if entry is None:
+            return None
+        if max_age_seconds is not None and (self.clock() - entry.fetched_at).total_seconds() > max_age_seconds:
+            return None
+        return entry.book
+
+    def get_many(self, market_ids: Sequence[str], max_age_seconds: Optional[float] = None) -> Dict[str, Dict]:
+        """Books for the markets that have one, as get_market_book returns them"""
+        books = {}
+        for market_id in market_ids:
+            book = self.get(market_id, max_age_seconds)
+            if book is not None:
+                books[market_id] = book
+        return books
+
+
+@dataclass
+class _TrackedMarket:
+    start_time: datetime
+    next_poll: datetime
+
+
+def _as_datetime(value: Union[str, datetime]) -> datetime:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class MarketBookPoller:
+    """
+    Schedules, batches and coalesces market book requests
+    """
+
+    def __init__(
+        self,
+        client: BetfairClient,
+        cache: Optional[MarketBookCache] = None,
+        schedule: Sequence[Tuple[float, float]] = DEFAULT_SCHEDULE,
+        market_weight: int = PRICE_DATA_WEIGHTS['EX_BEST_OFFERS'],
+        max_concurrent_requests: int = 4,
+        tick_seconds: float = 0.1,
+        stop_after_off_minutes: float = 10.0,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        """
+        Args:
+            client: Logged-in BetfairClient (any mode)
+            cache: Cache to publish into (default: a new one)
+            schedule: (minutes to off at or above, poll interval seconds),
+                most distant first; the last entry should cover everything
+            market_weight: Request weight per market of the price projection
+            max_concurrent_requests: Batches in flight at once
+            tick_seconds: Coalescing window for request() / run() loop period
+            stop_after_off_minutes: Stop polling a market this long after its off
+            clock: Current time (naive UTC, as market start times)
+        """
+        self.client = client
+        self.clock = clock
+        self.cache = cache if cache is not None else MarketBookCache(clock)
+        self.schedule = tuple(schedule)
+        self.batch_size = max(1, MAX_REQUEST_WEIGHT // market_weight)
+        self.max_concurrent_requests = max_concurrent_requests
+        self.tick_seconds = tick_seconds
+        self.stop_after_off = timedelta(minutes=stop_after_off_minutes)
+
+        self.requests_made = 0
+        self._tracked: Dict[str, _TrackedMarket] = {}
+        self._waiting: Dict[str, asyncio.Future] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent_requests, thread_name_prefix="betfair-poller"
+        )
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # Schedule
+    # ------------------------------------------------------------------
+
+    def poll_interval(self, minutes_to_off: float) -> float:
+        """Seconds between polls at this distance from the off"""
+        for threshold, interval in self.schedule:
+            if minutes_to_off >= threshold:
+                return interval
+        return self.schedule[-1][1]
+
+    def track(self, market_id: str, market_start_time: Union[str, datetime]):
+        """Poll a market on the time-to-off schedule (first poll is due now)"""
+        self._tracked[market_id] = _TrackedMarket(_as_datetime(market_start_time), self.clock())
+
+    def track_markets(self, markets: Sequence[Dict]):
+        """Track markets as listed by BetfairClient.list_markets_for_day"""
+        for market in markets:
+            self.track(market['market_id'], market['market_start_time'])
+
+    def untrack(self, market_id: str):
+        self._tracked.pop(market_id, None)
+
+    @property
+    def tracked(self) -> List[str]:
+        return list(self._tracked)
+
+    def due_markets(self, now: Optional[datetime] = None) -> List[str]:
+        """Tracked markets whose next poll is due (expired ones are dropped)"""
+        now = now or self.clock()
+        due = []
+        for market_id, market in list(self._tracked.items()):
+            if now - market.start_time > self.stop_after_off:
+                logger.info(f"Stopped polling {market_id}: past the off")
+                del self._tracked[market_id]
+            elif market.next_poll <= now:
+                due.append(market_id)
+        return due
+
+    def batches(self, market_ids: Sequence[str]) -> List[List[str]]:
+        """Split market ids into requests within the weight limit"""
+        market_ids = list(market_ids)
+        return [market_ids[i:i + self.batch_size] for i in range(0, len(market_ids), self.batch_size)]
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    def _settle(self, batch: Sequence[str], books: Optional[Dict[str, Dict]]):
+        """
+        Release a batch from in-flight: reschedule tracked markets and
+        resolve waiting futures (cancel them if the fetch never completed)
+        """
+        now = self.clock()
+        for market_id in batch:
+            book = books.get(market_id) if books is not None else None
+            market = self._tracked.get(market_id)
+            if market is not None:
+                if book is not None and book.get('status') == 'CLOSED':
+                    del self._tracked[market_id]
+                else:
+                    minutes_to_off = (market.start_time - now).total_seconds() / 60
+                    market.next_poll = now + timedelta(seconds=self.poll_interval(minutes_to_off))
+
+            future = self._in_flight.pop(market_id, None)
+            if future is not None and not future.done():
+                if books is None:
+                    future.cancel()
+                else:
+                    future.set_result(book)
+
+    async def _fetch_batch(self, batch: List[str]):
+        loop = asyncio.get_running_loop()
+        books = None
+        try:
+            async with self._semaphore:
+                self.requests_made += 1
+                try:
+                    books = await loop.run_in_executor(self._executor, self.client.get_market_book, batch)
+                except Exception as e:
+                    logger.error(f"Market book request for {len(batch)} markets failed: {e}")
+                    books = {}
+            self.cache.publish(books, self.clock())
+        finally:
+            # Also on cancellation, so no market is left in flight for good
+            self._settle(batch, books)
+
+    async def _fetch(self, market_ids: Sequence[str]) -> int:
+        """Fetch markets not already in flight; returns number fetched"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._loop = loop
+
+        to_fetch = []
+        for market_id in dict.fromkeys(market_ids):
+            if market_id in self._in_flight:
+                continue
+            future = self._waiting.pop(market_id, None) or loop.create_future()
+            self._in_flight[market_id] = future
+            to_fetch.append(market_id)
+
+        if to_fetch:
+            try:
+                await asyncio.gather(*(self._fetch_batch(batch) for batch in self.batches(to_fetch)))
+            finally:
+                # Batches cancelled before they started never reach their own cleanup
+                self._settle([m for m in to_fetch if m in self._in_flight], None)
+        return len(to_fetch)
+
+    async def _flush_after_tick(self):
+        # Requests arriving while a flush is fetching go out a tick later
+        while self._waiting:
+            await asyncio.sleep(self.tick_seconds)
+            await self._fetch(list(self._waiting))
+
+    async def request(self, market_id: str, max_age_seconds: Optional[float] = None) -> Optional[Dict]:
+        """
+        Market book, fetched on demand
+
+        Callers asking for the same market within a tick (or while it is
+        being fetched) share one fetch; different markets requested within
+        a tick go out in the same batches.
+
+        Args:
+            market_id: Betfair market ID
+            max_age_seconds: Return the cached book if at most this old
+
+        Returns:
+            Market book dict or None if Betfair returned none
+        """
+        if max_age_seconds is not None:
+            book = self.cache.get(market_id, max_age_seconds)
+            if book is not None:
+                return book
+
+        future = self._in_flight.get(market_id) or self._waiting.get(market_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiting[market_id] = future
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.ensure_future(self._flush_after_tick())
+        return await asyncio.shield(future)
+
+    async def poll_once(self) -> int:
+        """
+        One tick: fetch due tracked markets plus pending requests
+
+        Returns:
+            Number of markets fetched
+        """
+        return await self._fetch(self.due_markets() + list(self._waiting))
+
+    async def run(self, stop_when_idle: bool = False):
+        """
+        Poll until stop() (or, with stop_when_idle, until nothing is tracked)
+        """
+        self._running = True
+        logger.info(f"Market book poller started ({len(self._tracked)} markets tracked)")
+        try:
+            while self._running:
+                await self.poll_once()
+                if stop_when_idle and not self._tracked and not self._waiting:
+                    break
+                await asyncio.sleep(self.tick_seconds)
+        finally:
+            self._running = False
+            logger.info(f"Market book poller stopped after {self.requests_made} requests")
+
+    def stop(self):
+        self._running = False
+
+    def close(self):
+        """Release the worker threads"""
+        self._executor.shutdown(wait=True)
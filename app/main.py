@@ -5,9 +5,12 @@ Production-ready with CORS, health checks, and API routing
 from fastapi import FastAPI, HTTPException, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from dataclasses import asdict
 from datetime import datetime
+import asyncio
 import logging
 import os
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -116,27 +119,126 @@ async def predict_quick(
         Prediction with probability, edge, confidence
     """
     try:
-        # Import UMA
         from app.engine.uma import UMA
+        from app.engine.model_pool import get_model_pool
         
-        # Create UMA instance
-        uma = UMA()
+        # Score against the warm, process-wide model pool
+        uma = UMA(model_pool=get_model_pool())
         
         # Run prediction
         result = uma.predict(
-            race_id=race_data.get("race_id"),
-            runner_id=race_data.get("runner_id"),
             features=race_data.get("features", {}),
-            market_odds=race_data.get("market_odds")
+            market_odds=race_data.get("market_odds"),
+            race_context={
+                "race_id": race_data.get("race_id"),
+                "runner_id": race_data.get("runner_id")
+            }
         )
         
-        return result
+        return asdict(result)
         
     except Exception as e:
         logger.error(f"Prediction failed: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _runner_prediction(runner: dict, prediction) -> dict:
+    """Compact per-runner payload for batch endpoints"""
+    return {
+        "runner_id": runner.get("runner_id"),
+        "probability": prediction.probability,
+        "edge": prediction.edge,
+        "confidence": prediction.confidence,
+        "risk_band": prediction.risk_band,
+        "models": prediction.signals["models"]
+    }
+
+
+@app.post("/api/v1/predict/race")
+async def predict_race(
+    race_data: dict,
+    authorized: bool = Depends(verify_api_key)
+):
+    """
+    Batch prediction for every runner in a race
+    
+    Args:
+        race_data: {"race_id": ..., "runners": [{"runner_id", "features", "market_odds"}]}
+        
+    Returns:
+        Per-runner predictions from a single batched model pass
+    """
+    try:
+        from app.engine.uma import UMA
+        from app.engine.model_pool import get_model_pool
+        
+        start = time.perf_counter()
+        pool = get_model_pool()
+        uma = UMA(model_pool=pool)
+        
+        predictions = uma.predict_races([race_data])[0]
+        
+        return {
+            "race_id": race_data.get("race_id"),
+            "predictions": [
+                _runner_prediction(runner, prediction)
+                for runner, prediction in zip(race_data.get("runners", []), predictions)
+            ],
+            "model_generation": pool.generation,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        
+    except Exception as e:
+        logger.error(f"Race prediction failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/v1/predict/meeting")
+async def predict_meeting(
+    meeting_data: dict,
+    authorized: bool = Depends(verify_api_key)
+):
+    """
+    Batch prediction for a whole meeting card
+    
+    Args:
+        meeting_data: {"races": [race_data, ...]} as accepted by /predict/race
+        
+    Returns:
+        Per-race predictions; all runners are scored in one model pass
+    """
+    try:
+        from app.engine.uma import UMA
+        from app.engine.model_pool import get_model_pool
+        
+        start = time.perf_counter()
+        pool = get_model_pool()
+        uma = UMA(model_pool=pool)
+        
+        races = meeting_data.get("races", [])
+        grouped = uma.predict_races(races)
+        
+        return {
+            "races": [
+                {
+                    "race_id": race.get("race_id"),
+                    "predictions": [
+                        _runner_prediction(runner, prediction)
+                        for runner, prediction in zip(race.get("runners", []), predictions)
+                    ]
+                }
+                for race, predictions in zip(races, grouped)
+            ],
+            "runner_count": sum(len(predictions) for predictions in grouped),
+            "model_generation": pool.generation,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        
+    except Exception as e:
+        logger.error(f"Meeting prediction failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/api/v1/predict/full")
 async def predict_full(
     race_data: dict,
@@ -257,6 +359,25 @@ async def startup_event():
     logger.info(f"Environment: {ENV}")
     logger.info(f"API Key configured: {bool(API_KEY)}")
     logger.info("="*60)
+    
+    # Warm the model pool so the first prediction doesn't pay unpickling
+    from app.engine.model_pool import get_model_pool, get_refresh_interval
+    
+    pool = await asyncio.to_thread(get_model_pool)
+    
+    interval = get_refresh_interval()
+    if interval > 0:
+        app.state.model_refresh_task = asyncio.create_task(_refresh_model_pool(pool, interval))
+
+
+async def _refresh_model_pool(pool, interval: float):
+    """Poll the model registry and hot-swap changed models"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(pool.refresh)
+        except Exception as e:
+            logger.error(f"Model pool refresh failed: {e}")
 
 
 # Shutdown event
@@ -264,6 +385,10 @@ async def startup_event():
 async def shutdown_event():
     """Shutdown tasks"""
     logger.info("VÉLØ Oracle API Shutting Down")
+    
+    task = getattr(app.state, "model_refresh_task", None)
+    if task is not None:
+        task.cancel()
 
 
 if __name__ == "__main__":
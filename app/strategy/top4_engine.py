@@ -0,0 +1,354 @@
+"""
+VELO Top-4 Ranking Engine
+
+Array-backed equivalent of top4_ranker.rank_top4 for many races at once.
+
+Runners are held as a struct of arrays (odds, market role codes, Phase 2A
+modifiers) with race offsets: race i owns runners offsets[i]:offsets[i + 1].
+Race context (chaos, field size, manipulation risk) is one value per race.
+Every score component is computed for all runners in a few NumPy passes
+and each race is ordered with one stable lexsort, so ranking a 2,000-race
+manifest costs milliseconds instead of one Python call per runner.
+
+Scores are identical to calculate_runner_score (same operations in the
+same order), ties keep input order as rank_top4's stable sort does, and
+ScoreBreakdown objects are built on demand.
+
+Usage:
+    runners = RunnerArrays.from_profiles([(profiles, race_ctx), ...])
+    engine = Top4Engine(runners)
+    top4_idx, breakdowns = engine.rank_race(0)
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from app.core.errors import validate_scores, validate_top4
+from app.strategy.top4_ranker import (
+    ANCHOR_ROLES,
+    ROLE_SCORES,
+    ScoreBreakdown,
+    historical_modifier_for,
+    profile_fields,
+    stability_modifier_for,
+)
+
+logger = logging.getLogger(__name__)
+
+# Market role codes: index into ROLE_NAMES, UNKNOWN_ROLE for anything else
+ROLE_NAMES = tuple(ROLE_SCORES)
+UNKNOWN_ROLE = len(ROLE_NAMES)
+ROLE_WEIGHTS = np.array([*ROLE_SCORES.values(), 0.5])
+ANCHOR_MASK = np.array([name in ANCHOR_ROLES for name in ROLE_NAMES] + [False])
+
+# calculate_runner_score race context defaults
+DEFAULT_CHAOS_LEVEL = 0.5
+DEFAULT_FIELD_SIZE = 10
+DEFAULT_MANIPULATION_RISK = 0.5
+
+TOP_N = 4
+
+NOT_AVAILABLE = "not_available"
+
+
+def encode_roles(roles: Sequence) -> np.ndarray:
+    """Market role names (or MarketRole enums) → int8 role codes."""
+    names = [getattr(role, 'value', role) for role in roles]
+    codes = pd.Index(ROLE_NAMES).get_indexer(pd.Index(names, dtype=object))
+    return np.where(codes < 0, UNKNOWN_ROLE, codes).astype(np.int8)
+
+
+def _per_race(values, n_races: int, default) -> np.ndarray:
+    """Broadcast a scalar or per-race sequence to a float array."""
+    if values is None:
+        values = default
+    return np.broadcast_to(np.asarray(values, dtype=float), (n_races,)).copy()
+
+
+@dataclass
+class RunnerArrays:
+    """
+    Runners of many races as parallel arrays.
+
+    Runner arrays have one entry per runner; race arrays one per race.
+    Modifier reasons are None when no runner carries Phase 2A data.
+    """
+    runner_ids: np.ndarray
+    odds: np.ndarray
+    roles: np.ndarray
+    offsets: np.ndarray
+    chaos_level: np.ndarray
+    field_size: np.ndarray
+    manipulation_risk: np.ndarray
+    stability: Optional[np.ndarray] = None
+    stability_reasons: Optional[np.ndarray] = None
+    historical: Optional[np.ndarray] = None
+    historical_reasons: Optional[np.ndarray] = None
+    profiles: Optional[List] = None
+
+    def __post_init__(self):
+        self.offsets = np.asarray(self.offsets, dtype=np.int64)
+        n_runners = int(self.offsets[-1])
+        if len(self.odds) != n_runners or len(self.roles) != n_runners or len(self.runner_ids) != n_runners:
+            raise ValueError(f"Runner arrays must have {n_runners} entries (offsets[-1])")
+        if self.stability is None:
+            self.stability = np.zeros(n_runners)
+        if self.historical is None:
+            self.historical = np.zeros(n_runners)
+
+    @property
+    def n_races(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_runners(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def sizes(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @classmethod
+    def from_columns(
+        cls,
+        runner_ids: Sequence,
+        odds: Sequence[float],
+        roles: Sequence,
+        offsets: Sequence[int],
+        chaos_level=None,
+        field_size=None,
+        manipulation_risk=None,
+    ) -> "RunnerArrays":
+        """
+        Runners from flat columns (e.g. a batched feature frame).
+
+        Args:
+            runner_ids: Runner id per runner
+            odds: Decimal odds per runner (already defaulted, as
+                profile_fields would return them)
+            roles: Market role names/enums, or int role codes
+            offsets: Race boundaries, len(races) + 1
+            chaos_level, field_size, manipulation_risk: Scalar or one
+                value per race; None uses the calculate_runner_score
+                defaults
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        n_races = len(offsets) - 1
+        roles = np.asarray(roles)
+        if roles.dtype.kind not in 'iu':
+            roles = encode_roles(roles)
+        return cls(
+            runner_ids=np.asarray(runner_ids, dtype=object),
+            odds=np.asarray(odds, dtype=float),
+            roles=roles.astype(np.int8),
+            offsets=offsets,
+            chaos_level=_per_race(chaos_level, n_races, DEFAULT_CHAOS_LEVEL),
+            field_size=_per_race(field_size, n_races, DEFAULT_FIELD_SIZE),
+            manipulation_risk=_per_race(manipulation_risk, n_races, DEFAULT_MANIPULATION_RISK),
+        )
+
+    @classmethod
+    def from_profiles(cls, races: Sequence[Tuple[Sequence, Dict]]) -> "RunnerArrays":
+        """
+        Runners from (opponent_profiles, race_ctx) pairs, as passed to rank_top4.
+
+        Profiles are read once with the same field rules as
+        calculate_runner_score and kept for returning Top-4 profiles.
+        """
+        profiles, runner_ids, roles, odds = [], [], [], []
+        stability, stability_reasons, historical, historical_reasons = [], [], [], []
+        sizes, chaos_level, field_size, manipulation_risk = [], [], [], []
+
+        for race_profiles, race_ctx in races:
+            sizes.append(len(race_profiles))
+            chaos_level.append(race_ctx.get('chaos_level', DEFAULT_CHAOS_LEVEL))
+            field_size.append(race_ctx.get('field_size', DEFAULT_FIELD_SIZE))
+            manipulation_risk.append(race_ctx.get('manipulation_risk', DEFAULT_MANIPULATION_RISK))
+
+            for profile in race_profiles:
+                runner_id, market_role, runner_odds = profile_fields(profile)
+                profiles.append(profile)
+                runner_ids.append(runner_id)
+                roles.append(market_role)
+                odds.append(runner_odds)
+
+                modifier, reason = stability_modifier_for(profile)
+                stability.append(modifier)
+                stability_reasons.append(reason)
+                modifier, reason = historical_modifier_for(profile)
+                historical.append(modifier)
+                historical_reasons.append(reason)
+
+        def reasons(values: List[str]) -> Optional[np.ndarray]:
+            if all(reason == NOT_AVAILABLE for reason in values):
+                return None
+            return np.asarray(values, dtype=object)
+
+        return cls(
+            runner_ids=np.asarray(runner_ids, dtype=object),
+            odds=np.asarray(odds, dtype=float),
+            roles=encode_roles(roles),
+            offsets=np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)]),
+            chaos_level=np.asarray(chaos_level, dtype=float),
+            field_size=np.asarray(field_size, dtype=float),
+            manipulation_risk=np.asarray(manipulation_risk, dtype=float),
+            stability=np.asarray(stability, dtype=float),
+            stability_reasons=reasons(stability_reasons),
+            historical=np.asarray(historical, dtype=float),
+            historical_reasons=reasons(historical_reasons),
+            profiles=profiles,
+        )
+
+
+class Top4Engine:
+    """
+    Scores and per-race order for a RunnerArrays batch.
+
+    Everything is computed once at construction; top4/breakdown lookups
+    are then O(1) slices, so one engine can serve a whole manifest.
+    """
+
+    def __init__(self, runners: RunnerArrays):
+        self.runners = runners
+        self.owner = np.repeat(np.arange(runners.n_races), runners.sizes)
+        self._score()
+        self._rank()
+        self._find_duplicate_ids()
+
+    @property
+    def n_races(self) -> int:
+        return self.runners.n_races
+
+    def _score(self):
+        r = self.runners
+        odds = r.odds
+        chaos_level = r.chaos_level[self.owner]
+        manipulation_risk = r.manipulation_risk[self.owner]
+
+        # Phase 1.1 anchor guard
+        implied_prob = np.zeros(len(odds))
+        np.divide(1.0, odds, out=implied_prob, where=odds > 0)
+        is_strong_favorite = (implied_prob >= 0.62) & (manipulation_risk < 0.45)
+        self.anchor_guard = np.where(is_strong_favorite & ANCHOR_MASK[r.roles], 0.10, 0.0)
+
+        # Components 1-4
+        self.role = ROLE_WEIGHTS[r.roles] * 0.40 + self.anchor_guard
+        self.odds_score = np.minimum(implied_prob / 0.80, 1.0) * 0.30
+
+        favorite = odds < 3.0
+        mid_range = (odds >= 3.0) & (odds <= 8.0)
+        self.chaos = np.where(
+            chaos_level > 0.6,
+            np.where(mid_range, 0.20, np.where(favorite, 0.10, 0.05)),
+            np.where(favorite, 0.20, np.where(mid_range, 0.15, 0.05)),
+        )
+
+        field_score = np.maximum(0.0, (20 - r.field_size) / 20.0) * 0.10
+        self.field = field_score[self.owner]
+
+        self.total = (
+            r.stability +
+            r.historical +
+            self.role +
+            self.odds_score +
+            self.chaos +
+            self.field
+        )
+
+    def _rank(self):
+        # Best first within each race; stable, so ties keep input order
+        self.order = np.lexsort((-self.total, self.owner))
+
+        sizes = self.runners.sizes
+        slots = np.arange(TOP_N)
+        positions = self.runners.offsets[:-1, None] + slots
+        valid = slots < sizes[:, None]
+        if len(self.order):
+            self.top4_matrix = np.where(valid, self.order[np.minimum(positions, len(self.order) - 1)], -1)
+        else:
+            self.top4_matrix = np.full((self.n_races, TOP_N), -1)
+
+    def _find_duplicate_ids(self):
+        # rank_top4 keys breakdowns by str(runner_id); duplicates break the score contract
+        keys = pd.DataFrame({
+            'race': self.owner,
+            'runner_id': [str(runner_id) for runner_id in self.runners.runner_ids],
+        })
+        duplicated = keys.duplicated().to_numpy()
+        self.duplicate_ids = np.bincount(self.owner[duplicated], minlength=self.n_races) > 0
+
+    def race_runners(self, race: int) -> slice:
+        """Runner index range of a race."""
+        return slice(int(self.runners.offsets[race]), int(self.runners.offsets[race + 1]))
+
+    def top4(self, race: int) -> np.ndarray:
+        """Runner indices of a race's Top-4, best first."""
+        row = self.top4_matrix[race]
+        return row[row >= 0]
+
+    def breakdown(self, runner: int) -> ScoreBreakdown:
+        """ScoreBreakdown for one runner, as calculate_runner_score returns it."""
+        r = self.runners
+        components = {
+            'stability': float(r.stability[runner]),
+            'historical': float(r.historical[runner]),
+            'role': float(self.role[runner]),
+            'odds': float(self.odds_score[runner]),
+            'chaos': float(self.chaos[runner]),
+            'field': float(self.field[runner]),
+            'anchor_guard': float(self.anchor_guard[runner]),
+            'stability_reason': NOT_AVAILABLE if r.stability_reasons is None else r.stability_reasons[runner],
+            'historical_reason': NOT_AVAILABLE if r.historical_reasons is None else r.historical_reasons[runner],
+        }
+        return ScoreBreakdown(total=float(self.total[runner]), components=components)
+
+    def breakdowns(self, race: int) -> Dict[str, ScoreBreakdown]:
+        """Breakdowns for every runner of a race, keyed by str(runner_id)."""
+        runners = self.race_runners(race)
+        return {
+            str(self.runners.runner_ids[i]): self.breakdown(i)
+            for i in range(runners.start, runners.stop)
+        }
+
+    def rank_race(self, race: int) -> Tuple[np.ndarray, Dict[str, ScoreBreakdown]]:
+        """
+        rank_top4 for one race: (Top-4 runner indices, score breakdowns).
+
+        Raises:
+            V12Error: If the race breaks the score or Top-4 contract
+        """
+        breakdowns = self.breakdowns(race)
+        field_size = int(self.runners.sizes[race])
+        if self.duplicate_ids[race]:
+            validate_scores(breakdowns, field_size)
+
+        top4 = self.top4(race)
+        validate_top4([self.runners.runner_ids[i] for i in top4], field_size)
+        return top4, breakdowns
+
+    def top4_profiles(self, race: int) -> List:
+        """Top-4 profiles of a race (engines built from profiles)."""
+        if self.runners.profiles is None:
+            raise ValueError("Engine was not built from profiles")
+        return [self.runners.profiles[i] for i in self.top4(race)]
+
+
+def rank_top4_many(races: Sequence[Tuple[Sequence, Dict]]) -> List[Tuple[List, Dict[str, ScoreBreakdown]]]:
+    """
+    rank_top4 over many (opponent_profiles, race_ctx) pairs in one pass.
+
+    Returns:
+        (top4_profiles, score_breakdowns) per race, as rank_top4 returns
+    """
+    engine = Top4Engine(RunnerArrays.from_profiles(races))
+    logger.info(f"Ranked {engine.runners.n_runners} runners in {engine.n_races} races")
+
+    results = []
+    for race in range(engine.n_races):
+        top4, breakdowns = engine.rank_race(race)
+        results.append(([engine.runners.profiles[i] for i in top4], breakdowns))
+    return results
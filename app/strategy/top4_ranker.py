@@ -35,6 +35,65 @@ class ScoreBreakdown:
         }
 
 
+# Component 1 role strengths (unknown roles score 0.5)
+ROLE_SCORES = {
+    'Liquidity_Anchor': 1.0,      # Favorite
+    'ANCHOR': 1.0,                 # Alias
+    'Release_Horse': 0.75,         # Second fav / mid-band
+    'RELEASE': 0.75,               # Alias
+    'Steam': 0.70,                 # Sharp money
+    'Drift_Bait': 0.40,            # Drifting
+    'Spoiler': 0.30,               # Tactical
+    'Noise': 0.20,                 # Outsider
+    'NOISE': 0.20                  # Alias
+}
+
+# Roles eligible for the Phase 1.1 anchor boost
+ANCHOR_ROLES = ('Liquidity_Anchor', 'ANCHOR')
+
+
+def profile_fields(profile: any) -> Tuple[any, any, float]:
+    """
+    (runner_id, market_role, odds) of a profile (object or dict).
+    """
+    if isinstance(profile, dict):
+        runner_id = profile.get('runner_id', 'unknown')
+        market_role = profile.get('market_role', 'Noise')
+        # Try multiple paths for odds
+        odds = profile.get('odds_decimal') or profile.get('evidence', {}).get('odds', 10.0)
+    else:
+        runner_id = getattr(profile, 'runner_id', 'unknown')
+        market_role = getattr(profile, 'market_role', None)
+        if hasattr(market_role, 'value'):
+            market_role = market_role.value
+        odds = getattr(profile, 'evidence', {}).get('odds', 10.0)
+    return runner_id, market_role, odds
+
+
+def stability_modifier_for(profile: any) -> Tuple[float, str]:
+    """Phase 2A stability modifier (±0.10) and its reason."""
+    if isinstance(profile, dict) and 'stability_profile' in profile:
+        from app.ml.stability_clusters import get_cluster_trust_modifier
+        cluster_id = profile['stability_profile'].get('cluster_id', '')
+        if cluster_id:
+            return get_cluster_trust_modifier(cluster_id), cluster_id
+    return 0.0, "not_available"
+
+
+def historical_modifier_for(profile: any) -> Tuple[float, str]:
+    """Phase 2A historical stats modifier (±0.05) and its reason."""
+    if isinstance(profile, dict) and 'historical_stats' in profile:
+        from app.ml.historical_stats import calculate_historical_modifier
+        hist_result = calculate_historical_modifier(
+            profile['historical_stats'],
+            use_trainer=True,
+            use_jockey=True,
+            use_combo=False
+        )
+        return hist_result['total_modifier'], hist_result['reason']
+    return 0.0, "not_available"
+
+
 def calculate_runner_score(
     profile: any,
     race_ctx: Dict
@@ -61,18 +120,7 @@ def calculate_runner_score(
     Returns:
         ScoreBreakdown with total and components
     """
-    # Extract profile data (handle both object and dict)
-    if isinstance(profile, dict):
-        runner_id = profile.get('runner_id', 'unknown')
-        market_role = profile.get('market_role', 'Noise')
-        # Try multiple paths for odds
-        odds = profile.get('odds_decimal') or profile.get('evidence', {}).get('odds', 10.0)
-    else:
-        runner_id = getattr(profile, 'runner_id', 'unknown')
-        market_role = getattr(profile, 'market_role', None)
-        if hasattr(market_role, 'value'):
-            market_role = market_role.value
-        odds = getattr(profile, 'evidence', {}).get('odds', 10.0)
+    runner_id, market_role, odds = profile_fields(profile)
     
     # Extract race context
     chaos_level = race_ctx.get('chaos_level', 0.5)
@@ -84,21 +132,10 @@ def calculate_runner_score(
     # boost anchor weight to prevent Release bias
     implied_prob = 1.0 / odds if odds > 0 else 0.0
     is_strong_favorite = (implied_prob >= 0.62 and manipulation_risk < 0.45)
-    anchor_boost = 0.10 if (is_strong_favorite and market_role in ['Liquidity_Anchor', 'ANCHOR']) else 0.0
+    anchor_boost = 0.10 if (is_strong_favorite and market_role in ANCHOR_ROLES) else 0.0
     
     # Component 1: Market role strength (40% base + anchor boost)
-    role_scores = {
-        'Liquidity_Anchor': 1.0,      # Favorite
-        'ANCHOR': 1.0,                 # Alias
-        'Release_Horse': 0.75,         # Second fav / mid-band
-        'RELEASE': 0.75,               # Alias
-        'Steam': 0.70,                 # Sharp money
-        'Drift_Bait': 0.40,            # Drifting
-        'Spoiler': 0.30,               # Tactical
-        'Noise': 0.20,                 # Outsider
-        'NOISE': 0.20                  # Alias
-    }
-    role_score = role_scores.get(market_role, 0.5) * 0.40 + anchor_boost
+    role_score = ROLE_SCORES.get(market_role, 0.5) * 0.40 + anchor_boost
     
     # Component 2: Odds-derived probability (30%)
     # (implied_prob already calculated above for anchor guard)
@@ -130,28 +167,10 @@ def calculate_runner_score(
     field_score = max(0.0, (20 - field_size) / 20.0) * 0.10
     
     # Phase 2A: Stability modifier (±0.10)
-    stability_modifier = 0.0
-    stability_reason = "not_available"
-    if isinstance(profile, dict) and 'stability_profile' in profile:
-        from app.ml.stability_clusters import get_cluster_trust_modifier
-        cluster_id = profile['stability_profile'].get('cluster_id', '')
-        if cluster_id:
-            stability_modifier = get_cluster_trust_modifier(cluster_id)
-            stability_reason = cluster_id
+    stability_modifier, stability_reason = stability_modifier_for(profile)
     
     # Phase 2A: Historical stats modifier (±0.05)
-    historical_modifier = 0.0
-    historical_reason = "not_available"
-    if isinstance(profile, dict) and 'historical_stats' in profile:
-        from app.ml.historical_stats import calculate_historical_modifier
-        hist_result = calculate_historical_modifier(
-            profile['historical_stats'],
-            use_trainer=True,
-            use_jockey=True,
-            use_combo=False
-        )
-        historical_modifier = hist_result['total_modifier']
-        historical_reason = hist_result['reason']
+    historical_modifier, historical_reason = historical_modifier_for(profile)
     
     # Total score
     total = (
@@ -28,6 +28,13 @@ def check_regression_report(report_path: str, fail_on_violation: bool = False):
     print("=" * 80)
     print(f"Status: {status}")
     
+    current = report.get("current_metrics", {})
+    total_latency = current.get("latency_ms", {}).get("total")
+    if total_latency:
+        print(f"Latency: p50={total_latency['p50']:.2f}ms p95={total_latency['p95']:.2f}ms per race")
+    if "throughput" in current:
+        print(f"Throughput: {current['throughput']['races_per_sec']:.1f} races/s")
+    
     if violations:
         print("\n❌ Violations found:")
         for v in violations:
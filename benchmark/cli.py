@@ -18,6 +18,10 @@ Examples:
   # Run benchmark
   python -m benchmark.cli run --manifest benchmark/manifest_2000.json --as-of-date 2026-01-09 --out /tmp/results.json
   
+  # Offline performance run against a synthetic fixture
+  python -m benchmark.cli fixture --n-races 500 --manifest-out /tmp/manifest.json --fixture-out /tmp/fixture.json
+  python -m benchmark.cli run --manifest /tmp/manifest.json --fixture /tmp/fixture.json --concurrency 8 --as-of-date 2026-01-09 --out /tmp/results.json
+  
   # Calculate metrics
   python -m benchmark.cli metrics --input /tmp/results.json --out /tmp/metrics.json
   
@@ -48,6 +52,20 @@ Examples:
     run_parser.add_argument('--out', required=True, help='Output path for results')
     run_parser.add_argument('--shard', type=int, help='Shard number (1-indexed)')
     run_parser.add_argument('--total-shards', type=int, help='Total number of shards')
+    run_parser.add_argument('--concurrency', type=int, default=1, help='Batches in flight at once')
+    run_parser.add_argument('--batch-size', type=int, default=100, help='Races per feature query')
+    run_parser.add_argument('--fixture', help='Run offline against a recorded fixture JSON')
+    run_parser.add_argument('--fixture-latency-ms', type=float, default=0.0, help='Simulated DB latency per query (fixture runs)')
+    run_parser.add_argument('--record-fixture', help='Record live feature rows to this fixture JSON')
+    run_parser.add_argument('--trace-allocations', action='store_true', help='Track allocations with tracemalloc')
+    
+    # Fixture command
+    fixture_parser = subparsers.add_parser('fixture', help='Synthesize an offline manifest + fixture')
+    fixture_parser.add_argument('--n-races', type=int, default=2000, help='Number of races')
+    fixture_parser.add_argument('--as-of-date', default='2026-01-09', help='Anchor date (YYYY-MM-DD)')
+    fixture_parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    fixture_parser.add_argument('--manifest-out', required=True, help='Output manifest JSON path')
+    fixture_parser.add_argument('--fixture-out', required=True, help='Output fixture JSON path')
     
     # Metrics command
     metrics_parser = subparsers.add_parser('metrics', help='Calculate metrics')
@@ -84,7 +102,27 @@ Examples:
     
     elif args.command == 'run':
         from benchmark.runner import run_benchmark
-        asyncio.run(run_benchmark(args.manifest, args.as_of_date, args.out, args.shard, args.total_shards))
+        asyncio.run(run_benchmark(
+            args.manifest, args.as_of_date, args.out, args.shard, args.total_shards,
+            concurrency=args.concurrency,
+            batch_size=args.batch_size,
+            fixture_path=args.fixture,
+            fixture_latency_ms=args.fixture_latency_ms,
+            record_fixture_path=args.record_fixture,
+            trace_allocations=args.trace_allocations
+        ))
+    
+    elif args.command == 'fixture':
+        from benchmark.fixtures import synthesize_fixture, write_fixture
+        import json
+        import os
+        
+        manifest, races = synthesize_fixture(args.n_races, args.as_of_date, seed=args.seed)
+        os.makedirs(os.path.dirname(args.manifest_out) if os.path.dirname(args.manifest_out) else '.', exist_ok=True)
+        with open(args.manifest_out, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        write_fixture(args.fixture_out, races)
+        print(f"✅ Wrote {args.n_races}-race manifest to {args.manifest_out} and fixture to {args.fixture_out}")
     
     elif args.command == 'metrics':
         from benchmark.metrics import calculate_metrics, calculate_hash
@@ -108,6 +146,10 @@ Examples:
             print(f"Coverage: {metrics['coverage_pct']:.2f}% ({metrics['scored_runners']}/{metrics['total_runners']} runners)")
             print(f"Races: {metrics['races_processed']}")
             print(f"Runtime: {metrics['runtime']['total_seconds']:.1f}s ({metrics['runtime']['avg_per_race']:.3f}s/race)")
+            for stage, stats in metrics.get('latency_ms', {}).items():
+                print(f"Latency {stage}: p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms p99={stats['p99']:.2f}ms")
+            if 'throughput' in metrics:
+                print(f"Throughput: {metrics['throughput']['races_per_sec']:.1f} races/s")
             
             if args.out:
                 os.makedirs(os.path.dirname(args.out) if os.path.dirname(args.out) else '.', exist_ok=True)
@@ -0,0 +1,151 @@
+"""
+Offline fixtures for benchmark runs.
+
+A fixture is a JSON file of per-race feature rows keyed by race_id, as
+returned by the feature mart query. FixtureDatabase serves it through the
+asyncpg-style interface get_features_for_racecard expects, so a run needs
+no Supabase/Postgres connection and is reproducible byte-for-byte.
+
+Fixtures are either recorded from a live run (RecordingDatabase) or
+synthesized with a matching manifest (synthesize_fixture).
+"""
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+
+FIXTURE_VERSION = "1.0"
+
+
+class FixtureDatabase:
+    """Read-only asyncpg-style client backed by a recorded fixture."""
+
+    def __init__(self, path: str, latency_ms: float = 0.0):
+        """
+        Args:
+            path: Fixture JSON path
+            latency_ms: Simulated round-trip latency per query (0 = none)
+        """
+        with open(path) as f:
+            fixture = json.load(f)
+
+        self.path = path
+        self.races: Dict[str, Dict] = fixture["races"]
+        self.latency_ms = latency_ms
+
+    async def _wait(self):
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+
+    async def fetch(self, query: str, race_id, *args) -> List[Dict]:
+        await self._wait()
+        if isinstance(race_id, (list, tuple)):
+            # Multi-race query (race_id = ANY($1)): rows carry their race_id
+            return [
+                dict(row, race_id=rid)
+                for rid in race_id
+                for row in self.races.get(str(rid), {}).get("runners", [])
+            ]
+        race = self.races.get(str(race_id))
+        return [dict(row) for row in race["runners"]] if race else []
+
+    async def fetchrow(self, query: str, race_id, *args):
+        await self._wait()
+        race = self.races.get(str(race_id))
+        return {"import_date": race.get("import_date")} if race else None
+
+    async def close(self):
+        pass
+
+
+class RecordingDatabase:
+    """Wraps a live asyncpg-style client and records feature rows per race."""
+
+    def __init__(self, db):
+        self.db = db
+        self.races: Dict[str, Dict] = {}
+
+    async def fetch(self, query: str, race_id, *args):
+        rows = await self.db.fetch(query, race_id, *args)
+        if isinstance(race_id, (list, tuple)):
+            for rid in race_id:
+                self.races.setdefault(str(rid), {})["runners"] = []
+            for row in rows:
+                row = dict(row)
+                self.races[str(row.pop("race_id"))]["runners"].append(row)
+        else:
+            self.races.setdefault(str(race_id), {})["runners"] = [dict(row) for row in rows]
+        return rows
+
+    async def fetchrow(self, query: str, race_id, *args):
+        row = await self.db.fetchrow(query, race_id, *args)
+        if row is not None and "import_date" in row:
+            self.races.setdefault(str(race_id), {})["import_date"] = str(row["import_date"])
+        return row
+
+    async def close(self):
+        await self.db.close()
+
+    def save(self, path: str):
+        """Write the recorded rows as a fixture."""
+        write_fixture(path, self.races)
+
+
+def write_fixture(path: str, races: Dict[str, Dict]):
+    os.makedirs(os.path.dirname(path) if os.path.dirname(path) else '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"version": FIXTURE_VERSION, "races": races}, f, indent=2, default=str)
+
+
+def synthesize_fixture(
+    n_races: int,
+    as_of_date: str = "2026-01-09",
+    min_runners: int = 5,
+    max_runners: int = 16,
+    seed: int = 0
+) -> Tuple[Dict, Dict[str, Dict]]:
+    """
+    Deterministic synthetic manifest + fixture for offline performance runs.
+
+    Returns:
+        (manifest, races) where races is the fixture's race map
+    """
+    rng = random.Random(seed)
+    manifest_races = []
+    races = {}
+
+    for i in range(n_races):
+        race_id = f"fixture-race-{i:05d}"
+        n_runners = rng.randint(min_runners, max_runners)
+        runners = []
+        for j in range(n_runners):
+            runners.append({
+                "runner_id": f"{race_id}-r{j:02d}",
+                "horse_name": f"Fixture Horse {i}-{j}",
+                "trainer": f"Trainer {rng.randint(1, 200)}",
+                "jockey": f"Jockey {rng.randint(1, 150)}",
+                "course": f"Course {i % 40}",
+                "distance": str(rng.choice([1000, 1200, 1600, 2000, 2400, 3200])),
+                "odds": round(rng.uniform(1.5, 50.0), 2),
+                "trainer_win_pct_30d": round(rng.uniform(0, 0.3), 4),
+                "jockey_win_pct_30d": round(rng.uniform(0, 0.3), 4),
+                "jt_combo_win_pct_365d": round(rng.uniform(0, 0.3), 4),
+            })
+        races[race_id] = {"import_date": as_of_date, "runners": runners}
+        manifest_races.append({
+            "race_id": race_id,
+            "course": runners[0]["course"],
+            "race_date": as_of_date,
+            "runners_count": n_runners,
+        })
+
+    manifest = {
+        "version": "1.0",
+        "description": f"Synthetic {n_races}-race manifest for offline benchmark runs (seed={seed})",
+        "as_of_date": as_of_date,
+        "n_races": n_races,
+        "races": manifest_races,
+    }
+    return manifest, races
@@ -51,6 +51,8 @@ def merge_shards(shards_dir: str, output_path: str):
     total_failures = 0
     total_elapsed = 0.0
     
+    performances = []
+    
     manifest_path = None
     as_of_date = None
     
@@ -59,6 +61,8 @@ def merge_shards(shards_dir: str, output_path: str):
         total_successes += shard.get("successes", 0)
         total_failures += shard.get("failures", 0)
         total_elapsed += shard.get("elapsed_seconds", 0)
+        if shard.get("performance"):
+            performances.append(shard["performance"])
         
         if manifest_path is None:
             manifest_path = shard.get("manifest")
@@ -79,6 +83,17 @@ def merge_shards(shards_dir: str, output_path: str):
         "results": all_results
     }
     
+    # Shards run side by side: throughput adds up, memory is per process
+    if performances:
+        merged["performance"] = {
+            "concurrency": performances[0].get("concurrency", 1),
+            "shards": len(performances),
+            "wall_seconds": max(p.get("wall_seconds", 0) for p in performances),
+            "races_per_sec": sum(p.get("races_per_sec", 0) for p in performances),
+            "peak_rss_mb": max(p.get("peak_rss_mb", 0) for p in performances),
+            "allocated_blocks_delta": max(p.get("allocated_blocks_delta", 0) for p in performances)
+        }
+    
     # Sort results by race_id for consistency
     merged["results"].sort(key=lambda x: x.get("race_id", ""))
     
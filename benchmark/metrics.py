@@ -9,13 +9,45 @@ import argparse
 import os
 
 
+# Per-race timing keys recorded by the runner (plus "total")
+LATENCY_STAGES = ("feature_fetch", "ranking", "serialization", "total")
+
+
+def latency_summary(results: List[Dict]) -> Dict:
+    """
+    p50/p95/p99/mean/max latency (ms) per stage over successful races.
+    """
+    summary = {}
+    for stage in LATENCY_STAGES:
+        samples = [
+            r["timings_ms"][stage]
+            for r in results
+            if r.get("status") == "success" and stage in r.get("timings_ms", {})
+        ]
+        if not samples:
+            continue
+        values = np.asarray(samples, dtype=float)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary[stage] = {
+            "p50": round(float(p50), 4),
+            "p95": round(float(p95), 4),
+            "p99": round(float(p99), 4),
+            "mean": round(float(values.mean()), 4),
+            "max": round(float(values.max()), 4),
+            "samples": int(values.size)
+        }
+    return summary
+
+
 def calculate_metrics(run_output_path: str) -> Dict:
     """
     Calculate coverage, runtime, distribution metrics.
     
     Metrics:
     - coverage_pct: % of runners with scores
-    - runtime_p50/p95/p99: percentiles
+    - latency_ms: per-stage p50/p95/p99 latency per race
+    - throughput: races/sec at the run's concurrency
+    - memory: peak RSS and allocation counts
     - score_distribution: min/max/mean/std
     - garbage_patterns: all-zero, placeholders, etc.
     """
@@ -26,9 +58,6 @@ def calculate_metrics(run_output_path: str) -> Dict:
     total_runners = 0
     scored_runners = 0
     
-    # Runtime (placeholder - need actual timing)
-    runtimes = []
-    
     # Scores
     all_scores = []
     
@@ -89,6 +118,23 @@ def calculate_metrics(run_output_path: str) -> Dict:
         }
     }
     
+    # Performance (runs recorded before per-stage timing have none)
+    latency = latency_summary(run["results"])
+    if latency:
+        metrics["latency_ms"] = latency
+    
+    performance = run.get("performance")
+    if performance:
+        metrics["throughput"] = {
+            "races_per_sec": round(performance.get("races_per_sec", 0), 3),
+            "concurrency": performance.get("concurrency", 1)
+        }
+        metrics["memory"] = {
+            key: performance[key]
+            for key in ("peak_rss_mb", "allocated_blocks_delta", "traced_peak_mb", "traced_blocks")
+            if key in performance
+        }
+    
     return metrics
 
 
@@ -150,6 +196,12 @@ def main():
         print(f"Runtime: {metrics['runtime']['total_seconds']:.1f}s ({metrics['runtime']['avg_per_race']:.3f}s/race)")
         print(f"Scores: min={metrics['score_distribution']['min']:.3f}, max={metrics['score_distribution']['max']:.3f}, mean={metrics['score_distribution']['mean']:.3f}")
         print(f"Garbage: {metrics['garbage_patterns']['all_zero_count']} zeros, {metrics['garbage_patterns']['placeholder_count']} placeholders")
+        for stage, stats in metrics.get("latency_ms", {}).items():
+            print(f"Latency {stage}: p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms p99={stats['p99']:.2f}ms")
+        if "throughput" in metrics:
+            print(f"Throughput: {metrics['throughput']['races_per_sec']:.1f} races/s (concurrency {metrics['throughput']['concurrency']})")
+        if "memory" in metrics:
+            print(f"Peak RSS: {metrics['memory'].get('peak_rss_mb', 0):.1f}MB")
         
         if args.out:
             os.makedirs(os.path.dirname(args.out) if os.path.dirname(args.out) else '.', exist_ok=True)
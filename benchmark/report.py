@@ -40,6 +40,20 @@ def generate_report(
     if "runtime" in baseline_metrics and "runtime" in current_metrics:
         runtime_delta = current_metrics["runtime"]["avg_per_race"] - baseline_metrics["runtime"]["avg_per_race"]
     
+    latency_deltas = {}
+    for stage, stats in current_metrics.get("latency_ms", {}).items():
+        baseline_stats = baseline_metrics.get("latency_ms", {}).get(stage)
+        if baseline_stats:
+            latency_deltas[stage] = {
+                pct: round(stats[pct] - baseline_stats.get(pct, 0), 4)
+                for pct in ("p50", "p95", "p99")
+            }
+    
+    throughput_delta = None
+    if "throughput" in baseline_metrics and "throughput" in current_metrics:
+        throughput_delta = (current_metrics["throughput"]["races_per_sec"]
+                            - baseline_metrics["throughput"]["races_per_sec"])
+    
     report = {
         "status": "PASS" if is_passing else "FAIL",
         "violations": violations,
@@ -47,7 +61,9 @@ def generate_report(
         "baseline_metrics": baseline_metrics,
         "deltas": {
             "coverage_delta": round(coverage_delta, 2),
-            "runtime_delta": round(runtime_delta, 3) if runtime_delta is not None else None
+            "runtime_delta": round(runtime_delta, 3) if runtime_delta is not None else None,
+            "latency_ms_delta": latency_deltas,
+            "throughput_delta": round(throughput_delta, 3) if throughput_delta is not None else None
         }
     }
     
@@ -67,6 +83,15 @@ def generate_report(
         print(f"Runtime: {current_metrics['runtime']['avg_per_race']:.3f}s/race "
               f"(baseline: {baseline_metrics['runtime']['avg_per_race']:.3f}s, delta: {runtime_delta:+.3f}s)")
     
+    for stage, delta in latency_deltas.items():
+        stats = current_metrics["latency_ms"][stage]
+        print(f"Latency {stage}: p50={stats['p50']:.2f}ms ({delta['p50']:+.2f}) "
+              f"p95={stats['p95']:.2f}ms ({delta['p95']:+.2f})")
+    
+    if throughput_delta is not None:
+        print(f"Throughput: {current_metrics['throughput']['races_per_sec']:.1f} races/s "
+              f"(baseline: {baseline_metrics['throughput']['races_per_sec']:.1f}, delta: {throughput_delta:+.1f})")
+    
     if violations:
         print("\n❌ VIOLATIONS:")
         for v in violations:
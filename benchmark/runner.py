@@ -2,10 +2,11 @@
 Execute VELO pipeline on benchmark manifest.
 Deterministic: same manifest + as_of_date → same output.
 """
+import asyncio
 import json
-import hashlib
 import time
 import argparse
+import tracemalloc
 from typing import Dict, List
 from datetime import datetime
 import sys
@@ -15,12 +16,177 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+# Timed stages per race (milliseconds in the run output)
+STAGES = ("feature_fetch", "ranking", "serialization")
+
+# Feature columns the ranker consumes, with defaults for missing values
+PROFILE_COLUMNS = {
+    'runner_id': 'unknown',
+    'horse_name': '',
+    'odds': 10.0,
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (MB)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+def features_to_runners(features):
+    """
+    Ranker arrays for a batched feature fetch (one RunnerArrays for all races).
+
+    Missing columns take the PROFILE_COLUMNS defaults; every runner gets
+    the default 'NOISE' market role until market data is wired in. Odds
+    follow the profile rule (a falsy value falls back to 10.0).
+    """
+    from app.strategy.top4_engine import RunnerArrays
+
+    frame = features.frame
+    columns = {
+        name: (frame[name].tolist() if name in frame.columns else [default] * len(frame))
+        for name, default in PROFILE_COLUMNS.items()
+    }
+    sizes = features.runner_counts
+    return RunnerArrays.from_columns(
+        runner_ids=columns['runner_id'],
+        odds=[odds or 10.0 for odds in columns['odds']],
+        roles=['NOISE'] * len(frame),  # Default role, would come from market data
+        offsets=features.offsets,
+        chaos_level=0.5,  # Default, would be calculated
+        field_size=sizes,
+        manipulation_risk=0.3  # Default
+    ), columns['horse_name']
+
+
+def open_database(fixture_path: str = None, fixture_latency_ms: float = 0.0, record_path: str = None):
+    """Fixture-backed client for offline runs, else the live database client."""
+    from benchmark.fixtures import FixtureDatabase, RecordingDatabase
+
+    if fixture_path:
+        return FixtureDatabase(fixture_path, latency_ms=fixture_latency_ms)
+
+    from workers.ingestion_spine.db import DatabaseClient
+    db = DatabaseClient()
+    return RecordingDatabase(db) if record_path else db
+
+
+def process_race(race_id: str, engine, race: int, names: List[str], fetch_ms: float, rank_ms: float) -> Dict:
+    """
+    Rank one race from the batch's ranking engine and serialize the result, timing each stage.
+    
+    Args:
+        race_id: Race id
+        engine: Top4Engine scored over the whole batch
+        race: The race's index in the engine
+        names: Horse name per runner in the engine
+        fetch_ms: This race's share of the batched feature fetch
+        rank_ms: This race's share of the batched scoring
+    """
+    timings = {"feature_fetch": fetch_ms}
+    runners_count = int(engine.runners.sizes[race])
+
+    try:
+        t1 = time.perf_counter()
+        if runners_count:
+            top4, score_breakdowns = engine.rank_race(race)
+        else:
+            top4, score_breakdowns = [], {}
+        t2 = time.perf_counter()
+        timings["ranking"] = rank_ms + (t2 - t1) * 1000
+
+        # Format predictions
+        runner_ids = engine.runners.runner_ids
+        predictions = {
+            'top_4': [
+                {
+                    'position': i + 1,
+                    'runner_id': runner_ids[idx],
+                    'name': names[idx],
+                    # ScoreBreakdown is a dataclass, not a dict
+                    'score': score_breakdowns[runner_ids[idx]].total
+                    if runner_ids[idx] in score_breakdowns else 0.0
+                }
+                for i, idx in enumerate(top4)
+            ]
+        }
+        result = {
+            "race_id": race_id,
+            "runners_count": runners_count,
+            "predictions": predictions,
+            "status": "success"
+        }
+        # Serialization cost of the payload the API would return
+        json.dumps(result, default=str)
+        t3 = time.perf_counter()
+        timings["serialization"] = (t3 - t2) * 1000
+        timings["total"] = fetch_ms + timings["ranking"] + timings["serialization"]
+
+    except Exception as e:
+        print(f"   ⚠️  Error processing race {race_id}: {e}")
+        result = {
+            "race_id": race_id,
+            "status": "error",
+            "error": str(e)
+        }
+
+    result["timings_ms"] = {stage: round(ms, 4) for stage, ms in timings.items()}
+    return result
+
+
+async def process_batch(db, races: List[Dict], as_of_date: str) -> List[Dict]:
+    """
+    Fetch features for a batch of races in one round trip, score every
+    runner of the batch in one array pass, then rank each race.
+    
+    The batched fetch and scoring times are split evenly across the batch's races.
+    """
+    from app.engine.features import get_features_for_racecards
+    from app.strategy.top4_engine import Top4Engine
+
+    race_ids = [race["race_id"] for race in races]
+    try:
+        t0 = time.perf_counter()
+        # Get features (deterministic)
+        features = await get_features_for_racecards(db, race_ids, as_of_date=as_of_date)
+        t1 = time.perf_counter()
+        runners, names = features_to_runners(features)
+        engine = Top4Engine(runners)
+        t2 = time.perf_counter()
+    except Exception as e:
+        print(f"   ⚠️  Error fetching features for {len(races)} races: {e}")
+        return [
+            {"race_id": race_id, "status": "error", "error": str(e), "timings_ms": {}}
+            for race_id in race_ids
+        ]
+
+    fetch_ms = (t1 - t0) * 1000 / max(len(races), 1)
+    rank_ms = (t2 - t1) * 1000 / max(len(races), 1)
+    positions = {race_id: i for i, race_id in enumerate(features.race_ids)}
+    return [
+        process_race(race_id, engine, positions[str(race_id)], names, fetch_ms, rank_ms)
+        for race_id in race_ids
+    ]
+
+
 async def run_benchmark(
     manifest_path: str,
     as_of_date: str,
     output_path: str,
     shard: int = None,
-    total_shards: int = None
+    total_shards: int = None,
+    concurrency: int = 1,
+    batch_size: int = 100,
+    fixture_path: str = None,
+    fixture_latency_ms: float = 0.0,
+    record_fixture_path: str = None,
+    trace_allocations: bool = False
 ) -> Dict:
     """
     Run pipeline on all races in manifest.
@@ -30,12 +196,24 @@ async def run_benchmark(
     2. Run Phase 2A scoring
     3. Generate Top-4 predictions
     
+    Features are fetched for `batch_size` races per query. Each stage is
+    timed per race (the batched fetch is split across its races); the run
+    records races/sec, peak RSS and allocation counts. Up to `concurrency`
+    batches are in flight at once (results keep manifest order, so the
+    output hash is unchanged).
+    
     Args:
         manifest_path: Path to manifest JSON
         as_of_date: Anchor date for feature extraction
         output_path: Output path for results
         shard: Shard number (1-indexed) for parallel execution
         total_shards: Total number of shards
+        concurrency: Batches processed concurrently in-process
+        batch_size: Races per feature query
+        fixture_path: Serve features from a recorded fixture (offline run)
+        fixture_latency_ms: Simulated per-query latency for fixture runs
+        record_fixture_path: Record live feature rows to this fixture
+        trace_allocations: Track Python allocations with tracemalloc (slower)
     
     Returns:
         {
@@ -43,13 +221,10 @@ async def run_benchmark(
             "manifest": str,
             "as_of_date": str,
             "races_processed": int,
+            "performance": {...},
             "results": [...]
         }
     """
-    from app.engine.features import get_features_for_racecard
-    from app.strategy.top4_ranker import rank_top4
-    from workers.ingestion_spine.db import DatabaseClient
-    
     # Load manifest
     with open(manifest_path) as f:
         manifest = json.load(f)
@@ -64,84 +239,54 @@ async def run_benchmark(
         races = [r for i, r in enumerate(races) if i % total_shards == shard_idx]
         print(f"   Processing {len(races)} races in this shard")
     
-    db = DatabaseClient()
-    results = []
+    db = open_database(fixture_path, fixture_latency_ms, record_fixture_path)
+    batch_size = max(1, batch_size)
+    batches = [races[i:i + batch_size] for i in range(0, len(races), batch_size)]
+    batch_results: List[List[Dict]] = [None] * len(batches)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    completed = 0
     
-    start_time = time.time()
+    async def run_one(idx: int, batch: List[Dict]):
+        nonlocal completed
+        async with semaphore:
+            batch_results[idx] = await process_batch(db, batch, as_of_date)
+        completed += len(batch)
+        print(f"   Progress: {completed}/{len(races)} races")
     
-    try:
-        for idx, race in enumerate(races):
-            race_id = race["race_id"]
-            
-            if (idx + 1) % 10 == 0:
-                print(f"   Progress: {idx + 1}/{len(races)} races")
-            
-            try:
-                # Get features (deterministic)
-                features_df = await get_features_for_racecard(
-                    db, 
-                    race_id, 
-                    as_of_date=as_of_date
-                )
-                
-                # Convert DataFrame to profiles for ranking
-                # The top4_ranker expects a list of profile dicts
-                runner_profiles = []
-                
-                if not features_df.empty:
-                    for _, row in features_df.iterrows():
-                        profile = {
-                            'runner_id': row.get('runner_id', 'unknown'),
-                            'horse_name': row.get('horse_name', ''),
-                            'market_role': 'NOISE',  # Default role, would come from market data
-                            'odds_decimal': row.get('odds', 10.0),
-                        }
-                        runner_profiles.append(profile)
-                    
-                    # Build race context
-                    race_ctx = {
-                        'chaos_level': 0.5,  # Default, would be calculated
-                        'field_size': len(runner_profiles),
-                        'manipulation_risk': 0.3  # Default
-                    }
-                    
-                    # Run ranking
-                    top4_profiles, score_breakdowns = rank_top4(runner_profiles, race_ctx)
-                    
-                    # Format predictions
-                    predictions = {
-                        'top_4': [
-                            {
-                                'position': i + 1,
-                                'runner_id': p.get('runner_id', 'unknown'),
-                                'name': p.get('horse_name', ''),
-                                'score': score_breakdowns.get(p.get('runner_id', 'unknown'), {}).get('total', 0.0)
-                            }
-                            for i, p in enumerate(top4_profiles[:4])
-                        ]
-                    }
-                else:
-                    predictions = {'top_4': []}
-                
-                results.append({
-                    "race_id": race_id,
-                    "runners_count": len(runner_profiles),
-                    "predictions": predictions,
-                    "status": "success"
-                })
-                
-            except Exception as e:
-                print(f"   ⚠️  Error processing race {race_id}: {e}")
-                results.append({
-                    "race_id": race_id,
-                    "status": "error",
-                    "error": str(e)
-                })
+    if trace_allocations:
+        tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    start_time = time.perf_counter()
     
+    try:
+        await asyncio.gather(*(run_one(idx, batch) for idx, batch in enumerate(batches)))
     finally:
         await db.close()
     
-    elapsed = time.time() - start_time
+    results = [result for batch in batch_results for result in batch]
+    
+    elapsed = time.perf_counter() - start_time
+    
+    performance = {
+        "concurrency": max(1, concurrency),
+        "batch_size": batch_size,
+        "feature_queries": len(batches),
+        "offline": fixture_path is not None,
+        "wall_seconds": elapsed,
+        "races_per_sec": len(races) / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 2),
+        "allocated_blocks_delta": sys.getallocatedblocks() - blocks_before,
+    }
+    if trace_allocations:
+        _, traced_peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        performance["traced_peak_mb"] = round(traced_peak / 1024 ** 2, 3)
+        performance["traced_blocks"] = sum(stat.count for stat in snapshot.statistics('filename'))
+    
+    if record_fixture_path and hasattr(db, 'save'):
+        db.save(record_fixture_path)
+        print(f"   Recorded fixture: {record_fixture_path}")
     
     # Output
     output = {
@@ -154,6 +299,7 @@ async def run_benchmark(
         "successes": sum(1 for r in results if r["status"] == "success"),
         "failures": sum(1 for r in results if r["status"] == "error"),
         "elapsed_seconds": elapsed,
+        "performance": performance,
         "timestamp": datetime.utcnow().isoformat(),
         "results": results
     }
@@ -168,7 +314,8 @@ async def run_benchmark(
     print(f"   Races: {output['races_processed']}")
     print(f"   Success: {output['successes']}")
     print(f"   Failures: {output['failures']}")
-    print(f"   Time: {elapsed:.1f}s")
+    print(f"   Time: {elapsed:.1f}s ({performance['races_per_sec']:.1f} races/s, concurrency {performance['concurrency']})")
+    print(f"   Peak RSS: {performance['peak_rss_mb']:.1f}MB")
     
     return output
 
@@ -180,6 +327,12 @@ def main():
     parser.add_argument("--out", required=True, help="Output path for results")
     parser.add_argument("--shard", type=int, help="Shard number (1-indexed)")
     parser.add_argument("--total-shards", type=int, help="Total number of shards")
+    parser.add_argument("--concurrency", type=int, default=1, help="Batches in flight at once")
+    parser.add_argument("--batch-size", type=int, default=100, help="Races per feature query")
+    parser.add_argument("--fixture", help="Run offline against a recorded fixture JSON")
+    parser.add_argument("--fixture-latency-ms", type=float, default=0.0, help="Simulated DB latency per query (fixture runs)")
+    parser.add_argument("--record-fixture", help="Record live feature rows to this fixture JSON")
+    parser.add_argument("--trace-allocations", action="store_true", help="Track allocations with tracemalloc")
     
     args = parser.parse_args()
     
@@ -187,13 +340,18 @@ def main():
         print("Error: --shard and --total-shards must be used together")
         sys.exit(1)
     
-    import asyncio
     asyncio.run(run_benchmark(
         args.manifest,
         args.as_of_date,
         args.out,
         args.shard,
-        args.total_shards
+        args.total_shards,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        fixture_path=args.fixture,
+        fixture_latency_ms=args.fixture_latency_ms,
+        record_fixture_path=args.record_fixture,
+        trace_allocations=args.trace_allocations
     ))
 
 
@@ -21,6 +21,17 @@ HARD_GATES = {
     "runtime": {
         "p95_multiplier": 1.30,
         "description": "p95 runtime ≤ baseline × 1.30"
+    },
+    "latency": {
+        "stages": ["total", "feature_fetch", "ranking"],
+        "p50_multiplier": 1.20,
+        "p95_multiplier": 1.30,
+        "min_slack_ms": 1.0,
+        "description": "Per-stage p50 ≤ baseline × 1.20 and p95 ≤ baseline × 1.30 (+1ms slack)"
+    },
+    "throughput": {
+        "min_ratio": 0.80,
+        "description": "races/sec ≥ baseline × 0.80 at the same concurrency"
     }
 }
 
@@ -83,10 +94,59 @@ def check_regression(current_metrics: dict, baseline_metrics: dict) -> tuple:
                 f"(baseline: {baseline_runtime:.3f}s × 1.30)"
             )
     
+    violations.extend(check_performance(current_metrics, baseline_metrics))
+    
     is_passing = len(violations) == 0
     return is_passing, violations
 
 
+def check_performance(current_metrics: dict, baseline_metrics: dict) -> list:
+    """
+    Latency and throughput gates.
+    
+    Only applied where both runs recorded the metric, so baselines frozen
+    before per-stage timing still compare on coverage/runtime alone. The
+    slack keeps sub-millisecond stages from failing on timer noise.
+    
+    Returns:
+        List of violation messages
+    """
+    violations = []
+    gate = HARD_GATES["latency"]
+    
+    current_latency = current_metrics.get("latency_ms", {})
+    baseline_latency = baseline_metrics.get("latency_ms", {})
+    for stage in gate["stages"]:
+        if stage not in current_latency or stage not in baseline_latency:
+            continue
+        for pct in ("p50", "p95"):
+            multiplier = gate[f"{pct}_multiplier"]
+            baseline_ms = baseline_latency[stage].get(pct, 0)
+            current_ms = current_latency[stage].get(pct, 0)
+            max_allowed_ms = baseline_ms * multiplier + gate["min_slack_ms"]
+            
+            if current_ms > max_allowed_ms:
+                violations.append(
+                    f"Latency regression ({stage} {pct}): {current_ms:.2f}ms > {max_allowed_ms:.2f}ms "
+                    f"(baseline: {baseline_ms:.2f}ms × {multiplier:.2f})"
+                )
+    
+    current_tp = current_metrics.get("throughput", {})
+    baseline_tp = baseline_metrics.get("throughput", {})
+    if current_tp and baseline_tp and current_tp.get("concurrency") == baseline_tp.get("concurrency"):
+        min_ratio = HARD_GATES["throughput"]["min_ratio"]
+        min_allowed = baseline_tp.get("races_per_sec", 0) * min_ratio
+        current_rate = current_tp.get("races_per_sec", 0)
+        
+        if current_rate < min_allowed:
+            violations.append(
+                f"Throughput regression: {current_rate:.1f} races/s < {min_allowed:.1f} races/s "
+                f"(baseline: {baseline_tp['races_per_sec']:.1f} × {min_ratio:.2f})"
+            )
+    
+    return violations
+
+
 def check_hash_match(current_hash: str, baseline_hash: str) -> tuple:
     """
     Check if hash matches for determinism validation.
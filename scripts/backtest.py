@@ -26,6 +26,10 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.settings import settings
 from src.core import log
+from src.data.raceform_parsers import parse_odds, parse_rating, parse_position
+from src.data.racing_dataset import load_racing_data
+from src.models.conditional_logit import RaceSegments
+from src.backtesting.bankroll import simulate_bankroll
 import logging
 
 # Setup logging
@@ -33,61 +37,31 @@ log.setup_logging("config/logging.json")
 logger = logging.getLogger("velo.backtest")
 
 
-def parse_odds(sp_str):
-    """Parse starting price to decimal odds"""
-    if pd.isna(sp_str) or sp_str == '–':
-        return None
-    
-    sp_str = str(sp_str).strip().replace('F', '').strip()
-    
-    if sp_str.lower() == 'evens':
-        return 2.0
-    
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            return (float(parts[0]) / float(parts[1])) + 1.0
-        except:
-            return None
-    
-    try:
-        return float(sp_str)
-    except:
-        return None
+RACE_KEYS = ['date', 'course', 'race_id']
 
 
-def parse_rating(rating_str):
-    """Parse rating to integer"""
-    if pd.isna(rating_str) or rating_str == '–':
-        return None
-    try:
-        return int(rating_str)
-    except:
-        return None
+def race_segments(df):
+    """Race offsets over df rows (shared segment engine)"""
+    return RaceSegments.from_keys(df[RACE_KEYS])
 
 
 def load_data(filepath, start_date, end_date):
     """Load and prepare race data"""
     logger.info(f"Loading data from {filepath}...")
     
-    df = pd.read_csv(filepath, low_memory=False)
-    logger.info(f"Loaded {len(df)} rows")
-    
-    # Parse dates
+    # Date range is pushed into the scan for Parquet datasets
+    df = load_racing_data(filepath, start_date=start_date, end_date=end_date)
     df['date'] = pd.to_datetime(df['date'])
-    
-    # Filter by date range
-    df = df[(df['date'] >= start_date) & (df['date'] <= end_date)]
-    logger.info(f"Filtered to {start_date} - {end_date}: {len(df)} rows")
+    logger.info(f"Loaded {start_date} - {end_date}: {len(df)} rows")
     
     # Parse odds and ratings
-    df['sp_decimal'] = df['sp'].apply(parse_odds)
-    df['or_int'] = df['or'].apply(parse_rating)
-    df['rpr_int'] = df['rpr'].apply(parse_rating)
-    df['ts_int'] = df['ts'].apply(parse_rating)
+    df['sp_decimal'] = parse_odds(df['sp'])
+    df['or_int'] = parse_rating(df['or'])
+    df['rpr_int'] = parse_rating(df['rpr'])
+    df['ts_int'] = parse_rating(df['ts'])
     
     # Parse position
-    df['pos_int'] = df['pos'].apply(lambda x: int(float(x)) if pd.notna(x) and str(x).replace('.','').isdigit() else None)
+    df['pos_int'] = parse_position(df['pos'])
     df['is_winner'] = (df['pos_int'] == 1).astype(int)
     
     # Filter: must have odds, ratings, and result
@@ -99,9 +73,7 @@ def load_data(filepath, start_date, end_date):
     
     # Calculate public probability
     df['p_public'] = 1.0 / df['sp_decimal']
-    df['p_public_norm'] = df.groupby(['date', 'course', 'race_id'])['p_public'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_public_norm'] = race_segments(df).normalize(df['p_public'])
     
     return df
 
@@ -129,13 +101,8 @@ def normalize_fundamental_probabilities(df):
     df['rating_avg'] = df.apply(calculate_fundamental_probability, axis=1)
     df = df[df['rating_avg'].notna()].copy()
     
-    def softmax_race(group):
-        ratings = group['rating_avg'].values
-        exp_ratings = np.exp(ratings / 20.0)
-        probs = exp_ratings / exp_ratings.sum()
-        return pd.Series(probs, index=group.index)
-    
-    df['p_fundamental'] = df.groupby(['date', 'course', 'race_id']).apply(softmax_race).reset_index(level=[0,1,2], drop=True)
+    # Softmax of ratings within each race (temperature = 20)
+    df['p_fundamental'] = race_segments(df).softmax(df['rating_avg'].to_numpy() / 20.0)
     
     return df
 
@@ -148,9 +115,7 @@ def apply_benter_model(df, alpha, beta):
     df['p_model_raw'] = alpha * df['p_fundamental'] + beta * df['p_public_norm']
     
     # Normalize by race
-    df['p_model'] = df.groupby(['date', 'course', 'race_id'])['p_model_raw'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_model'] = race_segments(df).normalize(df['p_model_raw'])
     
     return df
 
@@ -182,34 +147,6 @@ def identify_overlays(df, min_edge=0.02, min_odds=1.5, max_odds=200.0):
     return overlays
 
 
-def calculate_kelly_stake(p_model, odds, fractional_kelly=0.33, bankroll=1.0):
-    """
-    Calculate Kelly criterion stake
-    
-    Args:
-        p_model: Model probability
-        odds: Decimal odds
-        fractional_kelly: Fraction of Kelly to use (0.0-1.0)
-        bankroll: Current bankroll
-    
-    Returns:
-        Stake amount
-    """
-    # Full Kelly: f* = (p * odds - 1) / (odds - 1)
-    full_kelly = (p_model * odds - 1) / (odds - 1)
-    
-    # Fractional Kelly
-    kelly_fraction = full_kelly * fractional_kelly
-    
-    # Clip to [0, 1] (never bet more than bankroll, never negative)
-    kelly_fraction = np.clip(kelly_fraction, 0.0, 1.0)
-    
-    # Stake
-    stake = kelly_fraction * bankroll
-    
-    return stake
-
-
 def simulate_betting(overlays, initial_bankroll=1000.0, fractional_kelly=0.33):
     """
     Simulate betting with Kelly sizing
@@ -227,53 +164,35 @@ def simulate_betting(overlays, initial_bankroll=1000.0, fractional_kelly=0.33):
     # Sort by date
     overlays = overlays.sort_values('date').copy()
     
-    # Initialize
-    bankroll = initial_bankroll
-    bankroll_history = [bankroll]
-    
-    results = []
-    
-    for idx, row in overlays.iterrows():
-        # Calculate stake
-        stake = calculate_kelly_stake(
-            row['p_model'],
-            row['sp_decimal'],
-            fractional_kelly,
-            bankroll
-        )
-        
-        # Place bet
-        if row['is_winner'] == 1:
-            # Win
-            profit = stake * (row['sp_decimal'] - 1)
-            bankroll += profit
-            result = 'win'
-        else:
-            # Loss
-            profit = -stake
-            bankroll += profit
-            result = 'loss'
-        
-        bankroll_history.append(bankroll)
-        
-        results.append({
-            'date': row['date'],
-            'course': row['course'],
-            'race_id': row['race_id'],
-            'horse': row['horse'],
-            'odds': row['sp_decimal'],
-            'p_model': row['p_model'],
-            'p_market': row['p_market'],
-            'edge': row['edge'],
-            'stake': stake,
-            'profit': profit,
-            'bankroll': bankroll,
-            'result': result
-        })
-    
-    results_df = pd.DataFrame(results)
-    
-    logger.info(f"Simulation complete: {len(results)} bets placed")
+    # Every overlay compounds on its own (one bet per step)
+    won = (overlays['is_winner'] == 1).to_numpy()
+    path = simulate_bankroll(
+        np.arange(len(overlays) + 1),
+        overlays['p_model'].to_numpy(dtype=float),
+        overlays['sp_decimal'].to_numpy(dtype=float),
+        won,
+        initial_bankroll=initial_bankroll,
+        kelly_fraction=fractional_kelly
+    )
+    bankroll = path.equity[-1]
+    bankroll_history = path.equity.tolist()
+    
+    results_df = pd.DataFrame({
+        'date': overlays['date'].to_numpy(),
+        'course': overlays['course'].to_numpy(),
+        'race_id': overlays['race_id'].to_numpy(),
+        'horse': overlays['horse'].to_numpy(),
+        'odds': overlays['sp_decimal'].to_numpy(),
+        'p_model': overlays['p_model'].to_numpy(),
+        'p_market': overlays['p_market'].to_numpy(),
+        'edge': overlays['edge'].to_numpy(),
+        'stake': path.stakes,
+        'profit': path.profits,
+        'bankroll': path.equity[1:],
+        'result': np.where(won, 'win', 'loss')
+    })
+    
+    logger.info(f"Simulation complete: {len(results_df)} bets placed")
     logger.info(f"Final bankroll: £{bankroll:.2f} (started with £{initial_bankroll:.2f})")
     
     return results_df, bankroll_history
@@ -379,7 +298,7 @@ def plot_results(results_df, bankroll_history, output_dir):
 
 def main():
     parser = argparse.ArgumentParser(description='Backtest Benter model')
-    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv', help='Path to raceform.csv')
+    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv', help='Path to raceform.csv or Parquet dataset')
     parser.add_argument('--weights', default='models/benter_weights.json', help='Path to trained weights')
     parser.add_argument('--start-date', default='2024-01-01', help='Backtest start date')
     parser.add_argument('--end-date', default='2024-12-31', help='Backtest end date')
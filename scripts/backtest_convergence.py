@@ -7,18 +7,23 @@ Tests intelligence stack convergence hypothesis:
 - ROI improvement over baseline
 - Hit rate and volatility metrics
 
-Designed for memory-efficient processing of large datasets.
+Designed for memory-efficient processing of large datasets: each year is
+packed once (backtesting.packed_races) and the year × configuration runs
+fan out over a process pool that attaches to the packed data in shared
+memory. Results are collected in submission order, so the report matches
+a serial run.
 
 Author: VÉLØ Oracle Team
 Version: 1.0.0
 """
 
+import os
 import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 import json
 from dataclasses import dataclass, asdict
 
@@ -34,6 +39,7 @@ from intelligence.sqpe import SQPE
 from intelligence.tie import TIE
 from intelligence.nds import NDS
 from intelligence.orchestrator import IntelligenceOrchestrator
+from backtesting.packed_races import PackedRaces, run_packed_jobs
 
 logger = get_logger(__name__)
 settings = get_settings()
@@ -168,12 +174,24 @@ class ConvergenceBacktester:
             'runners': runners
         }
     
-    def run_baseline_backtest(self, df: pd.DataFrame, year: int) -> BacktestResult:
+    @staticmethod
+    def pack(df: Union[pd.DataFrame, PackedRaces]) -> PackedRaces:
+        """
+        Race data for every race of a DataFrame, packed once
+        
+        Same races, order and runner dicts as df.groupby('race_id') +
+        prepare_race_data, without a per-row iterrows pass per run.
+        """
+        if isinstance(df, PackedRaces):
+            return df
+        return PackedRaces.from_frame(df)
+    
+    def run_baseline_backtest(self, df: Union[pd.DataFrame, PackedRaces], year: int) -> BacktestResult:
         """
         Run baseline Benter backtest (no intelligence)
         
         Args:
-            df: Race data
+            df: Race data (DataFrame or PackedRaces)
             year: Year being tested
             
         Returns:
@@ -190,11 +208,11 @@ class ConvergenceBacktester:
         
         bankroll_history = [bankroll]
         
-        # Group by race
-        for race_id, race_df in df.groupby('race_id'):
+        races = self.pack(df)
+        for race_index in range(races.n_races):
             total_races += 1
             
-            race_data = self.prepare_race_data(race_df)
+            race_data = races.race_data(race_index)
             
             # Get Benter probabilities
             probs = self.benter.predict_probabilities(race_data)
@@ -270,7 +288,7 @@ class ConvergenceBacktester:
     
     def run_intelligence_backtest(
         self,
-        df: pd.DataFrame,
+        df: Union[pd.DataFrame, PackedRaces],
         year: int,
         min_modules: int = 2,
         sqpe_threshold: float = 0.6,
@@ -281,7 +299,7 @@ class ConvergenceBacktester:
         Run intelligence stack backtest with convergence requirement
         
         Args:
-            df: Race data
+            df: Race data (DataFrame or PackedRaces)
             year: Year being tested
             min_modules: Minimum modules that must agree (2 or 3)
             sqpe_threshold: SQPE confidence threshold
@@ -320,11 +338,11 @@ class ConvergenceBacktester:
         
         bankroll_history = [bankroll]
         
-        # Group by race
-        for race_id, race_df in df.groupby('race_id'):
+        races = self.pack(df)
+        for race_index in range(races.n_races):
             total_races += 1
             
-            race_data = self.prepare_race_data(race_df)
+            race_data = races.race_data(race_index)
             
             # Get Benter probabilities
             probs = self.benter.predict_probabilities(race_data)
@@ -451,38 +469,53 @@ class ConvergenceBacktester:
         
         return result
     
-    def run_comprehensive_suite(self, years: List[int]) -> List[BacktestResult]:
+    def run_comprehensive_suite(
+        self,
+        years: List[int],
+        workers: Optional[int] = None
+    ) -> List[BacktestResult]:
         """
         Run comprehensive test suite across multiple years
         
+        Each year is loaded and packed once; the baseline and min_modules
+        runs for every year then share it. With workers > 1 the runs go to
+        a process pool attached to the packed data in shared memory.
+        
         Args:
             years: List of years to test
+            workers: Worker processes (default: all cores; 1 = serial)
             
         Returns:
-            List of BacktestResults
+            List of BacktestResults, in year / configuration order
         """
-        results = []
+        workers = workers or os.cpu_count() or 1
         
+        jobs = []
+        packed = {}
         for year in years:
             logger.info(f"\n{'='*60}")
-            logger.info(f"TESTING YEAR: {year}")
+            logger.info(f"PREPARING YEAR: {year}")
             logger.info(f"{'='*60}")
             
-            # Load data for year
-            df = self.load_data_chunked(year=year)
-            
-            # Run baseline
-            baseline = self.run_baseline_backtest(df, year)
-            results.append(baseline)
+            packed[year] = self.pack(self.load_data_chunked(year=year))
             
-            # Run intelligence with different convergence levels
+            # Baseline, then intelligence with different convergence levels
+            jobs.append((year, None))
             for min_modules in [2, 3]:
-                intel = self.run_intelligence_backtest(
-                    df, year, min_modules=min_modules
-                )
-                results.append(intel)
+                jobs.append((year, min_modules))
         
-        return results
+        return run_packed_jobs(
+            self._run_job,
+            packed,
+            [(year, year, min_modules) for year, min_modules in jobs],
+            workers=workers
+        )
+    
+    def _run_job(self, races: PackedRaces, year: int, min_modules: Optional[int]) -> BacktestResult:
+        """One suite run: baseline when min_modules is None"""
+        if min_modules is None:
+            return self.run_baseline_backtest(races, year)
+        return self.run_intelligence_backtest(races, year, min_modules=min_modules)
     
     def save_results(self, results: List[BacktestResult], output_path: str):
         """
@@ -631,6 +664,12 @@ def main():
         default=1000.0,
         help='Initial bankroll (default: 1000)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Worker processes (default: all cores, 1 = serial)'
+    )
     
     args = parser.parse_args()
     
@@ -641,7 +680,7 @@ def main():
     )
     
     # Run comprehensive suite
-    results = backtester.run_comprehensive_suite(args.years)
+    results = backtester.run_comprehensive_suite(args.years, workers=args.workers)
     
     # Save results
     output_dir = Path(args.output_dir)
@@ -22,6 +22,7 @@ import numpy as np
 import pickle
 import json
 from datetime import datetime
+from src.data.raceform_parsers import parse_odds
 from src.features.builder_v11 import FeatureBuilderV11
 
 logging.basicConfig(
@@ -31,29 +32,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def parse_sp_to_decimal(sp_str):
-    """Convert SP string to decimal odds."""
-    if pd.isna(sp_str) or sp_str == '':
-        return None
-    
-    sp_str = str(sp_str).strip()
-    sp_str = sp_str.replace('F', '').replace('J', '').strip()
-    
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            numerator = float(parts[0])
-            denominator = float(parts[1])
-            return (numerator / denominator) + 1.0
-        except:
-            return None
-    
-    try:
-        return float(sp_str)
-    except:
-        return None
-
-
 def main():
     """Main backtest script."""
     logger.info("="*60)
@@ -79,9 +57,8 @@ def main():
     
     # Build features for OOS period (sample for speed)
     logger.info("\nBuilding features for OOS sample (2K records)...")
-    logger.info("  (Full OOS would require optimized feature computation)")
     
-    builder = FeatureBuilderV11(str(db_path))
+    builder = FeatureBuilderV11(str(db_path), set_based=True)
     
     # Get OOS data (July-Sept 2024)
     df_oos = builder.build_all_features(sample_size=2000)
@@ -97,7 +74,7 @@ def main():
         df_oos = df_oos.sort_values('date', ascending=False).head(1000)
     
     # Parse odds
-    df_oos['odds'] = df_oos['sp'].apply(parse_sp_to_decimal)
+    df_oos['odds'] = parse_odds(df_oos['sp'])
     df_oos = df_oos[df_oos['odds'].notna()]
     df_oos['win'] = (df_oos['pos'] == '1').astype(int)
     
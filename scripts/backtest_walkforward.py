@@ -17,6 +17,7 @@ import numpy as np
 import argparse
 import json
 from datetime import datetime
+from src.data.racing_dataset import load_racing_data
 from src.features import FeatureBuilder
 from src.intelligence.sqpe import SQPEEngine, SQPEConfig
 
@@ -64,7 +65,7 @@ def backtest_walk_forward(
     
     # Load data
     print(f"\nLoading data from {data_path}...")
-    df = pd.read_csv(data_path, low_memory=False)
+    df = load_racing_data(data_path)
     df['date'] = pd.to_datetime(df['date'])
     df = df.sort_values('date').reset_index(drop=True)
     
@@ -100,10 +101,12 @@ def backtest_walk_forward(
         history = df.iloc[:start_idx + train_window].copy()
         
         try:
-            X_train = builder.build_sqpe_features(train_df, history)
+            # One as-of index serves both train and test feature builds
+            history_index = builder.build_history_index(history)
+            X_train = builder.build_sqpe_features(train_df, history, history_index=history_index)
             y_train = builder.build_targets(train_df)
             
-            X_test = builder.build_sqpe_features(test_df, history)
+            X_test = builder.build_sqpe_features(test_df, history, history_index=history_index)
             
             print(f"  Train features: {X_train.shape}")
             print(f"  Test features: {X_test.shape}")
@@ -216,7 +219,7 @@ def backtest_walk_forward(
 
 def main():
     parser = argparse.ArgumentParser(description='Run walk-forward backtest')
-    parser.add_argument('--data', type=str, required=True, help='Path to preprocessed data')
+    parser.add_argument('--data', type=str, required=True, help='Path to preprocessed CSV or Parquet dataset')
     parser.add_argument('--output', type=str, default='results/backtest_walkforward.json', help='Output path')
     parser.add_argument('--train-window', type=int, default=10000, help='Training window size')
     parser.add_argument('--test-window', type=int, default=5000, help='Test window size')
@@ -17,6 +17,7 @@ import logging
 from pathlib import Path
 import pandas as pd
 import numpy as np
+from src.data.raceform_parsers import parse_odds
 from src.features.builder_v11 import FeatureBuilderV11
 
 logging.basicConfig(
@@ -26,29 +27,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def parse_sp_to_decimal(sp_str):
-    """Convert SP string to decimal odds."""
-    if pd.isna(sp_str) or sp_str == '':
-        return None
-    
-    sp_str = str(sp_str).strip()
-    sp_str = sp_str.replace('F', '').replace('J', '').strip()
-    
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            numerator = float(parts[0])
-            denominator = float(parts[1])
-            return (numerator / denominator) + 1.0
-        except:
-            return None
-    
-    try:
-        return float(sp_str)
-    except:
-        return None
-
-
 def main():
     """Main feature computation script."""
     logger.info("="*60)
@@ -63,11 +41,10 @@ def main():
     
     # Initialize feature builder
     logger.info("\nInitializing feature builder...")
-    builder = FeatureBuilderV11(str(db_path))
+    builder = FeatureBuilderV11(str(db_path), set_based=True)
     
     # Build features for SAMPLE (10K records for v1.1.0 validation)
     logger.info("\nBuilding features for 10K record sample...")
-    logger.info("This will take 2-3 minutes...")
     
     df = builder.build_all_features(sample_size=10000)
     
@@ -81,7 +58,7 @@ def main():
     
     # Parse SP to decimal odds
     logger.info("\nParsing starting prices...")
-    df_train['odds'] = df_train['sp'].apply(parse_sp_to_decimal)
+    df_train['odds'] = parse_odds(df_train['sp'])
     df_train = df_train[df_train['odds'].notna()]
     logger.info(f"  Records with valid odds: {len(df_train):,}")
     
@@ -22,6 +22,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.settings import settings
 from src.core import log
+from src.data.raceform_parsers import parse_odds, parse_rating, parse_position
 import logging
 
 # Setup logging
@@ -29,82 +30,6 @@ log.setup_logging("config/logging.json")
 logger = logging.getLogger("velo.data_loader")
 
 
-def parse_odds(sp_str):
-    """
-    Parse starting price string to decimal odds
-    
-    Examples:
-        "1/3F" -> 1.33
-        "5/2" -> 3.5
-        "10/1" -> 11.0
-        "Evens" -> 2.0
-    """
-    if pd.isna(sp_str) or sp_str == '–':
-        return None
-    
-    sp_str = str(sp_str).strip()
-    
-    # Remove 'F' (favorite marker)
-    sp_str = sp_str.replace('F', '').strip()
-    
-    # Handle special cases
-    if sp_str.lower() == 'evens':
-        return 2.0
-    
-    # Parse fraction
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            numerator = float(parts[0])
-            denominator = float(parts[1])
-            # Convert fractional to decimal
-            return (numerator / denominator) + 1.0
-        except:
-            return None
-    
-    # Try parsing as decimal
-    try:
-        return float(sp_str)
-    except:
-        return None
-
-
-def parse_rating(rating_str):
-    """
-    Parse rating string to integer
-    
-    Handles: "123", "–", NaN
-    """
-    if pd.isna(rating_str) or rating_str == '–':
-        return None
-    
-    try:
-        return int(rating_str)
-    except:
-        return None
-
-
-def parse_position(pos_str):
-    """
-    Parse position string to integer
-    
-    Handles: "1", "2", "PU" (pulled up), "F" (fell), etc.
-    """
-    if pd.isna(pos_str):
-        return None
-    
-    pos_str = str(pos_str).strip()
-    
-    # Non-finishers
-    if pos_str in ['PU', 'F', 'U', 'BD', 'RO', 'UR', 'SU']:
-        return None
-    
-    try:
-        return int(float(pos_str))
-    except:
-        return None
-
-
 def clean_dataframe(df):
     """
     Clean and preprocess dataframe
@@ -121,15 +46,15 @@ def clean_dataframe(df):
     df['date'] = pd.to_datetime(df['date'])
     
     # Parse odds
-    df['sp_decimal'] = df['sp'].apply(parse_odds)
+    df['sp_decimal'] = parse_odds(df['sp'])
     
     # Parse ratings
-    df['or_int'] = df['or'].apply(parse_rating)
-    df['rpr_int'] = df['rpr'].apply(parse_rating)
-    df['ts_int'] = df['ts'].apply(parse_rating)
+    df['or_int'] = parse_rating(df['or'])
+    df['rpr_int'] = parse_rating(df['rpr'])
+    df['ts_int'] = parse_rating(df['ts'])
     
     # Parse position
-    df['pos_int'] = df['pos'].apply(parse_position)
+    df['pos_int'] = parse_position(df['pos'])
     
     # Add winner flag
     df['is_winner'] = (df['pos_int'] == 1).astype(int)
@@ -11,33 +11,20 @@ import json
 import logging
 from datetime import datetime, date
 from typing import List, Dict, Optional
-from difflib import SequenceMatcher
 
 from app.integrations.betfair_client import create_betfair_client, BetfairMode
+from app.integrations.betfair_matching import (
+    AliasTable,
+    BetfairMatcher,
+    RunnerIndex,
+    normalize_venue_name,
+    string_similarity,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def normalize_venue_name(name: str) -> str:
-    """Normalize venue name for matching"""
-    return name.lower().replace(" ", "").replace("-", "").replace("(aw)", "").strip()
-
-
-def normalize_runner_name(name: str) -> str:
-    """Normalize runner name for matching"""
-    # Remove common suffixes and normalize
-    name = name.lower()
-    name = name.replace("(ire)", "").replace("(fr)", "").replace("(gb)", "")
-    name = name.replace("'", "").replace("-", "").replace(" ", "")
-    return name.strip()
-
-
-def string_similarity(a: str, b: str) -> float:
-    """Calculate string similarity (0-1)"""
-    return SequenceMatcher(None, a, b).ratio()
-
-
 def match_venue(internal_venue: str, betfair_venue: str) -> float:
     """
     Match internal venue to Betfair venue
@@ -59,6 +46,9 @@ def match_runners(
     """
     Match internal runners to Betfair selection IDs
     
+    Normalized-exact names are hash lookups; only the rest are scored
+    against the Betfair runners not already taken.
+    
     Args:
         internal_runners: List of internal runner dicts with 'name'
         betfair_runners: List of Betfair runner dicts with 'runner_name', 'selection_id'
@@ -67,34 +57,7 @@ def match_runners(
     Returns:
         Dict mapping internal runner name → Betfair selection_id
     """
-    mapping = {}
-    
-    for internal in internal_runners:
-        internal_name = normalize_runner_name(internal['name'])
-        best_match = None
-        best_score = 0.0
-        
-        for betfair in betfair_runners:
-            betfair_name = normalize_runner_name(betfair['runner_name'])
-            score = string_similarity(internal_name, betfair_name)
-            
-            if score > best_score:
-                best_score = score
-                best_match = betfair
-        
-        if best_match and best_score >= threshold:
-            mapping[internal['name']] = best_match['selection_id']
-            logger.debug(
-                f"Matched '{internal['name']}' → '{best_match['runner_name']}' "
-                f"(selection_id: {best_match['selection_id']}, score: {best_score:.2f})"
-            )
-        else:
-            logger.warning(
-                f"No match found for '{internal['name']}' "
-                f"(best score: {best_score:.2f})"
-            )
-    
-    return mapping
+    return RunnerIndex(betfair_runners).match(internal_runners, threshold=threshold)
 
 
 def sync_race_to_betfair(
@@ -119,74 +82,19 @@ def sync_race_to_betfair(
             - venue_match_score
             - runner_mappings: {internal_name: selection_id}
     """
-    race_venue = race['venue']
-    race_time = datetime.fromisoformat(race['off_time'])
-    
-    best_market = None
-    best_score = 0.0
-    
-    for market in betfair_markets:
-        # Check venue match
-        venue_score = match_venue(race_venue, market['venue'])
-        
-        if venue_score < venue_threshold:
-            continue
-        
-        # Check time match
-        market_time = datetime.fromisoformat(market['market_start_time'])
-        time_diff_minutes = abs((race_time - market_time).total_seconds() / 60)
-        
-        if time_diff_minutes > time_tolerance_minutes:
-            continue
-        
-        # Combined score (venue 70%, time 30%)
-        time_score = max(0, 1 - (time_diff_minutes / time_tolerance_minutes))
-        combined_score = (venue_score * 0.7) + (time_score * 0.3)
-        
-        if combined_score > best_score:
-            best_score = combined_score
-            best_market = market
-    
-    if not best_market:
-        logger.warning(
-            f"No Betfair market found for {race_venue} {race_time.strftime('%H:%M')}"
-        )
-        return None
-    
-    # Match runners
-    runner_mappings = match_runners(race['runners'], best_market['runners'])
-    
-    if not runner_mappings:
-        logger.warning(
-            f"No runners matched for {race_venue} {race_time.strftime('%H:%M')}"
-        )
-        return None
-    
-    mapping = {
-        'race_id': race.get('race_id'),
-        'market_id': best_market['market_id'],
-        'event_id': best_market['event_id'],
-        'venue': best_market['venue'],
-        'market_start_time': best_market['market_start_time'],
-        'venue_match_score': best_score,
-        'runner_mappings': runner_mappings,
-        'matched_runners': len(runner_mappings),
-        'total_runners': len(race['runners'])
-    }
-    
-    logger.info(
-        f"✅ Matched {race_venue} {race_time.strftime('%H:%M')} → "
-        f"market {best_market['market_id']} "
-        f"({len(runner_mappings)}/{len(race['runners'])} runners)"
+    matcher = BetfairMatcher(
+        betfair_markets,
+        venue_threshold=venue_threshold,
+        time_tolerance_minutes=time_tolerance_minutes
     )
-    
-    return mapping
+    return matcher.sync_race(race)
 
 
 def sync_today_markets(
     internal_races: List[Dict],
     mode: BetfairMode = BetfairMode.SIM,
-    output_file: Optional[str] = None
+    output_file: Optional[str] = None,
+    alias_file: Optional[str] = None
 ) -> List[Dict]:
     """
     Sync all internal races to Betfair markets for today
@@ -195,6 +103,7 @@ def sync_today_markets(
         internal_races: List of internal race dicts
         mode: Betfair mode (SIM, DELAYED, LIVE)
         output_file: Optional JSON file to save mappings
+        alias_file: Optional JSON alias table of confirmed runner matches
     
     Returns:
         List of mapping dicts
@@ -219,12 +128,15 @@ def sync_today_markets(
     
     logger.info(f"Found {len(betfair_markets)} Betfair markets for {today}")
     
-    # Match each race
+    # Index markets once, then match each race
+    aliases = AliasTable(alias_file)
+    matcher = BetfairMatcher(betfair_markets, aliases=aliases)
     mappings = []
     for race in internal_races:
-        mapping = sync_race_to_betfair(race, betfair_markets)
+        mapping = matcher.sync_race(race)
         if mapping:
             mappings.append(mapping)
+    aliases.save()
     
     logger.info(
         f"✅ Successfully matched {len(mappings)}/{len(internal_races)} races"
@@ -266,6 +178,11 @@ def main():
         default='data/betfair_mappings.json',
         help='Output JSON file for mappings'
     )
+    parser.add_argument(
+        '--aliases',
+        default='data/betfair_aliases.json',
+        help='JSON alias table of confirmed runner matches'
+    )
     
     args = parser.parse_args()
     
@@ -276,7 +193,8 @@ def main():
     mappings = sync_today_markets(
         internal_races=internal_races,
         mode=BetfairMode(args.mode),
-        output_file=args.output
+        output_file=args.output,
+        alias_file=args.aliases
     )
     
     # Print summary
@@ -14,7 +14,6 @@ This script:
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import log_loss
 import sys
 import os
 from datetime import datetime
@@ -26,6 +25,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.settings import settings
 from src.core import log
+from src.data.raceform_parsers import parse_odds, parse_rating, parse_position
+from src.data.racing_dataset import load_racing_data
+from src.models.conditional_logit import RaceSegments, grid_log_loss, best_on_grid
 import logging
 
 # Setup logging
@@ -33,45 +35,20 @@ log.setup_logging("config/logging.json")
 logger = logging.getLogger("velo.train")
 
 
-def parse_odds(sp_str):
-    """Parse starting price to decimal odds"""
-    if pd.isna(sp_str) or sp_str == '–':
-        return None
-    
-    sp_str = str(sp_str).strip().replace('F', '').strip()
-    
-    if sp_str.lower() == 'evens':
-        return 2.0
-    
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            return (float(parts[0]) / float(parts[1])) + 1.0
-        except:
-            return None
-    
-    try:
-        return float(sp_str)
-    except:
-        return None
+RACE_KEYS = ['date', 'course', 'race_id']
 
 
-def parse_rating(rating_str):
-    """Parse rating to integer"""
-    if pd.isna(rating_str) or rating_str == '–':
-        return None
-    try:
-        return int(rating_str)
-    except:
-        return None
+def race_segments(df):
+    """Race offsets over df rows (shared segment engine)"""
+    return RaceSegments.from_keys(df[RACE_KEYS])
 
 
 def load_and_prepare_data(filepath, start_date=None, end_date=None, sample_size=None):
     """
-    Load race data from CSV and prepare for training
+    Load race data and prepare for training
     
     Args:
-        filepath: Path to raceform.csv
+        filepath: Path to raceform.csv or the Parquet dataset
         start_date: Start date filter (YYYY-MM-DD)
         end_date: End date filter (YYYY-MM-DD)
         sample_size: Number of rows to sample (for testing)
@@ -81,36 +58,24 @@ def load_and_prepare_data(filepath, start_date=None, end_date=None, sample_size=
     """
     logger.info(f"Loading data from {filepath}...")
     
-    # Load data
+    # Load data (date range and sample size are pushed into Parquet scans)
     if sample_size:
         logger.info(f"Sampling {sample_size} rows for testing...")
-        df = pd.read_csv(filepath, nrows=sample_size, low_memory=False)
-    else:
-        df = pd.read_csv(filepath, low_memory=False)
-    
-    logger.info(f"Loaded {len(df)} rows")
+    df = load_racing_data(filepath, nrows=sample_size, start_date=start_date, end_date=end_date)
     
     # Parse dates
     df['date'] = pd.to_datetime(df['date'])
-    
-    # Filter by date range
-    if start_date:
-        df = df[df['date'] >= start_date]
-        logger.info(f"Filtered to >= {start_date}: {len(df)} rows")
-    
-    if end_date:
-        df = df[df['date'] <= end_date]
-        logger.info(f"Filtered to <= {end_date}: {len(df)} rows")
+    logger.info(f"Loaded {len(df)} rows ({start_date or 'start'} - {end_date or 'end'})")
     
     # Parse odds and ratings
     logger.info("Parsing odds and ratings...")
-    df['sp_decimal'] = df['sp'].apply(parse_odds)
-    df['or_int'] = df['or'].apply(parse_rating)
-    df['rpr_int'] = df['rpr'].apply(parse_rating)
-    df['ts_int'] = df['ts'].apply(parse_rating)
+    df['sp_decimal'] = parse_odds(df['sp'])
+    df['or_int'] = parse_rating(df['or'])
+    df['rpr_int'] = parse_rating(df['rpr'])
+    df['ts_int'] = parse_rating(df['ts'])
     
     # Parse position
-    df['pos_int'] = df['pos'].apply(lambda x: int(float(x)) if pd.notna(x) and str(x).replace('.','').isdigit() else None)
+    df['pos_int'] = parse_position(df['pos'])
     df['is_winner'] = (df['pos_int'] == 1).astype(int)
     
     # Filter: must have odds and at least one rating
@@ -125,9 +90,7 @@ def load_and_prepare_data(filepath, start_date=None, end_date=None, sample_size=
     
     # Normalize public probabilities by race (handle overround)
     logger.info("Normalizing public probabilities...")
-    df['p_public_norm'] = df.groupby(['date', 'course', 'race_id'])['p_public'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_public_norm'] = race_segments(df).normalize(df['p_public'])
     
     return df
 
@@ -171,15 +134,8 @@ def normalize_fundamental_probabilities(df):
     # Filter out rows without ratings
     df = df[df['rating_avg'].notna()].copy()
     
-    # Convert ratings to probabilities using softmax within each race
-    def softmax_race(group):
-        ratings = group['rating_avg'].values
-        # Scale ratings (higher is better)
-        exp_ratings = np.exp(ratings / 20.0)  # Temperature = 20
-        probs = exp_ratings / exp_ratings.sum()
-        return pd.Series(probs, index=group.index)
-    
-    df['p_fundamental'] = df.groupby(['date', 'course', 'race_id']).apply(softmax_race).reset_index(level=[0,1,2], drop=True)
+    # Softmax of ratings within each race (temperature = 20)
+    df['p_fundamental'] = race_segments(df).softmax(df['rating_avg'].to_numpy() / 20.0)
     
     logger.info(f"Fundamental probabilities calculated for {len(df)} rows")
     
@@ -198,9 +154,7 @@ def combine_probabilities(df, alpha, beta):
     df['p_model_raw'] = alpha * df['p_fundamental'] + beta * df['p_public_norm']
     
     # Normalize by race
-    df['p_model'] = df.groupby(['date', 'course', 'race_id'])['p_model_raw'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_model'] = race_segments(df).normalize(df['p_model_raw'])
     
     return df
 
@@ -211,22 +165,19 @@ def evaluate_model(df, alpha, beta):
     
     Lower log loss = better calibration
     """
-    # Combine probabilities
-    df_eval = combine_probabilities(df.copy(), alpha, beta)
-    
-    # Calculate log loss
-    # Clip probabilities to avoid log(0)
-    p_model_clipped = np.clip(df_eval['p_model'].values, 1e-15, 1 - 1e-15)
-    
-    loss = log_loss(df_eval['is_winner'].values, p_model_clipped)
-    
-    return loss
+    return grid_log_loss(
+        race_segments(df), df['p_fundamental'], df['p_public_norm'], df['is_winner'] == 1,
+        [alpha], [beta], loss='binary'
+    )[0, 0]
 
 
 def grid_search(df, alpha_range, beta_range):
     """
     Grid search to find optimal α and β
     
+    The whole grid is evaluated in blocked broadcasts over all runners,
+    with race normalization done by segment sums.
+    
     Args:
         df: Training data
         alpha_range: List of α values to try
@@ -237,36 +188,17 @@ def grid_search(df, alpha_range, beta_range):
     """
     logger.info(f"Starting grid search: {len(alpha_range)} alphas × {len(beta_range)} betas = {len(alpha_range) * len(beta_range)} combinations")
     
-    results = []
-    best_loss = float('inf')
-    best_alpha = None
-    best_beta = None
-    
-    total = len(alpha_range) * len(beta_range)
-    count = 0
-    
-    for alpha in alpha_range:
-        for beta in beta_range:
-            count += 1
-            
-            # Evaluate
-            loss = evaluate_model(df, alpha, beta)
-            
-            results.append({
-                'alpha': alpha,
-                'beta': beta,
-                'log_loss': loss
-            })
-            
-            if loss < best_loss:
-                best_loss = loss
-                best_alpha = alpha
-                best_beta = beta
-                logger.info(f"[{count}/{total}] New best: α={alpha:.2f}, β={beta:.2f}, loss={loss:.6f}")
-            elif count % 10 == 0:
-                logger.info(f"[{count}/{total}] α={alpha:.2f}, β={beta:.2f}, loss={loss:.6f}")
-    
-    results_df = pd.DataFrame(results)
+    losses = grid_log_loss(
+        race_segments(df), df['p_fundamental'], df['p_public_norm'], df['is_winner'] == 1,
+        alpha_range, beta_range, loss='binary'
+    )
+    best_alpha, best_beta, best_loss = best_on_grid(losses, alpha_range, beta_range)
+    
+    results_df = pd.DataFrame({
+        'alpha': np.repeat(alpha_range, len(beta_range)),
+        'beta': np.tile(beta_range, len(alpha_range)),
+        'log_loss': losses.ravel()
+    })
     
     logger.info(f"✅ Grid search complete!")
     logger.info(f"Best: α={best_alpha:.2f}, β={best_beta:.2f}, loss={best_loss:.6f}")
@@ -276,7 +208,7 @@ def grid_search(df, alpha_range, beta_range):
 
 def main():
     parser = argparse.ArgumentParser(description='Train Benter model')
-    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv', help='Path to raceform.csv')
+    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv', help='Path to raceform.csv or Parquet dataset')
     parser.add_argument('--train-start', default='2015-01-01', help='Training start date')
     parser.add_argument('--train-end', default='2023-12-31', help='Training end date')
     parser.add_argument('--val-start', default='2024-01-01', help='Validation start date')
@@ -11,7 +11,6 @@ Strategy:
 
 import pandas as pd
 import numpy as np
-from sklearn.metrics import log_loss
 import sys
 import os
 from datetime import datetime
@@ -22,84 +21,47 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.core.settings import settings
 from src.core import log
+from src.data.raceform_parsers import parse_odds, parse_rating, parse_position
+from src.data.racing_dataset import load_racing_data
+from src.models.conditional_logit import RaceSegments, grid_log_loss, best_on_grid
 import logging
 
 log.setup_logging("config/logging.json")
 logger = logging.getLogger("velo.train")
 
 
-def parse_odds(sp_str):
-    """Parse SP to decimal"""
-    if pd.isna(sp_str) or sp_str == '–':
-        return None
-    sp_str = str(sp_str).strip().replace('F', '').strip()
-    if sp_str.lower() == 'evens':
-        return 2.0
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            return (float(parts[0]) / float(parts[1])) + 1.0
-        except:
-            return None
-    try:
-        return float(sp_str)
-    except:
-        return None
+RACE_KEYS = ['date', 'course', 'race_id']
 
 
-def parse_rating(rating_str):
-    """Parse rating"""
-    if pd.isna(rating_str) or rating_str == '–':
-        return None
-    try:
-        return int(rating_str)
-    except:
-        return None
+def race_segments(df):
+    """Race offsets over df rows (shared segment engine)"""
+    return RaceSegments.from_keys(df[RACE_KEYS])
 
 
 def load_sample(filepath, start_date, end_date, sample_size=100000):
     """Load random sample from date range"""
     logger.info(f"Loading {sample_size} row sample from {start_date} to {end_date}...")
     
-    # Count total rows in range (quick scan)
-    logger.info("Scanning file...")
-    row_count = 0
-    target_rows = []
-    
-    for i, chunk in enumerate(pd.read_csv(filepath, chunksize=50000, low_memory=False)):
-        chunk['date'] = pd.to_datetime(chunk['date'])
-        chunk_in_range = chunk[(chunk['date'] >= start_date) & (chunk['date'] <= end_date)]
-        
-        if len(chunk_in_range) > 0:
-            # Store chunk indices
-            target_rows.extend(chunk_in_range.index.tolist())
-            row_count += len(chunk_in_range)
-        
-        if i % 10 == 0:
-            logger.info(f"Scanned {(i+1)*50000} rows, found {row_count} in range...")
-    
+    # Date range is pushed into the scan for Parquet datasets
+    df = load_racing_data(filepath, start_date=start_date, end_date=end_date)
+    row_count = len(df)
     logger.info(f"Found {row_count} rows in date range")
     
-    # Sample indices
+    # Sample rows
     if row_count > sample_size:
-        sample_indices = np.random.choice(target_rows, sample_size, replace=False)
+        sample_indices = np.random.choice(df.index, sample_size, replace=False)
+        df = df.loc[sample_indices].copy()
         logger.info(f"Sampling {sample_size} rows...")
     else:
-        sample_indices = target_rows
         logger.info(f"Using all {row_count} rows (less than sample size)")
     
-    # Load sampled rows
-    logger.info("Loading sampled data...")
-    df = pd.read_csv(filepath, low_memory=False)
-    df = df.loc[sample_indices].copy()
-    
     # Parse
     df['date'] = pd.to_datetime(df['date'])
-    df['sp_decimal'] = df['sp'].apply(parse_odds)
-    df['or_int'] = df['or'].apply(parse_rating)
-    df['rpr_int'] = df['rpr'].apply(parse_rating)
-    df['ts_int'] = df['ts'].apply(parse_rating)
-    df['pos_int'] = df['pos'].apply(lambda x: int(float(x)) if pd.notna(x) and str(x).replace('.','').isdigit() else None)
+    df['sp_decimal'] = parse_odds(df['sp'])
+    df['or_int'] = parse_rating(df['or'])
+    df['rpr_int'] = parse_rating(df['rpr'])
+    df['ts_int'] = parse_rating(df['ts'])
+    df['pos_int'] = parse_position(df['pos'])
     df['is_winner'] = (df['pos_int'] == 1).astype(int)
     
     # Filter
@@ -111,9 +73,7 @@ def load_sample(filepath, start_date, end_date, sample_size=100000):
     
     # Public probability
     df['p_public'] = 1.0 / df['sp_decimal']
-    df['p_public_norm'] = df.groupby(['date', 'course', 'race_id'])['p_public'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_public_norm'] = race_segments(df).normalize(df['p_public'])
     
     return df
 
@@ -137,12 +97,8 @@ def normalize_fundamental(df):
     df['rating_avg'] = df.apply(calculate_fundamental, axis=1)
     df = df[df['rating_avg'].notna()].copy()
     
-    def softmax_race(group):
-        ratings = group['rating_avg'].values
-        exp_ratings = np.exp(ratings / 20.0)
-        return pd.Series(exp_ratings / exp_ratings.sum(), index=group.index)
-    
-    df['p_fundamental'] = df.groupby(['date', 'course', 'race_id']).apply(softmax_race).reset_index(level=[0,1,2], drop=True)
+    # Softmax of ratings within each race (temperature = 20)
+    df['p_fundamental'] = race_segments(df).softmax(df['rating_avg'].to_numpy() / 20.0)
     
     return df
 
@@ -150,53 +106,42 @@ def normalize_fundamental(df):
 def combine_probs(df, alpha, beta):
     """Combine with Benter formula"""
     df['p_model_raw'] = alpha * df['p_fundamental'] + beta * df['p_public_norm']
-    df['p_model'] = df.groupby(['date', 'course', 'race_id'])['p_model_raw'].transform(
-        lambda x: x / x.sum()
-    )
+    df['p_model'] = race_segments(df).normalize(df['p_model_raw'])
     return df
 
 
 def evaluate(df, alpha, beta):
     """Evaluate with log loss"""
-    df_eval = combine_probs(df.copy(), alpha, beta)
-    p_clipped = np.clip(df_eval['p_model'].values, 1e-15, 1 - 1e-15)
-    return log_loss(df_eval['is_winner'].values, p_clipped)
+    return grid_log_loss(
+        race_segments(df), df['p_fundamental'], df['p_public_norm'], df['is_winner'] == 1,
+        [alpha], [beta], loss='binary'
+    )[0, 0]
 
 
 def grid_search(df, alpha_range, beta_range):
-    """Grid search"""
+    """Grid search (whole grid in blocked broadcasts)"""
     logger.info(f"Grid search: {len(alpha_range)} × {len(beta_range)} = {len(alpha_range) * len(beta_range)} combinations")
     
-    results = []
-    best_loss = float('inf')
-    best_alpha = None
-    best_beta = None
-    
-    total = len(alpha_range) * len(beta_range)
-    count = 0
+    losses = grid_log_loss(
+        race_segments(df), df['p_fundamental'], df['p_public_norm'], df['is_winner'] == 1,
+        alpha_range, beta_range, loss='binary'
+    )
+    best_alpha, best_beta, best_loss = best_on_grid(losses, alpha_range, beta_range)
     
-    for alpha in alpha_range:
-        for beta in beta_range:
-            count += 1
-            loss = evaluate(df, alpha, beta)
-            results.append({'alpha': alpha, 'beta': beta, 'log_loss': loss})
-            
-            if loss < best_loss:
-                best_loss = loss
-                best_alpha = alpha
-                best_beta = beta
-                logger.info(f"[{count}/{total}] New best: α={alpha:.2f}, β={beta:.2f}, loss={loss:.6f}")
-            elif count % 10 == 0:
-                logger.info(f"[{count}/{total}] α={alpha:.2f}, β={beta:.2f}, loss={loss:.6f}")
+    results = pd.DataFrame({
+        'alpha': np.repeat(alpha_range, len(beta_range)),
+        'beta': np.tile(beta_range, len(alpha_range)),
+        'log_loss': losses.ravel()
+    })
     
     logger.info(f"✅ Best: α={best_alpha:.2f}, β={best_beta:.2f}, loss={best_loss:.6f}")
     
-    return best_alpha, best_beta, best_loss, pd.DataFrame(results)
+    return best_alpha, best_beta, best_loss, results
 
 
 def main():
     parser = argparse.ArgumentParser(description='Train Benter (memory-efficient)')
-    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv')
+    parser.add_argument('--filepath', default='/home/ubuntu/upload/raceform.csv', help='Path to raceform.csv or Parquet dataset')
     parser.add_argument('--train-start', default='2015-01-01')
     parser.add_argument('--train-end', default='2023-12-31')
     parser.add_argument('--val-start', default='2024-01-01')
@@ -21,6 +21,7 @@ import numpy as np
 import pickle
 import json
 
+from src.data.raceform_parsers import parse_odds
 from src.training import (
     FeatureStore,
     LabelCreator,
@@ -94,39 +95,12 @@ def load_training_data(db_path: str, train_end_date: str, val_days: int = 90):
     return train_df, val_df
 
 
-def parse_sp_to_decimal(sp_str):
-    """Convert SP string to decimal odds."""
-    if pd.isna(sp_str) or sp_str == '':
-        return None
-    
-    sp_str = str(sp_str).strip()
-    
-    # Handle favorites (e.g., "1/3F")
-    sp_str = sp_str.replace('F', '').replace('J', '').strip()
-    
-    # Handle fractions (e.g., "5/2")
-    if '/' in sp_str:
-        try:
-            parts = sp_str.split('/')
-            numerator = float(parts[0])
-            denominator = float(parts[1])
-            return (numerator / denominator) + 1.0
-        except:
-            return None
-    
-    # Handle decimals (e.g., "3.5")
-    try:
-        return float(sp_str)
-    except:
-        return None
-
-
 def preprocess_data(df):
     """Preprocess raw data for training."""
     logger.info("Preprocessing data...")
     
     # Convert SP to decimal odds
-    df['odds'] = df['sp'].apply(parse_sp_to_decimal)
+    df['odds'] = parse_odds(df['sp'])
     
     # Convert position to integer
     df['finish_position'] = pd.to_numeric(df['pos'], errors='coerce')
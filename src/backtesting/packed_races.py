@@ -0,0 +1,302 @@
+"""
+VÉLØ Oracle - Packed race data for parallel backtests
+
+Runner fields used by the convergence backtest are packed once into flat
+arrays with race offsets (CSR layout, as in models.conditional_logit).
+String fields are stored as int32 codes into small lookup tables, so the
+whole structure is a handful of numeric arrays that can be placed in one
+shared memory block and attached by worker processes without copying or
+pickling the season's DataFrame.
+
+race_data(i) rebuilds exactly the dict ConvergenceBacktester.prepare_race_data
+builds for the i-th race of df.groupby('race_id').
+
+run_packed_jobs() fans runs over packed races out to a process pool (or
+runs them in order when serial), returning results in job order.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# (field, source column, default) for prepare_race_data's runner dicts
+STRING_FIELDS = [
+    ('horse_name', 'horse_name', 'unknown'),
+    ('form', 'form', ''),
+    ('trainer', 'trainer', ''),
+    ('jockey', 'jockey', ''),
+]
+FLOAT_FIELDS = [
+    ('or_rating', 'OR', 0.0),
+    ('rpr_rating', 'RPR', 0.0),
+    ('ts_rating', 'TS', 0.0),
+    ('win_odds', 'win_odds', 999.0),
+    ('course_win_pct', 'course_win_pct', 0.0),
+    ('distance_win_pct', 'distance_win_pct', 0.0),
+]
+
+# Runner dict key order, as prepare_race_data builds it
+RUNNER_KEYS = [
+    'runner_id', 'horse_name', 'or_rating', 'rpr_rating', 'ts_rating',
+    'win_odds', 'form', 'trainer', 'jockey', 'days_since_last',
+    'course_win_pct', 'distance_win_pct', 'won',
+]
+
+_ALIGN = 64
+
+
+@dataclass
+class SharedRaces:
+    """Picklable handle to a PackedRaces placed in shared memory"""
+    name: str
+    layout: List[Tuple[str, str, int, int]]   # (array, dtype, length, byte offset)
+    tables: Dict[str, List[str]]
+    race_ids: List[str]
+
+
+def _encode(values: pd.Series) -> Tuple[np.ndarray, List[str]]:
+    """int32 codes + str() of each distinct value (NaN included)"""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return codes.astype(np.int32), [str(v) for v in uniques]
+
+
+def _constant(n: int, value: str) -> Tuple[np.ndarray, List[str]]:
+    return np.zeros(n, dtype=np.int32), [value]
+
+
+def _as_int(values: pd.Series) -> np.ndarray:
+    """int() of every value, raising on NaN as int() does"""
+    if pd.api.types.is_numeric_dtype(values.dtype):
+        as_float = values.to_numpy(dtype=float)
+        if np.isnan(as_float).any():
+            raise ValueError("cannot convert float NaN to integer")
+        if pd.api.types.is_integer_dtype(values.dtype):
+            return values.to_numpy(dtype=np.int64)
+        return as_float.astype(np.int64)
+    return np.array([int(v) for v in values.tolist()], dtype=np.int64)
+
+
+def _as_bool(values: pd.Series) -> np.ndarray:
+    """bool() of every value (NaN is truthy)"""
+    if values.dtype == object:
+        return np.fromiter((bool(v) for v in values.tolist()), dtype=bool, count=len(values))
+    return values.to_numpy().astype(bool)
+
+
+class PackedRaces:
+    """
+    Runners of many races as flat arrays + race offsets
+
+    Races are in df.groupby('race_id') order (sorted keys, missing
+    race_id dropped); runners keep their order within a race.
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        race_ids: List[str],
+        arrays: Dict[str, np.ndarray],
+        tables: Dict[str, List[str]]
+    ):
+        """
+        Args:
+            offsets: Race start positions plus total length
+            race_ids: str(race_id) per race
+            arrays: Runner-level arrays; string fields hold codes
+            tables: Lookup table per string field
+        """
+        self.offsets = offsets
+        self.race_ids = race_ids
+        self.arrays = arrays
+        self.tables = tables
+
+    @property
+    def n_races(self) -> int:
+        return len(self.race_ids)
+
+    @property
+    def n_runners(self) -> int:
+        return int(self.offsets[-1])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, race_key: str = 'race_id') -> 'PackedRaces':
+        """
+        Pack a season of runners
+
+        Args:
+            df: One row per runner with race_key and the columns read by
+                prepare_race_data (absent columns take its defaults)
+            race_key: Race column to group by
+        """
+        race_codes, race_keys = pd.factorize(df[race_key], sort=True)
+        keep = race_codes >= 0
+        order = np.argsort(race_codes[keep], kind='stable')
+        runners = df.iloc[np.flatnonzero(keep)[order]]
+        sizes = np.bincount(race_codes[keep], minlength=len(race_keys))
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+
+        n = len(runners)
+        arrays: Dict[str, np.ndarray] = {}
+        tables: Dict[str, List[str]] = {}
+
+        for field, column, default in STRING_FIELDS:
+            if column in runners.columns:
+                arrays[field], tables[field] = _encode(runners[column])
+            else:
+                arrays[field], tables[field] = _constant(n, default)
+
+        # runner_id falls back to the raw horse_name, then 'unknown'
+        if 'runner_id' in runners.columns:
+            arrays['runner_id'], tables['runner_id'] = _encode(runners['runner_id'])
+        else:
+            arrays['runner_id'], tables['runner_id'] = arrays['horse_name'], tables['horse_name']
+
+        for field, column, default in FLOAT_FIELDS:
+            if column in runners.columns:
+                arrays[field] = np.asarray(runners[column].to_numpy(), dtype=float)
+            else:
+                arrays[field] = np.full(n, default)
+
+        if 'days_since_last' in runners.columns:
+            arrays['days_since_last'] = _as_int(runners['days_since_last'])
+        else:
+            arrays['days_since_last'] = np.full(n, 999, dtype=np.int64)
+
+        if 'won' in runners.columns:
+            arrays['won'] = _as_bool(runners['won'])
+        else:
+            arrays['won'] = np.zeros(n, dtype=bool)
+
+        return cls(offsets, [str(key) for key in race_keys], arrays, tables)
+
+    def race_data(self, i: int) -> Dict:
+        """prepare_race_data output for race i"""
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        columns = {}
+        for key in RUNNER_KEYS:
+            values = self.arrays[key][start:end].tolist()
+            if key in self.tables:
+                table = self.tables[key]
+                values = [table[code] for code in values]
+            columns[key] = values
+
+        return {
+            'race_id': self.race_ids[i],
+            'runners': [dict(zip(RUNNER_KEYS, row)) for row in zip(*(columns[k] for k in RUNNER_KEYS))]
+        }
+
+    # -------------------------------------------------------------------------
+    # Shared memory
+    # -------------------------------------------------------------------------
+
+    def share(self) -> Tuple[SharedRaces, shared_memory.SharedMemory]:
+        """
+        Copy the arrays into one shared memory block
+
+        The caller owns the block: close() and unlink() it once every
+        worker is done.
+
+        Returns:
+            (handle for attach(), the SharedMemory block)
+        """
+        arrays = {'offsets': self.offsets, **self.arrays}
+        layout = []
+        size = 0
+        for name, array in arrays.items():
+            size = -(-size // _ALIGN) * _ALIGN
+            layout.append((name, array.dtype.str, len(array), size))
+            size += array.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (name, dtype, length, offset) in layout:
+            np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset)[:] = arrays[name]
+
+        handle = SharedRaces(name=shm.name, layout=layout, tables=self.tables, race_ids=self.race_ids)
+        return handle, shm
+
+    @classmethod
+    def attach(cls, handle: SharedRaces) -> Tuple['PackedRaces', shared_memory.SharedMemory]:
+        """
+        Zero-copy view of a shared PackedRaces
+
+        Keep the returned SharedMemory referenced while the view is used.
+        """
+        shm = shared_memory.SharedMemory(name=handle.name)
+        arrays = {
+            name: np.ndarray(length, dtype=dtype, buffer=shm.buf, offset=offset)
+            for name, dtype, length, offset in handle.layout
+        }
+        offsets = arrays.pop('offsets')
+        return cls(offsets, handle.race_ids, arrays, handle.tables), shm
+
+
+# -----------------------------------------------------------------------------
+# Parallel runs
+# -----------------------------------------------------------------------------
+
+# Per-process state for pool workers
+_worker_runner: Optional[Callable[..., Any]] = None
+_worker_races: Dict[str, Tuple[PackedRaces, shared_memory.SharedMemory]] = {}
+
+
+def _init_worker(runner: Callable[..., Any]) -> None:
+    """Receive the runner once per worker"""
+    global _worker_runner
+    _worker_runner = runner
+
+
+def _run_worker_job(job: Tuple[SharedRaces, tuple]) -> Any:
+    """Run one job against shared packed races, attaching on first use"""
+    handle, args = job
+    if handle.name not in _worker_races:
+        _worker_races[handle.name] = PackedRaces.attach(handle)
+    races, _ = _worker_races[handle.name]
+    return _worker_runner(races, *args)
+
+
+def run_packed_jobs(
+    runner: Callable[..., Any],
+    packed: Dict[Hashable, PackedRaces],
+    jobs: Sequence[Tuple],
+    workers: int = 1
+) -> List[Any]:
+    """
+    Run runner(packed[key], *args) for every (key, *args) job
+
+    With workers > 1 the packed races are copied into shared memory once
+    and the jobs go to a process pool whose workers attach to them, so
+    runner must be picklable (a module-level function or a bound method
+    of a picklable object).
+
+    Args:
+        runner: Called with (races, *args) per job
+        packed: Packed races by key
+        jobs: (key, *args) tuples
+        workers: Worker processes (1 = serial, in this process)
+
+    Returns:
+        Runner results in job order
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        return [runner(packed[key], *args) for key, *args in jobs]
+
+    blocks = {key: races.share() for key, races in packed.items()}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(jobs)),
+            initializer=_init_worker,
+            initargs=(runner,)
+        ) as executor:
+            # map() yields in submission order, whichever run finishes first
+            return list(executor.map(
+                _run_worker_job,
+                [(blocks[key][0], tuple(args)) for key, *args in jobs]
+            ))
+    finally:
+        for _, shm in blocks.values():
+            shm.close()
+            shm.unlink()
@@ -11,6 +11,8 @@ from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 import logging
 
+from .bankroll import race_offsets, simulate_bankroll
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -104,16 +106,23 @@ class PortfolioKellyCriterion:
     More sophisticated than per-bet Kelly.
     """
     
-    def __init__(self, kelly_fraction: float = 0.1, max_stake_pct: float = 0.05):
+    def __init__(
+        self,
+        kelly_fraction: float = 0.1,
+        max_stake_pct: float = 0.05,
+        max_exposure: float = 0.5
+    ):
         """
         Initialize Portfolio Kelly Criterion.
         
         Args:
             kelly_fraction: Fraction of Kelly to use (for safety)
             max_stake_pct: Maximum stake as percentage of bankroll per bet
+            max_exposure: Maximum total stake as percentage of bankroll per race
         """
         self.kelly_fraction = kelly_fraction
         self.max_stake_pct = max_stake_pct
+        self.max_exposure = max_exposure
     
     def calculate_stakes(
         self,
@@ -153,8 +162,8 @@ class PortfolioKellyCriterion:
         
         # Normalize if total stakes exceed bankroll
         total_stakes = sum(stakes)
-        if total_stakes > bankroll * 0.5:  # Don't risk more than 50% of bankroll at once
-            scale_factor = (bankroll * 0.5) / total_stakes
+        if total_stakes > bankroll * self.max_exposure:  # Don't risk more than max_exposure of bankroll at once
+            scale_factor = (bankroll * self.max_exposure) / total_stakes
             stakes = [s * scale_factor for s in stakes]
         
         return stakes
@@ -244,61 +253,39 @@ class TimeSeriesBacktester:
         test_df: pd.DataFrame
     ) -> BacktestResult:
         """Run backtest on a single fold."""
-        bankroll = self.initial_bankroll
-        total_profit = 0.0
-        total_bets = 0
-        wins = 0
-        equity_curve = [bankroll]
-        
-        # Group by race
-        races = test_df.groupby('race_id')
-        
-        for race_id, race_data in races:
-            # Get predictions for this race
-            predictions = self._get_predictions(race_data)
-            
-            # Filter by minimum edge
-            opportunities = []
-            for pred in predictions:
-                edge = pred['probability'] - (1 / pred['odds'])
-                if edge >= self.min_edge:
-                    opportunities.append(pred)
-            
-            if not opportunities:
-                continue
-            
-            # Calculate optimal stakes using Portfolio Kelly
-            stakes = self.portfolio_kelly.calculate_stakes(opportunities, bankroll)
-            
-            # Place bets and calculate results
-            race_profit = 0.0
-            for opp, stake in zip(opportunities, stakes):
-                if stake <= 0:
-                    continue
-                
-                total_bets += 1
-                
-                # Check if bet won
-                actual_result = race_data[race_data['horse_name'] == opp['horse_name']]['result'].iloc[0]
-                
-                if actual_result == 'win':
-                    profit = stake * (opp['odds'] - 1)
-                    wins += 1
-                else:
-                    profit = -stake
-                
-                race_profit += profit
-            
-            # Update bankroll
-            bankroll += race_profit
-            total_profit += race_profit
-            equity_curve.append(bankroll)
+        # Candidate bets packed by race, in groupby('race_id') order
+        order, offsets = race_offsets(test_df['race_id'].to_numpy())
+        predictions = self._predict_frame(test_df.iloc[order])
+        edge = predictions['probability'] - (1 / predictions['odds'])
+        candidate = edge >= self.min_edge
+
+        # Races with no opportunity are skipped (no equity point)
+        race_of = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))[candidate]
+        sizes = np.bincount(race_of, minlength=len(offsets) - 1)
+        bet_offsets = np.concatenate([[0], np.cumsum(sizes[sizes > 0])])
+
+        won = predictions['result'][candidate] == 'win'
+        path = simulate_bankroll(
+            bet_offsets,
+            predictions['probability'][candidate],
+            predictions['odds'][candidate],
+            won,
+            initial_bankroll=self.initial_bankroll,
+            kelly_fraction=self.portfolio_kelly.kelly_fraction,
+            max_stake_pct=self.portfolio_kelly.max_stake_pct,
+            max_exposure=self.portfolio_kelly.max_exposure
+        )
+        placed = path.placed
+        total_bets = int(placed.sum())
+        wins = int((placed & won).sum())
+        total_profit = float(path.race_profits.sum())
+        bankroll = float(path.equity[-1])
         
         # Calculate metrics
         roi = (bankroll / self.initial_bankroll) - 1
         win_rate = wins / total_bets if total_bets > 0 else 0.0
-        sharpe = self._calculate_sharpe(equity_curve)
-        max_drawdown = self._calculate_max_drawdown(equity_curve)
+        sharpe = path.sharpe()
+        max_drawdown = path.max_drawdown
         
         return BacktestResult(
             fold_id=fold_id,
@@ -316,22 +303,31 @@ class TimeSeriesBacktester:
             total_bets=total_bets
         )
     
-    def _get_predictions(self, race_data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Get model predictions for a race."""
-        predictions = []
+    def _predict_frame(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Model predictions for every runner of a frame in one call.
         
-        for _, horse in race_data.iterrows():
-            # Get model prediction (placeholder)
-            prob = self.model.predict_proba(horse) if hasattr(self.model, 'predict_proba') else 0.1
-            
-            pred = {
-                'horse_name': horse['horse_name'],
-                'probability': prob,
-                'odds': horse.get('odds', 5.0)
-            }
-            predictions.append(pred)
-        
-        return predictions
+        Models exposing predict_proba are called once with the whole frame and
+        may return one probability per row or an (n, 2) class-probability array.
+        """
+        n = len(data)
+        if hasattr(self.model, 'predict_proba'):
+            probability = np.asarray(self.model.predict_proba(data), dtype=float)
+            if probability.ndim == 2:
+                probability = probability[:, 1]
+            probability = np.broadcast_to(probability, (n,))
+        else:
+            probability = np.full(n, 0.1)
+        
+        odds = data['odds'].to_numpy(dtype=float) if 'odds' in data.columns else np.full(n, 5.0)
+        result = data['result'].to_numpy() if 'result' in data.columns else np.full(n, None)
+        
+        return {
+            'horse_name': data['horse_name'].to_numpy(),
+            'probability': probability,
+            'odds': odds,
+            'result': result
+        }
     
     def _calculate_sharpe(self, equity_curve: List[float]) -> float:
         """Calculate Sharpe ratio from equity curve."""
@@ -0,0 +1,194 @@
+"""
+VÉLØ Oracle - Vectorized Raceform Parsers
+==========================================
+
+Column parsers for raw raceform data (SP, ratings, positions, weights,
+distances, class, beaten distances), shared by every CSV loader.
+
+Each parser takes a whole column and returns a float Series (NaN for
+unparseable values). Raceform text columns have few distinct values
+(a few hundred SP strings across 1.7M runners), so a column is factorized
+first, the distinct values are parsed with pandas string ops and regex
+extraction, and the results are gathered back through the codes.
+
+Conventions:
+- SP: fractional ("5/2"), decimal ("3.5"), "Evens"/"EVS"; favourite
+  markers ("F", "JF", "CF") are stripped; blanks and dashes are missing
+- Positions: leading integer ("1", "2=", "3dh"); non-finisher codes
+  (PU, F, UR, ...) map to a caller-chosen value (default NaN)
+- Weights: "st-lb" → pounds
+- Distances: "2m3½f" → yards (numeric values pass through)
+
+Author: VÉLØ Oracle Team
+Version: 1.0
+"""
+
+import numpy as np
+import pandas as pd
+
+# Non-finisher codes across raceform exports
+NON_FINISHER_CODES = ('PU', 'F', 'U', 'BD', 'RO', 'SU', 'UR', 'RR', 'DSQ', 'CO')
+
+# Values meaning "no data" in raceform text columns
+MISSING_MARKERS = ('', '-', '–', '—')
+
+EVENS_MARKERS = ('EVENS', 'EVS', 'EVEN')
+
+FRACTION_VALUES = {'½': 0.5, '¼': 0.25, '¾': 0.75}
+
+YARDS_PER_MILE = 1760
+YARDS_PER_FURLONG = 220
+
+
+def _as_series(values) -> pd.Series:
+    return values if isinstance(values, pd.Series) else pd.Series(values)
+
+
+def _per_unique(parse_distinct):
+    """Run a text parser once per distinct value and broadcast back"""
+    def parser(values, *args, **kwargs):
+        values = _as_series(values)
+        if pd.api.types.is_numeric_dtype(values):
+            return parse_distinct(values, *args, **kwargs)
+
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        parsed = parse_distinct(pd.Series(uniques, dtype=object), *args, **kwargs).to_numpy()
+        return pd.Series(parsed[codes], index=values.index)
+
+    parser.__name__ = parse_distinct.__name__
+    parser.__doc__ = parse_distinct.__doc__
+    return parser
+
+
+def _text(values: pd.Series) -> pd.Series:
+    """Stripped, upper-cased string view (NA preserved)"""
+    return values.astype('string').str.strip().str.upper()
+
+
+def _to_float(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(values, errors='coerce').astype(float)
+
+
+def _result(values, index) -> pd.Series:
+    return pd.Series(np.asarray(values, dtype=float), index=index)
+
+
+@_per_unique
+def parse_odds(values) -> pd.Series:
+    """
+    Starting price → decimal odds
+
+    "5/2" → 3.5, "1/3F" → 1.333, "11/10JF" → 2.1, "Evens" → 2.0, "3.5" → 3.5
+    """
+    values = _as_series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    text = _text(values)
+    # Favourite markers: F, JF (joint), CF (co-favourite)
+    text = text.str.replace(r'\s*[JC]?F$', '', regex=True).str.strip()
+
+    fraction = text.str.extract(r'^(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)')
+    numerator = _to_float(fraction[0])
+    denominator = _to_float(fraction[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fractional = numerator / denominator.where(denominator != 0) + 1.0
+
+    decimal = _to_float(text.where(~text.isin(MISSING_MARKERS)))
+    odds = fractional.where(fraction[0].notna(), decimal)
+    odds = odds.mask(text.isin(EVENS_MARKERS), 2.0)
+    return _result(odds, values.index)
+
+
+@_per_unique
+def parse_rating(values) -> pd.Series:
+    """Rating (OR / RPR / TS) → number; "–", blanks and non-integers are NaN"""
+    values = _as_series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return _result(np.trunc(values.astype(float)), values.index)
+
+    text = values.astype('string').str.strip()
+    integer = text.where(text.str.fullmatch(r'[+-]?\d+').fillna(False).astype(bool))
+    rating = _to_float(integer)
+
+    # Numeric objects mixed into a text column
+    if pd.api.types.infer_dtype(values, skipna=True) != 'string':
+        is_text = values.map(lambda v: isinstance(v, str)).astype(bool)
+        rating = rating.where(is_text, np.trunc(_to_float(values.where(~is_text))))
+
+    return _result(rating, values.index)
+
+
+@_per_unique
+def parse_position(values, non_finisher: float = np.nan) -> pd.Series:
+    """
+    Finishing position → integer place
+
+    Args:
+        values: Raw position column ("1", "2=", "PU", ...)
+        non_finisher: Value for non-finisher codes (NaN drops them; some
+            loaders keep them as 99)
+    """
+    values = _as_series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return _result(np.trunc(values.astype(float)), values.index)
+
+    text = _text(values)
+    place = _to_float(text.str.extract(r'^(\d+)', expand=False))
+    place = place.mask(text.isin(NON_FINISHER_CODES), non_finisher)
+    return _result(place, values.index)
+
+
+@_per_unique
+def parse_weight(values) -> pd.Series:
+    """Weight carried → pounds ("11-6" → 160; plain numbers pass through)"""
+    values = _as_series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    text = values.astype('string').str.strip()
+    stone_lb = text.str.extract(r'^(\d+)-(\d+)')
+    pounds = _to_float(stone_lb[0]) * 14 + _to_float(stone_lb[1])
+    return _result(pounds.where(stone_lb[0].notna(), _to_float(text)), values.index)
+
+
+@_per_unique
+def parse_distance(values, default: int = 2000) -> pd.Series:
+    """
+    Race distance → yards ("2m3½f" → 4290, "5f" → 1100)
+
+    Numeric values are taken as already in yards; unparseable or missing
+    distances get the default.
+    """
+    values = _as_series(values)
+    numeric = np.trunc(_to_float(values))
+
+    text = values.astype('string').str.strip()
+    miles = _to_float(text.str.extract(r'(\d+)m', expand=False)).fillna(0)
+    furlong_parts = text.str.extract(r'(\d+)([½¼¾])?f')
+    furlongs = _to_float(furlong_parts[0]) + furlong_parts[1].map(FRACTION_VALUES).astype(float).fillna(0)
+    furlong_yards = np.floor(furlongs * YARDS_PER_FURLONG).fillna(0)
+
+    yards = miles * YARDS_PER_MILE + furlong_yards
+    yards = yards.where(yards > 0, default)
+    return _result(numeric.where(numeric.notna(), yards), values.index)
+
+
+@_per_unique
+def parse_class(values, default: int = 4) -> pd.Series:
+    """Race class → integer ("Class 4" → 4; default when absent)"""
+    values = _as_series(values)
+    digits = values.astype('string').str.extract(r'(\d+)', expand=False)
+    return _result(_to_float(digits).fillna(default), values.index)
+
+
+@_per_unique
+def parse_beaten_distance(values) -> pd.Series:
+    """Beaten distance → lengths (winner's "-" or blank → 0.0)"""
+    values = _as_series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    text = values.astype('string').str.strip()
+    lengths = _to_float(text)
+    return _result(lengths.mask(text.isin(['-', '']), 0.0), values.index)
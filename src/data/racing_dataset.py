@@ -0,0 +1,431 @@
+"""
+VÉLØ Oracle - Partitioned Racing Dataset
+=========================================
+
+Canonical on-disk form of the raceform history: a Hive-partitioned
+(year=YYYY/month=M) Parquet dataset with stable, typed columns, plus the
+loader API used by training and backtest entry points.
+
+Layout (columns follow scripts/preprocess_raceform.py):
+- date as timestamp; year/month as partition keys
+- course/trainer/jockey/horse stored as strings (dictionary-encoded
+  pages) and read back as pandas categoricals
+- class and dist parsed in place (class number, yards)
+- parsed numerics next to the raw text: sp_decimal, or_int, rpr_int,
+  ts_int, pos_int (non-finishers = 99), btn_int, lbs
+- every other column typed once (numeric or string), so all row groups
+  share one schema and carry min/max statistics
+
+Loading pushes work into the scan: date ranges prune partitions and row
+groups, columns are projected, nrows stops the scan early and batches
+stream without materializing the full table.
+
+Usage:
+    build_racing_dataset("raceform.csv", "storage/velo-datasets/racing_full")
+
+    df = load_racing_data(path, start_date="2020-01-01", columns=["date", "horse", "sp"])
+    for batch in iter_racing_batches(path, start_date="2024-01-01"):
+        ...
+
+Author: VÉLØ Oracle Team
+Version: 1.0
+"""
+
+import os
+import re
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .raceform_parsers import (
+    parse_beaten_distance,
+    parse_class,
+    parse_distance,
+    parse_odds,
+    parse_position,
+    parse_rating,
+    parse_weight,
+)
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+RACING_DATASET_PATH = "storage/velo-datasets/racing_full"
+
+PARTITION_COLUMNS = ['year', 'month']
+
+# High-cardinality keys, read back as categoricals
+CATEGORICAL_COLUMNS = ['course', 'trainer', 'jockey', 'horse']
+
+# Raw raceform columns that are numeric
+INTEGER_COLUMNS = ['race_id']
+NUMERIC_COLUMNS = ['ran', 'num', 'draw', 'ovr_btn', 'age', 'prize']
+
+# Parsed column → (source column, parser); class/dist are parsed in place
+PARSED_COLUMNS = {
+    'class': ('class', parse_class),
+    'dist': ('dist', parse_distance),
+    'sp_decimal': ('sp', parse_odds),
+    'or_int': ('or', parse_rating),
+    'rpr_int': ('rpr', parse_rating),
+    'ts_int': ('ts', parse_rating),
+    'pos_int': ('pos', lambda values: parse_position(values, non_finisher=99)),
+    'btn_int': ('btn', parse_beaten_distance),
+    'lbs': ('wgt', parse_weight),
+}
+
+DEFAULT_ROW_GROUP_SIZE = 128_000
+
+_PARTITION_RE = re.compile(r'year=(\d+)[/\\]month=(\d+)')
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+
+
+def is_parquet_path(path: Union[str, Path]) -> bool:
+    """Partitioned dataset directory or single Parquet file"""
+    path = Path(path)
+    return path.is_dir() or path.suffix == '.parquet'
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def type_raceform_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Give a raw or preprocessed raceform chunk the dataset's stable column types
+
+    Parsed columns are derived from their raw source; a preprocessed CSV
+    that already carries them keeps its values (coerced to float). Since
+    the parsers accept already-parsed numbers, class/dist work either way.
+    """
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    df = df[df['date'].notna()]
+
+    for target, (source, parser) in PARSED_COLUMNS.items():
+        if target in df.columns and target != source:
+            df[target] = pd.to_numeric(df[target], errors='coerce').astype(float)
+        elif source in df.columns:
+            df[target] = parser(df[source])
+
+    for column in df.columns:
+        if column == 'date' or column in PARSED_COLUMNS:
+            continue
+        if column in INTEGER_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype('Int64')
+        elif column in NUMERIC_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(float)
+        else:
+            df[column] = df[column].astype('string')
+
+    df['year'] = df['date'].dt.year.astype(np.int16)
+    df['month'] = df['date'].dt.month.astype(np.int8)
+    return df
+
+
+def _partitioning() -> "ds.Partitioning":
+    return ds.partitioning(
+        pa.schema([('year', pa.int16()), ('month', pa.int8())]),
+        flavor='hive'
+    )
+
+
+def write_racing_dataset(
+    chunks: Iterable[pd.DataFrame],
+    output_dir: str = RACING_DATASET_PATH,
+    compression: str = 'snappy',
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> Dict:
+    """
+    Write typed chunks as a year/month-partitioned Parquet dataset
+
+    The schema is fixed by the first chunk; later chunks are cast to it.
+    Any existing partitions under output_dir are replaced.
+
+    Returns:
+        Write statistics (rows, chunks, files)
+    """
+    _require_pyarrow()
+
+    stats = {'rows': 0, 'chunks': 0}
+    schema = None
+
+    def batches():
+        nonlocal schema
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            schema = table.schema
+            stats['rows'] += len(chunk)
+            stats['chunks'] += 1
+            yield from table.to_batches()
+
+    iterator = batches()
+    first = next(iterator, None)
+    if first is None:
+        raise ValueError("No rows to write")
+
+    def all_batches():
+        yield first
+        yield from iterator
+
+    ds.write_dataset(
+        all_batches(),
+        output_dir,
+        schema=first.schema,
+        format='parquet',
+        partitioning=_partitioning(),
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+        min_rows_per_group=min(row_group_size, 16_384),
+        max_rows_per_group=row_group_size,
+        existing_data_behavior='delete_matching',
+        basename_template='part-{i}.parquet'
+    )
+
+    stats['files'] = len(_dataset_files(output_dir))
+    return stats
+
+
+def build_racing_dataset(
+    csv_path: str,
+    output_dir: str = RACING_DATASET_PATH,
+    chunk_size: int = 250_000,
+    compression: str = 'snappy',
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE
+) -> Dict:
+    """
+    Build the partitioned dataset from a raceform CSV in one streaming pass
+
+    Returns:
+        Build statistics (rows, files, duration, sizes)
+    """
+    start = time.time()
+    chunks = (
+        type_raceform_chunk(chunk)
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[''])
+    )
+    stats = write_racing_dataset(chunks, output_dir, compression=compression, row_group_size=row_group_size)
+
+    stats['duration_seconds'] = time.time() - start
+    stats['csv_size_mb'] = os.path.getsize(csv_path) / 1024 ** 2
+    stats['dataset_size_mb'] = sum(os.path.getsize(f) for f in _dataset_files(output_dir)) / 1024 ** 2
+    logger.info(
+        f"Built racing dataset: {stats['rows']:,} rows, {stats['files']} files, "
+        f"{stats['dataset_size_mb']:.1f}MB in {stats['duration_seconds']:.1f}s"
+    )
+    return stats
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+def _dataset_files(path: str) -> List[str]:
+    return sorted(str(p) for p in Path(path).rglob('*.parquet'))
+
+
+def _partition_order(file_path: str):
+    match = _PARTITION_RE.search(file_path)
+    return (int(match.group(1)), int(match.group(2)), file_path) if match else (0, 0, file_path)
+
+
+def open_racing_dataset(path: str = RACING_DATASET_PATH) -> "ds.Dataset":
+    """
+    Open a partitioned dataset (or single Parquet file) for scanning
+
+    Partitions are ordered chronologically, so scans and nrows follow
+    date order.
+    """
+    _require_pyarrow()
+
+    file_format = ds.ParquetFileFormat(
+        read_options=ds.ParquetReadOptions(dictionary_columns=CATEGORICAL_COLUMNS)
+    )
+    if not Path(path).is_dir():
+        return ds.dataset(path, format=file_format)
+
+    files = sorted(_dataset_files(path), key=_partition_order)
+    if not files:
+        raise FileNotFoundError(f"No Parquet files under {path}")
+    return ds.dataset(files, format=file_format, partitioning=_partitioning(), partition_base_dir=str(path))
+
+
+def _timestamp(value: pd.Timestamp) -> "pa.Scalar":
+    return pa.scalar(value.as_unit('ns').to_datetime64(), pa.timestamp('ns'))
+
+
+def racing_filter(
+    start_date=None,
+    end_date=None,
+    filters=None,
+    partitioned: bool = True
+) -> Optional["ds.Expression"]:
+    """
+    Scan filter for an inclusive date range plus optional extra filters
+
+    Args:
+        start_date: First date to include
+        end_date: Last date to include
+        filters: pyarrow Expression or DNF list [('col', op, value), ...]
+        partitioned: Also bound year/month so whole partitions are skipped
+    """
+    _require_pyarrow()
+
+    expressions = []
+    year, month = ds.field('year'), ds.field('month')
+
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        expressions.append(ds.field('date') >= _timestamp(start))
+        if partitioned:
+            expressions.append((year > start.year) | ((year == start.year) & (month >= start.month)))
+
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        expressions.append(ds.field('date') <= _timestamp(end))
+        if partitioned:
+            expressions.append((year < end.year) | ((year == end.year) & (month <= end.month)))
+
+    if filters is not None:
+        expressions.append(filters if isinstance(filters, ds.Expression) else pq.filters_to_expression(filters))
+
+    if not expressions:
+        return None
+
+    combined = expressions[0]
+    for expression in expressions[1:]:
+        combined = combined & expression
+    return combined
+
+
+def _scan_args(dataset, columns, start_date, end_date, filters):
+    partitioned = 'year' in dataset.schema.names and 'month' in dataset.schema.names
+    return {
+        'columns': list(columns) if columns is not None else None,
+        'filter': racing_filter(start_date, end_date, filters, partitioned=partitioned),
+    }
+
+
+def _string_types(arrow_type):
+    # Text stays in Arrow buffers (no per-value Python objects)
+    if arrow_type in (pa.string(), pa.large_string()):
+        return pd.StringDtype('pyarrow')
+    return None
+
+
+def _to_pandas(table: "pa.Table") -> pd.DataFrame:
+    # Release Arrow buffers column by column while converting
+    return table.to_pandas(split_blocks=True, self_destruct=True, types_mapper=_string_types)
+
+
+def load_racing_dataset_table(
+    path: str = RACING_DATASET_PATH,
+    nrows: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    start_date=None,
+    end_date=None,
+    filters=None
+) -> pd.DataFrame:
+    """
+    Load rows from the Parquet dataset
+
+    Args:
+        path: Dataset directory or Parquet file
+        nrows: Stop after this many rows (scan ends early)
+        columns: Columns to read (None = all)
+        start_date: First date to include (inclusive)
+        end_date: Last date to include (inclusive)
+        filters: Extra pyarrow filters (Expression or DNF list)
+
+    Returns:
+        DataFrame (categorical entity columns, typed numerics)
+    """
+    dataset = open_racing_dataset(path)
+    scan = _scan_args(dataset, columns, start_date, end_date, filters)
+
+    if nrows is not None:
+        table = dataset.head(nrows, **scan)
+    else:
+        table = dataset.to_table(**scan)
+    return _to_pandas(table)
+
+
+def iter_racing_batches(
+    path: str = RACING_DATASET_PATH,
+    batch_size: int = DEFAULT_ROW_GROUP_SIZE,
+    columns: Optional[List[str]] = None,
+    start_date=None,
+    end_date=None,
+    filters=None
+) -> Iterator[pd.DataFrame]:
+    """Stream the dataset as DataFrames of at most batch_size rows (date order)"""
+    dataset = open_racing_dataset(path)
+    scanner = dataset.scanner(batch_size=batch_size, **_scan_args(dataset, columns, start_date, end_date, filters))
+    for batch in scanner.to_batches():
+        if batch.num_rows:
+            yield batch.to_pandas(types_mapper=_string_types)
+
+
+def load_racing_data(
+    path: str,
+    nrows: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    start_date=None,
+    end_date=None
+) -> pd.DataFrame:
+    """
+    Load raceform rows from a Parquet dataset or, failing that, a CSV
+
+    Entry points call this with whatever --data path they were given;
+    Parquet gets full pushdown, CSV falls back to a pandas read with
+    usecols and an in-memory date filter. Either way nrows counts rows
+    inside the date range.
+    """
+    if is_parquet_path(path):
+        return load_racing_dataset_table(
+            path, nrows=nrows, columns=columns, start_date=start_date, end_date=end_date
+        )
+
+    logger.info(f"Reading CSV {path} (build a Parquet dataset for faster loads)")
+    if start_date is None and end_date is None:
+        return pd.read_csv(path, nrows=nrows, usecols=columns, low_memory=False)
+
+    # The filter needs 'date' even when the caller did not ask for it
+    usecols = columns if columns is None or 'date' in columns else [*columns, 'date']
+    kept = []
+    n_kept = 0
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=DEFAULT_ROW_GROUP_SIZE, low_memory=False):
+        dates = pd.to_datetime(chunk['date'], errors='coerce')
+        mask = pd.Series(True, index=chunk.index)
+        if start_date is not None:
+            mask &= dates >= pd.Timestamp(start_date)
+        if end_date is not None:
+            mask &= dates <= pd.Timestamp(end_date)
+        kept.append(chunk[mask])
+        n_kept += int(mask.sum())
+        if nrows is not None and n_kept >= nrows:
+            break
+
+    df = pd.concat(kept) if kept else pd.read_csv(path, usecols=usecols, nrows=0)
+    if nrows is not None:
+        df = df.head(nrows)
+    if usecols is not columns:
+        df = df.drop(columns='date')
+    return df
@@ -27,6 +27,8 @@ from .builder import (
     FeatureExtractor,
 )
 
+from .history_index import HistoryIndex, HistoryWindow
+
 from .cache import FeatureCache
 
 __all__ = [
@@ -48,6 +50,10 @@ __all__ = [
     'FeatureBuilderConfig',
     'FeatureExtractor',
     
+    # History index
+    'HistoryIndex',
+    'HistoryWindow',
+    
     # Cache
     'FeatureCache',
 ]
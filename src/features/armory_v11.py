@@ -25,6 +25,8 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from . import set_based_v11 as sb
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,16 +38,20 @@ class FeatureArmoryV11:
     Empirical Bayes shrinkage, rolling windows, regime-specific logic.
     """
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, set_based: bool = False):
         """
         Initialize Feature Armory.
         
         Args:
             db_path: Path to SQLite database with racing_data table
+            set_based: Compute each family for all rows at once (one history
+                query + GROUP BYs) instead of per-row queries
         """
         self.db_path = db_path
         self.conn = None
-        logger.info(f"FeatureArmoryV11 initialized with DB: {db_path}")
+        self.set_based = set_based
+        self._history = None
+        logger.info(f"FeatureArmoryV11 initialized with DB: {db_path} (set_based={set_based})")
     
     def connect(self):
         """Open database connection."""
@@ -83,6 +89,9 @@ class FeatureArmoryV11:
         logger.info("Computing Trainer/Jockey Velocity features...")
         self.connect()
         
+        if self.set_based:
+            return self._compute_velocity_set(df, windows)
+        
         for window in windows:
             # Trainer velocity
             df[f'trainer_sr_{window}d'] = df.apply(
@@ -108,6 +117,46 @@ class FeatureArmoryV11:
         logger.info(f"  Added {len(windows)*2 + 1} velocity features")
         return df
     
+    def _history_for(self, df: pd.DataFrame) -> pd.DataFrame:
+        """History slice for set-based families (loaded once per compute_all)."""
+        if self._history is None:
+            return sb.load_entity_history(self.conn, df)
+        return self._history
+    
+    def _entity_sr_set(self, counter: "sb.WindowCounter", entities: pd.Series,
+                       dates: pd.Series, window_days: int) -> np.ndarray:
+        """Set-based _get_entity_sr for every row."""
+        start = dates - pd.Timedelta(days=window_days)
+        runs, wins = counter.between(entities, start, dates)
+        r_career, w_career = counter.between(entities, None, start)
+        sr = sb.eb_strike_rate(wins, runs, w_career, r_career)
+        return np.where(sb.blank_mask(entities), 0.0, sr)
+    
+    def _compute_velocity_set(self, df: pd.DataFrame, windows: List[int]) -> pd.DataFrame:
+        """Set-based velocity: point-in-time at each row's own race date."""
+        history = self._history_for(df)
+        dates = pd.to_datetime(df['date'])
+        counters = {entity: sb.WindowCounter(history, entity) for entity in ('trainer', 'jockey')}
+        
+        for window in windows:
+            for entity, counter in counters.items():
+                df[f'{entity}_sr_{window}d'] = self._entity_sr_set(counter, df[entity], dates, window)
+        
+        # Trainer×Jockey combo (365d) vs 365d individual baselines
+        combo = sb.combo_key(df['trainer'], df['jockey'])
+        runs, wins = sb.WindowCounter(history, 'trainer_jockey').between(
+            combo, dates - pd.Timedelta(days=365), dates
+        )
+        combo_sr = np.where(runs > 0, wins / np.maximum(runs, 1), 0.0)
+        baseline_sr = (
+            self._entity_sr_set(counters['trainer'], df['trainer'], dates, 365)
+            + self._entity_sr_set(counters['jockey'], df['jockey'], dates, 365)
+        ) / 2
+        df['tj_combo_uplift'] = np.where(combo.isna().to_numpy(), 0.0, combo_sr - baseline_sr)
+        
+        logger.info(f"  Added {len(windows)*2 + 1} velocity features (set-based)")
+        return df
+    
     def _get_entity_sr(self, entity_type: str, entity_name: str, 
                       race_date: str, window_days: int) -> float:
         """
@@ -210,13 +259,18 @@ class FeatureArmoryV11:
         logger.info("Computing Class/Layoff features...")
         self.connect()
         
-        df['class_delta'] = df.apply(
-            lambda row: self._get_class_delta(row['horse'], row['date']), axis=1
-        )
-        
-        df['layoff_days'] = df.apply(
-            lambda row: self._get_layoff_days(row['horse'], row['date']), axis=1
-        )
+        if self.set_based:
+            # class_delta mirrors _get_class_delta, which is still a placeholder
+            df['class_delta'] = 0
+            df['layoff_days'] = sb.layoff_days(self._history_for(df), df)
+        else:
+            df['class_delta'] = df.apply(
+                lambda row: self._get_class_delta(row['horse'], row['date']), axis=1
+            )
+            
+            df['layoff_days'] = df.apply(
+                lambda row: self._get_layoff_days(row['horse'], row['date']), axis=1
+            )
         
         # Layoff penalty (nonlinear: 0 if <7d, linear 7-90d, heavy >90d)
         df['layoff_penalty'] = df['layoff_days'].apply(
@@ -303,6 +357,9 @@ class FeatureArmoryV11:
         logger.info("Computing Going/Course/Draw Bias features...")
         self.connect()
         
+        if self.set_based:
+            return self._compute_bias_set(df)
+        
         df['course_going_iv'] = df.apply(
             lambda row: self._get_course_going_iv(row['course'], row['going']), axis=1
         )
@@ -318,6 +375,60 @@ class FeatureArmoryV11:
         logger.info("  Added 3 bias features")
         return df
     
+    def _compute_bias_set(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Set-based bias: one GROUP BY per table of IVs, mapped onto rows."""
+        courses = sb.stage_keys(self.conn, 'course', df['course'])
+        
+        overall = pd.read_sql_query("""
+            SELECT COUNT(*) as runs,
+                   SUM(CASE WHEN pos = '1' THEN 1 ELSE 0 END) as wins
+            FROM racing_data
+        """, self.conn).iloc[0]
+        overall_runs, overall_wins = (overall['runs'] or 0), (overall['wins'] or 0)
+        overall_sr = overall_wins / overall_runs if overall_runs > 0 else 0.1
+        
+        going = pd.read_sql_query(f"""
+            SELECT course, going,
+                   COUNT(*) as runs,
+                   SUM(CASE WHEN pos = '1' THEN 1 ELSE 0 END) as wins
+            FROM racing_data
+            WHERE course IN (SELECT value FROM {courses})
+            AND going IS NOT NULL
+            GROUP BY course, going
+            HAVING runs > 10
+        """, self.conn)
+        going['iv'] = (going['wins'] / going['runs']) / overall_sr if overall_sr > 0 else 1.0
+        keys = pd.DataFrame({'course': df['course'].to_numpy(), 'going': df['going'].to_numpy()})
+        iv = keys.merge(going[['course', 'going', 'iv']], on=['course', 'going'], how='left')['iv']
+        df['course_going_iv'] = iv.fillna(1.0).to_numpy()
+        
+        draws = pd.read_sql_query(f"""
+            SELECT course, draw,
+                   COUNT(*) as runs,
+                   SUM(CASE WHEN pos = '1' THEN 1 ELSE 0 END) as wins
+            FROM racing_data
+            WHERE course IN (SELECT value FROM {courses})
+            AND draw IS NOT NULL
+            GROUP BY course, draw
+            HAVING runs > 10
+        """, self.conn)
+        draws['draw_n'] = pd.to_numeric(draws['draw'], errors='coerce')
+        draws['score'] = draws['wins'] / draws['runs']
+        rows = pd.DataFrame({
+            'course': df['course'].to_numpy(),
+            'draw_n': pd.to_numeric(df['draw'], errors='coerce').to_numpy() if 'draw' in df.columns else 0.0,
+        })
+        score = rows.merge(
+            draws.dropna(subset=['draw_n'])[['course', 'draw_n', 'score']].drop_duplicates(['course', 'draw_n']),
+            on=['course', 'draw_n'], how='left'
+        )['score']
+        df['draw_bias_score'] = np.where(rows['draw_n'].fillna(0) == 0, 0.0, score.fillna(0.0))
+        
+        df['bias_persist_flag'] = 0
+        
+        logger.info("  Added 3 bias features (set-based)")
+        return df
+    
     def _get_course_going_iv(self, course: str, going: str) -> float:
         """
         Compute Impact Value for course×going.
@@ -402,6 +513,9 @@ class FeatureArmoryV11:
         logger.info("Computing Form Curve features...")
         self.connect()
         
+        if self.set_based:
+            return self._compute_form_curves_set(df)
+        
         df['form_ewma'] = df.apply(
             lambda row: self._get_form_ewma(row['horse'], row['date']), axis=1
         )
@@ -421,6 +535,26 @@ class FeatureArmoryV11:
         logger.info("  Added 4 form curve features")
         return df
     
+    def _compute_form_curves_set(self, df: pd.DataFrame, n_runs: int = 5) -> pd.DataFrame:
+        """Set-based form curves over each horse's last n finished runs."""
+        history = self._history_for(df)
+        runs = sb.last_runs(history[history['finished']], df, ['finish_pct', 'pos_n'], n_runs)
+        blank = sb.blank_mask(df['horse'])
+        
+        # Percentile 0=won, 1=last; EWMA with alpha=0.3
+        pct, pct_count = sb.compact_valid(runs['finish_pct'])
+        ewma = sb.sequential_ewma(pct, pct_count, lambda i: 0.3, empty=0.5)
+        
+        positions, pos_count = sb.compact_valid(runs['pos_n'])
+        
+        df['form_ewma'] = np.where(blank, 0.5, ewma)
+        df['form_slope'] = np.where(blank, 0.0, sb.trend_slope(positions, pos_count))
+        df['ts_trend'] = 0.0
+        df['form_variance'] = np.where(blank, 0.0, sb.masked_variance(positions, pos_count))
+        
+        logger.info("  Added 4 form curve features (set-based)")
+        return df
+    
     def _get_form_ewma(self, horse: str, race_date: str, n_runs: int = 5) -> float:
         """Get EWMA of finish percentile (0=won, 1=last)."""
         if pd.isna(horse) or horse == '':
@@ -596,6 +730,10 @@ class FeatureArmoryV11:
         
         self.connect()
         
+        if self.set_based:
+            sb.ensure_racing_indexes(self.conn)
+            self._history = sb.load_entity_history(self.conn, df)
+        
         # Family 1: Trainer/Jockey Velocity
         df = self.compute_trainer_jockey_velocity(df)
         
@@ -614,6 +752,7 @@ class FeatureArmoryV11:
         # Family 6: Market (placeholder)
         df = self.compute_market_features(df)
         
+        self._history = None
         self.close()
         
         logger.info("="*60)
@@ -20,6 +20,7 @@ from pathlib import Path
 import logging
 from dataclasses import dataclass
 
+from .history_index import HistoryIndex
 from .schema import (
     SQPE_FEATURE_NAMES,
     TIE_FEATURE_NAMES,
@@ -48,6 +49,7 @@ class FeatureExtractor:
     def __init__(self, name: str, cache=None):
         self.name = name
         self.cache = cache
+        self.history_index: Optional[HistoryIndex] = None
         self.logger = logging.getLogger(f"{__name__}.{name}")
     
     def extract(self, df: pd.DataFrame, history: Optional[pd.DataFrame] = None) -> pd.DataFrame:
@@ -117,21 +119,7 @@ class FormExtractor(FeatureExtractor):
 
         # Use cache if available
         if self.cache is not None:
-            form_features = []
-            for idx, row in df.iterrows():
-                horse = row['horse']
-                stats = self.cache.form_stats.get(horse, {})
-                
-                form_features.append({
-                    'form_last_pos': stats.get('last_pos', 0.0),
-                    'form_avg_pos_3': stats.get('avg_pos_3', 0.0),
-                    'form_avg_pos_5': stats.get('avg_pos_5', 0.0),
-                    'form_wins_3': stats.get('wins_3', 0),
-                    'form_wins_5': stats.get('wins_5', 0),
-                    'form_places_3': stats.get('places_3', 0),
-                })
-            
-            form_df = pd.DataFrame(form_features, index=df.index)
+            form_df = self.cache.form_features(df['horse'])
             result = pd.concat([result, form_df], axis=1)
             self.logger.info(f"Extracted {6} form features (from cache)")
             return result
@@ -149,6 +137,9 @@ class FormExtractor(FeatureExtractor):
             result['form_places_3'] = 0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         # For each horse, get last N runs
         form_features = []
         
@@ -206,6 +197,29 @@ class FormExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {6} form features for {len(df)} runners")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract form features from the as-of history index."""
+        window = self.history_index.window(result['horse'], result['date'])
+        
+        # Last 5 positions, most recent first; missing positions count as 0
+        mask = window.last_n_mask(5)
+        pos = np.where(mask, np.nan_to_num(window.last_n('pos_int', 5).astype(float), nan=0.0), np.nan)
+        
+        count_3 = mask[:, :3].sum(axis=1)
+        count_5 = mask.sum(axis=1)
+        sum_3 = np.where(mask[:, :3], pos[:, :3], 0.0).sum(axis=1)
+        sum_5 = np.where(mask, pos, 0.0).sum(axis=1)
+        
+        result['form_last_pos'] = np.nan_to_num(pos[:, 0], nan=0.0)
+        result['form_avg_pos_3'] = np.where(count_3 > 0, sum_3 / np.maximum(count_3, 1), 0.0)
+        result['form_avg_pos_5'] = np.where(count_5 > 0, sum_5 / np.maximum(count_5, 1), 0.0)
+        result['form_wins_3'] = (pos[:, :3] == 1).sum(axis=1)
+        result['form_wins_5'] = (pos == 1).sum(axis=1)
+        result['form_places_3'] = (pos[:, :3] <= 3).sum(axis=1)
+        
+        self.logger.info(f"Extracted {6} form features for {len(result)} runners (indexed)")
+        return result
 
 
 # ============================================================================
@@ -230,6 +244,9 @@ class ClassExtractor(FeatureExtractor):
             result['class_win_rate'] = 0.0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         class_features = []
         
         for idx, row in df.iterrows():
@@ -275,6 +292,29 @@ class ClassExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {4} class features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract class features from the as-of history index."""
+        index = self.history_index
+        window = index.window(result['horse'], result['date'])
+        current_class = result['class'].fillna(4).to_numpy(dtype=float)
+        has_history = window.has_history
+        
+        # Average class of last 3 runs (missing class counts as 4)
+        mask = window.last_n_mask(3)
+        last_3 = np.nan_to_num(window.last_n('class', 3).astype(float), nan=4.0)
+        count_3 = mask.sum(axis=1)
+        class_avg_3 = np.where(mask, last_3, 0.0).sum(axis=1) / np.maximum(count_3, 1)
+        
+        class_col = index.column('class')
+        runs, wins = window.count_where(lambda owner, rows: class_col[rows] == current_class[owner])
+        
+        result['class_avg_3'] = np.where(has_history, class_avg_3, current_class)
+        result['class_delta'] = np.where(has_history, current_class - class_avg_3, 0.0)
+        result['class_win_rate'] = np.where(runs > 0, wins / np.maximum(runs, 1), 0.0)
+        
+        self.logger.info(f"Extracted {4} class features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -300,6 +340,9 @@ class DistanceExtractor(FeatureExtractor):
             result['dist_win_rate'] = 0.0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         dist_features = []
         
         for idx, row in df.iterrows():
@@ -351,6 +394,33 @@ class DistanceExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {4} distance features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract distance features from the as-of history index."""
+        index = self.history_index
+        window = index.window(result['horse'], result['date'])
+        current_dist = result['dist'].fillna(2000).to_numpy(dtype=float)
+        has_history = window.has_history
+        
+        # Average distance of last 3 runs (missing distance counts as 2000)
+        mask = window.last_n_mask(3)
+        last_3 = np.nan_to_num(window.last_n('dist', 3).astype(float), nan=2000.0)
+        count_3 = mask.sum(axis=1)
+        mean_3 = np.where(mask, last_3, 0.0).sum(axis=1) / np.maximum(count_3, 1)
+        
+        # Win rate at similar distance (±10%)
+        dist_col = index.column('dist').astype(float)
+        runs, wins = window.count_where(
+            lambda owner, rows: (dist_col[rows] >= current_dist[owner] * 0.9)
+            & (dist_col[rows] <= current_dist[owner] * 1.1)
+        )
+        
+        result['dist_avg_3'] = np.where(has_history, mean_3 / 4000.0, current_dist / 4000.0)
+        result['dist_delta'] = np.where(has_history, (current_dist - mean_3) / 4000.0, 0.0)
+        result['dist_win_rate'] = np.where(runs > 0, wins / np.maximum(runs, 1), 0.0)
+        
+        self.logger.info(f"Extracted {4} distance features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -383,6 +453,9 @@ class GoingExtractor(FeatureExtractor):
             result['going_win_rate'] = 0.0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         going_features = []
         
         for idx, row in df.iterrows():
@@ -417,6 +490,24 @@ class GoingExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {2} going features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract going features from the as-of history index."""
+        index = self.history_index
+        window = index.window(result['horse'], result['date'])
+        current_going = result['going_encoded'].to_numpy(dtype=float)
+        
+        going_col = index.derive(
+            'going_encoded',
+            'going',
+            lambda going: pd.Series(going).str.lower().map(self.GOING_MAP).fillna(1).to_numpy(dtype=float),
+        )
+        runs, wins = window.count_where(lambda owner, rows: going_col[rows] == current_going[owner])
+        
+        result['going_win_rate'] = np.where(runs > 0, wins / np.maximum(runs, 1), 0.0)
+        
+        self.logger.info(f"Extracted {2} going features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -438,6 +529,9 @@ class CourseExtractor(FeatureExtractor):
             result['course_win_rate'] = 0.0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         course_features = []
         
         for idx, row in df.iterrows():
@@ -470,6 +564,21 @@ class CourseExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {2} course features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract course features from the as-of history index."""
+        index = self.history_index
+        window = index.window(result['horse'], result['date'])
+        current_course = result['course'].to_numpy()
+        
+        course_col = index.column('course')
+        runs, wins = window.count_where(lambda owner, rows: course_col[rows] == current_course[owner])
+        
+        result['course_runs'] = runs
+        result['course_win_rate'] = np.where(runs > 0, wins / np.maximum(runs, 1), 0.0)
+        
+        self.logger.info(f"Extracted {2} course features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -492,7 +601,7 @@ class TrainerExtractor(FeatureExtractor):
             return result
         
         # Build trainer stats
-        trainer_stats = history.groupby('trainer').agg({
+        trainer_stats = history.groupby('trainer', observed=True).agg({
             'pos_int': lambda x: (x == 1).sum() / len(x) if len(x) > 0 else 0.0
         }).rename(columns={'pos_int': 'trainer_win_rate'})
         
@@ -501,7 +610,7 @@ class TrainerExtractor(FeatureExtractor):
         cutoff = max_date - pd.Timedelta(days=90)
         recent = history[pd.to_datetime(history['date']) >= cutoff]
         
-        trainer_recent = recent.groupby('trainer').agg({
+        trainer_recent = recent.groupby('trainer', observed=True).agg({
             'pos_int': lambda x: (x == 1).sum() / len(x) if len(x) > 0 else 0.0
         }).rename(columns={'pos_int': 'trainer_recent_win_rate'})
         
@@ -536,12 +645,12 @@ class JockeyExtractor(FeatureExtractor):
             return result
         
         # Jockey win rate
-        jockey_stats = history.groupby('jockey').agg({
+        jockey_stats = history.groupby('jockey', observed=True).agg({
             'pos_int': lambda x: (x == 1).sum() / len(x) if len(x) > 0 else 0.0
         }).rename(columns={'pos_int': 'jockey_win_rate'})
         
         # Jockey-trainer combo win rate
-        combo_stats = history.groupby(['jockey', 'trainer']).agg({
+        combo_stats = history.groupby(['jockey', 'trainer'], observed=True).agg({
             'pos_int': lambda x: (x == 1).sum() / len(x) if len(x) > 0 else 0.0
         }).rename(columns={'pos_int': 'jockey_trainer_combo_wr'})
         
@@ -581,6 +690,9 @@ class WeightExtractor(FeatureExtractor):
             result['weight_delta'] = 0.0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         weight_features = []
         
         for idx, row in df.iterrows():
@@ -606,6 +718,17 @@ class WeightExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {2} weight features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract weight features from the as-of history index."""
+        window = self.history_index.window(result['horse'], result['date'])
+        current_weight = result['lbs'].fillna(130.0).to_numpy(dtype=float)
+        last_weight = window.last_n('lbs', 1).astype(float)[:, 0]
+        
+        result['weight_delta'] = np.where(np.isnan(last_weight), 0.0, current_weight - last_weight)
+        
+        self.logger.info(f"Extracted {2} weight features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -653,6 +776,9 @@ class TemporalExtractor(FeatureExtractor):
             result['runs_last_90d'] = 0
             return result
         
+        if self.history_index is not None:
+            return self._extract_indexed(result)
+        
         temporal_features = []
         
         for idx, row in df.iterrows():
@@ -694,6 +820,37 @@ class TemporalExtractor(FeatureExtractor):
         
         self.logger.info(f"Extracted {3} temporal features")
         return result
+    
+    def _extract_indexed(self, result: pd.DataFrame) -> pd.DataFrame:
+        """Extract temporal features from the as-of history index."""
+        index = self.history_index
+        if len(index) == 0:
+            # Every history row lacked a horse or a date
+            result['days_since_last_run'] = 30
+            result['runs_last_30d'] = 0
+            result['runs_last_90d'] = 0
+            return result
+        
+        window = index.window(result['horse'], result['date'])
+        current_date = pd.to_datetime(result['date']).to_numpy(dtype='datetime64[ns]')
+        has_history = window.has_history
+        
+        # Days since last run
+        last_run = index.dates[np.maximum(window.end - 1, 0)]
+        days_since = (current_date - last_run) // np.timedelta64(1, 'D')
+        
+        # Runs in last 30/90 days
+        cutoff_30 = current_date - np.timedelta64(30, 'D')
+        cutoff_90 = current_date - np.timedelta64(90, 'D')
+        runs_30d, _ = window.count_where(lambda owner, rows: index.dates[rows] >= cutoff_30[owner])
+        runs_90d, _ = window.count_where(lambda owner, rows: index.dates[rows] >= cutoff_90[owner])
+        
+        result['days_since_last_run'] = np.where(has_history, days_since, 30)
+        result['runs_last_30d'] = runs_30d
+        result['runs_last_90d'] = runs_90d
+        
+        self.logger.info(f"Extracted {3} temporal features (indexed)")
+        return result
 
 
 # ============================================================================
@@ -729,6 +886,7 @@ class FeatureBuilderConfig:
     """Configuration for FeatureBuilder."""
     validate_schema: bool = True
     log_level: str = "INFO"
+    use_history_index: bool = False  # As-of history index (fast full-history rebuilds)
 
 
 class FeatureBuilder:
@@ -765,10 +923,23 @@ class FeatureBuilder:
             MarketExtractor(),
         ]
     
+    def build_history_index(self, history: pd.DataFrame) -> HistoryIndex:
+        """
+        Build an as-of history index for reuse across build_sqpe_features calls.
+        
+        Args:
+            history: Historical data for lookback features
+        
+        Returns:
+            HistoryIndex over history
+        """
+        return HistoryIndex(history)
+    
     def build_sqpe_features(
         self,
         df: pd.DataFrame,
-        history: Optional[pd.DataFrame] = None
+        history: Optional[pd.DataFrame] = None,
+        history_index: Optional[HistoryIndex] = None,
     ) -> pd.DataFrame:
         """
         Build complete SQPE feature set.
@@ -776,15 +947,21 @@ class FeatureBuilder:
         Args:
             df: Current race data (raw schema)
             history: Historical data for lookback features
+            history_index: Prebuilt index over history. If None and
+                config.use_history_index is set, one is built from history.
         
         Returns:
             DataFrame with SQPE features
         """
         self.logger.info(f"Building SQPE features for {len(df)} runners")
         
+        if history_index is None and self.config.use_history_index and history is not None and not history.empty:
+            history_index = self.build_history_index(history)
+        
         # Run all extractors
         result = df.copy()
         for extractor in self.extractors:
+            extractor.history_index = history_index
             result = extractor.extract(result, history)
         
         # Select only SQPE features
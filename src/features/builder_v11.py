@@ -27,6 +27,8 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from . import set_based_v11 as sb
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,13 +38,19 @@ class FeatureBuilderV11:
     
     Adapted from enterprise spec to work with flat racing_data schema.
     All features computed via SQL for performance.
+    
+    With set_based=True each family is computed for all runners at once
+    (one history query, point-in-time per race date) instead of one
+    query per trainer/jockey/horse/runner.
     """
     
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, set_based: bool = False):
         """Initialize feature builder."""
         self.db_path = db_path
         self.conn = None
-        logger.info(f"FeatureBuilderV11 initialized: {db_path}")
+        self.set_based = set_based
+        self._history = None
+        logger.info(f"FeatureBuilderV11 initialized: {db_path} (set_based={set_based})")
     
     def connect(self):
         """Open database connection."""
@@ -78,6 +86,10 @@ class FeatureBuilderV11:
         base_df = self._load_base_data(target_date, sample_size)
         logger.info(f"Base dataset: {len(base_df):,} records")
         
+        if self.set_based:
+            sb.ensure_racing_indexes(self.conn)
+            self._history = sb.load_entity_history(self.conn, base_df)
+        
         # Family 1: Trainer/Jockey Velocity
         logger.info("\n[1/4] Computing Trainer/Jockey Velocity...")
         base_df = self._add_tj_velocity(base_df)
@@ -94,6 +106,7 @@ class FeatureBuilderV11:
         logger.info("\n[4/4] Computing Form Curves...")
         base_df = self._add_form_curves(base_df)
         
+        self._history = None
         self.close()
         
         logger.info("="*60)
@@ -137,6 +150,9 @@ class FeatureBuilderV11:
         - jockey_sr_14d, jockey_sr_30d, jockey_sr_90d
         - tj_combo_uplift
         """
+        if self.set_based:
+            return self._add_tj_velocity_set(df)
+        
         # Pre-compute trainer stats for all unique trainers
         trainers = df['trainer'].unique()
         trainer_stats = {}
@@ -173,6 +189,43 @@ class FeatureBuilderV11:
         logger.info("  Added 7 velocity features")
         return df
     
+    def _history_for(self, df: pd.DataFrame) -> pd.DataFrame:
+        """History slice for set-based families (loaded once per build)."""
+        if self._history is None:
+            return sb.load_entity_history(self.conn, df)
+        return self._history
+    
+    def _add_tj_velocity_set(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Set-based velocity: point-in-time at each runner's own race date."""
+        history = self._history_for(df)
+        finished = history[history['finished']]
+        dates = pd.to_datetime(df['date'])
+        career_end = dates - pd.Timedelta(days=90)
+        
+        sr_90d = {}
+        for entity in ('trainer', 'jockey'):
+            counter = sb.WindowCounter(finished, entity)
+            r_prior, w_prior = counter.between(df[entity], None, career_end)
+            blank = sb.blank_mask(df[entity])
+            
+            for days in (14, 30, 90):
+                runs, wins = counter.between(df[entity], dates - pd.Timedelta(days=days), dates)
+                sr = sb.eb_strike_rate(wins, runs, w_prior, r_prior)
+                df[f'{entity}_sr_{days}d'] = np.where(blank, 0.0, sr)
+            sr_90d[entity] = df[f'{entity}_sr_90d'].to_numpy()
+        
+        # Combo uplift (365d combo SR with light prior vs 90d individual baselines)
+        combo = sb.combo_key(df['trainer'], df['jockey'])
+        runs, wins = sb.WindowCounter(finished, 'trainer_jockey').between(
+            combo, dates - pd.Timedelta(days=365), dates
+        )
+        combo_sr = np.where(runs > 0, (wins + 5) / (runs + 50), 0.0)
+        uplift = np.clip(combo_sr - (sr_90d['trainer'] + sr_90d['jockey']) / 2, -0.3, 0.3)
+        df['tj_combo_uplift'] = np.where(combo.isna().to_numpy(), 0.0, uplift)
+        
+        logger.info("  Added 7 velocity features (set-based)")
+        return df
+    
     def _compute_entity_velocity(self, entity_type: str, entity_name: str, 
                                  max_date: str) -> Dict[str, float]:
         """Compute rolling SR with EB shrinkage for entity."""
@@ -262,16 +315,27 @@ class FeatureBuilderV11:
         - layoff_days, layoff_penalty, freshness_flag
         - weight_delta, or_delta
         """
-        # Compute for each horse
-        df['class_drop'] = df.apply(
-            lambda row: self._get_class_drop(row['horse'], row['date'], row['class']),
-            axis=1
-        )
-        
-        df['layoff_days'] = df.apply(
-            lambda row: self._get_layoff_days(row['horse'], row['date']),
-            axis=1
-        )
+        if self.set_based:
+            history = self._history_for(df)
+            has_run, _, prev_class = sb.previous_run(history, df)
+            prev_class = pd.Series(prev_class, index=df.index)
+            
+            # Positive = drop (prev 5 → curr 3 = +2 drop)
+            drop = sb.parse_class(prev_class) - sb.parse_class(df['class'])
+            no_prev = ~has_run | prev_class.isna().to_numpy() | sb.blank_mask(df['horse'])
+            df['class_drop'] = np.where(no_prev, 0, drop)
+            df['layoff_days'] = sb.layoff_days(history, df)
+        else:
+            # Compute for each horse
+            df['class_drop'] = df.apply(
+                lambda row: self._get_class_drop(row['horse'], row['date'], row['class']),
+                axis=1
+            )
+            
+            df['layoff_days'] = df.apply(
+                lambda row: self._get_layoff_days(row['horse'], row['date']),
+                axis=1
+            )
         
         # Layoff penalty (nonlinear)
         def layoff_penalty(days):
@@ -452,6 +516,9 @@ class FeatureBuilderV11:
         - ts_trend (topspeed trend)
         - form_var (consistency)
         """
+        if self.set_based:
+            return self._add_form_curves_set(df)
+        
         df['form_ewma'] = df.apply(
             lambda row: self._compute_form_ewma(row['horse'], row['date']),
             axis=1
@@ -475,6 +542,26 @@ class FeatureBuilderV11:
         logger.info("  Added 4 form curve features")
         return df
     
+    def _add_form_curves_set(self, df: pd.DataFrame, n_runs: int = 5) -> pd.DataFrame:
+        """Set-based form curves over each horse's last n finished runs."""
+        history = self._history_for(df)
+        runs = sb.last_runs(history[history['finished']], df, ['finish_pct', 'pos_n'], n_runs)
+        blank = sb.blank_mask(df['horse'])
+        
+        # Percentile with 1=won, 0=last; EWMA with decay=0.6
+        pct, pct_count = sb.compact_valid(1.0 - runs['finish_pct'])
+        ewma = sb.sequential_ewma(pct, pct_count, lambda i: 0.6 ** i, empty=0.5)
+        
+        positions, pos_count = sb.compact_valid(runs['pos_n'])
+        
+        df['form_ewma'] = np.where(blank, 0.5, ewma)
+        df['form_slope'] = np.where(blank, 0.0, sb.trend_slope(positions, pos_count))
+        df['ts_trend'] = 0.0
+        df['form_var'] = np.where(blank, 0.0, sb.masked_variance(positions, pos_count))
+        
+        logger.info("  Added 4 form curve features (set-based)")
+        return df
+    
     def _compute_form_ewma(self, horse: str, race_date: str, n_runs: int = 5) -> float:
         """Compute EWMA of finish percentile with decay=0.6."""
         if pd.isna(horse) or horse == '':
@@ -4,219 +4,561 @@ Feature Cache System - 10-20x Speedup for Historical Lookups
 Pre-computes and caches trainer/jockey/course statistics to avoid
 repeated O(n) scans during feature extraction.
 
+The cache is incremental: per-entity state lives in compact arrays
+(win/run counters, a last-5 form buffer per horse) that are advanced by
+applying new results as deltas, so a daily refresh or a walk-forward
+backtest costs time proportional to the new rows only. Trainer "recent"
+stats use a 90-day window that expires old days as the as-of date moves.
+
+Snapshots are written as a directory of .npy arrays plus a JSON
+manifest, and load memory-mapped so several workers can share one
+snapshot without unpickling.
+
 Usage:
     cache = FeatureCache()
     cache.build_from_history(history_df, date='2015-05-01')
-    
+
     # O(1) lookup instead of O(n) scan
     trainer_stats = cache.get_trainer_stats('Brian Ellison')
+
+    # Daily refresh: apply the day's results, move the as-of date
+    cache.advance(todays_results, as_of='2015-05-02')
+
+    # Walk-forward: stats as of each race date, no future leakage
+    for race_date, cache in FeatureCache().walk_forward(history_df, race_dates):
+        features = cache.form_features(runners_on(race_date)['horse'])
+
+    # Shared, memory-mapped snapshot
+    cache.save('storage/feature_cache/2015-05-02')
+    shared = FeatureCache().load('storage/feature_cache/2015-05-02')
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import pickle
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import json
+from collections import deque
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+CACHE_FORMAT_VERSION = 1
+
+# Trainer "recent" window (days before the as-of date)
+RECENT_DAYS = 90
+
+# Runs kept per horse for form stats
+FORM_RUNS = 5
+
+# Entity vocabularies and the column each is read from
+ENTITY_COLUMNS = {
+    'trainer': 'trainer',
+    'jockey': 'jockey',
+    'horse': 'horse',
+    'course': 'course',
+    'going': 'going',
+    'class': 'class',
+}
+
+# Count tables: name -> entity key(s)
+TABLE_KEYS = {
+    'trainer': ('trainer',),
+    'trainer_recent': ('trainer',),
+    'jockey': ('jockey',),
+    'jockey_trainer': ('jockey', 'trainer'),
+    'course': ('horse', 'course'),
+    'going': ('horse', 'going'),
+    'class': ('horse', 'class'),
+}
+
+_PAIR_SHIFT = np.int64(32)
+
+
+def _day_numbers(dates) -> np.ndarray:
+    """Dates → integer day numbers (days since epoch)."""
+    return pd.to_datetime(dates).to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+
+def _to_day(date) -> int:
+    return int(pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64))
+
+
+def _json_key(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _writable(array: np.ndarray) -> np.ndarray:
+    """Copy memory-mapped (read-only) arrays before the first in-place update."""
+    return array if array.flags.writeable else np.array(array)
+
+
+def _grown(array: np.ndarray, size: int, fill=0) -> np.ndarray:
+    """``array`` with room for at least ``size`` rows (geometric growth)."""
+    if len(array) >= size:
+        return _writable(array)
+    capacity = max(size, 2 * len(array), 64)
+    out = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+    out[:len(array)] = array
+    return out
+
+
+class _Vocabulary:
+    """Entity name ↔ dense integer id."""
+
+    def __init__(self, names=()):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def encode(self, values) -> np.ndarray:
+        """Ids for a column of names, adding unseen names (-1 for missing)."""
+        codes, uniques = pd.factorize(pd.Series(values).to_numpy(dtype=object))
+        mapped = np.empty(len(uniques), dtype=np.int64)
+        for i, name in enumerate(uniques):
+            entity_id = self.ids.get(name)
+            if entity_id is None:
+                entity_id = len(self.names)
+                self.ids[name] = entity_id
+                self.names.append(name)
+            mapped[i] = entity_id
+        return np.where(codes >= 0, mapped[np.maximum(codes, 0)] if len(mapped) else -1, -1)
+
+
+class _CountTable:
+    """Wins/runs counters keyed by an entity id or an (id, id) pair."""
+
+    def __init__(self, codes=None, wins=None, runs=None):
+        self.codes = np.asarray(codes if codes is not None else [], dtype=np.int64)
+        self.wins = np.asarray(wins if wins is not None else [], dtype=np.int64)
+        self.runs = np.asarray(runs if runs is not None else [], dtype=np.int64)
+        self.size = len(self.codes)
+        self.slots = {int(code): slot for slot, code in enumerate(self.codes[:self.size])}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, codes: np.ndarray, won: np.ndarray, sign: int = 1):
+        """Add (or with sign=-1, remove) runs for a batch of keys."""
+        if len(codes) == 0:
+            return
+        uniques, inverse = np.unique(codes, return_inverse=True)
+        slot_ids = np.empty(len(uniques), dtype=np.int64)
+        for i, code in enumerate(uniques.tolist()):
+            slot = self.slots.get(code)
+            if slot is None:
+                slot = self.size
+                self.slots[code] = slot
+                self.size += 1
+            slot_ids[i] = slot
+
+        self.codes = _grown(self.codes, self.size, fill=-1)
+        self.wins = _grown(self.wins, self.size)
+        self.runs = _grown(self.runs, self.size)
+        self.codes[slot_ids] = uniques
+
+        per_key = np.bincount(inverse, minlength=len(uniques))
+        per_key_wins = np.bincount(inverse, weights=won, minlength=len(uniques)).astype(np.int64)
+        self.runs[slot_ids] += sign * per_key
+        self.wins[slot_ids] += sign * per_key_wins
+
+    def stats(self, code: int) -> Optional[Tuple[int, int]]:
+        slot = self.slots.get(code)
+        if slot is None:
+            return None
+        return int(self.wins[slot]), int(self.runs[slot])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {'codes': self.codes[:self.size], 'wins': self.wins[:self.size], 'runs': self.runs[:self.size]}
+
+
+def _stats_dict(wins: int, runs: int) -> Dict:
+    return {'wins': wins, 'runs': runs, 'win_rate': wins / runs if runs else 0.0}
+
+
+class _StatsView(Mapping):
+    """Read-only dict view of a count table keyed by entity names."""
+
+    def __init__(self, cache: 'FeatureCache', table: str):
+        self.cache = cache
+        self.table = table
+
+    def _code(self, key) -> Optional[int]:
+        return self.cache._code(self.table, key)
+
+    def __getitem__(self, key) -> Dict:
+        code = self._code(key)
+        counts = None if code is None else self.cache._tables[self.table].stats(code)
+        if counts is None or counts[1] == 0:
+            raise KeyError(key)
+        return self.cache._table_stats(self.table, code, *counts)
+
+    def __iter__(self):
+        table = self.cache._tables[self.table]
+        entities = [self.cache._vocab[e].names for e in TABLE_KEYS[self.table]]
+        for code, runs in zip(table.codes[:table.size].tolist(), table.runs[:table.size].tolist()):
+            if runs == 0:
+                continue
+            if len(entities) == 1:
+                yield entities[0][code]
+            else:
+                yield (entities[0][code >> int(_PAIR_SHIFT)], entities[1][code & 0xFFFFFFFF])
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.cache._tables[self.table].runs[:len(self.cache._tables[self.table])]))
+
+
+class _FormView(Mapping):
+    """Read-only dict view of per-horse form stats."""
+
+    def __init__(self, cache: 'FeatureCache'):
+        self.cache = cache
+
+    def __getitem__(self, horse) -> Dict:
+        horse_id = self.cache._vocab['horse'].ids.get(horse)
+        if horse_id is None or horse_id >= len(self.cache._form_runs) or self.cache._form_runs[horse_id] == 0:
+            raise KeyError(horse)
+        frame = self.cache._form_frame(np.array([horse_id]))
+        row = frame.iloc[0]
+        return {
+            'last_pos': float(row['form_last_pos']),
+            'avg_pos_3': float(row['form_avg_pos_3']),
+            'avg_pos_5': float(row['form_avg_pos_5']),
+            'wins_3': int(row['form_wins_3']),
+            'wins_5': int(row['form_wins_5']),
+            'places_3': int(row['form_places_3']),
+        }
+
+    def __iter__(self):
+        names = self.cache._vocab['horse'].names
+        runs = self.cache._form_runs
+        for horse_id in np.flatnonzero(runs[:len(names)]).tolist():
+            yield names[horse_id]
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.cache._form_runs))
+
 
 class FeatureCache:
     """
     Pre-computed historical statistics cache.
-    
+
     Stores:
     - Trainer stats (overall + recent)
     - Jockey stats (overall + combos)
     - Course stats (per horse)
     - Going stats (per horse)
     - Class stats (per horse)
+    - Form stats (last 5 runs per horse)
+
+    All stats reflect results strictly before ``cache_date`` (a
+    pd.Timestamp; the day after the latest result when built without a
+    cutoff).
     """
-    
+
     def __init__(self, cache_dir: Optional[Path] = None):
         """
         Initialize feature cache.
-        
+
         Args:
             cache_dir: Directory to store cache files. If None, uses memory only.
         """
         self.cache_dir = Path(cache_dir) if cache_dir else None
         if self.cache_dir:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-        # In-memory caches
-        self.trainer_stats = {}
-        self.jockey_stats = {}
-        self.course_stats = {}
-        self.going_stats = {}
-        self.class_stats = {}
-        
+
+        self._reset()
+
+    def _reset(self):
+        self._vocab = {entity: _Vocabulary() for entity in ENTITY_COLUMNS}
+        self._tables = {name: _CountTable() for name in TABLE_KEYS}
+
+        # Last FORM_RUNS positions per horse id, oldest → newest (right-aligned)
+        self._form_positions = np.zeros((0, FORM_RUNS), dtype=np.float64)
+        self._form_runs = np.zeros(0, dtype=np.int64)
+
+        # Trainer results inside the recent window, one entry per day
+        self._recent = deque()
+
+        self._as_of_day = None
+        self._last_day = None
+
         self.cache_date = None
         self.is_loaded = False
-    
+
+        # Dict-style views (kept for callers that read the stats directly)
+        self.trainer_stats = _StatsView(self, 'trainer')
+        self.jockey_stats = {
+            'overall': _StatsView(self, 'jockey'),
+            'combos': _StatsView(self, 'jockey_trainer'),
+        }
+        self.course_stats = _StatsView(self, 'course')
+        self.going_stats = _StatsView(self, 'going')
+        self.class_stats = _StatsView(self, 'class')
+        self.form_stats = _FormView(self)
+
     def build_from_history(self, history_df: pd.DataFrame, date: str = None):
         """
         Build cache from historical data up to a given date.
-        
+
         Args:
             history_df: Historical race data
-            date: Cache cutoff date (only use data before this)
+            date: Cache cutoff date (only use data before this; default:
+                the day after the latest result)
         """
         # Convert date column to datetime
         history_df = history_df.copy()
         history_df["date"] = pd.to_datetime(history_df["date"])
-        
+
         if date:
             history_df = history_df[history_df['date'] < date].copy()
-        
-        self.cache_date = date or history_df['date'].max()
-        
+
         logger.info(f"Building feature cache from {len(history_df):,} historical rows")
+
+        self._reset()
+        self.advance(history_df, as_of=date)
+
         logger.info(f"Cache date: {self.cache_date}")
-        
-        # Build trainer stats
-        self._build_trainer_stats(history_df)
-        
-        # Build jockey stats
-        self._build_jockey_stats(history_df)
-        
-        # Build per-horse stats
-        self._build_horse_stats(history_df)
-        
-        # Build form stats
-        self._build_form_stats(history_df)
-        
+        logger.info(
+            f"Feature cache built: {len(self.trainer_stats):,} trainers, "
+            f"{len(self.jockey_stats['overall']):,} jockeys, {len(self.form_stats):,} horses"
+        )
+
+    def advance(self, results_df: pd.DataFrame, as_of=None):
+        """
+        Apply new results as deltas and move the cache to ``as_of``.
+
+        Args:
+            results_df: Results dated on/after the latest applied day
+                (typically one race day)
+            as_of: New cache date; defaults to the day after the latest
+                result. Results dated on or after it are rejected (they
+                would leak into that day's features).
+        """
+        days = _day_numbers(results_df['date']) if len(results_df) else np.zeros(0, dtype=np.int64)
+
+        if as_of is None:
+            if not len(days):
+                return
+            as_of = pd.Timestamp(int(days.max()) + 1, unit='D')
+        as_of_day = _to_day(as_of)
+        if self._as_of_day is not None and as_of_day < self._as_of_day:
+            raise ValueError(f"as_of {as_of} is before the current cache date {self.cache_date}")
+
+        if len(days):
+            if self._last_day is not None and days.min() < self._last_day:
+                raise ValueError(
+                    f"Results dated before the latest applied day ({pd.Timestamp(self._last_day, unit='D').date()}) "
+                    f"cannot be applied incrementally; rebuild the cache"
+                )
+            if days.max() >= as_of_day:
+                raise ValueError(f"Results dated on or after as_of {as_of} would leak into the cache")
+
+            order = np.argsort(days, kind='stable')
+            self._apply(results_df.iloc[order], days[order], as_of_day)
+            self._last_day = int(days.max())
+
+        self._expire_recent(as_of_day)
+        self._as_of_day = as_of_day
+        self.cache_date = pd.Timestamp(as_of)
         self.is_loaded = True
-        logger.info("Feature cache built successfully")
-    
-    def _build_trainer_stats(self, df: pd.DataFrame):
-        """Build trainer statistics."""
-        logger.info("Building trainer stats...")
-        
-        # Overall stats
-        trainer_overall = df.groupby('trainer').agg({
-            'pos_int': lambda x: (x == 1).sum(),  # wins
-            'race_id': 'count',  # runs
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        trainer_overall['win_rate'] = trainer_overall['wins'] / trainer_overall['runs']
-        
-        # Recent stats (last 90 days)
-        recent_cutoff = pd.to_datetime(self.cache_date) - timedelta(days=90)
-        df_recent = df[df['date'] >= recent_cutoff]
-        
-        trainer_recent = df_recent.groupby('trainer').agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'recent_wins', 'race_id': 'recent_runs'})
-        
-        trainer_recent['recent_win_rate'] = trainer_recent['recent_wins'] / trainer_recent['recent_runs']
-        
-        # Combine
-        self.trainer_stats = trainer_overall.join(trainer_recent, how='outer').fillna(0).to_dict('index')
-        
-        logger.info(f"  Cached {len(self.trainer_stats):,} trainers")
-    
-    def _build_jockey_stats(self, df: pd.DataFrame):
-        """Build jockey statistics."""
-        logger.info("Building jockey stats...")
-        
-        # Overall jockey stats
-        jockey_overall = df.groupby('jockey').agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        jockey_overall['win_rate'] = jockey_overall['wins'] / jockey_overall['runs']
-        
-        # Jockey-trainer combos
-        combo_stats = df.groupby(['jockey', 'trainer']).agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        combo_stats['win_rate'] = combo_stats['wins'] / combo_stats['runs']
-        
-        self.jockey_stats = {
-            'overall': jockey_overall.to_dict('index'),
-            'combos': combo_stats.to_dict('index'),
+
+    def _apply(self, df: pd.DataFrame, days: np.ndarray, as_of_day: int):
+        """Fold date-sorted results into the counters and form buffers."""
+        ids = {
+            entity: self._vocab[entity].encode(df[column]) if column in df.columns else np.full(len(df), -1)
+            for entity, column in ENTITY_COLUMNS.items()
         }
-        
-        logger.info(f"  Cached {len(jockey_overall):,} jockeys, {len(combo_stats):,} combos")
-    
-    def _build_horse_stats(self, df: pd.DataFrame):
-        """Build per-horse statistics (course, going, class)."""
-        logger.info("Building per-horse stats...")
-        
-        # Course stats
-        course_stats = df.groupby(['horse', 'course']).agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        course_stats['win_rate'] = course_stats['wins'] / course_stats['runs']
-        self.course_stats = course_stats.to_dict('index')
-        
-        # Going stats
-        going_stats = df.groupby(['horse', 'going']).agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        going_stats['win_rate'] = going_stats['wins'] / going_stats['runs']
-        self.going_stats = going_stats.to_dict('index')
-        
-        # Class stats
-        class_stats = df.groupby(['horse', 'class']).agg({
-            'pos_int': lambda x: (x == 1).sum(),
-            'race_id': 'count',
-        }).rename(columns={'pos_int': 'wins', 'race_id': 'runs'})
-        
-        class_stats['win_rate'] = class_stats['wins'] / class_stats['runs']
-        self.class_stats = class_stats.to_dict('index')
-        
-        logger.info(f"  Cached course: {len(course_stats):,}, going: {len(going_stats):,}, class: {len(class_stats):,}")
-    
-
-    
-    def _build_form_stats(self, df: pd.DataFrame):
-        """Build form statistics (last N runs per horse)."""
-        logger.info("Building form stats...")
-        
-        # Sort by date
-        df_sorted = df.sort_values('date')
-        
-        # For each horse, get last 5 runs before cache date
-        self.form_stats = {}
-        
-        for horse in df_sorted['horse'].unique():
-            horse_df = df_sorted[df_sorted['horse'] == horse]
-            
-            # Get last 5 runs
-            last_5 = horse_df.tail(5)
-            
-            if len(last_5) == 0:
+        positions = pd.to_numeric(df['pos_int'], errors='coerce').to_numpy(dtype=float)
+        won = (positions == 1).astype(np.int64)
+
+        # Rows without a race_id were never counted as runs
+        counted = df['race_id'].notna().to_numpy() if 'race_id' in df.columns else np.ones(len(df), dtype=bool)
+
+        for name, keys in TABLE_KEYS.items():
+            if name == 'trainer_recent':
                 continue
-            
-            # Calculate form features
-            positions = last_5['pos_int'].fillna(0).values
-            
-            self.form_stats[horse] = {
-                'last_pos': float(positions[-1]) if len(positions) > 0 else 0.0,
-                'avg_pos_3': float(positions[-3:].mean()) if len(positions) >= 3 else 0.0,
-                'avg_pos_5': float(positions.mean()) if len(positions) > 0 else 0.0,
-                'wins_3': int((positions[-3:] == 1).sum()) if len(positions) >= 3 else 0,
-                'wins_5': int((positions == 1).sum()),
-                'places_3': int((positions[-3:] <= 3).sum()) if len(positions) >= 3 else 0,
-            }
-        
-        logger.info(f"  Cached form for {len(self.form_stats):,} horses")
+            codes, valid = self._keys_to_codes([ids[k] for k in keys])
+            valid &= counted
+            self._tables[name].add(codes[valid], won[valid])
+
+        # Recent trainer window: only days inside it are kept
+        trainer_valid = (ids['trainer'] >= 0) & counted
+        recent = trainer_valid & (days >= as_of_day - RECENT_DAYS)
+        if recent.any():
+            recent_days = days[recent]
+            recent_ids = ids['trainer'][recent]
+            recent_won = won[recent]
+            boundaries = np.flatnonzero(np.diff(recent_days)) + 1
+            for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(recent_days)]):
+                entry = (int(recent_days[start]), recent_ids[start:end], recent_won[start:end])
+                self._tables['trainer_recent'].add(entry[1], entry[2])
+                self._recent.append(entry)
+
+        self._apply_form(ids['horse'], np.nan_to_num(positions, nan=0.0))
+
+    def _apply_form(self, horse_ids: np.ndarray, positions: np.ndarray):
+        """Append date-ordered runs to each horse's last-5 buffer."""
+        valid = horse_ids >= 0
+        horse_ids = horse_ids[valid]
+        positions = positions[valid]
+        if not len(horse_ids):
+            return
+
+        n_horses = len(self._vocab['horse'])
+        self._form_positions = _grown(self._form_positions, n_horses)
+        self._form_runs = _grown(self._form_runs, n_horses)
+
+        order = np.argsort(horse_ids, kind='stable')
+        horse_ids = horse_ids[order]
+        positions = positions[order]
+        horses, first, new_runs = np.unique(horse_ids, return_index=True, return_counts=True)
+
+        # Shift each horse's buffer left by its number of new runs...
+        shift = np.minimum(new_runs, FORM_RUNS)
+        columns = np.arange(FORM_RUNS)
+        source = columns[None, :] + shift[:, None]
+        old = self._form_positions[horses]
+        buffer = np.where(source < FORM_RUNS, np.take_along_axis(old, np.minimum(source, FORM_RUNS - 1), axis=1), 0.0)
+
+        # ...then write the newest FORM_RUNS new runs on the right
+        owner = np.repeat(np.arange(len(horses)), new_runs)
+        from_end = (first + new_runs)[owner] - 1 - np.arange(len(horse_ids))
+        keep = from_end < FORM_RUNS
+        buffer[owner[keep], FORM_RUNS - 1 - from_end[keep]] = positions[keep]
+
+        self._form_positions[horses] = buffer
+        self._form_runs[horses] += new_runs
+
+    def _expire_recent(self, as_of_day: int):
+        cutoff = as_of_day - RECENT_DAYS
+        while self._recent and self._recent[0][0] < cutoff:
+            _, trainer_ids, won = self._recent.popleft()
+            self._tables['trainer_recent'].add(trainer_ids, won, sign=-1)
+
+    def walk_forward(self, history_df: pd.DataFrame, dates) -> Iterator[Tuple[pd.Timestamp, 'FeatureCache']]:
+        """
+        Advance through ``dates``, yielding the cache as of each one.
+
+        Each yielded state holds only results strictly before that date,
+        and each step applies only the rows since the previous date.
+
+        Args:
+            history_df: Historical race data (any order)
+            dates: As-of dates (e.g. race days of a backtest)
+
+        Yields:
+            (date, cache) — the cache is updated in place; use snapshot()
+            to keep a state beyond the next step
+        """
+        history_df = history_df.copy()
+        history_df['date'] = pd.to_datetime(history_df['date'])
+        history_df = history_df.sort_values('date', kind='stable')
+        history_days = _day_numbers(history_df['date'])
+
+        self._reset()
+        applied = 0
+        for date in sorted(pd.to_datetime(pd.Series(dates)).drop_duplicates()):
+            end = int(np.searchsorted(history_days, _to_day(date), side='left'))
+            self.advance(history_df.iloc[applied:end], as_of=date)
+            applied = end
+            yield date, self
+
+    def snapshot(self) -> 'FeatureCache':
+        """Independent copy of the current state (array copies, no recompute)."""
+        snap = FeatureCache()
+        snap._vocab = {entity: _Vocabulary(vocab.names) for entity, vocab in self._vocab.items()}
+        snap._tables = {
+            name: _CountTable(**{k: v.copy() for k, v in table.arrays().items()})
+            for name, table in self._tables.items()
+        }
+        snap._form_positions = self._form_positions[:len(self._vocab['horse'])].copy()
+        snap._form_runs = self._form_runs[:len(self._vocab['horse'])].copy()
+        snap._recent = deque(self._recent)
+        snap._as_of_day = self._as_of_day
+        snap._last_day = self._last_day
+        snap.cache_date = self.cache_date
+        snap.is_loaded = self.is_loaded
+        return snap
+
+    def _keys_to_codes(self, id_arrays) -> Tuple[np.ndarray, np.ndarray]:
+        valid = np.logical_and.reduce([ids >= 0 for ids in id_arrays])
+        if len(id_arrays) == 1:
+            return id_arrays[0], valid
+        first, second = id_arrays
+        return (first << _PAIR_SHIFT) | np.maximum(second, 0), valid
+
+    def _code(self, table: str, key) -> Optional[int]:
+        keys = TABLE_KEYS[table]
+        parts = (key,) if len(keys) == 1 else key
+        ids = [self._vocab[entity].ids.get(part) for entity, part in zip(keys, parts)]
+        if any(i is None for i in ids):
+            return None
+        return ids[0] if len(ids) == 1 else (ids[0] << int(_PAIR_SHIFT)) | ids[1]
+
+    def _table_stats(self, table: str, code: int, wins: int, runs: int) -> Dict:
+        stats = _stats_dict(wins, runs)
+        if table == 'trainer':
+            recent_wins, recent_runs = self._tables['trainer_recent'].stats(code) or (0, 0)
+            stats.update({
+                'recent_wins': recent_wins,
+                'recent_runs': recent_runs,
+                'recent_win_rate': recent_wins / recent_runs if recent_runs else 0.0,
+            })
+        return stats
+
+    def _lookup(self, table: str, key, default: Dict) -> Dict:
+        code = self._code(table, key)
+        counts = None if code is None else self._tables[table].stats(code)
+        if counts is None or counts[1] == 0:
+            return default
+        return self._table_stats(table, code, *counts)
+
+    def _form_frame(self, horse_ids: np.ndarray) -> pd.DataFrame:
+        known = (horse_ids >= 0) & (horse_ids < len(self._form_runs))
+        safe = np.where(known, horse_ids, 0)
+        runs = np.where(known, self._form_runs[safe] if len(self._form_runs) else 0, 0)
+        positions = self._form_positions[safe] if len(self._form_positions) else np.zeros((len(safe), FORM_RUNS))
+
+        seen = np.minimum(runs, FORM_RUNS)
+        in_buffer = np.arange(FORM_RUNS)[None, :] >= (FORM_RUNS - seen)[:, None]
+        last_3 = positions[:, -3:]
+        has_3 = runs >= 3
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_5 = np.where(in_buffer, positions, 0.0).sum(axis=1) / seen
+
+        return pd.DataFrame({
+            'form_last_pos': np.where(runs > 0, positions[:, -1], 0.0),
+            'form_avg_pos_3': np.where(has_3, last_3.mean(axis=1), 0.0),
+            'form_avg_pos_5': np.where(runs > 0, avg_5, 0.0),
+            'form_wins_3': np.where(has_3, (last_3 == 1).sum(axis=1), 0),
+            'form_wins_5': ((positions == 1) & in_buffer).sum(axis=1),
+            'form_places_3': np.where(has_3, (last_3 <= 3).sum(axis=1), 0),
+        })
+
+    def form_features(self, horses) -> pd.DataFrame:
+        """
+        Form features for a column of horses in one vectorized lookup.
+
+        Returns:
+            DataFrame aligned with ``horses`` (form_last_pos, form_avg_pos_3,
+            form_avg_pos_5, form_wins_3, form_wins_5, form_places_3);
+            unseen horses get zeros
+        """
+        ids = self._vocab['horse'].ids
+        horse_ids = np.fromiter((ids.get(h, -1) for h in horses), dtype=np.int64, count=len(horses))
+        frame = self._form_frame(horse_ids)
+        if isinstance(horses, pd.Series):
+            frame.index = horses.index
+        return frame
 
     def get_trainer_stats(self, trainer: str) -> Dict:
         """Get trainer statistics (O(1) lookup)."""
-        return self.trainer_stats.get(trainer, {
+        return self._lookup('trainer', trainer, {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
@@ -224,75 +566,133 @@ class FeatureCache:
             'recent_runs': 0,
             'recent_win_rate': 0.0,
         })
-    
+
     def get_jockey_stats(self, jockey: str) -> Dict:
         """Get jockey statistics (O(1) lookup)."""
-        return self.jockey_stats['overall'].get(jockey, {
+        return self._lookup('jockey', jockey, {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
         })
-    
+
     def get_jockey_trainer_stats(self, jockey: str, trainer: str) -> Dict:
         """Get jockey-trainer combo statistics (O(1) lookup)."""
-        return self.jockey_stats['combos'].get((jockey, trainer), {
+        return self._lookup('jockey_trainer', (jockey, trainer), {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
         })
-    
+
     def get_course_stats(self, horse: str, course: str) -> Dict:
         """Get horse course statistics (O(1) lookup)."""
-        return self.course_stats.get((horse, course), {
+        return self._lookup('course', (horse, course), {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
         })
-    
+
     def get_going_stats(self, horse: str, going: str) -> Dict:
         """Get horse going statistics (O(1) lookup)."""
-        return self.going_stats.get((horse, going), {
+        return self._lookup('going', (horse, going), {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
         })
-    
+
     def get_class_stats(self, horse: str, class_val: int) -> Dict:
         """Get horse class statistics (O(1) lookup)."""
-        return self.class_stats.get((horse, class_val), {
+        return self._lookup('class', (horse, class_val), {
             'wins': 0,
             'runs': 0,
             'win_rate': 0.0,
         })
-    
+
     def save(self, filepath: Path):
-        """Save cache to disk."""
-        cache_data = {
-            'trainer_stats': self.trainer_stats,
-            'jockey_stats': self.jockey_stats,
-            'course_stats': self.course_stats,
-            'going_stats': self.going_stats,
-            'class_stats': self.class_stats,
-            'cache_date': self.cache_date,
+        """
+        Save a snapshot to a directory of .npy arrays + manifest.json.
+
+        Entity names go in the manifest; counters, form buffers and the
+        recent window are plain arrays that load() memory-maps.
+        """
+        filepath = Path(filepath)
+        filepath.mkdir(parents=True, exist_ok=True)
+
+        for name, table in self._tables.items():
+            for field, array in table.arrays().items():
+                np.save(filepath / f"{name}_{field}.npy", array)
+
+        n_horses = len(self._vocab['horse'])
+        np.save(filepath / "form_positions.npy", self._form_positions[:n_horses])
+        np.save(filepath / "form_runs.npy", self._form_runs[:n_horses])
+
+        recent = list(self._recent)
+        np.save(filepath / "recent_days.npy", np.repeat(
+            np.array([day for day, _, _ in recent], dtype=np.int64),
+            [len(ids) for _, ids, _ in recent]
+        ).astype(np.int64))
+        np.save(filepath / "recent_trainers.npy", np.concatenate([ids for _, ids, _ in recent]) if recent else np.zeros(0, np.int64))
+        np.save(filepath / "recent_wins.npy", np.concatenate([won for _, _, won in recent]) if recent else np.zeros(0, np.int64))
+
+        manifest = {
+            'version': CACHE_FORMAT_VERSION,
+            'cache_date': str(pd.Timestamp(self.cache_date).date()) if self.cache_date is not None else None,
+            'as_of_day': self._as_of_day,
+            'last_day': self._last_day,
+            'vocabularies': {
+                entity: [_json_key(name) for name in vocab.names]
+                for entity, vocab in self._vocab.items()
+            },
         }
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(cache_data, f)
-        
+        with open(filepath / "manifest.json", 'w') as f:
+            json.dump(manifest, f)
+
         logger.info(f"Cache saved to {filepath}")
-    
-    def load(self, filepath: Path):
-        """Load cache from disk."""
-        with open(filepath, 'rb') as f:
-            cache_data = pickle.load(f)
-        
-        self.trainer_stats = cache_data['trainer_stats']
-        self.jockey_stats = cache_data['jockey_stats']
-        self.course_stats = cache_data['course_stats']
-        self.going_stats = cache_data['going_stats']
-        self.class_stats = cache_data['class_stats']
-        self.cache_date = cache_data['cache_date']
+
+    def load(self, filepath: Path, mmap: bool = True) -> 'FeatureCache':
+        """
+        Load a snapshot written by save().
+
+        Args:
+            filepath: Snapshot directory
+            mmap: Memory-map the arrays (read-only, shared between
+                processes); they are copied on the first advance()
+        """
+        filepath = Path(filepath)
+        with open(filepath / "manifest.json") as f:
+            manifest = json.load(f)
+
+        if manifest.get('version') != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported feature cache version: {manifest.get('version')}")
+
+        mmap_mode = 'r' if mmap else None
+
+        def array(name):
+            return np.load(filepath / f"{name}.npy", mmap_mode=mmap_mode)
+
+        self._reset()
+        self._vocab = {
+            entity: _Vocabulary(names)
+            for entity, names in manifest['vocabularies'].items()
+        }
+        self._tables = {
+            name: _CountTable(array(f"{name}_codes"), array(f"{name}_wins"), array(f"{name}_runs"))
+            for name in TABLE_KEYS
+        }
+        self._form_positions = array("form_positions")
+        self._form_runs = array("form_runs")
+
+        recent_days = np.load(filepath / "recent_days.npy")
+        recent_trainers = np.load(filepath / "recent_trainers.npy")
+        recent_wins = np.load(filepath / "recent_wins.npy")
+        boundaries = np.flatnonzero(np.diff(recent_days)) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(recent_days)]):
+            if end > start:
+                self._recent.append((int(recent_days[start]), recent_trainers[start:end], recent_wins[start:end]))
+
+        self._as_of_day = manifest['as_of_day']
+        self._last_day = manifest['last_day']
+        self.cache_date = pd.Timestamp(manifest['cache_date']) if manifest['cache_date'] is not None else None
         self.is_loaded = True
-        
-        logger.info(f"Cache loaded from {filepath} (date: {self.cache_date})")
 
+        logger.info(f"Cache loaded from {filepath} (date: {self.cache_date})")
+        return self
@@ -0,0 +1,235 @@
+"""
+History Index - Point-in-time ("as-of") lookups over per-horse history
+
+The history-based extractors in builder.py need, for every runner, the
+horse's runs strictly before the race date. Filtering the full history
+frame per runner is O(runners × history). This index sorts history once
+by (horse, date) into contiguous arrays so that the as-of cut for every
+runner is a single vectorized searchsorted.
+
+Usage:
+    index = HistoryIndex(history_df)
+    window = index.window(df['horse'], df['date'])
+
+    # Last 3 finishing positions before each race (most recent first)
+    last_3 = window.last_n('pos_int', 3)
+
+    # Count of prior wins per runner
+    owner, rows = window.ragged()
+    wins = np.bincount(owner, weights=index.column('pos_int')[rows] == 1,
+                       minlength=len(window))
+
+Author: VÉLØ Oracle Team
+Version: 1.0
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWindow:
+    """
+    As-of slices of a HistoryIndex for a batch of queries.
+
+    Query i owns the sorted index rows ``[start[i], end[i])``: the runs of
+    its horse dated strictly before its as-of date, oldest first.
+    """
+
+    def __init__(self, index: "HistoryIndex", start: np.ndarray, end: np.ndarray):
+        self.index = index
+        self.start = start
+        self.end = end
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of prior runs per query."""
+        return self.end - self.start
+
+    @property
+    def has_history(self) -> np.ndarray:
+        """Boolean mask of queries with at least one prior run."""
+        return self.end > self.start
+
+    def last_n(self, column: str, n: int, fill=np.nan) -> np.ndarray:
+        """
+        Last ``n`` values of ``column`` before each as-of date.
+
+        Args:
+            column: Indexed column name
+            n: Number of most recent runs
+            fill: Value used where a horse has fewer than ``n`` prior runs
+
+        Returns:
+            Array of shape (len(window), n), most recent run in column 0
+        """
+        values = self.index.column(column)
+        offsets = np.arange(1, n + 1)
+        positions = self.end[:, None] - offsets[None, :]
+        valid = positions >= self.start[:, None]
+
+        out = np.full(positions.shape, fill, dtype=np.result_type(values.dtype, np.asarray(fill).dtype))
+        out[valid] = values[positions[valid]]
+        return out
+
+    def last_n_mask(self, n: int) -> np.ndarray:
+        """Boolean (len(window), n) mask of which last_n slots hold a real run."""
+        offsets = np.arange(1, n + 1)
+        return (self.end[:, None] - offsets[None, :]) >= self.start[:, None]
+
+    def ragged(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flatten every query's window into aligned (owner, row) arrays.
+
+        Returns:
+            owner: Query position for each flattened run
+            rows: Sorted index row for each flattened run
+        """
+        counts = self.counts
+        total = int(counts.sum())
+        owner = np.repeat(np.arange(len(counts)), counts)
+        if total == 0:
+            return owner, np.zeros(0, dtype=np.int64)
+
+        # Ragged arange: start[i], start[i] + 1, ..., end[i] - 1 for each i
+        seg_starts = np.cumsum(counts) - counts
+        rows = np.arange(total) - np.repeat(seg_starts, counts) + np.repeat(self.start, counts)
+        return owner, rows
+
+    def count_where(self, mask_fn) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count runs and wins per query over the runs selected by ``mask_fn``.
+
+        Args:
+            mask_fn: Callable ``(owner, rows) -> bool array`` selecting runs
+
+        Returns:
+            (runs, wins) arrays of length len(window)
+        """
+        owner, rows = self.ragged()
+        selected = mask_fn(owner, rows)
+        won = self.index.column('pos_int')[rows] == 1
+
+        size = len(self)
+        runs = np.bincount(owner[selected], minlength=size)
+        wins = np.bincount(owner[selected & won], minlength=size)
+        return runs, wins
+
+
+class HistoryIndex:
+    """
+    Per-horse, date-sorted history for point-in-time feature extraction.
+
+    History rows are sorted by (horse, date) once. Each horse owns a
+    contiguous block of rows, and the as-of cut inside that block is
+    resolved with a single searchsorted on a composite (horse, date) key.
+    """
+
+    DEFAULT_COLUMNS = ('pos_int', 'class', 'dist', 'going', 'course', 'lbs')
+
+    def __init__(
+        self,
+        history: pd.DataFrame,
+        key: str = 'horse',
+        date_col: str = 'date',
+        columns: Optional[Iterable[str]] = None,
+    ):
+        """
+        Build the index.
+
+        Args:
+            history: Historical race data
+            key: Entity column to group runs by
+            date_col: Race date column
+            columns: Columns to carry into the index (defaults to the
+                columns the builder extractors read)
+        """
+        columns = list(columns) if columns is not None else list(self.DEFAULT_COLUMNS)
+        columns = [c for c in columns if c in history.columns]
+
+        dates = pd.to_datetime(history[date_col]).to_numpy(dtype='datetime64[ns]')
+        codes, uniques = pd.factorize(history[key])
+
+        # Rows with no horse or no date can never match an as-of query
+        keep = (codes >= 0) & ~np.isnat(dates)
+        codes = codes[keep]
+        dates = dates[keep]
+
+        order = np.lexsort((dates, codes))
+        codes = codes[order]
+        self.dates = dates[order]
+
+        self.keys = pd.Index(uniques)
+        self.offsets = np.searchsorted(codes, np.arange(len(self.keys) + 1), side='left')
+
+        # Composite (horse, date-rank) key for as-of searchsorted
+        self._unique_dates = np.unique(self.dates)
+        date_rank = np.searchsorted(self._unique_dates, self.dates, side='left')
+        self._stride = len(self._unique_dates) + 1
+        self._composite = codes.astype(np.int64) * self._stride + date_rank
+
+        self._columns: Dict[str, np.ndarray] = {}
+        for col in columns:
+            self._columns[col] = history[col].to_numpy()[keep][order]
+
+        logger.info(
+            f"Built history index: {len(self.dates):,} runs across {len(self.keys):,} {key} keys"
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def column(self, name: str) -> np.ndarray:
+        """Sorted values of an indexed column."""
+        return self._columns[name]
+
+    def derive(self, name: str, source: str, fn) -> np.ndarray:
+        """
+        Memoized column computed from an indexed column.
+
+        Args:
+            name: Derived column name
+            source: Indexed column passed to ``fn``
+            fn: Callable mapping the source array to the derived array
+        """
+        if name not in self._columns:
+            self._columns[name] = np.asarray(fn(self._columns[source]))
+        return self._columns[name]
+
+    def window(self, keys, as_of) -> HistoryWindow:
+        """
+        Resolve the as-of window for each (key, date) query.
+
+        Args:
+            keys: Horse per query
+            as_of: Race date per query; runs strictly before it are included
+
+        Returns:
+            HistoryWindow aligned with the queries
+        """
+        codes = self.keys.get_indexer(pd.Index(keys))
+        as_of = pd.to_datetime(pd.Series(as_of)).to_numpy(dtype='datetime64[ns]')
+
+        known = (codes >= 0) & ~np.isnat(as_of)
+        safe_codes = np.where(known, codes, 0)
+
+        start = self.offsets[safe_codes]
+        cut_rank = np.searchsorted(self._unique_dates, as_of, side='left')
+        end = np.searchsorted(
+            self._composite,
+            safe_codes.astype(np.int64) * self._stride + cut_rank,
+            side='left',
+        )
+
+        start = np.where(known, start, 0)
+        end = np.where(known, end, 0)
+        return HistoryWindow(self, start.astype(np.int64), end.astype(np.int64))
@@ -0,0 +1,283 @@
+"""
+VÉLØ v10.2 - Set-Based Feature Kernels for v1.1 Builders
+=========================================================
+
+Shared, set-based implementations of the per-row SQLite lookups in
+FeatureBuilderV11 and FeatureArmoryV11.
+
+The row-wise builders issue one query per trainer, jockey, horse or
+runner. Here the relevant slice of racing_data is pulled once (keys are
+staged in TEMP tables and joined), sorted into a HistoryIndex per entity,
+and every feature family is resolved point-in-time for each runner's own
+race date with searchsorted + prefix sums.
+
+Usage:
+    ensure_racing_indexes(conn)
+    history = load_entity_history(conn, df)
+
+    trainer = WindowCounter(history[history['finished']], 'trainer')
+    runs, wins = trainer.between(df['trainer'], dates - pd.Timedelta(days=14), dates)
+
+Author: VÉLØ Oracle Team
+Version: 10.2.0
+"""
+
+import sqlite3
+import logging
+from typing import Dict, Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+from .history_index import HistoryIndex
+
+logger = logging.getLogger(__name__)
+
+
+# Non-finishing positions excluded by the v1.1 SQL filters
+DNF_POSITIONS = ('PU', 'F', 'U', 'BD', 'RO', 'SU', 'UR')
+
+# Supporting indexes for the set-based queries (and the legacy per-row ones)
+RACING_DATA_INDEXES = {
+    'idx_racing_data_trainer_date': '(trainer, date)',
+    'idx_racing_data_jockey_date': '(jockey, date)',
+    'idx_racing_data_horse_date': '(horse, date)',
+    'idx_racing_data_trainer_jockey_date': '(trainer, jockey, date)',
+    'idx_racing_data_course_going': '(course, going)',
+    'idx_racing_data_course_draw': '(course, draw)',
+}
+
+ENTITY_KEYS = ('trainer', 'jockey', 'horse')
+
+
+def ensure_racing_indexes(conn: sqlite3.Connection):
+    """Create the racing_data indexes used by set-based builds (idempotent)."""
+    try:
+        for name, columns in RACING_DATA_INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON racing_data {columns}")
+        conn.commit()
+    except sqlite3.OperationalError as e:
+        # Read-only databases still work, just without the index speedup
+        logger.warning(f"Could not create racing_data indexes: {e}")
+
+
+def _valid_keys(values: Iterable) -> list:
+    return [v for v in pd.unique(pd.Series(values)) if not pd.isna(v) and v != '']
+
+
+def stage_keys(conn: sqlite3.Connection, name: str, values: Iterable):
+    """Load distinct key values into a TEMP table for set-based joins."""
+    table = f"_v11_keys_{name}"
+    conn.execute(f"DROP TABLE IF EXISTS temp.{table}")
+    conn.execute(f"CREATE TEMP TABLE {table} (value PRIMARY KEY)")
+    conn.executemany(
+        f"INSERT OR IGNORE INTO temp.{table} (value) VALUES (?)",
+        ((v.item() if isinstance(v, np.generic) else v,) for v in _valid_keys(values))
+    )
+    return f"temp.{table}"
+
+
+def load_entity_history(conn: sqlite3.Connection, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Load every racing_data run of the trainers, jockeys and horses in df.
+
+    One query; the key sets are staged in TEMP tables. Adds parsed columns:
+    finished (passes the DNF filter), won (pos = '1'), pos_n/ran_n (integer
+    parses, NaN where the legacy int() would fail) and finish_pct.
+    """
+    staged = {key: stage_keys(conn, key, df[key]) for key in ENTITY_KEYS if key in df.columns}
+
+    query = "SELECT trainer, jockey, horse, date, pos, ran, class FROM racing_data"
+    if staged:
+        query += " WHERE " + " OR ".join(
+            f"{key} IN (SELECT value FROM {table})" for key, table in staged.items()
+        )
+
+    history = pd.read_sql_query(query, conn)
+    history['finished'] = history['pos'].notna() & ~history['pos'].astype(str).isin(DNF_POSITIONS)
+    history['won'] = is_win(history['pos'])
+    history['pos_n'] = parse_int(history['pos'])
+    history['ran_n'] = parse_int(history['ran'])
+    history['finish_pct'] = finish_percentile(history['pos_n'], history['ran'], history['ran_n'])
+    history['trainer_jockey'] = combo_key(history['trainer'], history['jockey'])
+
+    logger.info(f"  Loaded {len(history):,} history rows for set-based build")
+    return history
+
+
+def is_win(pos: pd.Series) -> np.ndarray:
+    """pos = '1' with SQLite comparison semantics for text and numeric values."""
+    text = pos.map(lambda v: isinstance(v, str))
+    numeric = pd.to_numeric(pos.where(~text), errors='coerce')
+    return np.where(text, pos.astype(str) == '1', numeric == 1)
+
+
+def parse_int(values: pd.Series) -> np.ndarray:
+    """Vectorized int() of DB values; NaN where int() would raise."""
+    text = values.map(lambda v: isinstance(v, str))
+    as_text = values.where(text).astype(str).str.strip()
+    text_ok = as_text.str.fullmatch(r'[+-]?\d+').fillna(False).astype(bool)
+    parsed = pd.to_numeric(as_text.where(text_ok), errors='coerce')
+
+    numeric = pd.to_numeric(values.where(~text), errors='coerce')
+    return np.where(text, parsed, np.trunc(numeric)).astype(float)
+
+
+def finish_percentile(pos_n, ran: pd.Series, ran_n) -> np.ndarray:
+    """
+    (pos - 1) / max(ran - 1, 1), with the legacy `int(ran) if ran else pos`.
+
+    NaN where the legacy loop skips the run (unparseable pos or ran).
+    """
+    text = ran.map(lambda v: isinstance(v, str))
+    blank = ran.isna() | (text & (ran.astype(str) == '')) | (~text & (pd.to_numeric(ran.where(~text), errors='coerce') == 0))
+    field = np.where(blank, pos_n, ran_n)
+    return (np.asarray(pos_n) - 1) / np.maximum(field - 1, 1)
+
+
+def parse_class(values: pd.Series) -> np.ndarray:
+    """Vectorized _parse_class: first integer in the class string, 99 if none."""
+    missing = values.isna() | (values.astype(str) == '')
+    digits = values.astype(str).str.extract(r'(\d+)', expand=False)
+    parsed = pd.to_numeric(digits, errors='coerce').fillna(99)
+    return np.where(missing, 99, parsed).astype(int)
+
+
+def combo_key(trainer: pd.Series, jockey: pd.Series) -> pd.Series:
+    """Trainer×jockey key (NaN when either side is missing or blank)."""
+    valid = trainer.notna() & jockey.notna() & (trainer != '') & (jockey != '')
+    return (trainer.astype(str) + '|' + jockey.astype(str)).where(valid)
+
+
+def blank_mask(values: pd.Series) -> np.ndarray:
+    """Rows the legacy lookups short-circuit (NaN or empty key)."""
+    return (values.isna() | (values == '')).to_numpy()
+
+
+class WindowCounter:
+    """
+    Runs/wins per entity over point-in-time [start, end) date ranges.
+
+    Built on a HistoryIndex keyed by the entity; a prefix sum over the
+    sorted win flags makes each range count two searchsorted lookups.
+    """
+
+    def __init__(self, history: pd.DataFrame, key: str):
+        self.index = HistoryIndex(history, key=key, columns=['won'])
+        won = self.index.column('won').astype(np.int64)
+        self._cum_wins = np.concatenate([[0], np.cumsum(won)])
+
+    def between(self, keys, start, end) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count runs and wins with start <= date < end per query.
+
+        Args:
+            keys: Entity per query
+            start: Range start per query, or None for "since records began"
+            end: Exclusive range end per query
+
+        Returns:
+            (runs, wins) arrays aligned with the queries
+        """
+        keys = pd.Index(keys)
+        upper = self.index.window(keys, end)
+        lower = upper.start if start is None else self.index.window(keys, start).end
+        lower = np.minimum(lower, upper.end)
+
+        runs = upper.end - lower
+        wins = self._cum_wins[upper.end] - self._cum_wins[lower]
+        return runs, wins
+
+
+def eb_strike_rate(w_window, r_window, w_prior, r_prior, prior_weight: float = 0.1) -> np.ndarray:
+    """Window strike rate shrunk toward the prior (prior counts at 10% weight)."""
+    total_w = w_window + w_prior * prior_weight
+    total_r = r_window + r_prior * prior_weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total_r > 0, total_w / np.where(total_r > 0, total_r, 1.0), 0.0)
+
+
+def last_runs(history: pd.DataFrame, df: pd.DataFrame, columns, n: int = 5) -> Dict[str, np.ndarray]:
+    """
+    Last n runs of each runner's horse before its race date.
+
+    Returns:
+        Dict of (len(df), n) arrays per column (most recent first, NaN
+        fill), plus 'present' marking slots that hold a real run
+    """
+    index = HistoryIndex(history, key='horse', columns=list(columns))
+    window = index.window(df['horse'], df['date'])
+
+    runs = {col: window.last_n(col, n) for col in columns}
+    runs['present'] = window.last_n_mask(n)
+    return runs
+
+
+def compact_valid(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Shift non-NaN values left per row, keeping order; returns (values, count)."""
+    invalid = np.isnan(values)
+    order = np.argsort(invalid, axis=1, kind='stable')
+    return np.take_along_axis(values, order, axis=1), (~invalid).sum(axis=1)
+
+
+def sequential_ewma(values: np.ndarray, counts: np.ndarray, weight_fn, empty: float) -> np.ndarray:
+    """
+    Vectorized form of the legacy EWMA loop over compacted values.
+
+    weight_fn(i) gives the weight of the i-th (1-based) older value.
+    """
+    ewma = np.where(counts > 0, values[:, 0], empty)
+    for i in range(1, values.shape[1]):
+        weight = weight_fn(i)
+        ewma = np.where(i < counts, weight * values[:, i] + (1 - weight) * ewma, ewma)
+    return ewma
+
+
+def trend_slope(values: np.ndarray, counts: np.ndarray, min_runs: int = 3) -> np.ndarray:
+    """Least-squares slope of compacted values against 0..k-1 (0 if k < min_runs)."""
+    k = counts.astype(float)
+    x = np.arange(values.shape[1], dtype=float)[None, :]
+    mask = x < k[:, None]
+    y = np.where(mask, values, 0.0)
+    xm = np.where(mask, x, 0.0)
+
+    sx, sy = xm.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (xm * xm).sum(axis=1), (xm * y).sum(axis=1)
+    denom = k * sxx - sx * sx
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (k * sxy - sx * sy) / denom
+    return np.where(counts >= min_runs, slope, 0.0)
+
+
+def masked_variance(values: np.ndarray, counts: np.ndarray, min_runs: int = 2) -> np.ndarray:
+    """Population variance of compacted values (0 if k < min_runs)."""
+    mask = np.arange(values.shape[1])[None, :] < counts[:, None]
+    safe = np.where(counts >= 1, counts, 1)
+    mean = np.where(mask, values, 0.0).sum(axis=1) / safe
+    var = np.where(mask, (values - mean[:, None]) ** 2, 0.0).sum(axis=1) / safe
+    return np.where(counts >= min_runs, var, 0.0)
+
+
+def previous_run(history: pd.DataFrame, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Most recent run before each race date (any finishing status).
+
+    Returns:
+        (has_run, last_date, last_class) aligned with df
+    """
+    index = HistoryIndex(history, key='horse', columns=['class'])
+    window = index.window(df['horse'], df['date'])
+
+    has_run = window.has_history
+    last = np.where(has_run, window.end - 1, 0)
+    last_date = index.dates[last] if len(index) else np.full(len(df), np.datetime64('NaT'))
+    last_class = index.column('class')[last] if len(index) else np.full(len(df), None)
+    return has_run, last_date, last_class
+
+
+def layoff_days(history: pd.DataFrame, df: pd.DataFrame) -> np.ndarray:
+    """Days since the horse's previous run (999 if none or horse missing)."""
+    has_run, last_date, _ = previous_run(history, df)
+    dates = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+    days = (dates - last_date).astype('timedelta64[D]').astype(np.int64)
+    return np.where(has_run & ~blank_mask(df['horse']), days, 999)
@@ -13,9 +13,11 @@ Author: VÉLØ Oracle Team
 Version: 1.0
 """
 
+from __future__ import annotations
+
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Any, Dict, List, Mapping, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
@@ -33,6 +35,26 @@ class BetRecommendation(Enum):
     STRONG_FADE = "strong_fade"       # 3 modules agree, fade this horse
 
 
+# Vote codes for the columnar path (evaluate_columns)
+VOTE_ABSTAIN = 0
+VOTE_BACK = 1
+VOTE_FADE = -1
+
+# Module outputs for evaluate_columns: a DataFrame or mapping of aligned
+# arrays named like the signal dataclass fields
+ModuleOutputs = Mapping[str, Any]
+
+
+def _field(outputs: ModuleOutputs, name: str) -> np.ndarray:
+    """One module output field as an array"""
+    return np.asarray(outputs[name])
+
+
+def _enum_values(values: Any) -> np.ndarray:
+    """Enum members (or their values) as an array of values"""
+    return np.array([getattr(v, 'value', v) for v in np.asarray(values, dtype=object)], dtype=object)
+
+
 @dataclass
 class IntelligenceSignal:
     """Combined intelligence analysis for a single runner"""
@@ -234,6 +256,203 @@ class IntelligenceOrchestrator:
         
         return np.clip(conviction, 0, 1)
     
+    # -------------------------------------------------------------------------
+    # Columnar evaluation
+    # -------------------------------------------------------------------------
+    
+    def sqpe_votes(self, sqpe: ModuleOutputs) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        evaluate_sqpe_vote for aligned SQPE outputs
+        
+        Args:
+            sqpe: signal_strength, edge, sqpe_score and confidence, e.g. the
+                SQPEEngine.analyze_races result
+        
+        Returns:
+            (vote codes, vote confidences)
+        """
+        strong = _enum_values(_field(sqpe, 'signal_strength')) == SignalStrength.STRONG.value
+        with np.errstate(invalid='ignore'):
+            back = (
+                strong
+                & (_field(sqpe, 'edge') > 0)
+                & (_field(sqpe, 'sqpe_score') >= self.sqpe_threshold)
+            )
+        return self._votes(back, np.zeros_like(back), _field(sqpe, 'confidence'))
+    
+    def tie_votes(self, tie: ModuleOutputs) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        evaluate_tie_vote for aligned TIE outputs
+        
+        Args:
+            tie: intent (TrainerIntent members or their values), tie_score
+                and confidence
+        
+        Returns:
+            (vote codes, vote confidences)
+        """
+        intent = _enum_values(_field(tie, 'intent'))
+        with np.errstate(invalid='ignore'):
+            back = (intent == 'win_today') | (
+                (intent == 'placed_to_win') & (_field(tie, 'tie_score') >= self.tie_threshold)
+            )
+        fade = (intent == 'experience') | (intent == 'deceive')
+        return self._votes(back, fade, _field(tie, 'confidence'))
+    
+    def nds_votes(self, nds: ModuleOutputs) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        evaluate_nds_vote for aligned NDS outputs
+        
+        Args:
+            nds: is_fade_opportunity, is_back_opportunity, nds_score and
+                confidence
+        
+        Returns:
+            (vote codes, vote confidences)
+        """
+        with np.errstate(invalid='ignore'):
+            fade = (
+                _field(nds, 'is_fade_opportunity').astype(bool)
+                & (_field(nds, 'nds_score') >= self.nds_threshold)
+            )
+        back = ~fade & _field(nds, 'is_back_opportunity').astype(bool)
+        return self._votes(back, fade, _field(nds, 'confidence'))
+    
+    @staticmethod
+    def _votes(
+        back: np.ndarray,
+        fade: np.ndarray,
+        confidence: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Vote codes from back/fade masks (back wins); abstain has 0.0 confidence"""
+        votes = np.select([back, fade], [VOTE_BACK, VOTE_FADE], default=VOTE_ABSTAIN).astype(np.int8)
+        return votes, np.where(votes != VOTE_ABSTAIN, confidence.astype(float), 0.0)
+    
+    def agreement_columns(
+        self,
+        votes: np.ndarray,
+        confidences: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        calculate_agreement for many runners
+        
+        Args:
+            votes: (n_runners, n_modules) vote codes, modules in vote order
+            confidences: (n_runners, n_modules) vote confidences
+        
+        Returns:
+            (back_count, fade_count, agreement_score) arrays
+        """
+        back_count = (votes == VOTE_BACK).sum(axis=1)
+        fade_count = (votes == VOTE_FADE).sum(axis=1)
+        
+        aligned = np.where(
+            back_count >= fade_count, VOTE_BACK, VOTE_FADE
+        )[:, None] == votes
+        
+        # Accumulate module by module, as the scalar loop does
+        total_confidence = np.zeros(len(votes))
+        aligned_confidence = np.zeros(len(votes))
+        for module in range(votes.shape[1]):
+            voted = votes[:, module] != VOTE_ABSTAIN
+            total_confidence = np.where(voted, total_confidence + confidences[:, module], total_confidence)
+            aligned_confidence = np.where(
+                voted & aligned[:, module],
+                aligned_confidence + confidences[:, module],
+                aligned_confidence
+            )
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            agreement_score = np.where(
+                total_confidence > 0, aligned_confidence / total_confidence, 0.0
+            )
+        
+        return back_count, fade_count, agreement_score
+    
+    def recommendation_columns(
+        self,
+        back_count: np.ndarray,
+        fade_count: np.ndarray
+    ) -> np.ndarray:
+        """make_recommendation for many runners, as BetRecommendation values"""
+        return np.select(
+            [
+                back_count >= 3,
+                back_count >= self.min_modules_required,
+                fade_count >= 3,
+                fade_count >= self.min_modules_required,
+            ],
+            [
+                BetRecommendation.STRONG_BACK.value,
+                BetRecommendation.MODERATE_BACK.value,
+                BetRecommendation.STRONG_FADE.value,
+                BetRecommendation.MODERATE_FADE.value,
+            ],
+            default=BetRecommendation.HOLD.value
+        )
+    
+    def conviction_columns(
+        self,
+        recommendation: np.ndarray,
+        agreement_score: np.ndarray,
+        back_count: np.ndarray,
+        fade_count: np.ndarray
+    ) -> np.ndarray:
+        """calculate_conviction for many runners"""
+        unanimous = (back_count == 3) | (fade_count == 3)
+        conviction = np.clip(
+            np.where(unanimous, agreement_score * 1.2, agreement_score), 0, 1
+        )
+        return np.where(recommendation == BetRecommendation.HOLD.value, 0.0, conviction)
+    
+    def evaluate_columns(
+        self,
+        sqpe: ModuleOutputs,
+        tie: ModuleOutputs,
+        nds: ModuleOutputs
+    ) -> pd.DataFrame:
+        """
+        Dual-signal evaluation over aligned module outputs
+        
+        Columnar equivalent of the vote / agreement / recommendation /
+        conviction steps of analyze_runner, for any number of runners
+        across any number of races. Values match the scalar methods
+        exactly; no signal objects or reasoning strings are built.
+        
+        Args:
+            sqpe: SQPE outputs (see sqpe_votes)
+            tie: TIE outputs (see tie_votes)
+            nds: NDS outputs (see nds_votes)
+        
+        Returns:
+            DataFrame with one row per runner, in input order:
+            sqpe_vote, tie_vote, nds_vote (VOTE_* codes),
+            modules_agree_back, modules_agree_fade, agreement_score,
+            recommendation (BetRecommendation values) and conviction
+        """
+        module_votes = [self.sqpe_votes(sqpe), self.tie_votes(tie), self.nds_votes(nds)]
+        n = len(module_votes[0][0])
+        votes = np.column_stack([v for v, _ in module_votes]).reshape(n, 3)
+        confidences = np.column_stack([c for _, c in module_votes]).reshape(n, 3)
+        
+        back_count, fade_count, agreement_score = self.agreement_columns(votes, confidences)
+        recommendation = self.recommendation_columns(back_count, fade_count)
+        conviction = self.conviction_columns(recommendation, agreement_score, back_count, fade_count)
+        
+        index = sqpe.index if isinstance(sqpe, pd.DataFrame) else None
+        return pd.DataFrame({
+            'sqpe_vote': votes[:, 0],
+            'tie_vote': votes[:, 1],
+            'nds_vote': votes[:, 2],
+            'modules_agree_back': back_count,
+            'modules_agree_fade': fade_count,
+            'agreement_score': agreement_score,
+            'recommendation': pd.Categorical(
+                recommendation, categories=[r.value for r in BetRecommendation]
+            ),
+            'conviction': conviction,
+        }, index=index)
+    
     def analyze_runner(
         self,
         runner: pd.Series,
@@ -20,7 +20,7 @@ from __future__ import annotations
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Iterable
+from typing import Any, Dict, List, Mapping, Tuple, Optional, Iterable, Union
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -119,6 +119,18 @@ class SQPESignal:
     is_longshot: bool         # odds > 10.0
 
 
+# Columns of the analyze_races result frame, in order
+SIGNAL_COLUMNS = [
+    'race', 'row', 'p_benter', 'p_public', 'edge',
+    'rating_signal', 'form_signal', 'class_signal', 'market_signal',
+    'convergence_score', 'signal_strength', 'sqpe_score', 'confidence',
+    'odds', 'is_longshot',
+]
+
+# Probabilities for analyze_races: per runner_id mapping or row-aligned values
+Probabilities = Union[Mapping[str, float], Iterable[float]]
+
+
 # ============================================================================
 # ML Core Engine
 # ============================================================================
@@ -276,6 +288,7 @@ class SQPEEngine:
         - predict_proba(X): Get calibrated win probabilities
         - analyze_runner(runner, p_benter, p_public): Signal analysis
         - analyze_race(runners, p_dict, p_public_dict): Full race analysis
+        - analyze_races(runners, p_benter, p_public): Batched analysis of many races
         - save(directory): Persist model
         - load(directory): Load model
     """
@@ -484,19 +497,253 @@ class SQPEEngine:
         Returns:
             List of SQPESignal objects, sorted by sqpe_score (descending)
         """
-        signals = []
-        
-        for idx, runner in runners.iterrows():
-            runner_id = f"{runner.get('date')}_{runner.get('course')}_{runner.get('num')}"
-            p_benter = p_benter_dict.get(runner_id, 0.0)
-            p_public = p_public_dict.get(runner_id, 0.0)
-            
-            signal = self.analyze_runner(runner, p_benter, p_public)
-            signals.append(signal)
-        
-        signals.sort(key=lambda x: x.sqpe_score, reverse=True)
-        return signals
+        results = self.analyze_races(runners, p_benter_dict, p_public_dict, race_key=None)
+        return self.build_signals(results, runners)
     
+    # -------------------------------------------------------------------------
+    # Batched Signal Analysis
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _numeric(runners: pd.DataFrame, column: str) -> np.ndarray:
+        """Column as floats; absent columns and unparseable values are NaN."""
+        if column not in runners.columns:
+            return np.full(len(runners), np.nan)
+        return pd.to_numeric(runners[column], errors='coerce').to_numpy(dtype=float)
+
+    @staticmethod
+    def _runner_ids(runners: pd.DataFrame) -> List[str]:
+        """runner_id strings as analyze_runner formats them."""
+        parts = [
+            runners[column].tolist() if column in runners.columns else [None] * len(runners)
+            for column in ('date', 'course', 'num')
+        ]
+        return [f"{date}_{course}_{num}" for date, course, num in zip(*parts)]
+
+    def _probabilities(
+        self,
+        values: Probabilities,
+        runner_ids: Optional[List[str]],
+        n: int
+    ) -> np.ndarray:
+        """Row-aligned probabilities from a runner_id mapping or a sequence."""
+        if isinstance(values, Mapping):
+            return np.array([values.get(runner_id, 0.0) for runner_id in runner_ids], dtype=float)
+        values = np.asarray(values, dtype=float)
+        if values.shape != (n,):
+            raise ValueError(f"Expected {n} probabilities, got shape {values.shape}")
+        return values
+
+    def rating_signals(self, runners: pd.DataFrame) -> np.ndarray:
+        """calculate_rating_signal for every row."""
+        ratings = np.column_stack([
+            self._numeric(runners, column) for column in ('or_int', 'rpr_int', 'ts_int')
+        ])
+        present = ~np.isnan(ratings)
+        count = present.sum(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_rating = np.where(present, ratings, 0.0).sum(axis=1) / count
+            deviation = np.where(present, ratings - avg_rating[:, None], 0.0)
+            std = np.sqrt((deviation * deviation).sum(axis=1) / count)
+
+        normalized = np.clip(avg_rating / 140.0, 0, 1)
+        consistency = 1.0 - np.clip(std / 20.0, 0, 1)
+        normalized = np.where(count > 1, normalized * (1.0 + 0.2 * consistency), normalized)
+        return np.where(count > 0, np.clip(normalized, 0, 1), 0.0)
+
+    def form_signals(self, runners: pd.DataFrame) -> np.ndarray:
+        """calculate_form_signal for every row."""
+        with np.errstate(invalid='ignore'):
+            placed = self._numeric(runners, 'pos_int') <= 3
+        return np.where(placed, 0.7, 0.3)
+
+    def class_signals(self, runners: pd.DataFrame) -> np.ndarray:
+        """calculate_class_signal for every row."""
+        if 'class' not in runners.columns:
+            return np.full(len(runners), 0.5)
+
+        values = runners['class']
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            class_val = values.to_numpy(dtype=float)
+            valid = np.isfinite(class_val)
+            class_val = np.trunc(np.where(valid, class_val, 0.0))
+        else:
+            # int() semantics per distinct value ("3" parses, "3.0" does not)
+            codes, uniques = pd.factorize(values)
+            # Trailing NaN slot: missing values have code -1
+            parsed = np.full(len(uniques) + 1, np.nan)
+            for i, value in enumerate(uniques):
+                try:
+                    parsed[i] = int(value)
+                except Exception:
+                    pass
+            class_val = parsed[codes]
+            valid = ~np.isnan(class_val)
+            class_val = np.where(valid, class_val, 0.0)
+
+        return np.where(valid, np.clip((8 - class_val) / 7.0, 0, 1), 0.5)
+
+    def market_signals(self, runners: pd.DataFrame) -> np.ndarray:
+        """calculate_market_signal for every row (zero odds count as 1.0)."""
+        sp_decimal = self._numeric(runners, 'sp_decimal')
+        with np.errstate(divide='ignore'):
+            p_market = 1.0 / sp_decimal
+        return np.where(np.isnan(sp_decimal), 0.0, np.clip(p_market * 2.0, 0, 1))
+
+    def analyze_races(
+        self,
+        runners: pd.DataFrame,
+        p_benter: Probabilities,
+        p_public: Probabilities,
+        race_key: Optional[str] = 'race_id'
+    ) -> pd.DataFrame:
+        """
+        Analyze every runner of many races at once.
+
+        Column-wise equivalent of analyze_race over a multi-race frame;
+        values match analyze_runner exactly. No SQPESignal objects are
+        built; use build_signals / top_signals on the result.
+
+        Args:
+            runners: DataFrame of runners, any number of races
+            p_benter: ML probabilities, by runner_id or aligned with rows
+            p_public: Public probabilities, by runner_id or aligned with rows
+            race_key: Column identifying the race (None or absent: one race)
+
+        Returns:
+            DataFrame with SIGNAL_COLUMNS, on the runners index. 'row' is the
+            runner's position in runners; races keep first-seen order and
+            runners within a race are sorted by sqpe_score (descending).
+        """
+        n = len(runners)
+        runner_ids = None
+        if isinstance(p_benter, Mapping) or isinstance(p_public, Mapping):
+            runner_ids = self._runner_ids(runners)
+        p_benter = self._probabilities(p_benter, runner_ids, n)
+        p_public = self._probabilities(p_public, runner_ids, n)
+
+        signals = np.column_stack([
+            self.rating_signals(runners),
+            self.form_signals(runners),
+            self.class_signals(runners),
+            self.market_signals(runners),
+        ]).reshape(n, 4)
+        convergence = 1.0 - np.clip(np.std(signals, axis=1), 0, 1)
+        confidence = np.mean(signals, axis=1)
+
+        edge = p_benter - p_public
+        odds = self._numeric(runners, 'sp_decimal') if 'sp_decimal' in runners.columns else np.zeros(n)
+        with np.errstate(invalid='ignore'):
+            is_longshot = odds > self.config.longshot_threshold
+
+        strength = np.select(
+            [
+                (convergence >= self.config.convergence_threshold) & (confidence >= self.config.min_confidence),
+                (convergence >= 0.4) & (confidence >= 0.3),
+                convergence >= 0.2,
+            ],
+            [SignalStrength.STRONG.value, SignalStrength.MODERATE.value, SignalStrength.WEAK.value],
+            default=SignalStrength.NOISE.value,
+        )
+        sqpe_score = edge * convergence * confidence
+        sqpe_score = np.where(is_longshot, sqpe_score * 0.7, sqpe_score)
+
+        if race_key is not None and race_key in runners.columns:
+            race = runners[race_key].to_numpy()
+            race_codes, _ = pd.factorize(race, use_na_sentinel=False)
+        else:
+            race_codes = np.zeros(n, dtype=np.intp)
+            race = np.zeros(n, dtype=np.intp)
+
+        # Stable, so equal scores keep input order as list.sort does
+        order = np.lexsort((-sqpe_score, race_codes))
+
+        results = pd.DataFrame({
+            'race': race,
+            'row': np.arange(n),
+            'p_benter': p_benter,
+            'p_public': p_public,
+            'edge': edge,
+            'rating_signal': signals[:, 0],
+            'form_signal': signals[:, 1],
+            'class_signal': signals[:, 2],
+            'market_signal': signals[:, 3],
+            'convergence_score': convergence,
+            'signal_strength': pd.Categorical(
+                strength, categories=[s.value for s in SignalStrength]
+            ),
+            'sqpe_score': sqpe_score,
+            'confidence': confidence,
+            'odds': odds,
+            'is_longshot': is_longshot,
+        }, index=runners.index, columns=SIGNAL_COLUMNS)
+        return results.iloc[order]
+
+    def build_signals(self, results: pd.DataFrame, runners: pd.DataFrame) -> List[SQPESignal]:
+        """
+        Materialize SQPESignal objects for rows of an analyze_races result.
+
+        Args:
+            results: analyze_races output, or any subset of its rows
+            runners: The DataFrame passed to analyze_races
+
+        Returns:
+            One SQPESignal per results row, in results order
+        """
+        selected = runners.iloc[results['row'].to_numpy()]
+        runner_ids = self._runner_ids(selected)
+        horses = selected['horse'].tolist() if 'horse' in selected.columns else ['Unknown'] * len(selected)
+
+        return [
+            SQPESignal(
+                runner_id=runner_id,
+                horse_name=horse,
+                p_benter=row.p_benter,
+                p_public=row.p_public,
+                edge=row.edge,
+                rating_signal=row.rating_signal,
+                form_signal=row.form_signal,
+                class_signal=row.class_signal,
+                market_signal=row.market_signal,
+                convergence_score=row.convergence_score,
+                signal_strength=SignalStrength(row.signal_strength),
+                sqpe_score=row.sqpe_score,
+                confidence=row.confidence,
+                odds=row.odds,
+                is_longshot=bool(row.is_longshot)
+            )
+            for runner_id, horse, row in zip(runner_ids, horses, results.itertuples(index=False))
+        ]
+
+    def top_signals(
+        self,
+        results: pd.DataFrame,
+        runners: pd.DataFrame,
+        top_n: int = 3,
+        strong_only: bool = False
+    ) -> Dict[Any, List[SQPESignal]]:
+        """
+        Top N SQPESignal objects per race from an analyze_races result.
+
+        Args:
+            results: analyze_races output
+            runners: The DataFrame passed to analyze_races
+            top_n: Opportunities per race
+            strong_only: Keep only STRONG signals before taking the top N
+
+        Returns:
+            Dict mapping race to its top signals (sqpe_score descending)
+        """
+        if strong_only:
+            results = results[results['signal_strength'] == SignalStrength.STRONG.value]
+        top = results.groupby('race', sort=False, observed=True, dropna=False).head(top_n)
+
+        signals: Dict[Any, List[SQPESignal]] = {}
+        for race, signal in zip(top['race'].tolist(), self.build_signals(top, runners)):
+            signals.setdefault(race, []).append(signal)
+        return signals
+
     def filter_strong_signals(self, signals: List[SQPESignal]) -> List[SQPESignal]:
         """Filter to only strong signals."""
         return [s for s in signals if s.signal_strength == SignalStrength.STRONG]
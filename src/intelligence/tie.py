@@ -150,7 +150,7 @@ class TrainerIntentEngine:
         df[date_col] = pd.to_datetime(df[date_col])
 
         # Overall stats
-        grp = df.groupby(trainer_col)
+        grp = df.groupby(trainer_col, observed=True)
         overall = grp[won_col].agg(["count", "mean"]).rename(
             columns={"count": "trainer_runs", "mean": "trainer_win_rate"}
         )
@@ -160,7 +160,7 @@ class TrainerIntentEngine:
         cutoff = max_date - pd.Timedelta(days=90)
         recent = (
             df[df[date_col] >= cutoff]
-            .groupby(trainer_col)[won_col]
+            .groupby(trainer_col, observed=True)[won_col]
             .agg(["count", "mean"])
             .rename(
                 columns={
@@ -6,9 +6,13 @@ Production betting models and algorithms
 from .benter import BenterModel
 from .kelly import KellyCriterion
 from .overlay import OverlaySelector
+from .conditional_logit import RaceSegments, ConditionalLogit, grid_log_loss
 
 __all__ = [
     'BenterModel',
     'KellyCriterion',
     'OverlaySelector',
+    'RaceSegments',
+    'ConditionalLogit',
+    'grid_log_loss',
 ]
@@ -21,6 +21,7 @@ import logging
 
 from ..modules.contracts import Runner, Racecard, Odds
 from ..core.settings import settings
+from .conditional_logit import RaceSegments, grid_log_loss, best_on_grid
 
 logger = logging.getLogger("velo.benter")
 
@@ -224,39 +225,22 @@ class BenterModel:
         """
         logger.info(f"Calibrating Benter model on {len(historical_races)} races")
         
-        best_alpha = self.alpha
-        best_beta = self.beta
-        best_loss = float('inf')
+        # Fundamental/public probabilities don't depend on α, β: compute once
+        segments, p_fundamental, p_public, winners = self._pack_races(historical_races)
+        
+        if segments is None or not winners.any():
+            logger.warning("No scorable races; keeping current weights")
+            return self.alpha, self.beta
         
         alphas = np.linspace(alpha_range[0], alpha_range[1], steps)
         betas = np.linspace(beta_range[0], beta_range[1], steps)
         
-        for alpha in alphas:
-            for beta in betas:
-                # Temporarily set weights
-                self.alpha = alpha
-                self.beta = beta
-                
-                # Calculate log loss
-                total_loss = 0.0
-                count = 0
-                
-                for racecard, odds_book, winner in historical_races:
-                    probs = self.estimate_race(racecard, odds_book)
-                    
-                    if winner in probs:
-                        p_winner = probs[winner]
-                        # Log loss for this race
-                        loss = -np.log(max(p_winner, 1e-10))
-                        total_loss += loss
-                        count += 1
-                
-                avg_loss = total_loss / count if count > 0 else float('inf')
-                
-                if avg_loss < best_loss:
-                    best_loss = avg_loss
-                    best_alpha = alpha
-                    best_beta = beta
+        # Whole grid in one (blocked) broadcast over all runners
+        losses = grid_log_loss(
+            segments, p_fundamental, p_public, winners,
+            alphas, betas, loss='race', clip=True
+        )
+        best_alpha, best_beta, best_loss = best_on_grid(losses, alphas, betas)
         
         # Set best weights
         self.alpha = best_alpha
@@ -265,4 +249,43 @@ class BenterModel:
         logger.info(f"Calibration complete: α={best_alpha:.2f}, β={best_beta:.2f}, loss={best_loss:.4f}")
         
         return best_alpha, best_beta
-
+    
+    def _pack_races(
+        self,
+        historical_races: List[Tuple[Racecard, Dict[str, Odds], str]]
+    ) -> Tuple[Optional[RaceSegments], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Flatten historical races into per-runner arrays with race offsets
+        
+        Runners without odds are dropped (as in estimate_race), as are
+        races left with no priced runners.
+        
+        Returns:
+            (segments, p_fundamental, p_public, winners)
+        """
+        p_fundamental, p_public, winners, sizes = [], [], [], []
+        
+        for racecard, odds_book, winner in historical_races:
+            size = 0
+            for runner in racecard.runners:
+                odds = odds_book.get(runner.name)
+                if not odds:
+                    continue
+                
+                p_fundamental.append(self.estimate_fundamental(runner, racecard))
+                p_public.append(self.estimate_public(odds))
+                winners.append(runner.name == winner)
+                size += 1
+            
+            if size:
+                sizes.append(size)
+        
+        if not sizes:
+            return None, np.empty(0), np.empty(0), np.empty(0, dtype=bool)
+        
+        return (
+            RaceSegments.from_sizes(sizes),
+            np.asarray(p_fundamental, dtype=float),
+            np.asarray(p_public, dtype=float),
+            np.asarray(winners, dtype=bool),
+        )
@@ -0,0 +1,379 @@
+"""
+VÉLØ v10 - Segment-Based Conditional Logit Engine
+Flat-array race representation for Benter calibration at scale
+
+Runners from many races are packed into flat arrays with race offsets
+(CSR layout). Per-race reductions (sums, maxima, softmax, winner lookup)
+are single np.add.reduceat / np.maximum.reduceat calls, so calibrating
+over 100k+ races is a handful of array passes instead of a Python loop
+per race per grid point.
+
+Provides:
+- RaceSegments: race offsets + segment ops (sum, max, softmax, normalize)
+- grid_log_loss: α/β grid for the linear Benter blend in one broadcast
+- ConditionalLogit: p ∝ exp(θ·x) per race, fit by Newton steps on
+  segment-reduced gradients/Hessians (Benter's second-stage model)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger("velo.conditional_logit")
+
+# Max elements per (grid × runners) block evaluated at once
+GRID_BLOCK_ELEMENTS = 1 << 22
+
+
+class RaceSegments:
+    """
+    Race boundaries over a flat array of runners
+
+    Runner arrays passed to the segment ops are in the caller's order;
+    if runners of a race are not contiguous they are packed/unpacked
+    internally with a stable permutation.
+    """
+
+    def __init__(self, offsets: np.ndarray, order: Optional[np.ndarray] = None):
+        """
+        Args:
+            offsets: Race start positions in packed order, plus total length
+            order: Packed position → caller position (None if contiguous)
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.sizes = np.diff(self.offsets)
+        if np.any(self.sizes <= 0):
+            raise ValueError("Every race segment must contain at least one runner")
+
+        self.order = order
+        self._inverse = None
+        if order is not None:
+            self._inverse = np.empty_like(order)
+            self._inverse[order] = np.arange(len(order))
+
+        # Race index of each packed runner
+        self.owner = np.repeat(np.arange(self.n_races), self.sizes)
+
+    @classmethod
+    def from_sizes(cls, sizes: Sequence[int]) -> "RaceSegments":
+        """Segments for contiguous races of the given sizes"""
+        return cls(np.concatenate([[0], np.cumsum(sizes)]))
+
+    @classmethod
+    def from_keys(cls, keys: Union[pd.DataFrame, pd.Series, np.ndarray]) -> "RaceSegments":
+        """
+        Segments from per-runner race keys (e.g. df[['date', 'course', 'race_id']])
+
+        Races keep order of first appearance; runners keep their order
+        within a race.
+        """
+        if isinstance(keys, pd.DataFrame):
+            codes = keys.groupby(list(keys.columns), sort=False, dropna=False, observed=True).ngroup().to_numpy()
+        else:
+            codes, _ = pd.factorize(pd.Series(np.asarray(keys)), use_na_sentinel=False)
+
+        sizes = np.bincount(codes)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+
+        if len(codes) == 0 or np.all(codes[1:] >= codes[:-1]):
+            return cls(offsets)
+        return cls(offsets, order=np.argsort(codes, kind='stable'))
+
+    @property
+    def n_races(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def n_runners(self) -> int:
+        return int(self.offsets[-1])
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    def pack(self, values) -> np.ndarray:
+        """Caller order → packed (race-contiguous) order along the last axis"""
+        values = np.asarray(values)
+        return values if self.order is None else values[..., self.order]
+
+    def unpack(self, values: np.ndarray) -> np.ndarray:
+        """Packed order → caller order along the last axis"""
+        return values if self._inverse is None else values[..., self._inverse]
+
+    # ------------------------------------------------------------------
+    # Packed-order kernels (last axis = runners)
+    # ------------------------------------------------------------------
+
+    def sum_packed(self, packed: np.ndarray) -> np.ndarray:
+        """Per-race sum of packed values, shape (..., n_races)"""
+        return np.add.reduceat(packed, self.starts, axis=-1)
+
+    def max_packed(self, packed: np.ndarray) -> np.ndarray:
+        """Per-race maximum of packed values, shape (..., n_races)"""
+        return np.maximum.reduceat(packed, self.starts, axis=-1)
+
+    def expand(self, per_race: np.ndarray) -> np.ndarray:
+        """Per-race values broadcast to every packed runner"""
+        return per_race[..., self.owner]
+
+    def softmax_packed(self, packed: np.ndarray) -> np.ndarray:
+        """softmax() of packed scores, staying in packed order"""
+        shifted = np.exp(packed - self.expand(self.max_packed(packed)))
+        return shifted / self.expand(self.sum_packed(shifted))
+
+    def normalize_packed(self, packed: np.ndarray) -> np.ndarray:
+        """normalize() of packed values, staying in packed order"""
+        totals = self.sum_packed(packed)
+        # Races summing to zero are left unnormalized
+        return packed / self.expand(np.where(totals != 0, totals, 1.0))
+
+    # ------------------------------------------------------------------
+    # Caller-order API
+    # ------------------------------------------------------------------
+
+    def sum(self, values) -> np.ndarray:
+        """Per-race sum, shape (..., n_races)"""
+        return self.sum_packed(self.pack(np.asarray(values, dtype=float)))
+
+    def max(self, values) -> np.ndarray:
+        """Per-race maximum, shape (..., n_races)"""
+        return self.max_packed(self.pack(np.asarray(values, dtype=float)))
+
+    def softmax(self, scores) -> np.ndarray:
+        """Per-race softmax of scores (numerically stabilized)"""
+        return self.unpack(self.softmax_packed(self.pack(np.asarray(scores, dtype=float))))
+
+    def normalize(self, values) -> np.ndarray:
+        """Divide each runner by its race total"""
+        return self.unpack(self.normalize_packed(self.pack(np.asarray(values, dtype=float))))
+
+    def winner_index(self, winners) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Packed position of the (first) winner of each race that has one
+
+        Returns:
+            (races, positions) for races with at least one winner
+        """
+        flags = self.pack(np.asarray(winners, dtype=bool))
+        has_winner = np.logical_or.reduceat(flags, self.starts)
+        # First flagged runner per race: argmax over each segment
+        position = np.where(flags, np.arange(len(flags)), len(flags))
+        first = np.minimum.reduceat(position, self.starts)
+        races = np.flatnonzero(has_winner)
+        return races, first[races]
+
+
+def _grid_blocks(n_grid: int, n_runners: int, block_elements: int):
+    step = max(1, block_elements // max(n_runners, 1))
+    for start in range(0, n_grid, step):
+        yield slice(start, min(start + step, n_grid))
+
+
+def grid_log_loss(
+    segments: RaceSegments,
+    p_fundamental,
+    p_public,
+    winners,
+    alphas: Sequence[float],
+    betas: Sequence[float],
+    loss: str = 'race',
+    clip: bool = False,
+    eps: float = None,
+    block_elements: int = GRID_BLOCK_ELEMENTS
+) -> np.ndarray:
+    """
+    Log loss of the race-normalized Benter blend α·p_f + β·p_p for every (α, β)
+
+    The grid is evaluated as (grid_block × runners) broadcasts with
+    segment-reduced race totals, in blocks bounded by block_elements.
+
+    Args:
+        segments: Race segments for the runner arrays
+        p_fundamental: Fundamental probability per runner
+        p_public: Public probability per runner
+        winners: Boolean winner flag per runner
+        alphas: α grid
+        betas: β grid
+        loss: 'race' = mean -log p(winner) over races with a winner;
+              'binary' = mean per-runner binary cross-entropy
+        clip: Clip the blend to [0, 1] before normalizing (BenterModel.combine)
+        eps: Probability floor (default 1e-10 for 'race', 1e-15 for 'binary')
+        block_elements: Memory bound for each broadcast block
+
+    Returns:
+        Loss matrix of shape (len(alphas), len(betas))
+    """
+    if loss not in ('race', 'binary'):
+        raise ValueError(f"Unknown loss: {loss}")
+    if eps is None:
+        eps = 1e-10 if loss == 'race' else 1e-15
+
+    f = segments.pack(np.asarray(p_fundamental, dtype=float))
+    m = segments.pack(np.asarray(p_public, dtype=float))
+    y = segments.pack(np.asarray(winners, dtype=bool))
+
+    alphas = np.asarray(alphas, dtype=float)
+    betas = np.asarray(betas, dtype=float)
+    grid_a = np.repeat(alphas, len(betas))
+    grid_b = np.tile(betas, len(alphas))
+
+    win_races, win_pos = segments.winner_index(winners)
+    losses = np.empty(len(grid_a))
+
+    for block in _grid_blocks(len(grid_a), segments.n_runners, block_elements):
+        blend = grid_a[block, None] * f[None, :] + grid_b[block, None] * m[None, :]
+        if clip:
+            np.clip(blend, 0.0, 1.0, out=blend)
+
+        totals = segments.sum_packed(blend)
+        totals = np.where(totals != 0, totals, 1.0)
+
+        if loss == 'race':
+            if len(win_races) == 0:
+                losses[block] = np.inf
+                continue
+            p_winner = blend[:, win_pos] / totals[:, win_races]
+            losses[block] = -np.log(np.maximum(p_winner, eps)).mean(axis=1)
+        else:
+            p = np.clip(blend / totals[:, segments.owner], eps, 1 - eps)
+            losses[block] = -np.where(y, np.log(p), np.log1p(-p)).mean(axis=1)
+
+    return losses.reshape(len(alphas), len(betas))
+
+
+def best_on_grid(losses: np.ndarray, alphas, betas) -> Tuple[float, float, float]:
+    """(α, β, loss) at the first minimum of a grid_log_loss matrix (α-major)"""
+    i, j = np.unravel_index(np.argmin(losses), losses.shape)
+    return float(alphas[i]), float(betas[j]), float(losses[i, j])
+
+
+def linear_blend(p_fundamental, p_public, alphas, betas) -> np.ndarray:
+    """Un-normalized α·p_f + β·p_p for paired (α, β) values, shape (len(alphas), n)"""
+    alphas = np.asarray(alphas, dtype=float)[:, None]
+    betas = np.asarray(betas, dtype=float)[:, None]
+    return alphas * np.asarray(p_fundamental, dtype=float)[None, :] + betas * np.asarray(p_public, dtype=float)[None, :]
+
+
+class ConditionalLogit:
+    """
+    Multinomial (conditional) logit over races: p_ij ∝ exp(θ · x_ij)
+
+    With x = [log p_fundamental, log p_public] this is Benter's second
+    stage; θ = (α, β). Fit by Newton's method on the race log-likelihood,
+    whose gradient and Hessian are segment reductions:
+        ∇ = Σ_r (x_winner - E_p[x]),  H = -Σ_r Cov_p[x]
+    """
+
+    def __init__(self, l2: float = 0.0):
+        """
+        Args:
+            l2: Ridge penalty on θ (0 = plain maximum likelihood)
+        """
+        self.l2 = l2
+        self.coef_: Optional[np.ndarray] = None
+        self.n_iter_ = 0
+        self.loss_ = None
+
+    @staticmethod
+    def _as_matrix(X) -> np.ndarray:
+        X = np.asarray(X, dtype=float)
+        return X[:, None] if X.ndim == 1 else X
+
+    def _loss_grad_hess(
+        self,
+        theta: np.ndarray,
+        segments: RaceSegments,
+        X: np.ndarray,
+        win_races: np.ndarray,
+        win_pos: np.ndarray
+    ) -> Tuple[float, np.ndarray, np.ndarray]:
+        """Mean negative log-likelihood, its gradient and Hessian (packed X)"""
+        scores = X @ theta
+
+        # Restrict to races with a winner
+        race_max = segments.max_packed(scores)
+        shifted = np.exp(scores - race_max[segments.owner])
+        totals = segments.sum_packed(shifted)
+        p = shifted / totals[segments.owner]
+
+        log_z = np.log(totals[win_races]) + race_max[win_races]
+        n = len(win_races)
+        nll = -(scores[win_pos] - log_z).sum() / n
+
+        in_scope = np.zeros(segments.n_races, dtype=bool)
+        in_scope[win_races] = True
+        weight = np.where(in_scope[segments.owner], p, 0.0)
+
+        expected = segments.sum_packed((weight[:, None] * X).T).T          # (races, k)
+        grad = -(X[win_pos].sum(axis=0) - expected[win_races].sum(axis=0)) / n
+
+        second = (weight[:, None] * X).T @ X                          # Σ p x xᵀ
+        hess = (second - expected[win_races].T @ expected[win_races]) / n
+
+        if self.l2:
+            nll += 0.5 * self.l2 * theta @ theta
+            grad = grad + self.l2 * theta
+            hess = hess + self.l2 * np.eye(len(theta))
+
+        return nll, grad, hess
+
+    def fit(
+        self,
+        segments: RaceSegments,
+        X,
+        winners,
+        theta0: Optional[Sequence[float]] = None,
+        max_iter: int = 50,
+        tol: float = 1e-9
+    ) -> "ConditionalLogit":
+        """
+        Fit θ on races
+
+        Args:
+            segments: Race segments
+            X: Per-runner features, shape (n_runners,) or (n_runners, k)
+            winners: Boolean winner flag per runner
+            theta0: Starting coefficients (default: ones)
+            max_iter: Newton iteration cap
+            tol: Stop when the step's loss improvement falls below tol
+        """
+        X = segments.pack(self._as_matrix(X).T).T
+        win_races, win_pos = segments.winner_index(winners)
+        if len(win_races) == 0:
+            raise ValueError("No races with a winner to fit on")
+
+        theta = np.ones(X.shape[1]) if theta0 is None else np.asarray(theta0, dtype=float)
+        loss, grad, hess = self._loss_grad_hess(theta, segments, X, win_races, win_pos)
+
+        for iteration in range(1, max_iter + 1):
+            try:
+                step = np.linalg.solve(hess, grad)
+            except np.linalg.LinAlgError:
+                step = grad
+
+            # Backtracking keeps every accepted step a descent step
+            t = 1.0
+            while True:
+                candidate = theta - t * step
+                new_loss, new_grad, new_hess = self._loss_grad_hess(candidate, segments, X, win_races, win_pos)
+                if new_loss <= loss or t < 1e-8:
+                    break
+                t *= 0.5
+
+            improvement = loss - new_loss
+            theta, loss, grad, hess = candidate, new_loss, new_grad, new_hess
+            self.n_iter_ = iteration
+            if improvement < tol:
+                break
+
+        self.coef_ = theta
+        self.loss_ = loss
+        logger.info(f"Conditional logit fit: θ={np.round(theta, 4).tolist()}, loss={loss:.6f}, iters={self.n_iter_}")
+        return self
+
+    def predict_proba(self, segments: RaceSegments, X) -> np.ndarray:
+        """Per-runner win probabilities (caller order)"""
+        if self.coef_ is None:
+            raise RuntimeError("ConditionalLogit is not fitted")
+        return segments.softmax(self._as_matrix(X) @ self.coef_)
@@ -0,0 +1,355 @@
+"""
+VÉLØ Oracle - Monte Carlo Bankroll Simulator
+Drawdown, ruin and growth distributions per staking policy
+
+KellyCriterion.growth_rate and BankrollManager only look at one bet at a
+time. This simulator replays a sequence of races many times: each path
+draws one winner per race from the model's (or a recalibrated)
+probabilities, so runners of a race are mutually exclusive, stakes every
+runner with positive Kelly from the bankroll at the start of the race and
+applies the BankrollManager stop-loss rules as the bankroll compounds.
+
+All paths (and all policies, on the same sampled outcomes) advance
+together: the Python loop is over races, everything inside a race is an
+array op over (policies × paths × bets). Paths run in fixed-size batches
+with their own spawned seeds, optionally on a process pool; results do
+not depend on the number of workers.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import logging
+
+from ..models.conditional_logit import RaceSegments
+from ..models.kelly import KellyCriterion
+from .bankroll_manager import BankrollManager
+
+logger = logging.getLogger("velo.bankroll_simulator")
+
+DRAWDOWN_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+DRAWDOWN_LEVELS = (0.1, 0.2, 0.3, 0.5)
+GROWTH_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+@dataclass(frozen=True)
+class StakingPolicy:
+    """
+    Kelly staking rule + stop-losses
+
+    Percentages are fractions of bankroll (0.05 = 5%). Daily rules only
+    apply when the simulator is given race days.
+    """
+    name: str
+    kelly_fraction: float = 0.33
+    max_stake_pct: float = 1.0
+    min_stake: float = 0.0                       # Stakes below this are not placed
+    max_drawdown_pct: Optional[float] = None     # Stop for good at this drawdown from peak
+    daily_stop_loss_pct: Optional[float] = None  # Stop for the day at this loss
+    max_bets_per_day: Optional[int] = None
+
+    @classmethod
+    def from_manager(cls, manager: BankrollManager, name: str = "bankroll_manager") -> "StakingPolicy":
+        """Policy with a BankrollManager's Kelly fraction, stake cap and stop-losses"""
+        return cls(
+            name=name,
+            kelly_fraction=manager.kelly_fraction,
+            max_stake_pct=manager.max_stake_pct,
+            min_stake=1.0,  # BankrollManager passes on stakes under £1
+            max_drawdown_pct=manager.max_drawdown_pct,
+            daily_stop_loss_pct=manager.daily_stop_loss_pct,
+            max_bets_per_day=manager.max_bets_per_day
+        )
+
+
+@dataclass
+class PolicyPaths:
+    """Simulated paths of one staking policy"""
+    policy: StakingPolicy
+    initial_bankroll: float
+    final_bankroll: np.ndarray
+    max_drawdown: np.ndarray
+    ruined: np.ndarray
+    stopped: np.ndarray
+    n_bets: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.final_bankroll)
+
+    @property
+    def log_growth(self) -> np.ndarray:
+        """log(final / initial bankroll) per path"""
+        with np.errstate(divide='ignore'):
+            return np.log(self.final_bankroll / self.initial_bankroll)
+
+    def drawdown_quantiles(self, quantiles: Sequence[float] = DRAWDOWN_QUANTILES) -> Dict[float, float]:
+        return dict(zip(quantiles, np.quantile(self.max_drawdown, quantiles).tolist()))
+
+    def drawdown_probability(self, level: float) -> float:
+        """P(max drawdown >= level)"""
+        return float(np.mean(self.max_drawdown >= level))
+
+    def summary(
+        self,
+        drawdown_quantiles: Sequence[float] = DRAWDOWN_QUANTILES,
+        drawdown_levels: Sequence[float] = DRAWDOWN_LEVELS,
+        growth_quantiles: Sequence[float] = GROWTH_QUANTILES
+    ) -> Dict[str, float]:
+        """Flat dict of the distribution summaries"""
+        growth = self.log_growth
+        summary = {
+            'policy': self.policy.name,
+            'n_paths': self.n_paths,
+            'mean_bets': float(np.mean(self.n_bets)),
+            'ruin_probability': float(np.mean(self.ruined)),
+            'stop_probability': float(np.mean(self.stopped)),
+            'mean_final_bankroll': float(np.mean(self.final_bankroll)),
+            'median_final_bankroll': float(np.median(self.final_bankroll)),
+            'mean_log_growth': float(np.mean(growth)),
+        }
+        for q, value in self.drawdown_quantiles(drawdown_quantiles).items():
+            summary[f'drawdown_q{q:g}'] = value
+        for level in drawdown_levels:
+            summary[f'p_drawdown_{level:g}'] = self.drawdown_probability(level)
+        for q, value in zip(growth_quantiles, np.quantile(growth, growth_quantiles).tolist()):
+            summary[f'log_growth_q{q:g}'] = value
+        return summary
+
+
+@dataclass
+class _Template:
+    """Picklable per-race bet arrays shared by every batch"""
+    runner_offsets: np.ndarray
+    cum_outcome: np.ndarray   # per-race cumulative outcome probabilities (packed)
+    bet_offsets: np.ndarray
+    bet_runner: np.ndarray    # race-local runner index of each bet
+    bet_fraction: np.ndarray  # (policies, bets) Kelly fraction of bankroll
+    bet_net_odds: np.ndarray
+    new_day: np.ndarray       # race starts a new day
+    initial_bankroll: float
+    ruin_level: float
+
+
+def _policy_column(policies: Sequence[StakingPolicy], attr: str, default: float) -> np.ndarray:
+    values = [getattr(p, attr) for p in policies]
+    return np.array([default if v is None else v for v in values], dtype=float)[:, None]
+
+
+def _simulate_batch(template: _Template, policies: Sequence[StakingPolicy], n_paths: int, seed) -> Dict[str, np.ndarray]:
+    """Advance n_paths paths of every policy through all races"""
+    rng = np.random.default_rng(seed)
+    shape = (len(policies), n_paths)
+
+    max_stake_pct = _policy_column(policies, 'max_stake_pct', 1.0)
+    min_stake = _policy_column(policies, 'min_stake', 0.0)[..., None]
+    max_drawdown = _policy_column(policies, 'max_drawdown_pct', np.inf)
+    daily_stop = _policy_column(policies, 'daily_stop_loss_pct', np.inf)
+    max_bets = _policy_column(policies, 'max_bets_per_day', np.inf)
+
+    bankroll = np.full(shape, template.initial_bankroll)
+    peak = bankroll.copy()
+    day_start = bankroll.copy()
+    worst_drawdown = np.zeros(shape)
+    bets_today = np.zeros(shape)
+    n_bets = np.zeros(shape, dtype=np.int64)
+    halted = np.zeros(shape, dtype=bool)       # drawdown stop: permanent
+    halted_today = np.zeros(shape, dtype=bool)  # daily stop / bet limit
+    ruined = np.zeros(shape, dtype=bool)
+    ruin_bankroll = template.ruin_level * template.initial_bankroll
+
+    runner_offsets = template.runner_offsets
+    bet_offsets = template.bet_offsets
+
+    for race in range(len(runner_offsets) - 1):
+        if template.new_day[race]:
+            day_start = bankroll.copy()
+            bets_today[:] = 0
+            halted_today[:] = False
+
+        # One winner per path: inverse CDF within the race
+        cum = template.cum_outcome[runner_offsets[race]:runner_offsets[race + 1]]
+        winner = np.minimum(np.searchsorted(cum, rng.random(n_paths), side='right'), len(cum) - 1)
+
+        start, end = bet_offsets[race], bet_offsets[race + 1]
+        if start == end:
+            continue
+
+        active = ~(halted | halted_today)
+        stakes = np.minimum(
+            template.bet_fraction[:, None, start:end] * bankroll[..., None],
+            (bankroll * max_stake_pct)[..., None]
+        )
+        stakes = np.where((stakes < min_stake) | ~active[..., None], 0.0, stakes)
+        # Only as many bets as the day's limit still allows, in bet order
+        placed_so_far = np.cumsum(stakes > 0, axis=-1)
+        stakes = np.where(placed_so_far > (max_bets - bets_today)[..., None], 0.0, stakes)
+        # Never more than the bankroll on one race
+        total = stakes.sum(axis=-1)
+        over = total > bankroll
+        if over.any():
+            stakes[over] *= (bankroll[over] / total[over])[:, None]
+
+        won = winner[None, :, None] == template.bet_runner[start:end]
+        profit = np.where(won, stakes * template.bet_net_odds[start:end], -stakes).sum(axis=-1)
+        bankroll = bankroll + profit
+
+        placed = (stakes > 0).sum(axis=-1)
+        n_bets += placed
+        bets_today += placed
+        peak = np.maximum(peak, bankroll)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (peak - bankroll) / peak
+            daily_loss = (day_start - bankroll) / day_start
+        worst_drawdown = np.maximum(worst_drawdown, drawdown)
+        ruined |= bankroll <= ruin_bankroll
+
+        # BankrollManager stop-loss rules
+        halted |= drawdown >= max_drawdown
+        halted_today |= (daily_loss >= daily_stop) | (bets_today >= max_bets)
+
+    return {
+        'final_bankroll': bankroll,
+        'max_drawdown': worst_drawdown,
+        'ruined': ruined,
+        'stopped': halted,
+        'n_bets': n_bets,
+    }
+
+
+def _run_batch(job) -> Dict[str, np.ndarray]:
+    return _simulate_batch(*job)
+
+
+class BankrollSimulator:
+    """
+    Monte Carlo bankroll paths over a sequence of races
+    """
+
+    def __init__(
+        self,
+        race_ids,
+        p_model,
+        odds,
+        p_outcome=None,
+        days=None,
+        initial_bankroll: float = 1000.0,
+        ruin_level: float = 0.1
+    ):
+        """
+        Args:
+            race_ids: Race key per runner; races are simulated in order of
+                first appearance
+            p_model: Model win probability per runner (drives the stakes)
+            odds: Decimal odds per runner
+            p_outcome: Probabilities outcomes are drawn from (default
+                p_model); normalized within each race
+            days: Race day per runner (enables daily stop-loss and bet limit)
+            initial_bankroll: Starting bankroll of every path
+            ruin_level: A path is ruined once its bankroll falls to this
+                fraction of the starting bankroll
+        """
+        self.segments = RaceSegments.from_keys(race_ids)
+        self.p_model = self.segments.pack(np.asarray(p_model, dtype=float))
+        self.odds = self.segments.pack(np.asarray(odds, dtype=float))
+
+        outcome = self.segments.pack(np.asarray(p_model if p_outcome is None else p_outcome, dtype=float))
+        if np.any(outcome < 0) or np.any(self.segments.sum_packed(outcome) <= 0):
+            raise ValueError("Outcome probabilities must be non-negative with a positive total per race")
+        self.p_outcome = self.segments.normalize_packed(outcome)
+
+        if days is None:
+            self.new_day = np.zeros(self.segments.n_races, dtype=bool)
+        else:
+            race_day = self.segments.pack(np.asarray(days))[self.segments.starts]
+            self.new_day = np.concatenate([[False], race_day[1:] != race_day[:-1]])
+
+        self.initial_bankroll = initial_bankroll
+        self.ruin_level = ruin_level
+
+        # Full Kelly per runner, with the KellyCriterion rules (clipped to [0, 1])
+        kelly = KellyCriterion(fraction=1.0)
+        self.full_kelly = np.array([
+            kelly.calculate_full_kelly(p, o) for p, o in zip(self.p_model.tolist(), self.odds.tolist())
+        ])
+
+    @property
+    def n_races(self) -> int:
+        return self.segments.n_races
+
+    def _template(self, policies: Sequence[StakingPolicy]) -> _Template:
+        fractions = np.array([p.kelly_fraction for p in policies])[:, None] * self.full_kelly
+        is_bet = (fractions > 0).any(axis=0)
+        bet_positions = np.flatnonzero(is_bet)
+
+        sizes = np.bincount(self.segments.owner[bet_positions], minlength=self.n_races)
+        # Per-race cumulative sums, so each race's last entry is 1
+        cum = np.cumsum(self.p_outcome)
+        cum -= np.repeat(np.concatenate([[0.0], cum[self.segments.offsets[1:-1] - 1]]), self.segments.sizes)
+
+        return _Template(
+            runner_offsets=self.segments.offsets,
+            cum_outcome=cum,
+            bet_offsets=np.concatenate([[0], np.cumsum(sizes)]),
+            bet_runner=bet_positions - self.segments.offsets[self.segments.owner[bet_positions]],
+            bet_fraction=fractions[:, bet_positions],
+            bet_net_odds=self.odds[bet_positions] - 1.0,
+            new_day=self.new_day,
+            initial_bankroll=self.initial_bankroll,
+            ruin_level=self.ruin_level
+        )
+
+    def run(
+        self,
+        policies: Sequence[StakingPolicy],
+        n_paths: int = 10_000,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        batch_paths: int = 10_000
+    ) -> Dict[str, PolicyPaths]:
+        """
+        Simulate n_paths bankroll paths for each policy
+
+        Every policy sees the same sampled race outcomes.
+
+        Args:
+            policies: Staking policies (unique names)
+            n_paths: Number of paths
+            seed: Seed for reproducible paths
+            workers: Process pool size (None/1 = run in this process)
+            batch_paths: Paths per batch (each batch has its own spawned seed)
+
+        Returns:
+            policy name → PolicyPaths
+        """
+        policies = list(policies)
+        if n_paths < 1:
+            raise ValueError(f"n_paths must be positive, got {n_paths}")
+        if len({p.name for p in policies}) != len(policies):
+            raise ValueError("Policy names must be unique")
+
+        template = self._template(policies)
+        sizes = [min(batch_paths, n_paths - start) for start in range(0, n_paths, batch_paths)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        jobs = [(template, policies, size, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+
+        logger.info(f"Simulating {n_paths} paths × {len(policies)} policies over {self.n_races} races")
+        if workers and workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                batches = list(executor.map(_run_batch, jobs))
+        else:
+            batches = [_run_batch(job) for job in jobs]
+
+        results = {}
+        for i, policy in enumerate(policies):
+            arrays = {key: np.concatenate([batch[key][i] for batch in batches]) for key in batches[0]}
+            results[policy.name] = PolicyPaths(policy=policy, initial_bankroll=self.initial_bankroll, **arrays)
+        return results
+
+
+def summary_frame(results: Dict[str, PolicyPaths], **kwargs) -> pd.DataFrame:
+    """One row of PolicyPaths.summary() per policy"""
+    return pd.DataFrame([paths.summary(**kwargs) for paths in results.values()]).set_index('policy')
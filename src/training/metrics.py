@@ -5,12 +5,16 @@ VÉLØ v10.1 - Training Metrics
 Comprehensive metrics for Benter model evaluation.
 Includes: AUC, Brier, LogLoss, A/E, IV, ROI@K, drawdown.
 
+compute_metric_grid is the fused kernel: predictions are sorted once and
+every metric is taken from the same arrays. A 2-D (n_candidates, n)
+prediction matrix scores a whole hyperparameter grid in one call.
+
 Author: VÉLØ Oracle Team
 Version: 10.1.0
 """
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 from sklearn.metrics import (
@@ -20,8 +24,16 @@ from sklearn.metrics import (
     accuracy_score
 )
 
+from ..models.conditional_logit import RaceSegments
+
 logger = logging.getLogger(__name__)
 
+# Top-K fractions reported as roi_top10 / roi_top20 / roi_top30
+ROI_TOP_K = (0.10, 0.20, 0.30)
+
+# Floor for the race-normalized winner probability (as grid_log_loss)
+RACE_EPS = 1e-10
+
 
 class ModelMetrics:
     """
@@ -71,27 +83,211 @@ class ModelMetrics:
         metrics['log_loss'] = self.compute_log_loss(y_true, y_pred)
         metrics['accuracy'] = accuracy_score(y_true, (y_pred > 0.5).astype(int))
         
-        # Calibration metrics
-        calibration = self.compute_calibration_error(y_true, y_pred)
+        # Calibration, racing, risk and race-level metrics (one sort)
+        kernel = self._kernel_metrics(
+            np.asarray(y_true), np.asarray(y_pred, dtype=float)[None, :], odds, race_ids
+        )
+        metrics.update({name: values[0] for name, values in kernel.items()})
+        
+        logger.info(f"Metrics computed: AUC={metrics['auc']:.4f}, Brier={metrics['brier_score']:.4f}")
+        
+        return metrics
+    
+    def compute_metric_grid(
+        self,
+        y_true: np.ndarray,
+        y_pred: np.ndarray,
+        odds: np.ndarray = None,
+        race_ids: np.ndarray = None
+    ) -> Dict[str, Union[float, np.ndarray]]:
+        """
+        Fused metric kernel over one or many candidate predictions.
+        
+        Each candidate is sorted once; AUC (tie-averaged ranks) and every
+        ROI@K come from that order, calibration bins are np.bincount
+        reductions and drawdown/Sharpe are shared across candidates.
+        ROI, A/E, drawdown, Sharpe and accuracy equal compute_all_metrics
+        exactly; AUC, Brier, log loss and calibration error agree to
+        floating-point rounding.
+        
+        Args:
+            y_true: True labels (0 or 1 for win), shape (n,)
+            y_pred: Predicted probabilities, shape (n,) or (n_candidates, n)
+            odds: Market odds (optional, for A/E, ROI and risk metrics)
+            race_ids: Race identifiers (optional, for race-level metrics)
+        
+        Returns:
+            compute_all_metrics keys, plus race_log_loss, race_top1_win_rate
+            and race_top1_roi with race_ids. Floats for 1-D y_pred, arrays
+            of shape (n_candidates,) for 2-D.
+        """
+        y_true = np.asarray(y_true)
+        preds = np.asarray(y_pred, dtype=float)
+        matrix = np.atleast_2d(preds)
+        
+        kernel = self._kernel_metrics(y_true, matrix, odds, race_ids, with_auc=True)
+        metrics = {
+            'auc': kernel.pop('auc'),
+            'brier_score': ((y_true - matrix) ** 2).mean(axis=1),
+            'log_loss': self._log_loss_rows(y_true, matrix),
+            'accuracy': ((matrix > 0.5).astype(int) == y_true).mean(axis=1),
+            **kernel,
+        }
+        
+        if preds.ndim == 1:
+            return {name: float(values[0]) for name, values in metrics.items()}
+        return metrics
+    
+    @staticmethod
+    def _log_loss_rows(y_true: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+        """Binary cross-entropy per candidate row (clipped as compute_log_loss)"""
+        p = np.clip(matrix, 1e-15, 1 - 1e-15)
+        return -np.where(y_true == 1, np.log(p), np.log1p(-p)).mean(axis=1)
+    
+    def _kernel_metrics(
+        self,
+        y_true: np.ndarray,
+        matrix: np.ndarray,
+        odds: Optional[np.ndarray],
+        race_ids: Optional[np.ndarray],
+        with_auc: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """Sorted, binned, outcome and race-level metrics per candidate row"""
+        m, n = matrix.shape
+        metrics = {}
+        
+        # Single sort per candidate; descending = reversed ascending order,
+        # as compute_roi_at_k takes it
+        order = np.argsort(matrix, axis=1)
+        
+        if with_auc:
+            metrics['auc'] = self._auc_from_order(y_true, matrix, order)
+        
+        calibration = self._calibration_grid(y_true, matrix)
         metrics['calibration_error'] = calibration['mean_error']
         metrics['max_calibration_error'] = calibration['max_error']
         
-        # Racing-specific metrics
         if odds is not None:
-            metrics['ae_ratio'] = self.compute_ae_ratio(y_true, y_pred, odds)
-            metrics['roi_all'] = self.compute_roi(y_true, odds)
-            metrics['roi_top10'] = self.compute_roi_at_k(y_true, y_pred, odds, k=0.10)
-            metrics['roi_top20'] = self.compute_roi_at_k(y_true, y_pred, odds, k=0.20)
-            metrics['roi_top30'] = self.compute_roi_at_k(y_true, y_pred, odds, k=0.30)
+            odds = np.asarray(odds, dtype=float)
+            
+            # Prediction-independent: computed once for every candidate
+            market_prob = 1.0 / odds
+            actual = y_true.mean()
+            expected = market_prob.mean()
+            metrics['ae_ratio'] = np.full(m, actual / expected if expected > 0 else 0.0)
+            metrics['roi_all'] = np.full(m, self.compute_roi(y_true, odds))
+            
+            returns = y_true * odds
+            descending = order[:, ::-1]
+            for k in ROI_TOP_K:
+                n_select = max(1, int(n * k))
+                total_returns = returns[descending[:, :n_select]].sum(axis=1)
+                metrics[f'roi_top{round(k * 100)}'] = (total_returns - n_select) / n_select * 100
+            
+            drawdown = self.compute_drawdown(y_true, None, odds)
+            metrics['max_drawdown'] = np.full(m, drawdown['max_drawdown'])
+            metrics['sharpe_ratio'] = np.full(m, drawdown['sharpe_ratio'])
+        
+        if race_ids is not None:
+            metrics.update(self._race_metrics(y_true, matrix, odds, race_ids))
         
-        # Risk metrics
-        if odds is not None:
-            drawdown_metrics = self.compute_drawdown(y_true, y_pred, odds)
-            metrics['max_drawdown'] = drawdown_metrics['max_drawdown']
-            metrics['sharpe_ratio'] = drawdown_metrics['sharpe_ratio']
+        return metrics
+    
+    @staticmethod
+    def _auc_from_order(y_true: np.ndarray, matrix: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """ROC AUC per row via tie-averaged ranks (Mann-Whitney U)"""
+        m, n = matrix.shape
+        positives = (y_true == 1)
+        n_pos = int(positives.sum())
+        n_neg = n - n_pos
+        if n_pos == 0 or n_neg == 0:
+            # roc_auc_score is undefined; compute_auc reports 0.0
+            return np.zeros(m)
+        
+        values = np.take_along_axis(matrix, order, axis=1)
+        labels = positives[order]
+        
+        index = np.broadcast_to(np.arange(n), (m, n))
+        new_value = values[:, 1:] != values[:, :-1]
+        starts = np.concatenate([np.ones((m, 1), dtype=bool), new_value], axis=1)
+        ends = np.concatenate([new_value, np.ones((m, 1), dtype=bool)], axis=1)
+        first = np.maximum.accumulate(np.where(starts, index, 0), axis=1)
+        last = np.minimum.accumulate(np.where(ends, index, n)[:, ::-1], axis=1)[:, ::-1]
+        ranks = (first + last) / 2.0 + 1.0
+        
+        rank_sum = np.where(labels, ranks, 0.0).sum(axis=1)
+        return (rank_sum - n_pos * (n_pos + 1) / 2.0) / (n_pos * n_neg)
+    
+    @staticmethod
+    def _calibration_grid(y_true: np.ndarray, matrix: np.ndarray, n_bins: int = 10) -> Dict[str, np.ndarray]:
+        """compute_calibration_error per row, bins reduced with np.bincount"""
+        m, n = matrix.shape
+        bins = np.linspace(0, 1, n_bins + 1)
+        bin_indices = np.clip(np.digitize(matrix, bins) - 1, 0, n_bins - 1)
+        codes = (bin_indices + np.arange(m)[:, None] * n_bins).ravel()
         
-        logger.info(f"Metrics computed: AUC={metrics['auc']:.4f}, Brier={metrics['brier_score']:.4f}")
+        size = m * n_bins
+        counts = np.bincount(codes, minlength=size).reshape(m, n_bins)
+        pred_sums = np.bincount(codes, weights=matrix.ravel(), minlength=size).reshape(m, n_bins)
+        true_sums = np.bincount(
+            codes, weights=np.broadcast_to(y_true, (m, n)).ravel().astype(float), minlength=size
+        ).reshape(m, n_bins)
         
+        filled = counts > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            errors = np.abs(pred_sums / counts - true_sums / counts)
+        n_filled = filled.sum(axis=1)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_error = np.where(n_filled > 0, np.where(filled, errors, 0.0).sum(axis=1) / n_filled, 0.0)
+        max_error = np.where(filled, errors, -np.inf).max(axis=1, initial=-np.inf)
+        
+        return {
+            'mean_error': mean_error,
+            'max_error': np.where(n_filled > 0, max_error, 0.0),
+            'n_bins': n_filled
+        }
+    
+    @staticmethod
+    def _race_metrics(
+        y_true: np.ndarray,
+        matrix: np.ndarray,
+        odds: Optional[np.ndarray],
+        race_ids: np.ndarray
+    ) -> Dict[str, np.ndarray]:
+        """
+        Race-level metrics from race_ids segment offsets.
+        
+        - race_log_loss: mean -log of the race-normalized winner probability
+        - race_top1_win_rate: share of races whose top-rated runner won
+        - race_top1_roi: ROI (%) of 1 unit on each race's top-rated runner
+        """
+        segments = RaceSegments.from_keys(np.asarray(race_ids))
+        packed = segments.pack(matrix)
+        won = segments.pack(y_true == 1)
+        n = packed.shape[1]
+        
+        win_races, win_pos = segments.winner_index(y_true == 1)
+        totals = segments.sum_packed(packed)
+        totals = np.where(totals != 0, totals, 1.0)
+        if len(win_races):
+            p_winner = packed[:, win_pos] / totals[:, win_races]
+            race_log_loss = -np.log(np.maximum(p_winner, RACE_EPS)).mean(axis=1)
+        else:
+            race_log_loss = np.full(len(matrix), np.inf)
+        
+        # First runner holding each race's maximum prediction
+        is_top = packed == segments.expand(segments.max_packed(packed))
+        top = np.minimum.reduceat(np.where(is_top, np.arange(n), n), segments.starts, axis=1)
+        top_won = won[top]
+        
+        metrics = {
+            'race_log_loss': race_log_loss,
+            'race_top1_win_rate': top_won.mean(axis=1),
+        }
+        if odds is not None:
+            top_odds = segments.pack(odds)[top]
+            metrics['race_top1_roi'] = (np.where(top_won, top_odds, 0.0).sum(axis=1) - segments.n_races) / segments.n_races * 100
         return metrics
     
     def compute_auc(self, y_true: np.ndarray, y_pred: np.ndarray) -> float:
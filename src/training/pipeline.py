@@ -24,6 +24,7 @@ import logging
 import json
 from datetime import datetime
 
+from ..data.racing_dataset import load_racing_data
 from ..features import FeatureBuilder, FeatureBuilderConfig
 from ..intelligence.sqpe import SQPEEngine, SQPEConfig
 from ..intelligence.tie import TrainerIntentEngine, TIEConfig
@@ -88,7 +89,7 @@ class TrainingPipeline:
         
         # Initialize components
         self.feature_builder = FeatureBuilder(
-            FeatureBuilderConfig(validate_schema=True, log_level=config.log_level)
+            FeatureBuilderConfig(validate_schema=True, log_level=config.log_level, use_history_index=True)
         )
         
         self.sqpe_config = SQPEConfig(
@@ -116,23 +117,19 @@ class TrainingPipeline:
         """Load and validate raw data."""
         self.logger.info(f"Loading data from {self.config.data_path}")
         
-        df = pd.read_csv(self.config.data_path, low_memory=False)
-        
-        self.logger.info(f"Loaded {len(df)} rows")
+        # Date range is pushed into the scan for Parquet datasets
+        df = load_racing_data(
+            self.config.data_path,
+            start_date=self.config.min_date,
+            end_date=self.config.max_date
+        )
         
         # Convert date column
         df['date'] = pd.to_datetime(df['date'], errors='coerce')
         
-        # Filter by date range if specified
-        if self.config.min_date:
-            min_date = pd.to_datetime(self.config.min_date)
-            df = df[df['date'] >= min_date]
-            self.logger.info(f"Filtered to {len(df)} rows after min_date={self.config.min_date}")
-        
-        if self.config.max_date:
-            max_date = pd.to_datetime(self.config.max_date)
-            df = df[df['date'] <= max_date]
-            self.logger.info(f"Filtered to {len(df)} rows after max_date={self.config.max_date}")
+        self.logger.info(
+            f"Loaded {len(df)} rows (min_date={self.config.min_date}, max_date={self.config.max_date})"
+        )
         
         # Create race_id if not exists
         if 'race_id' not in df.columns:
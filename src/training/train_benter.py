@@ -28,6 +28,7 @@ from .feature_store import FeatureStore
 from .labels import LabelCreator
 from .metrics import ModelMetrics
 from .model_registry import ModelRegistry
+from ..models.conditional_logit import linear_blend
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -292,30 +293,27 @@ class BenterTrainer:
         
         results = []
         
-        for alpha in alpha_values:
-            beta = 1.0 - alpha
-            
-            # Combined predictions
-            X_scaled = scaler.transform(X_val)
-            fundamental_probs = fundamental_model.predict_proba(X_scaled)[:, 1]
-            market_probs = 1.0 / odds_val
-            
-            combined_probs = alpha * fundamental_probs + beta * market_probs
-            
-            # Evaluate
-            metrics = self.metrics_calc.compute_all_metrics(
-                y_val, combined_probs, odds_val
-            )
-            
+        # Model outputs don't depend on α: score once, blend the whole grid at once
+        X_scaled = scaler.transform(X_val)
+        fundamental_probs = fundamental_model.predict_proba(X_scaled)[:, 1]
+        market_probs = 1.0 / odds_val
+        
+        beta_values = 1.0 - alpha_values
+        combined_grid = linear_blend(fundamental_probs, market_probs, alpha_values, beta_values)
+        
+        # Score every candidate blend in one fused metric pass
+        grid_metrics = self.metrics_calc.compute_metric_grid(y_val, combined_grid, odds_val)
+        
+        for i, (alpha, beta) in enumerate(zip(alpha_values, beta_values)):
             # Optimization target: ROI @ top 20%
-            target_metric = metrics.get('roi_top20', 0)
+            target_metric = grid_metrics['roi_top20'][i]
             
             results.append({
                 'alpha': alpha,
                 'beta': beta,
                 'roi_top20': target_metric,
-                'ae_ratio': metrics.get('ae_ratio', 0),
-                'auc': metrics.get('auc', 0)
+                'ae_ratio': grid_metrics['ae_ratio'][i],
+                'auc': grid_metrics['auc'][i]
             })
             
             if target_metric > best_metric:
@@ -0,0 +1,50 @@
+-- VÉLØ Feature Mart Source Rows
+-- Migration: 006_feature_mart_source
+-- Purpose: Expose the runner rows build_feature_mart aggregates, for the
+--          incremental range backfill (workers/ingestion_spine/feature_mart.py)
+--
+-- build_feature_mart(p_as_of_date) rescans every window per date. Backfilling
+-- a range reads these rows once for [p_start_date, p_end_date) and slides the
+-- windows client-side, then upserts into the same *_window tables.
+
+-- ============================================================================
+-- SOURCE ROWS
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION feature_mart_source(p_start_date DATE, p_end_date DATE)
+RETURNS TABLE (
+  import_date DATE,
+  race_id UUID,
+  course TEXT,
+  distance TEXT,
+  race_type TEXT,
+  trainer TEXT,
+  jockey TEXT,
+  "position" TEXT,
+  odds NUMERIC
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    ra.import_date,
+    ra.id,
+    ra.course,
+    ra.distance,
+    ra.race_type,
+    r.trainer,
+    r.jockey,
+    fl.position,
+    COALESCE((r.raw->>'odds')::NUMERIC, 0)
+  FROM runners r
+  JOIN races ra ON r.race_id = ra.id
+  JOIN import_batches b ON ra.batch_id = b.id
+  LEFT JOIN runner_form_lines fl ON fl.runner_id = r.id AND fl.run_date = ra.import_date
+  WHERE ra.import_date >= p_start_date
+    AND ra.import_date < p_end_date
+    AND b.status IN ('validated', 'ready')
+  -- Stable order so PostgREST range() paging neither skips nor repeats rows
+  ORDER BY ra.import_date, ra.id, r.id;
+$$;
+
+COMMENT ON FUNCTION feature_mart_source IS 'Runner rows (validated/ready batches) with import_date in [p_start_date, p_end_date), as joined by build_feature_mart. Used for incremental feature mart backfills.';
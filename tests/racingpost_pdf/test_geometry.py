@@ -0,0 +1,108 @@
+"""
+Tests for the word geometry layer (racingpost_pdf/geometry.py)
+
+The extract_words helpers must return exactly what the original per-word
+loops (kept in racingpost_pdf/bench.py) returned.
+"""
+
+import random
+
+import pytest
+
+from workers.ingestion_spine.racingpost_pdf.bench import (
+    reference_cluster_by_x_position,
+    reference_extract_block_words,
+    reference_find_runner_anchors,
+    reference_group_words_by_line,
+    run_geometry_benchmark,
+    synthesize_page,
+)
+from workers.ingestion_spine.racingpost_pdf.extract_words import (
+    cluster_by_x_position,
+    extract_block_words,
+    find_runner_anchors,
+    group_words_by_line,
+)
+from workers.ingestion_spine.racingpost_pdf.geometry import WordGeometry
+
+
+def _random_page(n_words, seed):
+    rng = random.Random(seed)
+    words = []
+    for i in range(n_words):
+        # Coarse grids force ties on top/x0 and words exactly at tolerance
+        words.append({
+            "text": rng.choice([str(rng.randint(0, 40)), f"w{i}", " 7 "]),
+            "x0": rng.choice([rng.randint(0, 60) * 2.5, rng.uniform(0, 600)]),
+            "top": rng.choice([rng.randint(0, 160) * 2.5, rng.uniform(0, 800)]),
+        })
+    return words
+
+
+def _ids(words):
+    return [id(w) for w in words]
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("tolerance", [0.0, 2.5, 10.0])
+def test_helpers_match_original_loops(seed, tolerance):
+    words = _random_page(400, seed)
+
+    expected = reference_cluster_by_x_position(words, tolerance)
+    columns = cluster_by_x_position(words, tolerance)
+    assert list(columns) == list(expected)
+    assert all(_ids(columns[k]) == _ids(expected[k]) for k in expected)
+
+    lines = group_words_by_line(words, y_tolerance=tolerance)
+    assert [_ids(line) for line in lines] == [_ids(line) for line in reference_group_words_by_line(words, tolerance)]
+
+    anchors = find_runner_anchors(words)
+    assert _ids(anchors) == _ids(reference_find_runner_anchors(words))
+
+    for anchor in anchors[:25]:
+        for max_height in (0.0, 12.5, 50.0):
+            assert _ids(extract_block_words(words, anchor, max_height)) == \
+                _ids(reference_extract_block_words(words, anchor, max_height))
+
+
+def test_column_assignment_is_greedy_in_input_order():
+    # 0 → key, 8 joins 0, 16 starts a new key (> 10 from 0) though within 10 of 8
+    words = [{"x0": x, "top": 0.0, "text": "w"} for x in (0.0, 8.0, 16.0, 9.0, 25.0, 5.0)]
+
+    columns = cluster_by_x_position(words, tolerance=10.0)
+
+    assert list(columns) == [0.0, 16.0]
+    assert [w["x0"] for w in columns[0.0]] == [0.0, 8.0, 9.0, 5.0]
+    assert [w["x0"] for w in columns[16.0]] == [16.0, 25.0]
+
+
+def test_float_boundary_uses_exact_test():
+    # 0.1 + 5.0 == 5.1 but 5.1 - 0.1 < 5.0 in floats; the original compared differences
+    words = [{"x0": 0.0, "top": t, "text": "w"} for t in (0.1, 5.1, 5.2)]
+    assert [len(line) for line in group_words_by_line(words, 5.0)] == \
+        [len(line) for line in reference_group_words_by_line(words, 5.0)]
+
+
+def test_empty_page():
+    assert cluster_by_x_position([]) == {}
+    assert group_words_by_line([]) == []
+    assert find_runner_anchors([]) == []
+    assert WordGeometry([]).lines() == []
+
+
+def test_geometry_reuse_across_anchors():
+    words = synthesize_page(n_runners=20)
+    geometry = WordGeometry(words)
+
+    for anchor in geometry.take(geometry.anchors()):
+        assert _ids(geometry.take(geometry.block(anchor))) == _ids(reference_extract_block_words(words, anchor))
+
+
+def test_micro_benchmark_reports_all_helpers():
+    result = run_geometry_benchmark([synthesize_page(n_runners=10)], repeat=1)
+
+    assert result["pages"] == 1
+    assert result["words"] == 10 * 4 * 14
+    assert set(result["helpers"]) == {
+        "cluster_by_x_position", "group_words_by_line", "find_runner_anchors", "extract_block_words"
+    }
@@ -0,0 +1,165 @@
+"""
+Tests for pooled, cached page extraction (racingpost_pdf/pages.py)
+"""
+
+import os
+
+import pytest
+
+from workers.ingestion_spine.racingpost_pdf import parse_meeting, pages
+from workers.ingestion_spine.racingpost_pdf.pages import PageCache, extract_pages, file_sha256
+
+
+def _pdf_bytes(page_lines):
+    """Minimal multi-page PDF (Helvetica text lines) for pdfplumber."""
+    n_pages = len(page_lines)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [" + b" ".join(
+            f"{4 + 2 * i} 0 R".encode() for i in range(n_pages)
+        ) + f"] /Count {n_pages} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(page_lines):
+        text = " T* ".join(
+            "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") Tj"
+            for line in lines
+        )
+        stream = f"BT /F1 10 Tf 14 TL 40 800 Td {text} ET".encode()
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def _card_pages(n_pages=7):
+    names = ["BRAVE EMPIRE", "SEA BREEZE", "NORTHERN STAR", "QUIET RIVER", "GOLDEN HOUR"]
+    page_lines = []
+    for p in range(n_pages):
+        lines = []
+        for r in range(2):
+            lines.append(f"{1 + p}.{r * 3}0 Handicap Stakes Class {r + 4} {5 + (p + r) % 4}f")
+            for n, name in enumerate(names):
+                lines.append(f"{n + 1} 0{n}35{p}- {name} {p}{r} {10 + n} D 5")
+                lines.append(f"{3 + n % 4} 9-{n + 2} William Cox OR: {60 + n} TS: {55 + n} RPR: {62 + n}")
+        page_lines.append(lines)
+    return page_lines
+
+
+@pytest.fixture
+def meeting_files(tmp_path):
+    xx = tmp_path / "WOL_20260109_00_00_F_0012_XX_Wolverhampton.pdf"
+    xx.write_bytes(_pdf_bytes(_card_pages()))
+    or_card = tmp_path / "WOL_20260109_00_00_F_0015_OR_Wolverhampton.pdf"
+    or_card.write_bytes(_pdf_bytes([["OR ratings"]]))
+    return [str(xx), str(or_card)]
+
+
+def _dump(report):
+    meeting = report.meeting.dict(exclude={"parsed_at"}) if report.meeting else None
+    return meeting, [e.dict() for e in report.errors], report.stats
+
+
+def test_pooled_parse_matches_serial(meeting_files):
+    serial = parse_meeting(meeting_files, validate_output=False)
+    pooled = parse_meeting(meeting_files, validate_output=False, workers=3)
+
+    assert serial.success
+    assert serial.stats["races_count"] == 14
+    assert serial.stats["runners_count"] == 70
+    assert _dump(pooled) == _dump(serial)
+
+
+def test_pooled_pages_in_order(meeting_files):
+    from concurrent.futures import ProcessPoolExecutor
+
+    serial = extract_pages(meeting_files[0], words=True)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = extract_pages(meeting_files[0], executor=executor, pages_per_task=2, words=True)
+
+    assert [p.page_num for p in pooled] == list(range(1, 8))
+    assert [(p.text, p.words) for p in pooled] == [(p.text, p.words) for p in serial]
+    assert "BRAVE EMPIRE" in serial[0].text
+    assert {"text", "x0", "x1", "top", "bottom"} <= set(serial[0].words[0])
+
+
+def test_cache_hit_skips_extraction(meeting_files, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    first = parse_meeting(meeting_files, validate_output=False, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    assert os.listdir(cache_dir)[0].startswith(file_sha256(meeting_files[0]))
+
+    def _no_extraction(*args, **kwargs):
+        raise AssertionError("extraction should come from the cache")
+
+    monkeypatch.setattr(pages, "_extract_page_range", _no_extraction)
+    second = parse_meeting(meeting_files, validate_output=False, cache_dir=cache_dir)
+    assert _dump(second) == _dump(first)
+
+
+def test_cache_keyed_by_content(meeting_files, tmp_path):
+    cache = PageCache(str(tmp_path / "cache"))
+    original = extract_pages(meeting_files[0], cache=cache)
+
+    # Same name, different contents: a miss, not the stale pages
+    with open(meeting_files[0], "wb") as f:
+        f.write(_pdf_bytes(_card_pages(n_pages=2)))
+    changed = extract_pages(meeting_files[0], cache=cache)
+
+    assert len(original) == 7
+    assert len(changed) == 2
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_words_only_on_request(meeting_files, tmp_path):
+    cache = PageCache(str(tmp_path / "cache"))
+    text_only = extract_pages(meeting_files[0], cache=cache)
+    assert all(page.words == [] for page in text_only)
+
+    with_words = extract_pages(meeting_files[0], cache=cache, words=True)
+    assert all(page.words for page in with_words)
+    assert [p.text for p in with_words] == [p.text for p in text_only]
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+
+def test_failed_pages_not_cached(meeting_files, tmp_path, monkeypatch):
+    cache = PageCache(str(tmp_path / "cache"))
+    extract_page = pages._extract_page
+
+    def _flaky(page, page_num, words=False):
+        if page_num == 3:
+            return pages.PageContent(page_num=page_num, text=None, error="layout failed")
+        return extract_page(page, page_num, words)
+
+    monkeypatch.setattr(pages, "_extract_page", _flaky)
+    failed = extract_pages(meeting_files[0], cache=cache)
+    assert failed[2].error == "layout failed"
+    assert os.listdir(cache.cache_dir) == []
+
+    monkeypatch.setattr(pages, "_extract_page", extract_page)
+    retried = extract_pages(meeting_files[0], cache=cache)
+    assert all(page.error is None for page in retried)
+    assert len(os.listdir(cache.cache_dir)) == 1
+
+
+def test_unreadable_pdf_reports_open_error(tmp_path):
+    xx = tmp_path / "WOL_20260109_00_00_F_0012_XX_Wolverhampton.pdf"
+    xx.write_bytes(b"not a pdf")
+
+    report = parse_meeting([str(xx)], workers=2)
+
+    assert not report.success
+    assert report.errors[0].location == "file"
+    assert report.errors[0].message.startswith("Failed to open PDF")
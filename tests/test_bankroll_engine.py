@@ -0,0 +1,150 @@
+"""
+Tests for the bankroll engine against the per-bet and per-race loops it replaces
+
+Sums are not taken in the loops' order, so float results match to rounding.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.bankroll import race_offsets, simulate_bankroll
+from src.backtesting.timeseries_backtest import PortfolioKellyCriterion, TimeSeriesBacktester
+
+
+def simulate_betting_loop(p_model, odds, won, initial_bankroll, fractional_kelly):
+    """scripts/backtest.py simulate_betting"""
+    bankroll = initial_bankroll
+    history, stakes, profits = [bankroll], [], []
+    for p, o, w in zip(p_model, odds, won):
+        stake = np.clip((p * o - 1) / (o - 1) * fractional_kelly, 0.0, 1.0) * bankroll
+        profit = stake * (o - 1) if w else -stake
+        bankroll += profit
+        history.append(bankroll)
+        stakes.append(stake)
+        profits.append(profit)
+    return stakes, profits, history
+
+
+class RowModel:
+    """Per-row probability looked up from the runner's own column"""
+
+    def predict_proba(self, data):
+        return data['p'].to_numpy()
+
+
+def backtest_fold_loop(test_df, kelly_fraction, min_edge, initial_bankroll):
+    """TimeSeriesBacktester._backtest_fold before the bankroll engine"""
+    portfolio_kelly = PortfolioKellyCriterion(kelly_fraction)
+    bankroll = initial_bankroll
+    total_profit, total_bets, wins = 0.0, 0, 0
+    equity_curve = [bankroll]
+    for _, race_data in test_df.groupby('race_id'):
+        opportunities = []
+        for _, horse in race_data.iterrows():
+            pred = {'horse_name': horse['horse_name'], 'probability': horse['p'], 'odds': horse.get('odds', 5.0)}
+            if pred['probability'] - (1 / pred['odds']) >= min_edge:
+                opportunities.append(pred)
+        if not opportunities:
+            continue
+        stakes = portfolio_kelly.calculate_stakes(opportunities, bankroll)
+        race_profit = 0.0
+        for opp, stake in zip(opportunities, stakes):
+            if stake <= 0:
+                continue
+            total_bets += 1
+            actual = race_data[race_data['horse_name'] == opp['horse_name']]['result'].iloc[0]
+            if actual == 'win':
+                profit = stake * (opp['odds'] - 1)
+                wins += 1
+            else:
+                profit = -stake
+            race_profit += profit
+        bankroll += race_profit
+        total_profit += race_profit
+        equity_curve.append(bankroll)
+    return bankroll, total_profit, total_bets, wins, equity_curve
+
+
+@pytest.fixture
+def bets():
+    rng = np.random.default_rng(22)
+    n = 1500
+    odds = rng.choice([1.5, 2.0, 3.5, 6.0, 11.0, 26.0], n)
+    p_model = np.clip(1 / odds + rng.normal(0.02, 0.08, n), 0.01, 0.99)
+    won = rng.random(n) < 1 / odds
+    return p_model, odds, won
+
+
+def test_bet_by_bet_matches_simulate_betting(bets):
+    p_model, odds, won = bets
+    stakes, profits, history = simulate_betting_loop(p_model, odds, won, 1000.0, 0.33)
+
+    path = simulate_bankroll(np.arange(len(odds) + 1), p_model, odds, won, 1000.0, 0.33)
+
+    assert path.stakes.tolist() == pytest.approx(stakes, rel=1e-9)
+    assert path.profits.tolist() == pytest.approx(profits, rel=1e-9)
+    assert path.equity.tolist() == pytest.approx(history, rel=1e-9)
+
+
+def test_race_exposure_cap(bets):
+    p_model, odds, won = bets
+    offsets = np.concatenate([[0], np.cumsum(np.full(150, 10))])
+    portfolio_kelly = PortfolioKellyCriterion(kelly_fraction=1.0, max_stake_pct=0.2)
+
+    path = simulate_bankroll(offsets, p_model, odds, won, 1000.0, 1.0, max_stake_pct=0.2, max_exposure=0.5)
+
+    bankroll = 1000.0
+    for race, (start, end) in enumerate(zip(offsets[:-1], offsets[1:])):
+        opportunities = [{'probability': p, 'odds': o} for p, o in zip(p_model[start:end], odds[start:end])]
+        stakes = portfolio_kelly.calculate_stakes(opportunities, bankroll)
+        assert path.stakes[start:end].tolist() == pytest.approx(stakes, rel=1e-9)
+        assert sum(stakes) <= bankroll * 0.5 * (1 + 1e-12)
+        race_profit = 0.0
+        for stake, o, w in zip(stakes, odds[start:end], won[start:end]):
+            race_profit += stake * (o - 1) if w else -stake
+        bankroll += race_profit
+        assert path.equity[race + 1] == pytest.approx(bankroll, rel=1e-9)
+
+
+def test_drawdown_and_sharpe():
+    path = simulate_bankroll([0, 1, 2, 3], [0.6, 0.6, 0.6], [2.0, 2.0, 2.0], [True, False, False], 100.0, 1.0)
+    backtester = TimeSeriesBacktester(model=None)
+    equity = path.equity.tolist()
+
+    assert path.max_drawdown == backtester._calculate_max_drawdown(equity)
+    assert path.sharpe() == backtester._calculate_sharpe(equity)
+    assert path.drawdown[0] == 0.0 and path.drawdown[-1] > 0
+
+
+def test_race_offsets_follow_groupby():
+    race_ids = np.array([7, 3, 7, 9, 3, 7])
+    order, offsets = race_offsets(race_ids)
+    assert order.tolist() == [1, 4, 0, 2, 5, 3]
+    assert offsets.tolist() == [0, 2, 5, 6]
+
+
+def test_backtest_fold_matches_loop():
+    rng = np.random.default_rng(220)
+    n = 1200
+    race_ids = rng.integers(0, 150, n)
+    odds = rng.choice([2.0, 3.5, 6.0, 11.0], n)
+    test_df = pd.DataFrame({
+        'race_id': race_ids,
+        'race_date': '2024-01-01',
+        'horse_name': [f'H{i}' for i in range(n)],
+        'p': np.clip(1 / odds + rng.normal(0.05, 0.1, n), 0.01, 0.99),
+        'odds': odds,
+        'result': np.where(rng.random(n) < 1 / odds, 'win', 'lost'),
+    })
+    backtester = TimeSeriesBacktester(model=RowModel(), kelly_fraction=0.25, min_edge=0.05)
+
+    result = backtester._backtest_fold(1, test_df, test_df)
+    bankroll, total_profit, total_bets, wins, equity = backtest_fold_loop(test_df, 0.25, 0.05, 1000.0)
+
+    assert result.test_profit == pytest.approx(total_profit, rel=1e-9)
+    assert result.test_roi == pytest.approx(bankroll / 1000.0 - 1, rel=1e-9)
+    assert result.total_bets == total_bets
+    assert result.test_win_rate == wins / total_bets
+    assert result.test_sharpe == pytest.approx(backtester._calculate_sharpe(equity), rel=1e-9)
+    assert result.test_max_drawdown == pytest.approx(backtester._calculate_max_drawdown(equity), rel=1e-9)
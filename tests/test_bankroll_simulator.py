@@ -0,0 +1,124 @@
+"""
+Tests for the Monte Carlo bankroll simulator
+"""
+
+import numpy as np
+import pytest
+
+from src.models.kelly import KellyCriterion
+from src.strategy.bankroll_manager import BankrollManager
+from src.strategy.bankroll_simulator import BankrollSimulator, StakingPolicy, summary_frame
+
+
+def single_bet_races(n_races=200):
+    """Each race: one backed runner (p=0.3 at 4.0) and the rest of the field"""
+    race_ids = np.repeat(np.arange(n_races), 2)
+    p_model = np.tile([0.3, 0.7], n_races)
+    odds = np.tile([4.0, 1.2], n_races)
+    return race_ids, p_model, odds
+
+
+def test_log_growth_matches_kelly_growth_rate():
+    race_ids, p_model, odds = single_bet_races()
+    simulator = BankrollSimulator(race_ids, p_model, odds)
+
+    results = simulator.run([StakingPolicy('third', kelly_fraction=1 / 3)], n_paths=20_000, seed=1)
+    growth = results['third'].log_growth
+
+    expected = 200 * KellyCriterion(fraction=1 / 3).growth_rate(0.3, 4.0)
+    assert np.mean(growth) == pytest.approx(expected, abs=4 * np.std(growth) / np.sqrt(len(growth)))
+    assert (results['third'].n_bets == 200).all()
+
+
+def test_one_winner_per_race():
+    # Both runners have positive Kelly; exactly one wins, so every race returns stake × 1
+    n_races = 50
+    simulator = BankrollSimulator(np.repeat(np.arange(n_races), 2), np.full(2 * n_races, 0.5), np.full(2 * n_races, 3.0))
+
+    paths = simulator.run([StakingPolicy('half', kelly_fraction=0.5)], n_paths=500, seed=2)['half']
+
+    # f* = 0.25 per runner, two bets of 0.125 × bankroll each
+    assert paths.final_bankroll == pytest.approx(np.full(500, 1000.0 * 1.125 ** n_races))
+    assert (paths.max_drawdown == 0).all()
+
+
+def test_outcome_probabilities_override_model():
+    race_ids, p_model, odds = single_bet_races()
+    simulator = BankrollSimulator(race_ids, p_model, odds, p_outcome=np.tile([0.0, 1.0], 200))
+
+    paths = simulator.run([StakingPolicy('full', kelly_fraction=1.0)], n_paths=100, seed=3)['full']
+
+    assert paths.ruined.all()
+    assert (paths.max_drawdown > 0.99).all()
+
+
+def test_results_independent_of_workers():
+    race_ids, p_model, odds = single_bet_races(50)
+    simulator = BankrollSimulator(race_ids, p_model, odds)
+    policies = [StakingPolicy('third', 1 / 3), StakingPolicy('full', 1.0, max_drawdown_pct=0.3)]
+
+    local = simulator.run(policies, n_paths=3000, seed=4, batch_paths=1000)
+    pooled = simulator.run(policies, n_paths=3000, seed=4, batch_paths=1000, workers=2)
+
+    for name in local:
+        np.testing.assert_array_equal(local[name].final_bankroll, pooled[name].final_bankroll)
+        np.testing.assert_array_equal(local[name].max_drawdown, pooled[name].max_drawdown)
+
+
+def test_stop_losses():
+    race_ids, p_model, odds = single_bet_races()
+    days = np.repeat(np.arange(40), 10)
+    simulator = BankrollSimulator(race_ids, p_model, odds, days=days)
+    policies = [
+        StakingPolicy('drawdown', kelly_fraction=1.0, max_stake_pct=0.05, max_drawdown_pct=0.2),
+        StakingPolicy('one_a_day', kelly_fraction=1.0, max_bets_per_day=1),
+    ]
+
+    results = simulator.run(policies, n_paths=2000, seed=5)
+
+    drawdown = results['drawdown']
+    assert drawdown.stopped.any()
+    assert (drawdown.max_drawdown[drawdown.stopped] < 0.2 + 0.05 + 1e-12).all()
+    assert (drawdown.n_bets[drawdown.stopped] < 200).all()
+    assert (results['one_a_day'].n_bets == 40).all()
+
+
+def test_bet_limit_within_a_race():
+    # Two positive-Kelly runners per race, five races a day
+    n_races = 20
+    simulator = BankrollSimulator(
+        np.repeat(np.arange(n_races), 2), np.full(2 * n_races, 0.5), np.full(2 * n_races, 3.0),
+        days=np.repeat(np.arange(n_races // 5), 10)
+    )
+
+    results = simulator.run([
+        StakingPolicy('one_a_day', kelly_fraction=0.5, max_bets_per_day=1),
+        StakingPolicy('three_a_day', kelly_fraction=0.5, max_bets_per_day=3),
+    ], n_paths=200, seed=7)
+
+    assert (results['one_a_day'].n_bets == 4).all()
+    assert (results['three_a_day'].n_bets == 12).all()
+
+
+def test_policy_from_manager_and_summary():
+    manager = BankrollManager(kelly_fraction=0.25, max_stake_pct=5.0, max_drawdown_pct=25.0)
+    policy = StakingPolicy.from_manager(manager)
+    assert (policy.kelly_fraction, policy.max_stake_pct, policy.max_drawdown_pct) == (0.25, 0.05, 0.25)
+    assert policy.min_stake == 1.0
+
+    race_ids, p_model, odds = single_bet_races(100)
+    results = BankrollSimulator(race_ids, p_model, odds).run([policy], n_paths=500, seed=6)
+    frame = summary_frame(results)
+
+    assert list(frame.index) == ['bankroll_manager']
+    assert 0.0 <= frame.loc['bankroll_manager', 'p_drawdown_0.3'] <= 1.0
+    assert frame.loc['bankroll_manager', 'drawdown_q0.5'] <= frame.loc['bankroll_manager', 'drawdown_q0.99']
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError):
+        BankrollSimulator([0, 0], [0.0, 0.0], [2.0, 2.0])
+
+    simulator = BankrollSimulator(*single_bet_races(5))
+    with pytest.raises(ValueError):
+        simulator.run([StakingPolicy('a'), StakingPolicy('a')])
@@ -310,5 +310,117 @@ class TestReport:
             assert "deltas" in report
 
 
+
+class TestPerformanceGates:
+    """Test latency/throughput metrics and gates"""
+    
+    def test_latency_summary(self):
+        """Test per-stage percentiles over successful races only"""
+        from benchmark.metrics import latency_summary
+        
+        results = [
+            {"status": "success", "timings_ms": {"feature_fetch": float(i), "ranking": 1.0, "total": float(i) + 1}}
+            for i in range(1, 101)
+        ]
+        results.append({"status": "error", "timings_ms": {"feature_fetch": 1000.0}})
+        
+        summary = latency_summary(results)
+        
+        assert summary["feature_fetch"]["samples"] == 100
+        assert summary["feature_fetch"]["p50"] == pytest.approx(50.5)
+        assert summary["feature_fetch"]["max"] == 100.0
+        assert summary["ranking"]["p95"] == 1.0
+        assert "serialization" not in summary
+    
+    def test_p95_and_throughput_regression(self):
+        """Test latency and throughput regressions fail the gate"""
+        from benchmark.tolerances import check_regression
+        
+        baseline = {
+            "coverage_pct": 100.0,
+            "garbage_patterns": {"all_zero_count": 0, "placeholder_count": 0},
+            "latency_ms": {"total": {"p50": 10.0, "p95": 20.0}},
+            "throughput": {"races_per_sec": 100.0, "concurrency": 4}
+        }
+        current = {
+            "coverage_pct": 100.0,
+            "garbage_patterns": {"all_zero_count": 0, "placeholder_count": 0},
+            "latency_ms": {"total": {"p50": 10.5, "p95": 40.0}},
+            "throughput": {"races_per_sec": 50.0, "concurrency": 4}
+        }
+        
+        is_passing, violations = check_regression(current, baseline)
+        
+        assert not is_passing
+        assert len(violations) == 2
+        assert "total p95" in violations[0]
+        assert "Throughput" in violations[1]
+    
+    def test_performance_gates_skip_missing_baseline(self):
+        """Test runs without recorded performance only use the existing gates"""
+        from benchmark.tolerances import check_regression
+        
+        baseline = {"coverage_pct": 100.0, "throughput": {"races_per_sec": 100.0, "concurrency": 1}}
+        current = {
+            "coverage_pct": 100.0,
+            "garbage_patterns": {"all_zero_count": 0, "placeholder_count": 0},
+            "latency_ms": {"total": {"p50": 500.0, "p95": 900.0}},
+            "throughput": {"races_per_sec": 10.0, "concurrency": 8}
+        }
+        
+        is_passing, violations = check_regression(current, baseline)
+        
+        assert is_passing
+        assert len(violations) == 0
+
+
+class TestOfflineRun:
+    """Test the runner against a synthetic fixture database"""
+    
+    def _run(self, tmpdir, concurrency, batch_size):
+        import asyncio
+        from benchmark.fixtures import synthesize_fixture, write_fixture
+        from benchmark.runner import run_benchmark
+        
+        manifest_path = Path(tmpdir) / "manifest.json"
+        fixture_path = Path(tmpdir) / "fixture.json"
+        if not manifest_path.exists():
+            manifest, races = synthesize_fixture(12, seed=3)
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
+            write_fixture(str(fixture_path), races)
+        
+        out_path = Path(tmpdir) / f"run_{concurrency}.json"
+        output = asyncio.run(run_benchmark(
+            str(manifest_path), "2026-01-09", str(out_path),
+            concurrency=concurrency, batch_size=batch_size, fixture_path=str(fixture_path)
+        ))
+        return out_path, output
+    
+    def test_concurrent_run_is_deterministic(self):
+        """Test concurrency changes throughput, not output"""
+        from benchmark.metrics import calculate_hash, calculate_metrics
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            serial_path, serial = self._run(tmpdir, concurrency=1, batch_size=1)
+            concurrent_path, concurrent = self._run(tmpdir, concurrency=4, batch_size=5)
+            
+            assert serial["successes"] == concurrent["successes"] == 12
+            assert [r["race_id"] for r in serial["results"]] == [r["race_id"] for r in concurrent["results"]]
+            assert calculate_hash(str(serial_path)) == calculate_hash(str(concurrent_path))
+            
+            assert concurrent["performance"]["concurrency"] == 4
+            assert serial["performance"]["feature_queries"] == 12
+            assert concurrent["performance"]["feature_queries"] == 3
+            assert concurrent["performance"]["races_per_sec"] > 0
+            assert concurrent["performance"]["peak_rss_mb"] > 0
+            
+            metrics = calculate_metrics(str(concurrent_path))
+            for stage in ("feature_fetch", "ranking", "serialization", "total"):
+                assert metrics["latency_ms"][stage]["samples"] == 12
+            assert metrics["throughput"]["concurrency"] == 4
+            assert metrics["garbage_patterns"]["placeholder_count"] == 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,195 @@
+"""
+Tests for the Betfair blocking index against the pairwise scans in scripts/sync_betfair_markets.py
+"""
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.integrations.betfair_matching import (
+    AliasTable,
+    BetfairMatcher,
+    RunnerIndex,
+    normalize_runner_name,
+    normalize_venue_name,
+    string_similarity,
+)
+
+VENUES = ['Kempton (AW)', 'Kempton', 'Newcastle', 'Newmarket', 'Chelmsford City',
+          'Leopardstown', 'Lingfield', 'Ludlow', 'Wolverhampton', 'Down Royal']
+T0 = datetime(2026, 5, 2, 13, 0)
+
+
+def match_runners_scan(internal_runners, betfair_runners, threshold=0.8):
+    """match_runners before the index"""
+    mapping = {}
+    for internal in internal_runners:
+        internal_name = normalize_runner_name(internal['name'])
+        best_match, best_score = None, 0.0
+        for betfair in betfair_runners:
+            score = string_similarity(internal_name, normalize_runner_name(betfair['runner_name']))
+            if score > best_score:
+                best_score, best_match = score, betfair
+        if best_match and best_score >= threshold:
+            mapping[internal['name']] = best_match['selection_id']
+    return mapping
+
+
+def find_market_scan(race, markets, venue_threshold=0.7, time_tolerance_minutes=15):
+    """sync_race_to_betfair's market scan"""
+    race_time = datetime.fromisoformat(race['off_time'])
+    best, best_score = None, 0.0
+    for i, market in enumerate(markets):
+        venue_score = string_similarity(normalize_venue_name(race['venue']), normalize_venue_name(market['venue']))
+        if venue_score < venue_threshold:
+            continue
+        diff = abs((race_time - datetime.fromisoformat(market['market_start_time'])).total_seconds() / 60)
+        if diff > time_tolerance_minutes:
+            continue
+        combined = venue_score * 0.7 + max(0, 1 - diff / time_tolerance_minutes) * 0.3
+        if combined > best_score:
+            best, best_score = i, combined
+    return best, best_score
+
+
+def random_name(rng):
+    syllables = ['ka', 'ro', 'mi', 'star', 'dan', 'cer', 'lo', 'ver', 'bay', 'sea', 'gold', 'run']
+    name = ' '.join(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3))) for _ in range(rng.randint(1, 2)))
+    return name.title() + rng.choice(['', ' (IRE)', ' (FR)'])
+
+
+def perturb(name, rng):
+    choice = rng.random()
+    if choice < 0.4:
+        return name
+    if choice < 0.6:
+        return name.upper().replace(' (IRE)', '').replace(' (FR)', '')
+    if choice < 0.85 and len(name) > 3:
+        i = rng.randrange(len(name))
+        return name[:i] + name[i + 1:]
+    return random_name(rng)
+
+
+@pytest.fixture
+def day():
+    rng = random.Random(24)
+    markets, races = [], []
+    selection = 1000
+    for m in range(120):
+        runners = []
+        for _ in range(rng.randint(5, 14)):
+            selection += 1
+            runners.append({'runner_name': random_name(rng), 'selection_id': selection})
+        start = T0 + timedelta(minutes=5 * rng.randint(0, 100))
+        markets.append({
+            'market_id': f'1.{m}', 'event_id': m, 'venue': rng.choice(VENUES),
+            'market_start_time': start.isoformat(), 'runners': runners,
+        })
+        if rng.random() < 0.8:
+            races.append({
+                'race_id': m,
+                'venue': markets[-1]['venue'].upper().replace(' (AW)', ''),
+                'off_time': (start + timedelta(minutes=rng.randint(-6, 6))).isoformat(),
+                'runners': [{'name': perturb(r['runner_name'], rng)} for r in runners],
+            })
+    return markets, races
+
+
+def test_market_choice_matches_scan(day):
+    markets, races = day
+    matcher = BetfairMatcher(markets)
+    for race in races:
+        position, score = matcher.find_market(race['venue'], datetime.fromisoformat(race['off_time']))
+        assert (position, score) == find_market_scan(race, markets)
+
+
+def test_runner_matches_agree_with_scan(day):
+    markets, races = day
+    for race in races:
+        runners = markets[race['race_id']]['runners']
+        expected = match_runners_scan(race['runners'], runners)
+        mapping = RunnerIndex(runners).match(race['runners'])
+        # The scan may hand one selection to several names; the index only
+        # differs where an exact match has already taken that selection
+        betfair_names = {normalize_runner_name(b['runner_name']) for b in runners}
+        exact = {r['name'] for r in race['runners'] if normalize_runner_name(r['name']) in betfair_names}
+        taken = {mapping[name] for name in exact}
+        assert set(mapping) <= set(expected)
+        for name, selection_id in expected.items():
+            if name in exact or selection_id not in taken:
+                assert mapping.get(name) == selection_id, name
+
+
+def test_exact_match_not_reused_by_fuzzy():
+    runners = [{'runner_name': 'Sea Star', 'selection_id': 1}, {'runner_name': 'Sea Stars Gold', 'selection_id': 2}]
+    internal = [{'name': 'SEA STAR'}, {'name': 'Sea Starr'}]
+    assert match_runners_scan(internal, runners) == {'SEA STAR': 1, 'Sea Starr': 1}
+    assert RunnerIndex(runners).match(internal, threshold=0.7) == {'SEA STAR': 1, 'Sea Starr': 2}
+
+
+def test_aliases_persist_and_override(tmp_path):
+    path = tmp_path / 'aliases.json'
+    aliases = AliasTable(str(path))
+    runners = [{'runner_name': 'Kamiro Dancer (IRE)', 'selection_id': 7}, {'runner_name': 'Verlo', 'selection_id': 8}]
+
+    # Exact names are not stored; a near-certain fuzzy match is
+    assert RunnerIndex(runners).match([{'name': 'Kamiro Dancer'}], aliases=aliases) == {'Kamiro Dancer': 7}
+    assert len(aliases) == 0
+    assert RunnerIndex(runners).match([{'name': 'Kamiro Dancr'}], aliases=aliases) == {'Kamiro Dancr': 7}
+    aliases.save()
+
+    reloaded = AliasTable(str(path))
+    assert reloaded.get('KAMIRO DANCR') == 7
+    # A confirmed alias wins over fuzzy scoring, as long as the selection runs
+    reloaded.confirm('Kamyro Dancer', 8)
+    assert RunnerIndex(runners).match([{'name': 'Kamyro Dancer'}], aliases=reloaded) == {'Kamyro Dancer': 8}
+    assert RunnerIndex(runners[:1]).match([{'name': 'Kamyro Dancer'}], aliases=reloaded) == {'Kamyro Dancer': 7}
+    assert reloaded.get('Kamyro Dancer') == 8
+
+
+def test_fuzzy_matches_not_confirmed_and_exact_beats_alias():
+    aliases = AliasTable()
+    runners = [{'runner_name': 'Sea Star', 'selection_id': 1}, {'runner_name': 'Gold Run', 'selection_id': 2}]
+
+    # Below the auto-confirm ratio: matched, but not remembered
+    assert RunnerIndex(runners).match([{'name': 'Sea Starr'}], aliases=aliases) == {'Sea Starr': 1}
+    assert aliases.get('Sea Starr') is None
+
+    # A stale alias must not override a runner whose name matches exactly
+    aliases.confirm('Gold Run', 1)
+    assert RunnerIndex(runners).match([{'name': 'GOLD RUN'}, {'name': 'Sea Star'}], aliases=aliases) == {
+        'GOLD RUN': 2, 'Sea Star': 1}
+    assert aliases.get('Gold Run') == 2
+
+
+def test_confident_fuzzy_match_resyncs_without_scoring(monkeypatch):
+    aliases = AliasTable()
+    runners = [{'runner_name': 'Golden Star Runner', 'selection_id': 1}, {'runner_name': 'Verlo', 'selection_id': 2}]
+    assert RunnerIndex(runners).match([{'name': 'Golden Star Runnr'}], aliases=aliases) == {'Golden Star Runnr': 1}
+
+    def no_scoring(*args, **kwargs):
+        raise AssertionError("re-sync should come from the alias table")
+
+    monkeypatch.setattr(RunnerIndex, 'best_fuzzy', no_scoring)
+    assert RunnerIndex(runners).match([{'name': 'Golden Star Runnr'}], aliases=aliases) == {'Golden Star Runnr': 1}
+
+
+def test_ambiguous_fuzzy_match_not_confirmed():
+    aliases = AliasTable()
+    runners = [{'runner_name': 'Seastarx', 'selection_id': 1}, {'runner_name': 'Seastary', 'selection_id': 2}]
+
+    assert RunnerIndex(runners).match([{'name': 'Seastar'}], aliases=aliases, confirm_ratio=0.9) == {'Seastar': 1}
+    assert aliases.get('Seastar') is None
+
+
+def test_sync_race_output(day):
+    markets, races = day
+    race = races[0]
+    mapping = BetfairMatcher(markets).sync_race(race)
+    market = markets[find_market_scan(race, markets)[0]]
+
+    assert mapping['market_id'] == market['market_id']
+    assert mapping['total_runners'] == len(race['runners'])
+    assert mapping['matched_runners'] == len(mapping['runner_mappings'])
+    assert BetfairMatcher(markets).sync_race({**race, 'venue': 'Nowhere'}) is None
@@ -0,0 +1,198 @@
+"""
+Tests for the async market book poller against the SIM Betfair backend
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.integrations.betfair_client import BetfairMode, create_betfair_client
+from app.integrations.betfair_poller import MarketBookCache, MarketBookPoller
+
+T0 = datetime(2026, 6, 20, 14, 0, 0)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeClock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def client():
+    client = create_betfair_client(mode=BetfairMode.SIM)
+    client.login()
+    client.calls = []
+    get_market_book = client.get_market_book
+
+    def recording(market_ids):
+        client.calls.append(list(market_ids))
+        return get_market_book(market_ids)
+
+    client.get_market_book = recording
+    return client
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_poller(client, clock, **kwargs):
+    return MarketBookPoller(client, clock=clock, tick_seconds=0.01, **kwargs)
+
+
+def test_batches_respect_request_weight(client, clock):
+    poller = make_poller(client, clock)
+    for i in range(100):
+        poller.track(f"1.{i}", T0 + timedelta(minutes=30))
+
+    fetched = run(poller.poll_once())
+    poller.close()
+
+    assert fetched == 100
+    assert sorted(len(call) for call in client.calls) == [20, 40, 40]
+    assert len(poller.cache) == 100
+    assert poller.cache.get("1.42")['status'] == 'OPEN'
+
+
+def test_concurrent_requests_coalesce(client, clock):
+    poller = make_poller(client, clock)
+
+    async def scenario():
+        return await asyncio.gather(*[poller.request("1.1") for _ in range(10)], poller.request("1.2"))
+
+    books = run(scenario())
+    poller.close()
+
+    assert client.calls == [["1.1", "1.2"]]
+    assert all(book is books[0] for book in books[:10])
+    assert poller.cache.get("1.2") is books[10]
+
+
+def test_request_uses_fresh_cache(client, clock):
+    poller = make_poller(client, clock)
+
+    async def scenario():
+        first = await poller.request("1.1")
+        clock.advance(2)
+        cached = await poller.request("1.1", max_age_seconds=5)
+        clock.advance(10)
+        refreshed = await poller.request("1.1", max_age_seconds=5)
+        return first, cached, refreshed
+
+    first, cached, refreshed = run(scenario())
+    poller.close()
+
+    assert cached is first
+    assert refreshed is not first
+    assert len(client.calls) == 2
+    assert poller.cache.entry("1.1").polls == 2
+
+
+def test_schedule_tightens_near_the_off(client, clock):
+    poller = make_poller(client, clock)
+    poller.track("far", T0 + timedelta(hours=2))
+    poller.track("near", T0 + timedelta(minutes=3))
+    poller.track("gone", T0 - timedelta(minutes=30))
+
+    async def scenario():
+        due = []
+        for _ in range(61):
+            await poller.poll_once()
+            due.append(sorted(m for call in client.calls for m in call))
+            client.calls.clear()
+            clock.advance(1)
+        return due
+
+    due = run(scenario())
+    poller.close()
+
+    assert due[0] == ["far", "near"]
+    # 3 minutes out: every 2 s; 2 hours out: every 60 s
+    assert sum("near" in tick for tick in due) == 31
+    assert sum("far" in tick for tick in due) == 2
+    assert poller.tracked == ["far", "near"]
+    assert poller.poll_interval(0.5) == 1.0 and poller.poll_interval(90) == 60.0
+
+
+def test_closed_markets_stop_polling(client, clock):
+    poller = make_poller(client, clock)
+    poller.track("1.1", T0 + timedelta(minutes=2))
+    sim_book = client.get_market_book
+
+    def closed(market_ids):
+        books = sim_book(market_ids)
+        for book in books.values():
+            book['status'] = 'CLOSED'
+        return books
+
+    client.get_market_book = closed
+    run(poller.poll_once())
+    poller.close()
+
+    assert poller.tracked == []
+    assert poller.cache.get("1.1")['status'] == 'CLOSED'
+
+
+def test_run_until_idle_and_cache_age(client, clock):
+    cache = MarketBookCache(clock)
+    poller = make_poller(client, clock, cache=cache, stop_after_off_minutes=0)
+    poller.track_markets(client.list_markets_for_day(T0, ["GB"], ["WIN"]))
+
+    async def scenario():
+        task = asyncio.ensure_future(poller.run(stop_when_idle=True))
+        await asyncio.sleep(0.05)
+        clock.advance(24 * 3600)
+        await asyncio.wait_for(task, 1)
+
+    run(scenario())
+    poller.close()
+
+    assert len(cache) == 5
+    assert cache.age_seconds("1.200000000") == 24 * 3600
+    assert cache.get_many(["1.200000000", "missing"], max_age_seconds=60) == {}
+    assert set(cache.get_many(["1.200000000", "missing"])) == {"1.200000000"}
+
+
+def test_cancelled_fetch_releases_markets(client, clock):
+    poller = make_poller(client, clock)
+    poller.track("1.1", T0 + timedelta(minutes=30))
+    sim_book = client.get_market_book
+
+    def slow(market_ids):
+        time.sleep(0.2)
+        return sim_book(market_ids)
+
+    async def scenario():
+        client.get_market_book = slow
+        task = asyncio.ensure_future(poller.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert poller._in_flight == {}
+
+        client.get_market_book = sim_book
+        clock.advance(60)
+        fetched = await poller.poll_once()
+        book = await asyncio.wait_for(poller.request("1.1"), 1)
+        return fetched, book
+
+    fetched, book = run(scenario())
+    poller.close()
+
+    assert fetched == 1
+    assert book['status'] == 'OPEN'
+    assert poller.tracked == ["1.1"]
@@ -0,0 +1,170 @@
+"""Tests for bulk race/runner ingestion in the ingestion spine DatabaseClient"""
+
+import itertools
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from workers.ingestion_spine.db import DatabaseClient
+
+
+class FakeQuery:
+    """Minimal PostgREST query builder recording executed operations"""
+
+    def __init__(self, store, table):
+        self.store = store
+        self.table = table
+        self.op = None
+        self.payload = None
+        self.filters = []
+
+    def insert(self, payload):
+        self.op, self.payload = "insert", payload
+        return self
+
+    def select(self, columns):
+        self.op = "select"
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def _matches(self, row):
+        return all(f(row) for f in self.filters)
+
+    def execute(self):
+        rows = self.store.tables.setdefault(self.table, [])
+        self.store.calls.append((self.table, self.op))
+
+        if self.op == "insert":
+            if self.table in self.store.fail_tables:
+                raise RuntimeError(f"insert into {self.table} failed")
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = [{**row, "id": f"{self.table}-{next(self.store.ids)}"} for row in payload]
+            rows.extend(inserted)
+            return SimpleNamespace(data=inserted)
+
+        matched = [row for row in rows if self._matches(row)]
+        if self.op == "delete":
+            self.store.tables[self.table] = [row for row in rows if not self._matches(row)]
+        return SimpleNamespace(data=matched)
+
+
+class FakeSupabase:
+    def __init__(self, fail_tables=()):
+        self.tables = {}
+        self.calls = []
+        self.ids = itertools.count(1)
+        self.fail_tables = set(fail_tables)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def make_db(fake):
+    db = DatabaseClient.__new__(DatabaseClient)
+    db.client = fake
+    return db
+
+
+def make_races(n):
+    return [
+        {"course": "Ascot", "off_time": f"14:{i:02d}", "join_key": f"2026-01-04|Ascot|14:{i:02d}"}
+        for i in range(n)
+    ]
+
+
+class TestBulkIngestion:
+    @pytest.mark.asyncio
+    async def test_races_inserted_in_chunks_and_mapped_by_join_key(self):
+        fake = FakeSupabase()
+        db = make_db(fake)
+        races = make_races(7)
+
+        race_ids = await db.insert_races_bulk("batch-1", date(2026, 1, 4), races, chunk_size=3)
+
+        assert fake.calls.count(("races", "insert")) == 3
+        assert set(race_ids) == {race["join_key"] for race in races}
+        stored = {row["join_key"]: row["id"] for row in fake.tables["races"]}
+        assert race_ids == stored
+
+    @pytest.mark.asyncio
+    async def test_runner_rows_match_single_insert_payload(self):
+        fake = FakeSupabase()
+        db = make_db(fake)
+        runner = {"horse_name": "Test Horse", "jockey": "J. Smith", "or_rating": 80}
+
+        ids = await db.insert_runners_bulk([("race-1", runner), ("race-2", runner)], chunk_size=10)
+
+        assert len(ids) == 2
+        assert fake.calls == [("racecards", "insert")]
+        assert fake.tables["racecards"][0]["horse"] == "Test Horse"
+        assert fake.tables["racecards"][0]["official_rating"] == 80
+        assert {k for k in fake.tables["racecards"][0] if k != "id"} == set(
+            DatabaseClient._runner_row("race-1", runner)
+        )
+
+    @pytest.mark.asyncio
+    async def test_rollback_removes_races_and_runners_for_batch(self):
+        fake = FakeSupabase()
+        db = make_db(fake)
+        inserted = []
+        race_ids = await db.insert_races_bulk(
+            "batch-1", date(2026, 1, 4), make_races(4), chunk_size=2, inserted_ids=inserted
+        )
+        await db.insert_runners_bulk([(race_id, {"horse_name": "H"}) for race_id in race_ids.values()])
+
+        removed = await db.rollback_batch_rows("batch-1", inserted)
+
+        assert inserted == list(race_ids.values())
+        assert removed == 4
+        assert fake.tables["races"] == []
+        assert fake.tables["racecards"] == []
+
+    @pytest.mark.asyncio
+    async def test_rollback_keeps_rows_from_earlier_parse(self):
+        fake = FakeSupabase()
+        db = make_db(fake)
+        first = await db.insert_races_bulk("batch-1", date(2026, 1, 4), make_races(3))
+        await db.insert_runners_bulk([(race_id, {"horse_name": "H"}) for race_id in first.values()])
+
+        # Re-parse of the same batch fails after its races are written
+        inserted = []
+        await db.insert_races_bulk("batch-1", date(2026, 1, 4), make_races(3), inserted_ids=inserted)
+        fake.fail_tables.add("racecards")
+        with pytest.raises(RuntimeError):
+            await db.insert_runners_bulk([(race_id, {"horse_name": "H"}) for race_id in inserted])
+
+        removed = await db.rollback_batch_rows("batch-1", inserted)
+
+        assert removed == 3
+        assert [row["id"] for row in fake.tables["races"]] == list(first.values())
+        assert len(fake.tables["racecards"]) == 3
+
+    @pytest.mark.asyncio
+    async def test_inserted_ids_count_repeated_join_keys(self):
+        db = make_db(FakeSupabase())
+        races = make_races(2) + make_races(2)
+        inserted = []
+
+        race_ids = await db.insert_races_bulk("batch-1", date(2026, 1, 4), races, inserted_ids=inserted)
+
+        assert len(race_ids) == 2
+        assert len(inserted) == 4
+
+    @pytest.mark.asyncio
+    async def test_rejects_non_positive_chunk_size(self):
+        db = make_db(FakeSupabase())
+
+        with pytest.raises(ValueError):
+            await db.insert_races_bulk("batch-1", date(2026, 1, 4), make_races(1), chunk_size=0)
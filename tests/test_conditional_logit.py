@@ -0,0 +1,146 @@
+"""
+Tests for the segment-based conditional logit engine (src/models/conditional_logit.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import log_loss
+
+from src.models import BenterModel
+from src.models.conditional_logit import ConditionalLogit, RaceSegments, grid_log_loss
+from src.modules.contracts import Odds, Racecard, Runner
+
+
+def _race_frame(n_races=200, seed=3):
+    rng = np.random.default_rng(seed)
+    sizes = rng.integers(3, 12, size=n_races)
+    race = np.repeat(np.arange(n_races), sizes)
+    df = pd.DataFrame({
+        'date': '2024-05-01',
+        'course': np.where(race % 2, 'Ascot', 'York'),
+        'race_id': race,
+        'rating_avg': rng.normal(80, 15, size=len(race)),
+        'p_public': rng.uniform(0.02, 0.5, size=len(race)),
+    })
+    first = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    df['is_winner'] = 0
+    df.loc[first + rng.integers(0, sizes), 'is_winner'] = 1
+    # Shuffle so races are not contiguous
+    return df.sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+
+def test_segment_softmax_and_normalize_match_groupby():
+    df = _race_frame()
+    segments = RaceSegments.from_keys(df[['date', 'course', 'race_id']])
+    keys = ['date', 'course', 'race_id']
+
+    expected_softmax = df.groupby(keys)['rating_avg'].transform(
+        lambda x: np.exp(x / 20.0) / np.exp(x / 20.0).sum()
+    )
+    expected_norm = df.groupby(keys)['p_public'].transform(lambda x: x / x.sum())
+
+    np.testing.assert_allclose(segments.softmax(df['rating_avg'] / 20.0), expected_softmax, rtol=1e-12)
+    np.testing.assert_allclose(segments.normalize(df['p_public']), expected_norm, rtol=1e-12)
+
+
+def test_grid_binary_loss_matches_per_cell_evaluation():
+    df = _race_frame()
+    keys = ['date', 'course', 'race_id']
+    segments = RaceSegments.from_keys(df[keys])
+    df['p_fundamental'] = segments.softmax(df['rating_avg'] / 20.0)
+    df['p_public_norm'] = segments.normalize(df['p_public'])
+
+    alphas = np.array([0.5, 1.0, 1.5])
+    betas = np.array([0.6, 1.1])
+    losses = grid_log_loss(
+        segments, df['p_fundamental'], df['p_public_norm'], df['is_winner'] == 1,
+        alphas, betas, loss='binary', block_elements=500
+    )
+
+    for i, alpha in enumerate(alphas):
+        for j, beta in enumerate(betas):
+            raw = alpha * df['p_fundamental'] + beta * df['p_public_norm']
+            p = raw / raw.groupby([df[k] for k in keys]).transform('sum')
+            expected = log_loss(df['is_winner'], np.clip(p, 1e-15, 1 - 1e-15))
+            assert losses[i, j] == pytest.approx(expected, rel=1e-10)
+
+
+def _historical_races(n_races=40, seed=5):
+    rng = np.random.default_rng(seed)
+    races = []
+    for r in range(n_races):
+        size = int(rng.integers(3, 9))
+        runners = [
+            Runner(
+                number=i + 1, name=f"R{r}H{i}",
+                or_rating=int(rng.integers(40, 110)), rpr=int(rng.integers(40, 120)),
+                last6=list(rng.choice(['1', '2', '5', '0'], size=4)),
+            )
+            for i in range(size)
+        ]
+        odds_book = {
+            runner.name: Odds(win=float(rng.uniform(1.5, 30)))
+            for runner in runners
+            if rng.random() > 0.1  # some runners unpriced
+        }
+        winner = runners[int(rng.integers(size))].name
+        races.append((Racecard(date='2024-05-01', course='Ascot', time='14:00', runners=runners), odds_book, winner))
+    return races
+
+
+def _legacy_calibrate(model, races, alphas, betas):
+    best = (model.alpha, model.beta, float('inf'))
+    for alpha in alphas:
+        for beta in betas:
+            model.alpha, model.beta = alpha, beta
+            losses = [
+                -np.log(max(probs[winner], 1e-10))
+                for racecard, odds_book, winner in races
+                for probs in [model.estimate_race(racecard, odds_book)]
+                if winner in probs
+            ]
+            loss = np.mean(losses) if losses else float('inf')
+            if loss < best[2]:
+                best = (alpha, beta, loss)
+    return best
+
+
+def test_benter_calibrate_matches_nested_loop():
+    races = _historical_races()
+    expected = _legacy_calibrate(BenterModel(0.9, 1.1), races, np.linspace(0.5, 1.5, 6), np.linspace(0.5, 1.5, 6))
+
+    model = BenterModel(0.9, 1.1)
+    alpha, beta = model.calibrate(races, steps=6)
+
+    assert (alpha, beta) == pytest.approx(expected[:2])
+    assert (model.alpha, model.beta) == (alpha, beta)
+
+
+def test_conditional_logit_recovers_coefficients():
+    rng = np.random.default_rng(0)
+    sizes = rng.integers(4, 14, size=5000)
+    segments = RaceSegments.from_sizes(sizes)
+    X = rng.normal(size=(segments.n_runners, 2))
+    theta = np.array([0.8, 1.3])
+
+    p = segments.softmax(X @ theta)
+    cum = np.cumsum(p)
+    draws = rng.random(segments.n_races)
+    # Sample one winner per race from its softmax
+    start_mass = np.concatenate([[0.0], cum])[segments.starts]
+    winner_pos = np.searchsorted(cum, start_mass + draws * segments.sum(p), side='right')
+    winner_pos = np.minimum(winner_pos, segments.offsets[1:] - 1)
+    winners = np.zeros(segments.n_runners, dtype=bool)
+    winners[winner_pos] = True
+
+    model = ConditionalLogit().fit(segments, X, winners)
+
+    np.testing.assert_allclose(model.coef_, theta, atol=0.1)
+    probs = model.predict_proba(segments, X)
+    np.testing.assert_allclose(segments.sum(probs), 1.0)
+
+
+def test_empty_race_segment_rejected():
+    with pytest.raises(ValueError):
+        RaceSegments.from_sizes([3, 0, 2])
@@ -17,7 +17,11 @@ from pathlib import Path
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.engine.features import get_features_for_racecard, build_feature_mart_for_batch
+from app.engine.features import (
+    get_features_for_racecard,
+    get_features_for_racecards,
+    build_feature_mart_for_batch,
+)
 
 
 @pytest.fixture
@@ -294,6 +298,56 @@ async def test_build_feature_mart_for_batch():
     print("✅ Build feature mart test passed")
 
 
+@pytest.mark.asyncio
+async def test_batched_racecards_match_single_race_fetch(mock_db_asyncpg):
+    """
+    Multi-race fetch: one ANY($1) query per batch, same features per race
+    """
+    single_rows = mock_db_asyncpg.fetch.return_value
+    df_single = await get_features_for_racecard(mock_db_asyncpg, 'race-b', as_of_date='2026-01-07')
+    
+    # Rows come back ordered by race_id; request order is race-b, race-a, race-c
+    db = AsyncMock()
+    db.fetch = AsyncMock(return_value=[
+        dict(single_rows[0], race_id='race-a', runner_id='a-1'),
+        dict(single_rows[0], race_id='race-b'),
+        dict(single_rows[1], race_id='race-b'),
+    ])
+    
+    batch = await get_features_for_racecards(db, ['race-b', 'race-a', 'race-c', 'race-b'], as_of_date=date(2026, 1, 7))
+    
+    assert db.fetch.call_count == 1
+    query, race_ids, as_of = db.fetch.call_args[0]
+    assert 'ANY($1)' in query
+    assert race_ids == ['race-b', 'race-a', 'race-c']
+    assert as_of == '2026-01-07'
+    
+    assert batch.race_ids == ['race-b', 'race-a', 'race-c']
+    assert batch.offsets.tolist() == [0, 2, 3, 3]
+    assert batch.frame['race_id'].tolist() == ['race-b', 'race-b', 'race-a']
+    pd.testing.assert_frame_equal(batch.race('race-b'), df_single)
+    assert batch.race('race-c').empty
+    assert [race_id for race_id, _ in batch] == batch.race_ids
+
+
+@pytest.mark.asyncio
+async def test_batched_racecards_chunk_queries():
+    """
+    Large race lists are split into batch_size races per query
+    """
+    db = AsyncMock()
+    db.fetch = AsyncMock(return_value=[])
+    
+    batch = await get_features_for_racecards(db, [f"race-{i}" for i in range(2000)], '2026-01-07', batch_size=500)
+    
+    assert db.fetch.call_count == 4
+    assert len(batch) == 2000
+    assert batch.runner_counts.sum() == 0
+    
+    with pytest.raises(ValueError):
+        await get_features_for_racecards(db, ['race-1'], as_of_date=None)
+
+
 def test_feature_column_schema():
     """
     Verify that we have all expected feature columns
@@ -0,0 +1,171 @@
+"""
+Tests for the incremental feature cache (src/features/cache.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import FeatureCache
+
+
+def _make_history(n_rows=3000, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 400, n_rows), unit='D'),
+        'race_id': rng.integers(0, 800, n_rows),
+        'horse': [f"Horse {i}" for i in rng.integers(0, 250, n_rows)],
+        'trainer': rng.choice(['T1', 'T2', 'T3', 'T4', None], n_rows),
+        'jockey': rng.choice(['J1', 'J2', 'J3'], n_rows),
+        'course': rng.choice(['Ascot', 'York', 'Kempton'], n_rows),
+        'going': rng.choice(['Good', 'Soft', 'Firm'], n_rows),
+        'class': rng.choice([1.0, 4.0, 6.0], n_rows),
+        'pos_int': rng.choice([1.0, 2.0, 3.0, 5.0, 9.0, np.nan], n_rows),
+    })
+    # One run per horse per day keeps "last 5 runs" unambiguous
+    return df.drop_duplicates(['horse', 'date']).sort_values('date', kind='stable').reset_index(drop=True)
+
+
+@pytest.fixture
+def history():
+    return _make_history()
+
+
+def _reference_form(history, horse, cutoff):
+    runs = history[(history['horse'] == horse) & (history['date'] < cutoff)]
+    positions = runs['pos_int'].fillna(0).to_numpy()[-5:]
+    return {
+        'last_pos': positions[-1],
+        'avg_pos_3': positions[-3:].mean() if len(positions) >= 3 else 0.0,
+        'avg_pos_5': positions.mean(),
+        'wins_5': (positions == 1).sum(),
+    }
+
+
+def _assert_same_state(a, b):
+    assert a.cache_date == b.cache_date
+    for name in ('trainer_stats', 'course_stats', 'going_stats', 'class_stats', 'form_stats'):
+        assert dict(getattr(a, name)) == dict(getattr(b, name)), name
+    assert dict(a.jockey_stats['combos']) == dict(b.jockey_stats['combos'])
+
+
+def test_build_matches_groupby(history):
+    cutoff = '2023-10-01'
+    cache = FeatureCache()
+    cache.build_from_history(history, date=cutoff)
+
+    before = history[history['date'] < cutoff]
+    expected = before.dropna(subset=['trainer']).groupby('trainer')['pos_int'].agg(
+        wins=lambda x: (x == 1).sum(), runs='size'
+    )
+    for trainer, row in expected.iterrows():
+        stats = cache.get_trainer_stats(trainer)
+        assert (stats['wins'], stats['runs']) == (row['wins'], row['runs'])
+
+    recent = before[before['date'] >= pd.Timestamp(cutoff) - pd.Timedelta(days=90)]
+    assert cache.get_trainer_stats('T1')['recent_runs'] == (recent['trainer'] == 'T1').sum()
+
+    combo = before[(before['jockey'] == 'J2') & (before['trainer'] == 'T3')]
+    assert cache.get_jockey_trainer_stats('J2', 'T3')['runs'] == len(combo)
+
+    horse = before['horse'].iloc[-1]
+    course_runs = before[(before['horse'] == horse) & (before['course'] == 'York')]
+    assert cache.get_course_stats(horse, 'York')['runs'] == len(course_runs)
+    assert cache.get_class_stats(horse, 4)['runs'] == ((before['horse'] == horse) & (before['class'] == 4)).sum()
+
+    for horse in before['horse'].unique()[:40]:
+        stats = cache.form_stats[horse]
+        for key, value in _reference_form(history, horse, cutoff).items():
+            assert stats[key] == pytest.approx(value)
+
+    assert cache.get_trainer_stats('Nobody')['runs'] == 0
+    assert 'Nobody' not in cache.form_stats
+
+
+def test_daily_advance_matches_full_build(history):
+    start, cutoff = pd.Timestamp('2023-09-01'), pd.Timestamp('2023-12-01')
+
+    incremental = FeatureCache()
+    incremental.build_from_history(history, date=start)
+    days = history[(history['date'] >= start) & (history['date'] < cutoff)]
+    for date, day in days.groupby('date'):
+        incremental.advance(day, as_of=date + pd.Timedelta(days=1))
+    incremental.advance(days.iloc[:0], as_of=cutoff)
+
+    full = FeatureCache()
+    full.build_from_history(history, date=cutoff)
+
+    _assert_same_state(incremental, full)
+
+
+def test_advance_rejects_leakage_and_late_results(history):
+    cache = FeatureCache()
+    cache.build_from_history(history, date='2023-06-01')
+
+    with pytest.raises(ValueError):
+        cache.advance(history[history['date'] == '2023-06-10'], as_of='2023-06-05')
+    with pytest.raises(ValueError):
+        cache.advance(history[history['date'] == '2023-03-01'], as_of='2023-06-02')
+    # Results of the as-of day itself would leak into that day's races
+    same_day = history[history['date'] == history.loc[history['date'] >= '2023-06-01', 'date'].min()]
+    with pytest.raises(ValueError):
+        cache.advance(same_day, as_of=same_day['date'].iloc[0])
+
+
+def test_default_cutoff_is_day_after_latest_result(history):
+    cache = FeatureCache()
+    cache.build_from_history(history)
+    latest = history['date'].max()
+    assert cache.cache_date == latest + pd.Timedelta(days=1)
+
+    expected = FeatureCache()
+    expected.build_from_history(history, date=latest + pd.Timedelta(days=1))
+    _assert_same_state(cache, expected)
+
+    empty = FeatureCache()
+    empty.build_from_history(history.iloc[:0])
+    assert empty.cache_date is None
+    assert empty.get_trainer_stats('T1')['runs'] == 0
+
+
+def test_walk_forward_and_snapshot(history):
+    dates = ['2023-04-01', '2023-08-15', '2024-01-20']
+    snapshots = {}
+    for date, cache in FeatureCache().walk_forward(history, dates):
+        snapshots[date] = cache.snapshot()
+
+    for date in dates:
+        expected = FeatureCache()
+        expected.build_from_history(history, date=date)
+        _assert_same_state(snapshots[pd.Timestamp(date)], expected)
+
+
+def test_memory_mapped_snapshot_round_trip(history, tmp_path):
+    cache = FeatureCache()
+    cache.build_from_history(history, date='2023-11-01')
+    cache.save(tmp_path / "cache")
+
+    shared = FeatureCache().load(tmp_path / "cache")
+    assert shared.cache_date == cache.cache_date == pd.Timestamp('2023-11-01')
+    assert not shared._tables['trainer'].runs.flags.writeable
+    _assert_same_state(shared, cache)
+
+    # A loaded snapshot keeps advancing (arrays are copied on first write)
+    day = history[history['date'] == history.loc[history['date'] >= '2023-11-01', 'date'].min()]
+    for state in (shared, cache):
+        state.advance(day, as_of='2023-11-20')
+    _assert_same_state(shared, cache)
+
+
+def test_form_features_align_with_form_stats(history):
+    cache = FeatureCache()
+    cache.build_from_history(history, date='2023-12-01')
+    horses = pd.Series(list(history['horse'].unique()[:30]) + ['Unraced'], index=np.arange(31) + 100)
+
+    features = cache.form_features(horses)
+
+    assert list(features.index) == list(horses.index)
+    for idx, horse in horses.items():
+        stats = cache.form_stats.get(horse, {})
+        assert features.loc[idx, 'form_avg_pos_5'] == pytest.approx(stats.get('avg_pos_5', 0.0))
+        assert features.loc[idx, 'form_places_3'] == stats.get('places_3', 0)
@@ -0,0 +1,251 @@
+"""
+Tests for the incremental feature mart backfill (workers/ingestion_spine/feature_mart.py)
+
+The reference below recomputes each as_of_date from scratch the way
+build_feature_mart (migration 005) does, with NUMERIC-style Decimal rounding.
+"""
+
+import sqlite3
+import statistics
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from workers.ingestion_spine.feature_mart import (
+    CONFLICT_KEYS,
+    SQLITE_FEATURE_MART_SCHEMA,
+    TABLE_COLUMNS,
+    backfill_feature_mart,
+    distance_band,
+    fetch_feature_mart_source_supabase,
+    source_date_range,
+    upsert_statement,
+    write_feature_mart_dbapi,
+)
+
+
+def _make_source(n_races=600, seed=5):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for race in range(n_races):
+        # Gaps in the calendar: not every day has racing
+        day = date(2024, 1, 1) + timedelta(days=int(rng.integers(0, 500)))
+        course = rng.choice(['Ascot', 'York', 'Kempton', None], p=[0.4, 0.3, 0.25, 0.05])
+        distance = rng.choice(['1000', '1400m', '1800', '2200m 1f', '3000', 'about 2m'])
+        race_type = rng.choice(['Flat', 'Hurdle', None])
+        n_runners = int(rng.integers(3, 9))
+        positions = [str(p) for p in rng.permutation(n_runners) + 1]
+        for runner in range(n_runners):
+            rows.append({
+                'import_date': day,
+                'race_id': f"race-{race}",
+                'course': course,
+                'distance': distance,
+                'race_type': race_type,
+                'trainer': rng.choice(['T1', 'T2', 'T3', 'T4', 'T5', None]),
+                'jockey': rng.choice(['J1', 'J2', 'J3', 'J4', None]),
+                'position': positions[runner] if rng.random() > 0.1 else None,
+                'odds': float(rng.choice([0.0, 1.5, 2.25, 3.35, 4.5, 7.0, 12.5, 33.0])),
+            })
+    return pd.DataFrame(rows)
+
+
+def _round(value, places):
+    return float(Decimal(value).quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP))
+
+
+def _reference_runner_stats(window, keys, window_days, as_of, min_starts):
+    rows = []
+    for entity, group in window.dropna(subset=list(keys)).groupby(list(keys)):
+        starts = len(group)
+        if starts < min_starts:
+            continue
+        wins = int((group['position'] == '1').sum())
+        places = int(group['position'].isin(['1', '2', '3']).sum())
+        odds = [Decimal(str(o)) for o in group['odds']]
+        entity = entity if isinstance(entity, tuple) else (entity,)
+        rows.append({
+            'as_of_date': as_of, 'window_days': window_days, **dict(zip(keys, entity)),
+            'starts': starts, 'wins': wins, 'places': places,
+            'win_pct': _round(Decimal(wins) / starts, 4),
+            'place_pct': _round(Decimal(places) / starts, 4),
+            'avg_odds': _round(sum(odds) / starts, 2),
+            'last_run_date': group['import_date'].max(),
+        })
+    return rows
+
+
+def _reference(source, start, end):
+    tables = {name: [] for name in TABLE_COLUMNS}
+    as_of = start
+    while as_of <= end:
+        def window(days, as_of=as_of):
+            lo = as_of - timedelta(days=days)
+            return source[(source['import_date'] >= lo) & (source['import_date'] < as_of)]
+
+        for days in (14, 30, 90):
+            tables['trainer_stats_window'] += _reference_runner_stats(window(days), ('trainer',), days, as_of, 1)
+            tables['jockey_stats_window'] += _reference_runner_stats(window(days), ('jockey',), days, as_of, 1)
+        tables['jt_combo_stats_window'] += _reference_runner_stats(
+            window(365), ('jockey', 'trainer'), 365, as_of, 3)
+
+        course = window(1095).dropna(subset=['course']).copy()
+        course['distance_band'] = distance_band(course['distance'])
+        course['surface'] = course['race_type'].fillna('Flat')
+        for (name, band, surface), group in course.groupby(['course', 'distance_band', 'surface']):
+            races = group['race_id'].nunique()
+            if races < 5:
+                continue
+            winning = [Decimal(str(o)) for o in group.loc[group['position'] == '1', 'odds']]
+            tables['course_distance_stats_window'].append({
+                'as_of_date': as_of, 'window_days': 1095,
+                'course': name, 'distance_band': band, 'surface': surface, 'races': races,
+                'avg_winning_odds': _round(sum(winning) / len(winning), 2) if winning else np.nan,
+                'odds_volatility': _round(statistics.stdev(winning), 2) if len(winning) >= 2 else np.nan,
+            })
+        as_of += timedelta(days=1)
+    return {name: pd.DataFrame(rows, columns=TABLE_COLUMNS[name]) for name, rows in tables.items()}
+
+
+def _sorted(frame, name):
+    return frame.sort_values(list(CONFLICT_KEYS[name])).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def source():
+    return _make_source()
+
+
+def test_backfill_matches_per_date_rebuild(source):
+    start, end = date(2025, 1, 1), date(2025, 1, 20)
+    lo, hi = source_date_range(start, end)
+    window = source[(source['import_date'] >= lo) & (source['import_date'] < hi)]
+
+    tables = backfill_feature_mart(window, start, end)
+    expected = _reference(source, start, end)
+
+    for name in TABLE_COLUMNS:
+        assert list(tables[name].columns) == TABLE_COLUMNS[name]
+        assert len(tables[name]) > 0, name
+        pd.testing.assert_frame_equal(
+            _sorted(tables[name], name), _sorted(expected[name], name),
+            check_dtype=False, obj=name,
+        )
+
+
+def test_single_date_and_shuffled_source(source):
+    as_of = date(2024, 9, 3)
+    shuffled = source.sample(frac=1.0, random_state=3)
+
+    tables = backfill_feature_mart(shuffled, as_of, as_of)
+    expected = _reference(source, as_of, as_of)
+
+    for name in TABLE_COLUMNS:
+        pd.testing.assert_frame_equal(
+            _sorted(tables[name], name), _sorted(expected[name], name),
+            check_dtype=False, obj=name,
+        )
+
+
+def test_rounding_is_half_away_from_zero():
+    day = date(2025, 3, 1)
+    source = pd.DataFrame({
+        'import_date': [day] * 8,
+        'race_id': [f"r{i}" for i in range(8)],
+        'course': ['York'] * 8,
+        'distance': ['1000'] * 8,
+        'race_type': ['Flat'] * 8,
+        'trainer': ['T1'] * 8,
+        'jockey': ['J1'] * 8,
+        'position': ['1', '1', '2', '4', '5', '6', '7', '8'],
+        'odds': [1.0, 1.01, 2.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+    })
+    tables = backfill_feature_mart(source, day + timedelta(days=1), day + timedelta(days=1))
+
+    trainer = tables['trainer_stats_window'].iloc[0]
+    assert trainer['win_pct'] == 0.25
+    assert trainer['place_pct'] == 0.375
+    # 14.01 / 8 = 1.75125 → 1.75
+    assert trainer['avg_odds'] == 1.75
+
+    course = tables['course_distance_stats_window'].iloc[0]
+    # Winners at 1.00 and 1.01: mean 1.005 rounds up, stddev 0.00707… → 0.01
+    assert course['avg_winning_odds'] == 1.01
+    assert course['odds_volatility'] == 0.01
+
+
+def test_rejects_reversed_range(source):
+    with pytest.raises(ValueError):
+        backfill_feature_mart(source, date(2025, 1, 2), date(2025, 1, 1))
+
+
+def test_bulk_write_round_trip_sqlite(source):
+    start, end = date(2025, 2, 1), date(2025, 2, 5)
+    tables = backfill_feature_mart(source, start, end)
+
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(SQLITE_FEATURE_MART_SCHEMA)
+    written = write_feature_mart_dbapi(conn, tables)
+    # Re-running a range upserts instead of duplicating
+    write_feature_mart_dbapi(conn, tables)
+
+    for name, frame in tables.items():
+        assert written[name] == len(frame)
+        stored = pd.read_sql(f"SELECT * FROM {name}", conn)
+        assert len(stored) == len(frame)
+
+    trainer = pd.read_sql(
+        "SELECT * FROM trainer_stats_window WHERE as_of_date = ? AND window_days = 90",
+        conn, params=(end.isoformat(),),
+    )
+    expected = tables['trainer_stats_window']
+    expected = expected[(expected['as_of_date'] == end) & (expected['window_days'] == 90)]
+    assert sorted(trainer['starts']) == sorted(expected['starts'])
+    assert sorted(trainer['avg_odds']) == pytest.approx(sorted(expected['avg_odds']))
+
+
+def test_upsert_statement_paramstyles():
+    statement = upsert_statement('jt_combo_stats_window')
+    assert "$10" in statement
+    assert "ON CONFLICT (as_of_date, window_days, jockey, trainer)" in statement
+    assert "starts = EXCLUDED.starts" in statement
+    assert "jockey = EXCLUDED" not in statement
+    assert upsert_statement('jockey_stats_window', 'format').count('%s') == 10
+    with pytest.raises(ValueError):
+        upsert_statement('jockey_stats_window', 'named')
+
+
+class _CappedRpc:
+    """Supabase RPC stand-in that caps every response at max_rows, as PostgREST does."""
+
+    def __init__(self, rows, max_rows=1000):
+        self.rows = rows
+        self.max_rows = max_rows
+        self.requests = []
+
+    def rpc(self, name, params):
+        self.requests.append((name, params))
+        return self
+
+    def range(self, start, end):
+        self._slice = (start, min(end + 1, start + self.max_rows))
+        return self
+
+    def execute(self):
+        start, stop = self._slice
+        return type('Response', (), {'data': self.rows[start:stop]})()
+
+
+@pytest.mark.parametrize('page_size', [500, 1000, 10000])
+def test_supabase_source_pages_past_max_rows(source, page_size):
+    rows = source.head(2500).to_dict('records')
+    client = _CappedRpc(rows)
+
+    fetched = fetch_feature_mart_source_supabase(client, date(2024, 1, 1), date(2026, 1, 1), page_size=page_size)
+
+    assert len(fetched) == 2500
+    assert list(fetched['race_id']) == [row['race_id'] for row in rows]
+    assert client.requests[0] == ('feature_mart_source', {'p_start_date': '2024-01-01', 'p_end_date': '2026-01-01'})
@@ -0,0 +1,108 @@
+"""
+Tests for the as-of history index used by FeatureBuilder (src/features/history_index.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features import FeatureBuilder, FeatureBuilderConfig, HistoryIndex
+from src.features.builder import TemporalExtractor
+
+
+def _make_history(n_horses=12, n_runs=15, seed=7):
+    rng = np.random.default_rng(seed)
+    rows = []
+    goings = ['Good', 'Soft', 'Heavy', 'Good To Firm', 'Firm', None]
+    courses = ['Ascot', 'York', 'Kempton']
+    for h in range(n_horses):
+        dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(
+            np.sort(rng.choice(400, size=n_runs, replace=False)), unit='D'
+        )
+        for i, date in enumerate(dates):
+            rows.append({
+                'race_id': f"R{h}_{i}",
+                'date': date.strftime('%Y-%m-%d'),
+                'horse': f"Horse {h}",
+                'trainer': f"T{h % 3}",
+                'jockey': f"J{h % 4}",
+                'pos_int': np.nan if rng.random() < 0.1 else float(rng.integers(1, 10)),
+                'class': float(rng.integers(1, 7)),
+                'dist': np.nan if rng.random() < 0.05 else float(rng.choice([1200, 1600, 2000, 2400])),
+                'going': goings[rng.integers(len(goings))],
+                'course': courses[rng.integers(len(courses))],
+                'lbs': np.nan if rng.random() < 0.1 else float(rng.integers(110, 140)),
+                'or_int': float(rng.integers(50, 100)),
+                'rpr_int': float(rng.integers(50, 100)),
+                'ts_int': float(rng.integers(50, 100)),
+                'age': float(rng.integers(2, 9)),
+                'sp_decimal': float(rng.uniform(1.5, 30)),
+            })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def history():
+    return _make_history()
+
+
+def test_window_matches_boolean_filter(history):
+    index = HistoryIndex(history)
+    queries = history.sample(40, random_state=1)
+    window = index.window(queries['horse'], queries['date'])
+
+    for i, (_, row) in enumerate(queries.iterrows()):
+        expected = history[
+            (history['horse'] == row['horse'])
+            & (pd.to_datetime(history['date']) < pd.to_datetime(row['date']))
+        ]
+        assert window.counts[i] == len(expected)
+
+
+def test_unknown_horse_has_no_history(history):
+    index = HistoryIndex(history)
+    window = index.window(['Nobody', 'Horse 0'], ['2030-01-01', '2000-01-01'])
+
+    assert list(window.counts) == [0, 0]
+    assert np.isnan(window.last_n('pos_int', 3)).all()
+
+
+def test_last_n_is_most_recent_first(history):
+    index = HistoryIndex(history)
+    window = index.window(['Horse 3'], ['2030-01-01'])
+
+    expected = (
+        history[history['horse'] == 'Horse 3']
+        .sort_values('date', ascending=False)['lbs']
+        .head(4)
+        .to_numpy()
+    )
+    np.testing.assert_array_equal(window.last_n('lbs', 4)[0], expected)
+
+
+def test_indexed_builder_matches_row_wise(history):
+    races = history.sample(60, random_state=3)
+
+    legacy = FeatureBuilder(FeatureBuilderConfig(validate_schema=False))
+    indexed = FeatureBuilder(FeatureBuilderConfig(validate_schema=False, use_history_index=True))
+
+    expected = legacy.build_sqpe_features(races, history)
+    actual = indexed.build_sqpe_features(races, history)
+
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+def test_indexed_builder_with_empty_index(history):
+    # No history row has a usable date, so the index holds no runs
+    undated = history.assign(date=pd.NaT)
+    races = history.sample(10, random_state=3)
+
+    extractor = TemporalExtractor()
+    extractor.history_index = HistoryIndex(undated)
+    result = extractor.extract(races, undated)
+
+    assert len(extractor.history_index) == 0
+    assert (result['days_since_last_run'] == 30).all()
+    assert (result['runs_last_30d'] == 0).all()
+    assert (result['runs_last_90d'] == 0).all()
@@ -0,0 +1,105 @@
+"""
+Tests for the fused metric kernel against the per-metric ModelMetrics methods
+"""
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from src.training.metrics import ModelMetrics
+
+EXACT = ['accuracy', 'ae_ratio', 'roi_all', 'roi_top10', 'roi_top20', 'roi_top30',
+         'max_drawdown', 'sharpe_ratio']
+APPROX = ['auc', 'brier_score', 'log_loss', 'calibration_error', 'max_calibration_error']
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(21)
+    n = 2000
+    race_ids = np.repeat(np.arange(200), 10)
+    rng.shuffle(race_ids)
+    y_true = rng.binomial(1, 0.12, n)
+    odds = rng.uniform(2.0, 30.0, n)
+    # Rounded so ties exercise the shared sort
+    grid = np.round(np.clip(rng.beta(2, 10, (6, n)) + 0.05 * y_true, 0, 1), 2)
+    return y_true, grid, odds, race_ids
+
+
+def reference(metrics, y_true, y_pred, odds):
+    calibration = metrics.compute_calibration_error(y_true, y_pred)
+    drawdown = metrics.compute_drawdown(y_true, y_pred, odds)
+    return {
+        'auc': metrics.compute_auc(y_true, y_pred),
+        'brier_score': metrics.compute_brier(y_true, y_pred),
+        'log_loss': metrics.compute_log_loss(y_true, y_pred),
+        'accuracy': float(((y_pred > 0.5).astype(int) == y_true).mean()),
+        'calibration_error': calibration['mean_error'],
+        'max_calibration_error': calibration['max_error'],
+        'ae_ratio': metrics.compute_ae_ratio(y_true, y_pred, odds),
+        'roi_all': metrics.compute_roi(y_true, odds),
+        'roi_top10': metrics.compute_roi_at_k(y_true, y_pred, odds, k=0.10),
+        'roi_top20': metrics.compute_roi_at_k(y_true, y_pred, odds, k=0.20),
+        'roi_top30': metrics.compute_roi_at_k(y_true, y_pred, odds, k=0.30),
+        'max_drawdown': drawdown['max_drawdown'],
+        'sharpe_ratio': drawdown['sharpe_ratio'],
+    }
+
+
+def test_grid_matches_per_metric(data):
+    y_true, grid, odds, _ = data
+    metrics = ModelMetrics()
+
+    scored = metrics.compute_metric_grid(y_true, grid, odds)
+
+    for row, y_pred in enumerate(grid):
+        expected = reference(metrics, y_true, y_pred, odds)
+        for name in EXACT:
+            assert scored[name][row] == expected[name], name
+        for name in APPROX:
+            assert scored[name][row] == pytest.approx(expected[name], rel=1e-12, abs=1e-15), name
+
+
+def test_one_dimensional_returns_floats(data):
+    y_true, grid, odds, _ = data
+    metrics = ModelMetrics()
+
+    scored = metrics.compute_metric_grid(y_true, grid[0], odds)
+    all_metrics = metrics.compute_all_metrics(y_true, grid[0], odds)
+
+    assert all(isinstance(value, float) for value in scored.values())
+    assert scored.keys() == all_metrics.keys()
+    for name in EXACT:
+        assert scored[name] == all_metrics[name]
+
+
+def test_auc_with_ties_matches_sklearn():
+    y_true = np.array([0, 1, 1, 0, 1, 0, 0, 1])
+    y_pred = np.array([[0.2, 0.2, 0.5, 0.5, 0.9, 0.1, 0.9, 0.3]])
+    auc = ModelMetrics().compute_metric_grid(y_true, y_pred)['auc']
+    assert auc[0] == pytest.approx(roc_auc_score(y_true, y_pred[0]))
+
+    single_class = ModelMetrics().compute_metric_grid(np.zeros(3, dtype=int), np.array([0.1, 0.2, 0.3]))
+    assert single_class['auc'] == 0.0
+
+
+def test_race_metrics(data):
+    y_true, grid, odds, race_ids = data
+    scored = ModelMetrics().compute_metric_grid(y_true, grid, odds, race_ids=race_ids)
+
+    for row, y_pred in enumerate(grid):
+        losses, top_won, top_returns = [], [], []
+        for race in np.unique(race_ids):
+            idx = np.flatnonzero(race_ids == race)
+            p = y_pred[idx] / y_pred[idx].sum()
+            if y_true[idx].any():
+                losses.append(-np.log(max(p[np.argmax(y_true[idx])], 1e-10)))
+            top = idx[np.argmax(y_pred[idx])]
+            top_won.append(y_true[top] == 1)
+            top_returns.append(odds[top] if y_true[top] == 1 else 0.0)
+
+        assert scored['race_log_loss'][row] == pytest.approx(np.mean(losses), rel=1e-12)
+        assert scored['race_top1_win_rate'][row] == np.mean(top_won)
+        assert scored['race_top1_roi'][row] == pytest.approx(
+            (sum(top_returns) - len(top_returns)) / len(top_returns) * 100, rel=1e-12
+        )
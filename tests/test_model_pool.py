@@ -0,0 +1,116 @@
+"""
+Tests for the warm model pool (app/engine/model_pool.py) and batched UMA inference
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from app.engine.model_pool import ModelPool
+from app.engine.uma import UMA
+
+FEATURES = ['sqpe_score', 'tie_score', 'form_rating', 'speed_rating', 'class_rating']
+
+
+def _train_model(seed):
+    rng = np.random.default_rng(seed)
+    X = rng.random((200, len(FEATURES)))
+    y = (X[:, 0] + rng.normal(0, 0.3, 200) > 0.5).astype(int)
+    return LogisticRegression().fit(X, y)
+
+
+def _write_model(path, model):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(model, f)
+
+
+@pytest.fixture
+def model_paths(tmp_path):
+    paths = {}
+    for i, name in enumerate(['sqpe_v14', 'tie_v9', 'longshot_v6']):
+        path = tmp_path / name / f"{name}.pkl"
+        _write_model(path, _train_model(i))
+        paths[name] = str(path)
+    # overlay_v5 is missing on disk and must fall back
+    paths['overlay_v5'] = str(tmp_path / 'overlay_v5' / 'overlay_v5.pkl')
+    return paths
+
+
+def _runners(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [dict(zip(FEATURES, rng.random(len(FEATURES)))) for _ in range(n)]
+
+
+def test_batch_matches_single_predictions(model_paths):
+    pool = ModelPool(model_paths)
+    pool.load()
+    uma = UMA(model_pool=pool)
+
+    runners = _runners(12)
+    odds = [2.5, None, 8.0, 1.0] * 3
+
+    batch = uma.predict_batch(runners, odds, race_context={'race_id': 'R1'})
+
+    for features, market_odds, actual in zip(runners, odds, batch):
+        expected = uma.predict(features, market_odds=market_odds, race_context={'race_id': 'R1'})
+        assert actual.probability == pytest.approx(expected.probability, rel=1e-12)
+        assert actual.edge == pytest.approx(expected.edge, rel=1e-12)
+        assert actual.confidence == pytest.approx(expected.confidence, rel=1e-12)
+        assert actual.risk_band == expected.risk_band
+        assert actual.signals['models'] == pytest.approx(expected.signals['models'])
+
+
+def test_missing_model_falls_back(model_paths):
+    pool = ModelPool(model_paths)
+    pool.load()
+
+    assert pool.status()['models'] == {
+        'sqpe_v14': True, 'tie_v9': True, 'longshot_v6': True, 'overlay_v5': False
+    }
+    batch = UMA(model_pool=pool).predict_batch(_runners(3))
+    assert all(p.signals['models']['overlay_v5'] == 0.15 for p in batch)
+
+
+def test_refresh_swaps_only_changed_models(model_paths):
+    pool = ModelPool(model_paths)
+    pool.load()
+    before = pool.models
+
+    assert pool.refresh() is False
+    assert pool.models is before
+
+    path = model_paths['tie_v9']
+    _write_model(Path(path), _train_model(99))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert pool.refresh() is True
+    assert pool.generation == 2
+    assert pool.models['tie_v9'] is not before['tie_v9']
+    assert pool.models['sqpe_v14'] is before['sqpe_v14']
+    # Readers holding the previous map keep a consistent snapshot
+    assert before['tie_v9'] is not None
+
+
+def test_predict_races_groups_by_race(model_paths):
+    pool = ModelPool(model_paths)
+    pool.load()
+    uma = UMA(model_pool=pool)
+
+    races = [
+        {'race_id': 'R1', 'runners': [{'features': f, 'market_odds': 4.0} for f in _runners(3, 1)]},
+        {'race_id': 'R2', 'runners': []},
+        {'race_id': 'R3', 'runners': [{'features': f} for f in _runners(5, 2)]},
+    ]
+
+    grouped = uma.predict_races(races)
+
+    assert [len(g) for g in grouped] == [3, 0, 5]
+    assert {p.metadata['race_id'] for p in grouped[2]} == {'R3'}
+    expected = uma.predict(races[2]['runners'][4]['features'])
+    assert grouped[2][4].probability == pytest.approx(expected.probability, rel=1e-12)
@@ -0,0 +1,97 @@
+"""
+Tests for the columnar odds tick store (app/feeds/tick_store.py) and OddsFeed on top of it
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.feeds.odds_feed import OddsFeed
+from app.feeds.tick_store import OddsTickStore, TickSeries
+
+T0 = datetime(2026, 3, 14, 13, 0, 0)
+
+
+def test_window_stats_match_numpy():
+    rng = np.random.default_rng(0)
+    series = TickSeries()
+    ts = np.arange(500, dtype=float) * 5.0
+    odds = 4.0 + rng.normal(0, 0.3, size=500)
+    for t, o in zip(ts, odds):
+        series.append(t, o)
+
+    stats = series.window_stats(window_seconds=600)
+    in_window = odds[ts >= ts[-1] - 600]
+
+    assert stats['count'] == len(in_window)
+    assert stats['first_odds'] == in_window[0]
+    assert stats['last_odds'] == in_window[-1]
+    assert stats['std'] == pytest.approx(np.std(in_window), rel=1e-9)
+
+
+def test_ring_buffer_caps_ticks_per_runner():
+    store = OddsTickStore(max_ticks_per_runner=100)
+    for i in range(1000):
+        store.append("R1", "H1", float(i), 3.0 + i * 0.001)
+
+    timestamps, odds, _ = store.history("R1", "H1")
+    assert len(timestamps) == 100
+    assert timestamps[0] == 900.0
+    assert store.window_stats("R1", "H1")['std'] == pytest.approx(np.std(odds), rel=1e-9)
+
+
+def test_out_of_order_ticks_are_sorted():
+    series = TickSeries()
+    for t, o in [(0.0, 5.0), (10.0, 4.0), (5.0, 4.5)]:
+        series.append(t, o)
+
+    np.testing.assert_array_equal(series.timestamps, [0.0, 5.0, 10.0])
+    assert series.window_stats()['last_odds'] == 4.0
+
+
+def test_compute_odds_movement_honours_window():
+    feed = OddsFeed()
+    # Drift early, then steam in the last 15 minutes
+    prices = [5.0, 6.0, 7.0, 7.0, 6.0, 5.0]
+    for i, price in enumerate(prices):
+        feed.capture_snapshot("RACE", [{'runner_id': 'H1', 'odds_decimal': price}], timestamp=T0 + timedelta(minutes=10 * i))
+
+    full = feed.compute_odds_movement("RACE", "H1", window_minutes=60)
+    recent = feed.compute_odds_movement("RACE", "H1", window_minutes=15)
+
+    assert full['first_odds'] == 5.0
+    assert recent['first_odds'] == 6.0
+    assert recent['snapshots_count'] == 2
+    assert feed.detect_steam_move("RACE", "H1", threshold=10.0)
+
+
+def test_segments_round_trip(tmp_path):
+    feed = OddsFeed(storage_path=str(tmp_path))
+    for i in range(5):
+        feed.capture_snapshot(
+            "RACE_A",
+            [{'runner_id': 'H1', 'odds_decimal': 3.0 + i, 'volume': 10 * i},
+             {'runner_id': 'H2', 'odds_decimal': 8.0 - i}],
+            timestamp=T0 + timedelta(seconds=5 * i),
+        )
+
+    segments = feed.save_snapshots(str(tmp_path / "day"))
+    assert len(segments) == 1
+
+    restored = OddsFeed()
+    restored.load_snapshots(str(tmp_path / "day"))
+
+    assert restored.get_odds_history("RACE_A", "H1") == feed.get_odds_history("RACE_A", "H1")
+    assert restored.compute_odds_movement("RACE_A", "H2") == feed.compute_odds_movement("RACE_A", "H2")
+
+
+def test_close_race_evicts_ticks(tmp_path):
+    feed = OddsFeed(storage_path=str(tmp_path))
+    feed.capture_snapshot("RACE_B", [{'runner_id': 'H1', 'odds_decimal': 2.5}], timestamp=T0)
+
+    segment = feed.close_race("RACE_B")
+
+    assert segment is not None and segment.endswith("RACE_B.parquet")
+    assert len(feed.ticks) == 0
+    assert feed.get_odds_history("RACE_B", "H1") == []
@@ -0,0 +1,119 @@
+"""
+Tests for the columnar orchestrator path against the scalar vote logic
+"""
+
+from enum import Enum
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.intelligence import orchestrator as orchestrator_module
+from src.intelligence.nds import NarrativeType
+from src.intelligence.orchestrator import (
+    VOTE_ABSTAIN,
+    VOTE_BACK,
+    VOTE_FADE,
+    BetRecommendation,
+    IntelligenceOrchestrator,
+)
+from src.intelligence.sqpe import SignalStrength
+
+
+class TrainerIntent(Enum):
+    WIN_TODAY = "win_today"
+    PLACED_TO_WIN = "placed_to_win"
+    EXPERIENCE = "experience"
+    DECEIVE = "deceive"
+    NEUTRAL = "neutral"
+
+
+VOTE_CODES = {"back": VOTE_BACK, "fade": VOTE_FADE, "abstain": VOTE_ABSTAIN}
+
+
+@pytest.fixture(autouse=True)
+def trainer_intent(monkeypatch):
+    monkeypatch.setattr(orchestrator_module, "TrainerIntent", TrainerIntent, raising=False)
+
+
+@pytest.fixture
+def outputs():
+    rng = np.random.default_rng(19)
+    n = 3000
+    # Coarse grids so thresholds are hit exactly
+    grid = np.round(np.linspace(0, 1, 11), 1)
+
+    sqpe = pd.DataFrame({
+        "signal_strength": rng.choice(list(SignalStrength), n),
+        "edge": rng.choice([-0.1, 0.0, 0.05, 0.2], n),
+        "sqpe_score": rng.choice(grid, n),
+        "confidence": rng.random(n),
+        "convergence_score": rng.random(n),
+    })
+    tie = pd.DataFrame({
+        "intent": rng.choice(list(TrainerIntent), n),
+        "tie_score": rng.choice(grid, n),
+        "confidence": rng.random(n),
+    })
+    nds = pd.DataFrame({
+        "is_fade_opportunity": rng.random(n) < 0.4,
+        "is_back_opportunity": rng.random(n) < 0.4,
+        "nds_score": rng.choice(grid, n),
+        "confidence": rng.random(n),
+        "narrative_type": NarrativeType.HYPE_FAVORITE,
+    })
+    return sqpe, tie, nds
+
+
+def scalar(orchestrator, sqpe, tie, nds):
+    rows = []
+    for s, t, d in zip(sqpe.itertuples(), tie.itertuples(), nds.itertuples()):
+        votes = {
+            "SQPE": orchestrator.evaluate_sqpe_vote(s),
+            "TIE": orchestrator.evaluate_tie_vote(t),
+            "NDS": orchestrator.evaluate_nds_vote(d),
+        }
+        back, fade, agreement = orchestrator.calculate_agreement(votes)
+        recommendation = orchestrator.make_recommendation(back, fade, agreement)
+        conviction = orchestrator.calculate_conviction(recommendation, agreement, back, fade)
+        rows.append((
+            *(VOTE_CODES[v] for v, _, _ in votes.values()),
+            back, fade, agreement, recommendation.value, conviction,
+        ))
+    return rows
+
+
+@pytest.mark.parametrize("min_modules", [2, 3])
+def test_matches_scalar_path(outputs, min_modules):
+    sqpe, tie, nds = outputs
+    orchestrator = IntelligenceOrchestrator(min_modules_required=min_modules)
+
+    result = orchestrator.evaluate_columns(sqpe, tie, nds)
+
+    assert list(result.itertuples(index=False, name=None)) == scalar(orchestrator, sqpe, tie, nds)
+
+
+def test_accepts_value_arrays(outputs):
+    sqpe, tie, nds = outputs
+    orchestrator = IntelligenceOrchestrator()
+
+    from_enums = orchestrator.evaluate_columns(sqpe, tie, nds)
+    from_values = orchestrator.evaluate_columns(
+        {**{c: sqpe[c].to_numpy() for c in sqpe}, "signal_strength": [s.value for s in sqpe["signal_strength"]]},
+        {**{c: tie[c].to_numpy() for c in tie}, "intent": [i.value for i in tie["intent"]]},
+        {c: nds[c].to_numpy() for c in nds},
+    )
+
+    pd.testing.assert_frame_equal(from_values, from_enums)
+    assert set(from_enums["recommendation"].cat.categories) == {r.value for r in BetRecommendation}
+
+
+def test_empty():
+    orchestrator = IntelligenceOrchestrator()
+    empty = {
+        "signal_strength": [], "edge": [], "sqpe_score": [], "confidence": [],
+        "intent": [], "tie_score": [],
+        "is_fade_opportunity": [], "is_back_opportunity": [], "nds_score": [],
+    }
+
+    assert orchestrator.evaluate_columns(empty, empty, empty).empty
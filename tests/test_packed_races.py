@@ -0,0 +1,146 @@
+"""
+Tests for packed race data against the convergence backtest's per-race dicts
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.backtesting.packed_races import PackedRaces, run_packed_jobs
+
+
+def prepare_race_data(race_df):
+    """ConvergenceBacktester.prepare_race_data"""
+    runners = []
+    for _, row in race_df.iterrows():
+        runners.append({
+            'runner_id': str(row.get('runner_id', row.get('horse_name', 'unknown'))),
+            'horse_name': str(row.get('horse_name', 'unknown')),
+            'or_rating': float(row.get('OR', 0)),
+            'rpr_rating': float(row.get('RPR', 0)),
+            'ts_rating': float(row.get('TS', 0)),
+            'win_odds': float(row.get('win_odds', 999.0)),
+            'form': str(row.get('form', '')),
+            'trainer': str(row.get('trainer', '')),
+            'jockey': str(row.get('jockey', '')),
+            'days_since_last': int(row.get('days_since_last', 999)),
+            'course_win_pct': float(row.get('course_win_pct', 0.0)),
+            'distance_win_pct': float(row.get('distance_win_pct', 0.0)),
+            'won': bool(row.get('won', False))
+        })
+    return {'race_id': str(race_df.iloc[0].get('race_id', 'unknown')), 'runners': runners}
+
+
+def comparable(races):
+    """NaN ratings compare equal"""
+    return [
+        {**race, 'runners': [
+            {k: 'NaN' if isinstance(v, float) and math.isnan(v) else v for k, v in runner.items()}
+            for runner in race['runners']
+        ]}
+        for race in races
+    ]
+
+
+def expected(df):
+    return comparable([prepare_race_data(race_df) for _, race_df in df.groupby('race_id')])
+
+
+def packed_races(races):
+    return comparable([races.race_data(i) for i in range(races.n_races)])
+
+
+@pytest.fixture
+def season():
+    rng = np.random.default_rng(20)
+    n = 800
+    df = pd.DataFrame({
+        'race_id': rng.integers(1000, 1100, n),
+        'runner_id': rng.integers(0, 10_000, n),
+        'horse_name': rng.choice(['Alpha', 'Beta', 'Gamma', None], n),
+        'OR': rng.choice([55.0, 72.0, np.nan], n),
+        'RPR': rng.integers(40, 120, n),
+        'TS': rng.normal(60, 10, n),
+        'win_odds': rng.choice([2.5, 6.0, 21.0], n),
+        'form': rng.choice(['1-23', '0P4', ''], n),
+        'trainer': rng.choice(['T One', 'T Two'], n),
+        'jockey': rng.choice(['J One', 'J Two', np.nan], n),
+        'days_since_last': rng.integers(7, 400, n),
+        'won': rng.choice([0.0, 1.0, np.nan], n),
+    })
+    df.loc[rng.random(n) < 0.02, 'race_id'] = np.nan
+    return df
+
+
+def test_matches_prepare_race_data(season):
+    assert packed_races(PackedRaces.from_frame(season)) == expected(season)
+
+
+def test_missing_columns_use_defaults():
+    df = pd.DataFrame({'race_id': ['b', 'a', 'b'], 'horse_name': ['X', 'Y', 'Z']})
+    assert packed_races(PackedRaces.from_frame(df)) == expected(df)
+
+
+def test_missing_days_since_last_raises(season):
+    season['days_since_last'] = season['days_since_last'].astype(float)
+    season.loc[3, 'days_since_last'] = np.nan
+    with pytest.raises(ValueError):
+        PackedRaces.from_frame(season)
+
+
+def race_count_and_first(handle):
+    races, shm = PackedRaces.attach(handle)
+    try:
+        return races.n_races, races.race_data(0)
+    finally:
+        del races
+        shm.close()
+
+
+def test_shared_memory_round_trip(season):
+    races = PackedRaces.from_frame(season)
+    handle, shm = races.share()
+    try:
+        attached, attached_shm = PackedRaces.attach(handle)
+        assert packed_races(attached) == packed_races(races)
+        del attached
+        attached_shm.close()
+
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(race_count_and_first, [handle, handle]))
+        assert [(n, comparable([race])) for n, race in results] == [(races.n_races, comparable([races.race_data(0)]))] * 2
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def back_the_favourite(races, stake):
+    """Flat stake on the shortest price in every race: (bets, winners, profit)"""
+    bets, winners, profit = 0, 0, 0.0
+    for i in range(races.n_races):
+        runners = races.race_data(i)['runners']
+        favourite = min(runners, key=lambda r: r['win_odds'])
+        bets += 1
+        if favourite['won']:
+            winners += 1
+            profit += stake * (favourite['win_odds'] - 1)
+        else:
+            profit -= stake
+    return bets, winners, profit
+
+
+def test_pooled_jobs_match_serial(season):
+    packed = {
+        'all': PackedRaces.from_frame(season),
+        'half': PackedRaces.from_frame(season.iloc[: len(season) // 2]),
+    }
+    jobs = [('all', 1.0), ('half', 1.0), ('all', 2.5), ('half', 10.0)]
+
+    serial = run_packed_jobs(back_the_favourite, packed, jobs)
+    pooled = run_packed_jobs(back_the_favourite, packed, jobs, workers=2)
+
+    assert pooled == serial
+    assert [bets for bets, _, _ in serial] == [packed[key].n_races for key, _ in jobs]
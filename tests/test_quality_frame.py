@@ -0,0 +1,130 @@
+"""Tests for columnar quality scoring against the per-row quality functions"""
+
+import random
+from datetime import time
+
+import pandas as pd
+import pytest
+
+from workers.ingestion_spine.quality import (
+    calculate_race_quality,
+    calculate_runner_confidence,
+    validate_race,
+)
+from workers.ingestion_spine.quality_frame import (
+    RUNNER_COLUMNS,
+    score_races,
+    score_runners,
+    validate_races,
+)
+
+
+def random_runner(rng, race_keys):
+    runner = {"race_join_key": rng.choice(race_keys)}
+    choices = {
+        "horse_name": ["Alpha", "alpha ", "Beta", "Gamma", "Delta", "", "   ", None],
+        "odds": [5.0, 0.0, 0.5, 2000.0, 12.5, 1.0, 1000, None],
+        "jockey": ["J. Smith", "", None],
+        "trainer": ["T. Jones", "", None],
+        "weight": [9.0, 0, "9-7", None],
+        "odds_estimated": [True, False, None],
+        "fuzzy_extraction": [True, False, None],
+    }
+    for field, values in choices.items():
+        # Leave some keys out entirely
+        if rng.random() < 0.8:
+            runner[field] = rng.choice(values)
+    return runner
+
+
+@pytest.fixture
+def batch():
+    rng = random.Random(7)
+    race_keys = [f"2026-01-04|Course {i}|14:{i:02d}" for i in range(12)]
+    races = [
+        {
+            "join_key": key,
+            "course": rng.choice(["Ascot", "", None]),
+            "distance": rng.choice(["1m", "", None]),
+            "race_time": rng.choice([time(14, 30), time(0, 0), None]),
+        }
+        for key in race_keys
+    ]
+    # Some races get no runners, some runners match no race
+    runners = [random_runner(rng, race_keys[:10] + ["unmatched"]) for _ in range(400)]
+    runners += [{"race_join_key": race_keys[9], "horse_name": f"H{i}", "odds": 3.0} for i in range(35)]
+    return races, runners
+
+
+def test_score_runners_matches_per_runner(batch):
+    _, runners = batch
+    scored = score_runners(pd.DataFrame(runners, columns=RUNNER_COLUMNS))
+
+    expected = [calculate_runner_confidence(runner) for runner in runners]
+    assert scored["confidence"].tolist() == [confidence for confidence, _, _ in expected]
+    assert scored["quality_flags"].tolist() == [flags for _, flags, _ in expected]
+    assert scored["extraction_method"].tolist() == [method for _, _, method in expected]
+
+
+def test_score_runners_empty():
+    scored = score_runners(pd.DataFrame(columns=RUNNER_COLUMNS))
+    assert scored.empty
+    assert list(scored.columns) == ["confidence", "quality_flags", "extraction_method"]
+
+
+def test_score_races_matches_per_race(batch):
+    races, runners = batch
+    for runner in runners:
+        runner["confidence"] = calculate_runner_confidence(runner)[0]
+
+    quality = score_races(pd.DataFrame(races), pd.DataFrame(runners))
+
+    for race, row in zip(races, quality.itertuples()):
+        race_runners = [r for r in runners if r["race_join_key"] == race["join_key"]]
+        assert (row.parse_confidence, row.quality_score, row.quality_flags) == \
+            calculate_race_quality(race, race_runners)
+
+
+def test_score_races_shared_key():
+    races = [
+        {"join_key": "a", "course": "Ascot", "distance": "1m", "race_time": "14:30"},
+        {"join_key": "a", "course": None, "distance": "1m", "race_time": "14:30"},
+    ]
+    runners = [
+        {"race_join_key": "a", "confidence": confidence, "horse_name": name}
+        for confidence, name in zip([1.0, 0.9, 0.8, 0.7], "wxyz")
+    ]
+
+    quality = score_races(pd.DataFrame(races), pd.DataFrame(runners))
+
+    expected = [calculate_race_quality(race, runners) for race in races]
+    assert list(quality.itertuples(index=False, name=None)) == expected
+    assert quality["quality_flags"].tolist() == [[], ["missing_course"]]
+
+
+def test_validate_races_matches_per_race(batch):
+    races, runners = batch
+    for runner in runners:
+        runner["confidence"] = calculate_runner_confidence(runner)[0]
+    quality = score_races(pd.DataFrame(races), pd.DataFrame(runners))
+
+    full_races = []
+    for i, (race, row) in enumerate(zip(races, quality.itertuples())):
+        full_races.append({
+            **race,
+            "id": f"race-{i}",
+            "quality_score": row.quality_score,
+            "quality_flags": row.quality_flags,
+            "runners": [r for r in runners if r["race_join_key"] == race["join_key"]],
+        })
+
+    results = validate_races(pd.DataFrame({
+        "id": [race["id"] for race in full_races],
+        "course": [race["course"] for race in full_races],
+        "distance": [race["distance"] for race in full_races],
+        "runner_count": [len(race["runners"]) for race in full_races],
+        "quality_score": [race["quality_score"] for race in full_races],
+        "quality_flags": [race["quality_flags"] for race in full_races],
+    }))
+
+    assert results == [validate_race(race) for race in full_races]
@@ -0,0 +1,213 @@
+"""
+Tests for the vectorized raceform parsers (src/data/raceform_parsers.py)
+
+The legacy per-row parsers are kept here as references; the shared
+parsers must agree with them on realistic raceform values, apart from
+the documented divergences asserted explicitly below.
+"""
+
+import importlib.util
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.raceform_parsers import (
+    parse_beaten_distance,
+    parse_class,
+    parse_distance,
+    parse_odds,
+    parse_position,
+    parse_rating,
+    parse_weight,
+)
+
+
+def _legacy_parse_odds(sp_str):
+    # scripts/load_historical_data.py (and backtest / train_benter*)
+    if pd.isna(sp_str) or sp_str == '–':
+        return None
+    sp_str = str(sp_str).strip().replace('F', '').strip()
+    if sp_str.lower() == 'evens':
+        return 2.0
+    if '/' in sp_str:
+        try:
+            parts = sp_str.split('/')
+            return (float(parts[0]) / float(parts[1])) + 1.0
+        except:
+            return None
+    try:
+        return float(sp_str)
+    except:
+        return None
+
+
+def _legacy_parse_rating(rating_str):
+    if pd.isna(rating_str) or rating_str == '–':
+        return None
+    try:
+        return int(rating_str)
+    except:
+        return None
+
+
+def _legacy_parse_position(pos_str):
+    if pd.isna(pos_str):
+        return None
+    pos_str = str(pos_str).strip()
+    if pos_str in ['PU', 'F', 'U', 'BD', 'RO', 'UR', 'SU']:
+        return None
+    try:
+        return int(float(pos_str))
+    except:
+        return None
+
+
+def _legacy_parse_weight(wgt):
+    # scripts/preprocess_raceform.py
+    if pd.isna(wgt):
+        return None
+    match = re.match(r'(\d+)-(\d+)', str(wgt).strip())
+    if match:
+        return int(match.group(1)) * 14 + int(match.group(2))
+    try:
+        return float(str(wgt).strip())
+    except:
+        return None
+
+
+def _legacy_parse_distance(dist):
+    if pd.isna(dist):
+        return 2000
+    dist_str = str(dist).strip()
+    try:
+        return int(float(dist_str))
+    except:
+        pass
+    total_yards = 0
+    miles_match = re.search(r'(\d+)m', dist_str)
+    if miles_match:
+        total_yards += int(miles_match.group(1)) * 1760
+    furlongs_match = re.search(r'(\d+)([½¼¾])?f', dist_str)
+    if furlongs_match:
+        furlongs = int(furlongs_match.group(1))
+        furlongs += {'½': 0.5, '¼': 0.25, '¾': 0.75}.get(furlongs_match.group(2), 0)
+        total_yards += int(furlongs * 220)
+    return total_yards if total_yards > 0 else 2000
+
+
+def _legacy_parse_class(cls):
+    if pd.isna(cls):
+        return 4
+    match = re.search(r'(\d+)', str(cls).strip())
+    return int(match.group(1)) if match else 4
+
+
+def _legacy_parse_beaten_distance(btn):
+    if pd.isna(btn):
+        return None
+    btn_str = str(btn).strip()
+    if btn_str in ['-', '']:
+        return 0.0
+    try:
+        return float(btn_str)
+    except:
+        return None
+
+
+def _assert_parity(parser, legacy, values):
+    series = pd.Series(values, dtype=object)
+    expected = pd.Series([legacy(v) for v in values], dtype=float)
+    np.testing.assert_allclose(parser(series).to_numpy(), expected.to_numpy(), equal_nan=True)
+
+
+def test_odds_match_legacy():
+    values = ['1/3F', '5/2', '10/1', '100/30', 'Evens', 'evens', '11/4', ' 7/2 ',
+              '3.5', '–', None, np.nan, 'abc', '9/4F']
+    _assert_parity(parse_odds, _legacy_parse_odds, values)
+
+
+def test_odds_documented_divergences():
+    parsed = parse_odds(pd.Series(['11/10JF', '6/4CF', 'EVS', 'EvensF', '5/0', '', '-']))
+
+    # Joint / co-favourite markers and EVS parse; bad denominators and blanks are missing
+    np.testing.assert_allclose(parsed.to_numpy(), [2.1, 2.5, 2.0, 2.0, np.nan, np.nan, np.nan], equal_nan=True)
+
+
+def test_ratings_and_positions_match_legacy():
+    _assert_parity(parse_rating, _legacy_parse_rating, ['123', '–', None, '88', ' 95 ', '12.5', 'x', 101])
+    _assert_parity(parse_position, _legacy_parse_position, ['1', '2', '10', 'PU', 'F', 'UR', None, '3.0'])
+
+
+def test_position_non_finishers_and_suffixes():
+    parsed = parse_position(pd.Series(['1=', '2dh', 'pu', 'DSQ', 'RR', '7']), non_finisher=99)
+    np.testing.assert_array_equal(parsed.to_numpy(), [1, 2, 99, 99, 99, 7])
+
+
+def test_preprocess_parsers_match_legacy():
+    _assert_parity(parse_weight, _legacy_parse_weight, ['11-6', '9-0', '10-13', '140', None, 'x'])
+    _assert_parity(parse_distance, _legacy_parse_distance,
+                   ['2m3½f', '5f', '1m', '7½f', '3m2f', '2m¼f', '1760', '2011.7', None, 'abc'])
+    _assert_parity(parse_class, _legacy_parse_class, ['Class 4', 'Class 1', '2', None, 'Listed'])
+    _assert_parity(parse_beaten_distance, _legacy_parse_beaten_distance, ['-', '', '1.5', '12', None, 'nk'])
+
+
+def test_numeric_columns_pass_through():
+    floats = pd.Series([1.0, 2.0, np.nan])
+    np.testing.assert_array_equal(parse_position(floats).to_numpy(), [1.0, 2.0, np.nan])
+    np.testing.assert_array_equal(parse_rating(pd.Series([95, 102])).to_numpy(), [95.0, 102.0])
+    np.testing.assert_array_equal(parse_odds(pd.Series([3.5, 11.0])).to_numpy(), [3.5, 11.0])
+
+
+def test_index_is_preserved():
+    series = pd.Series(['5/2', 'PU'], index=[10, 20])
+    assert list(parse_odds(series).index) == [10, 20]
+    assert list(parse_position(series).index) == [10, 20]
+
+
+@pytest.mark.parametrize('n_rows', [50_000])
+def test_large_column_parity(n_rows):
+    rng = np.random.default_rng(0)
+    pool = np.array(['1/3F', '5/2', '10/1', 'Evens', '–', '100/30', '7/4F', '33/1'], dtype=object)
+    values = pool[rng.integers(0, len(pool), n_rows)]
+
+    expected = np.array([_legacy_parse_odds(v) for v in pool], dtype=float)
+    lookup = dict(zip(pool, expected))
+    np.testing.assert_allclose(
+        parse_odds(pd.Series(values)).to_numpy(),
+        np.array([lookup[v] for v in values], dtype=float),
+        equal_nan=True
+    )
+
+
+def test_preprocess_raceform_keeps_fractional_ratings(tmp_path):
+    # preprocess_raceform parses ratings with pd.to_numeric, not parse_rating
+    path = Path(__file__).resolve().parents[1] / 'scripts' / 'preprocess_raceform.py'
+    spec = importlib.util.spec_from_file_location('preprocess_raceform', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    pd.DataFrame({
+        'date': ['2024-01-01', '2024-01-01'],
+        'horse': ['A', 'B'],
+        'trainer': ['T', 'T'],
+        'class': ['Class 4', 'Class 4'],
+        'dist': ['5f', '5f'],
+        'age': [4, 5],
+        'pos': ['1', '2'],
+        'btn': ['-', '1.5'],
+        'or': ['12.5', '–'],
+        'rpr': ['88', ''],
+        'ts': ['70.25', 'x'],
+        'wgt': ['9-0', '9-2'],
+        'sp': ['5/2', '3/1'],
+    }).to_csv(tmp_path / 'raw.csv', index=False)
+
+    module.preprocess_raceform(tmp_path / 'raw.csv', tmp_path / 'clean.csv')
+    clean = pd.read_csv(tmp_path / 'clean.csv')
+
+    np.testing.assert_allclose(clean['or_int'], [12.5, np.nan], equal_nan=True)
+    np.testing.assert_allclose(clean['rpr_int'], [88.0, np.nan], equal_nan=True)
+    np.testing.assert_allclose(clean['ts_int'], [70.25, np.nan], equal_nan=True)
@@ -0,0 +1,107 @@
+"""
+Tests for the partitioned racing dataset (src/data/racing_dataset.py)
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.data.racing_dataset import (
+    build_racing_dataset,
+    iter_racing_batches,
+    load_racing_data,
+    load_racing_dataset_table,
+)
+
+
+def _raceform_csv(path, n_rows=600):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2023-11-20", periods=n_rows // 6, freq="D").repeat(6)
+    pd.DataFrame({
+        'date': dates.strftime("%Y-%m-%d"),
+        'course': rng.choice(['Ascot', 'Kempton (AW)', 'Ayr'], n_rows),
+        'race_id': np.arange(n_rows) // 6 + 1000,
+        'class': rng.choice(['Class 1', 'Class 4', ''], n_rows),
+        'dist': rng.choice(['1m2f', '5f', '2m3½f'], n_rows),
+        'pos': rng.choice(['1', '2', '3', 'PU', 'F'], n_rows),
+        'horse': [f"Horse {i % 90}" for i in range(n_rows)],
+        'trainer': rng.choice(['A Trainer', 'B Trainer'], n_rows),
+        'jockey': rng.choice(['J One', 'J Two', 'J Three'], n_rows),
+        'wgt': rng.choice(['9-7', '11-6'], n_rows),
+        'sp': rng.choice(['5/2', '10/1', 'Evens', '1/3F'], n_rows),
+        'or': rng.choice(['85', '–', '102'], n_rows),
+        'rpr': rng.choice(['90', '–'], n_rows),
+        'ts': rng.choice(['70', '–'], n_rows),
+        'btn': rng.choice(['-', '1.5', '12'], n_rows),
+        'ran': 6,
+    }).to_csv(path, index=False)
+
+
+@pytest.fixture()
+def dataset(tmp_path):
+    csv_path = tmp_path / "raceform.csv"
+    _raceform_csv(csv_path)
+    out = tmp_path / "racing_full"
+    stats = build_racing_dataset(str(csv_path), str(out), chunk_size=100, row_group_size=50)
+    return csv_path, out, stats
+
+
+def test_build_partitions_by_year_month(dataset):
+    _, out, stats = dataset
+
+    assert stats['rows'] == 600
+    partitions = sorted(p.relative_to(out).parent.as_posix() for p in out.rglob("*.parquet"))
+    assert partitions[0] == "year=2023/month=11"
+    assert "year=2024/month=2" in partitions
+
+
+def test_typed_columns(dataset):
+    _, out, _ = dataset
+    df = load_racing_dataset_table(str(out))
+
+    assert isinstance(df['horse'].dtype, pd.CategoricalDtype)
+    assert isinstance(df['course'].dtype, pd.CategoricalDtype)
+    assert np.issubdtype(df['date'].dtype, np.datetime64)
+    assert df['date'].is_monotonic_increasing
+    assert set(df['class'].unique()) <= {1.0, 4.0}
+    assert set(df.loc[df['pos'].isin(['PU', 'F']), 'pos_int']) == {99.0}
+    np.testing.assert_allclose(sorted(df['sp_decimal'].unique()), [1 + 1 / 3, 2.0, 3.5, 11.0])
+
+
+def test_date_range_matches_csv_filter(dataset):
+    csv_path, out, _ = dataset
+    start, end = "2023-12-30", "2024-01-05"
+
+    parquet = load_racing_data(str(out), start_date=start, end_date=end, columns=['date', 'race_id', 'horse'])
+    csv = load_racing_data(str(csv_path), start_date=start, end_date=end)
+
+    assert list(parquet.columns) == ['date', 'race_id', 'horse']
+    assert len(parquet) == len(csv) == 7 * 6
+    assert parquet['race_id'].tolist() == csv['race_id'].tolist()
+
+
+def test_nrows_and_batches(dataset):
+    _, out, _ = dataset
+
+    head = load_racing_data(str(out), nrows=25, start_date="2024-01-01")
+    assert len(head) == 25
+    assert head['date'].min() == pd.Timestamp("2024-01-01")
+
+    batches = list(iter_racing_batches(str(out), batch_size=64, columns=['date']))
+    assert all(len(batch) <= 64 for batch in batches)
+    assert sum(len(batch) for batch in batches) == 600
+
+
+@pytest.mark.parametrize('chunk_size', [50, 128_000])
+def test_csv_nrows_and_columns_apply_after_date_filter(dataset, monkeypatch, chunk_size):
+    csv_path, out, _ = dataset
+    monkeypatch.setattr("src.data.racing_dataset.DEFAULT_ROW_GROUP_SIZE", chunk_size)
+
+    csv = load_racing_data(str(csv_path), nrows=25, columns=['race_id', 'horse'], start_date="2024-01-01")
+    parquet = load_racing_data(str(out), nrows=25, columns=['race_id', 'horse'], start_date="2024-01-01")
+
+    assert list(csv.columns) == ['race_id', 'horse']
+    assert len(csv) == 25
+    assert csv['race_id'].tolist() == parquet['race_id'].tolist()
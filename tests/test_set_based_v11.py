@@ -0,0 +1,122 @@
+"""
+Parity tests for the set-based v1.1 feature build (src/features/set_based_v11.py)
+against the row-wise FeatureBuilderV11 / FeatureArmoryV11 queries
+"""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.armory_v11 import FeatureArmoryV11
+from src.features.builder_v11 import FeatureBuilderV11
+
+
+def _make_db(path, n_races=60, seed=11):
+    rng = np.random.default_rng(seed)
+    horses = [f"Horse {i}" for i in range(24)]
+    trainers = [f"Trainer {i}" for i in range(5)] + ['']
+    jockeys = [f"Jockey {i}" for i in range(6)]
+    goings = ['Good', 'Soft', 'Heavy', None]
+    classes = ['Class 2', 'Class 3', 'Class 4', 'Class 5', '']
+    days = np.sort(rng.choice(400, size=n_races, replace=False))
+
+    rows = []
+    for r, day in enumerate(days):
+        date = (pd.Timestamp('2023-01-01') + pd.Timedelta(days=int(day))).strftime('%Y-%m-%d')
+        course = ['Ascot', 'York', 'Kempton'][r % 3]
+        going = goings[rng.integers(len(goings))]
+        race_class = classes[rng.integers(len(classes))]
+        field = rng.choice(horses, size=8, replace=False)
+        for i, horse in enumerate(field):
+            pos = str(i + 1) if rng.random() > 0.1 else 'PU'
+            rows.append((
+                date, course, f"R{r}", 'Flat', race_class, '1m', going,
+                '' if rng.random() < 0.1 else '8', pos, int(rng.integers(1, 9)), horse,
+                '4', 'g', '9-0', '5/1', jockeys[rng.integers(len(jockeys))],
+                trainers[rng.integers(len(trainers))], '80', '85', '70',
+            ))
+
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE racing_data (
+            id INTEGER PRIMARY KEY, date TEXT, course TEXT, race_id TEXT, type TEXT,
+            class TEXT, dist TEXT, going TEXT, ran TEXT, pos TEXT, draw INTEGER,
+            horse TEXT, age TEXT, sex TEXT, wgt TEXT, sp TEXT, jockey TEXT,
+            trainer TEXT, official_rating TEXT, rpr TEXT, ts TEXT
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO racing_data (date, course, race_id, type, class, dist, going, ran, pos, draw, "
+        "horse, age, sex, wgt, sp, jockey, trainer, official_rating, rpr, ts) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+    conn.close()
+    return sorted({row[0] for row in rows})
+
+
+@pytest.fixture
+def racing_db(tmp_path):
+    path = tmp_path / "racing.db"
+    dates = _make_db(path)
+    return str(path), dates
+
+
+def _assert_frames_match(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_builder_set_based_matches_row_wise(racing_db):
+    db_path, dates = racing_db
+
+    for target_date in dates[-3:]:
+        expected = FeatureBuilderV11(db_path).build_all_features(target_date=target_date)
+        actual = FeatureBuilderV11(db_path, set_based=True).build_all_features(target_date=target_date)
+        _assert_frames_match(actual, expected)
+
+
+def test_builder_velocity_is_point_in_time_per_race_date(racing_db):
+    db_path, _ = racing_db
+
+    actual = FeatureBuilderV11(db_path, set_based=True).build_all_features()
+    assert actual['date'].nunique() > 1
+
+    legacy = FeatureBuilderV11(db_path)
+    legacy.connect()
+    for _, row in actual.sample(40, random_state=0).iterrows():
+        for entity in ('trainer', 'jockey'):
+            if row[entity] == '':
+                continue
+            stats = legacy._compute_entity_velocity(entity, row[entity], row['date'])
+            for days in (14, 30, 90):
+                assert row[f'{entity}_sr_{days}d'] == pytest.approx(stats[f'sr_{days}d'])
+    legacy.close()
+
+
+def test_armory_set_based_matches_row_wise(racing_db):
+    db_path, _ = racing_db
+    conn = sqlite3.connect(db_path)
+    sample = pd.read_sql_query(
+        "SELECT horse, trainer, jockey, course, going, date, draw FROM racing_data", conn
+    ).sample(80, random_state=2).reset_index(drop=True)
+    conn.close()
+
+    expected = FeatureArmoryV11(db_path).compute_all_features(sample.copy())
+    actual = FeatureArmoryV11(db_path, set_based=True).compute_all_features(sample.copy())
+
+    _assert_frames_match(actual, expected)
+
+
+def test_set_based_build_creates_indexes(racing_db):
+    db_path, dates = racing_db
+    FeatureBuilderV11(db_path, set_based=True).build_all_features(target_date=dates[-1])
+
+    conn = sqlite3.connect(db_path)
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    conn.close()
+    assert 'idx_racing_data_horse_date' in names
+    assert 'idx_racing_data_trainer_jockey_date' in names
@@ -0,0 +1,127 @@
+"""
+Tests for batched SQPE signal analysis against the per-runner methods
+"""
+
+import math
+from dataclasses import astuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.intelligence.sqpe import SIGNAL_COLUMNS, SignalStrength, SQPEEngine
+
+
+def same(a, b):
+    """Field-wise equality with NaN == NaN"""
+    return all(
+        x == y or (isinstance(x, float) and isinstance(y, float) and math.isnan(x) and math.isnan(y))
+        for x, y in zip(astuple(a), astuple(b))
+    )
+
+
+def per_runner(engine, race_df, p_benter, p_public):
+    """The original iterrows implementation of analyze_race"""
+    signals = []
+    for _, runner in race_df.iterrows():
+        runner_id = f"{runner.get('date')}_{runner.get('course')}_{runner.get('num')}"
+        signals.append(engine.analyze_runner(
+            runner, p_benter.get(runner_id, 0.0), p_public.get(runner_id, 0.0)
+        ))
+    signals.sort(key=lambda x: x.sqpe_score, reverse=True)
+    return signals
+
+
+@pytest.fixture
+def runners():
+    rng = np.random.default_rng(5)
+    n = 600
+
+    def with_gaps(values, rate=0.25):
+        values = values.astype(float)
+        values[rng.random(n) < rate] = np.nan
+        return values
+
+    return pd.DataFrame({
+        'race_id': rng.integers(0, 60, n),
+        'date': '2024-05-01',
+        'course': rng.choice(['Ascot', 'York', 'Ayr'], n),
+        'num': np.arange(n),
+        'horse': [f"Horse {i}" for i in range(n)],
+        'or_int': with_gaps(rng.integers(40, 130, n)),
+        'rpr_int': with_gaps(rng.normal(90, 20, n)),
+        'ts_int': with_gaps(rng.integers(30, 140, n)),
+        'pos_int': with_gaps(rng.integers(1, 12, n)),
+        'class': with_gaps(rng.choice([1, 2, 3, 4, 5, 6, 7, 9, 1.5], n)),
+        'sp_decimal': with_gaps(rng.choice([1.5, 2.0, 4.0, 8.0, 10.0, 11.0, 33.0], n), 0.1),
+    })
+
+
+def probabilities(runners, seed):
+    rng = np.random.default_rng(seed)
+    ids = [f"{d}_{c}_{n}" for d, c, n in zip(runners['date'], runners['course'], runners['num'])]
+    # Leave some runners out so the 0.0 default is exercised
+    return {runner_id: p for runner_id, p in zip(ids, rng.random(len(ids))) if p > 0.1}
+
+
+def test_matches_per_runner(runners):
+    engine = SQPEEngine()
+    p_benter, p_public = probabilities(runners, 1), probabilities(runners, 2)
+
+    results = engine.analyze_races(runners, p_benter, p_public)
+    assert list(results.columns) == SIGNAL_COLUMNS
+
+    for race_id, race_df in runners.groupby('race_id', sort=False):
+        expected = per_runner(engine, race_df, p_benter, p_public)
+        actual = engine.build_signals(results[results['race'] == race_id], runners)
+        assert len(actual) == len(expected)
+        assert all(same(a, e) for a, e in zip(actual, expected))
+
+
+def test_analyze_race_delegates(runners):
+    engine = SQPEEngine()
+    p_benter, p_public = probabilities(runners, 3), probabilities(runners, 4)
+    race_df = runners[runners['race_id'] == runners['race_id'].iloc[0]]
+
+    actual = engine.analyze_race(race_df, p_benter, p_public)
+    expected = per_runner(engine, race_df, p_benter, p_public)
+    assert all(same(a, e) for a, e in zip(actual, expected))
+
+
+def test_array_probabilities_and_top_signals(runners):
+    engine = SQPEEngine()
+    p_benter = np.linspace(0.0, 0.5, len(runners))
+    p_public = np.full(len(runners), 0.1)
+
+    results = engine.analyze_races(runners, p_benter, p_public)
+    top = engine.top_signals(results, runners, top_n=2)
+
+    assert set(top) == set(runners['race_id'])
+    for race_id, signals in top.items():
+        scores = results.loc[results['race'] == race_id, 'sqpe_score'].tolist()
+        assert [s.sqpe_score for s in signals] == scores[:2]
+
+    strong = engine.top_signals(results, runners, top_n=5, strong_only=True)
+    assert all(s.signal_strength is SignalStrength.STRONG for race in strong.values() for s in race)
+
+    with pytest.raises(ValueError):
+        engine.analyze_races(runners, p_benter[:-1], p_public)
+
+
+def test_class_values_follow_int():
+    engine = SQPEEngine()
+    runners = pd.DataFrame({'class': ['3', '3.0', 'Class 2', None, 4, np.inf]})
+
+    expected = [engine.calculate_class_signal(row) for _, row in runners.iterrows()]
+    np.testing.assert_array_equal(engine.class_signals(runners), expected)
+
+
+def test_missing_columns():
+    engine = SQPEEngine()
+    runners = pd.DataFrame({'num': [1, 2]})
+
+    results = engine.analyze_races(runners, {}, {})
+    expected = per_runner(engine, runners, {}, {})
+
+    assert results['race'].tolist() == [0, 0]
+    assert all(same(a, e) for a, e in zip(engine.build_signals(results, runners), expected))
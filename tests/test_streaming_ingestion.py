@@ -0,0 +1,233 @@
+"""Tests for streaming batch ingestion in the ingestion spine"""
+
+import asyncio
+import csv
+import io
+
+import pytest
+
+from datetime import date
+
+from workers.ingestion_spine.models import FileType
+from workers.ingestion_spine.quality import (
+    RaceQualityAccumulator,
+    calculate_race_quality,
+    calculate_runner_confidence,
+)
+from workers.ingestion_spine.streaming import StreamingBatchParse, iter_csv_batches, prefetch
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(source):
+    return [item async for item in source]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+CSV_TEXT = (
+    "﻿course,off_time,race_name\n"
+    "Ascot,14:30,\"King's Stand\"\n"
+    "Kempton,16:40,\"Handicap, \"\"Div 1\"\"\"\n"
+    "Newbury,13:15,\"Two\nline name\"\n"
+    "York,15:00,Café Stakes\n"
+)
+
+
+class TestIterCsvBatches:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 4096])
+    def test_matches_dict_reader(self, chunk_size):
+        data = CSV_TEXT.encode("utf-8")
+        expected = list(csv.DictReader(io.StringIO(data.decode("utf-8-sig"))))
+
+        batches = run(collect(iter_csv_batches(chunked(data, chunk_size), 2)))
+
+        assert [row for batch in batches for row in batch] == expected
+        assert all(len(batch) <= 2 for batch in batches)
+
+    def test_no_trailing_newline(self):
+        data = b"a,b\n1,2\n3,4"
+        batches = run(collect(iter_csv_batches(chunked(data, 3), 10)))
+        assert batches == [[{"a": "1", "b": "2"}, {"a": "3", "b": "4"}]]
+
+    def test_header_only(self):
+        batches = run(collect(iter_csv_batches(chunked(b"a,b\n", 2), 10)))
+        assert batches == []
+
+    def test_invalid_utf8(self):
+        with pytest.raises(ValueError, match="Failed to parse CSV"):
+            run(collect(iter_csv_batches(chunked(b"a,b\n\xff\xfe,2\n", 4), 10)))
+
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError):
+            run(collect(iter_csv_batches(chunked(b"a\n1\n", 4), 0)))
+
+
+class TestPrefetch:
+    def test_preserves_order(self):
+        async def numbers():
+            for i in range(20):
+                yield i
+
+        assert run(collect(prefetch(numbers(), 2))) == list(range(20))
+
+    def test_reraises_producer_error(self):
+        async def failing():
+            yield 1
+            raise RuntimeError("storage read failed")
+
+        with pytest.raises(RuntimeError, match="storage read failed"):
+            run(collect(prefetch(failing(), 2)))
+
+
+class TestRaceQualityAccumulator:
+    def test_matches_calculate_race_quality(self):
+        race = {"course": "Ascot", "distance": "", "race_time": "14:30"}
+        runners = [
+            {"horse_name": "Alpha", "confidence": 1.0},
+            {"horse_name": " alpha ", "confidence": 0.4},
+            {"horse_name": "", "confidence": 0.5},
+            {"confidence": 0.9},
+            {"horse_name": "Beta"},
+        ]
+
+        accumulator = RaceQualityAccumulator()
+        for runner in runners:
+            accumulator.add(runner)
+
+        assert accumulator.result(race) == calculate_race_quality(race, runners)
+
+    def test_no_runners(self):
+        assert RaceQualityAccumulator().result({}) == (0.0, 0.0, ["no_runners"])
+
+
+IMPORT_DATE = date(2026, 1, 4)
+
+RACES = [
+    {'course': 'Ascot', 'off_time': '14:30', 'race_name': "King's Stand", 'distance': '5f',
+     'going': 'Good', 'join_key_base': 'Ascot|14:30|KS'},
+    {'course': 'York', 'off_time': '15:00', 'race_name': 'Nunthorpe', 'distance': '5f',
+     'going': 'Soft', 'join_key_base': 'York|15:00|N'},
+]
+
+RUNNERS = [
+    {'race_join_key': '2026-01-04|Ascot|14:30|KS', 'horse_name': 'Alpha', 'age': 4,
+     'or_rating': 90, 'rpr': 95, 'ts': 80, 'trainer': 'T One', 'jockey': 'J One'},
+    {'race_join_key': '2026-01-04|Ascot|14:30|KS', 'horse_name': 'Bravo', 'age': 5,
+     'or_rating': None, 'rpr': None, 'ts': None, 'trainer': 'T Two', 'jockey': None},
+    {'race_join_key': '2026-01-04|York|15:00|N', 'horse_name': 'Charlie', 'age': 3,
+     'or_rating': 100, 'rpr': 101, 'ts': 99, 'trainer': 'T Three', 'jockey': 'J Three'},
+]
+
+
+class FakeParser:
+    """Yields fresh copies of fixed rows once the byte stream is drained."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def parse_stream(self, chunks, batch_size):
+        async for _ in chunks:
+            pass
+        for start in range(0, len(self.rows), batch_size):
+            yield [dict(row) for row in self.rows[start:start + batch_size]]
+
+
+class FakeStorage:
+    def __init__(self, files):
+        self.files = files
+
+    async def stream_file(self, path, chunk_size=1 << 16):
+        async for chunk in chunked(self.files[path], 7):
+            yield chunk
+
+
+class FakeDb:
+    def __init__(self):
+        self.races = []
+        self.runner_rows = []
+
+    async def insert_races_bulk(self, batch_id, import_date, races, inserted_ids=None):
+        race_id_map = {}
+        for race_data in races:
+            race_id = f"race-{len(self.races)}"
+            self.races.append(dict(race_data))
+            race_id_map[race_data['join_key']] = race_id
+            if inserted_ids is not None:
+                inserted_ids.append(race_id)
+        return race_id_map
+
+    async def insert_runners_bulk(self, runner_rows, chunk_size=500):
+        self.runner_rows.extend(runner_rows)
+        return [f"runner-{i}" for i in range(len(runner_rows))]
+
+
+class TestStreamingBatchParse:
+    def parse(self, runners=RUNNERS, db=None):
+        db = db if db is not None else FakeDb()
+        counts = {
+            'races_inserted': 0,
+            'runners_inserted': 0,
+            'form_lines_inserted': 0,
+            'unmatched_runner_rows': 0,
+        }
+        pipeline = StreamingBatchParse(
+            db=db,
+            storage=FakeStorage({'racecards.csv': b'racecards', 'runners.csv': b'runners,spooled'}),
+            batch={'id': 'batch-1', 'import_date': IMPORT_DATE},
+            file_map={
+                FileType.RACECARDS: {'storage_path': 'racecards.csv'},
+                FileType.RUNNERS: {'storage_path': 'runners.csv'},
+            },
+            counts=counts,
+            racecards_parser=FakeParser(RACES),
+            runners_parser_factory=lambda: FakeParser(runners),
+            chunk_size=7,
+            batch_rows=2,
+        )
+        run(pipeline.run())
+        return db, counts, pipeline
+
+    def test_rows_match_per_row_quality(self):
+        db, counts, pipeline = self.parse()
+
+        assert counts['races_inserted'] == 2
+        assert counts['runners_inserted'] == 3
+        assert pipeline.inserted_race_ids == ['race-0', 'race-1']
+
+        runners = [runner for _, runner in db.runner_rows]
+        assert [race_id for race_id, _ in db.runner_rows] == ['race-0', 'race-0', 'race-1']
+        for runner in runners:
+            confidence, flags, method = calculate_runner_confidence(runner)
+            assert runner['confidence'] == pytest.approx(confidence)
+            assert runner['quality_flags'] == flags
+            assert runner['extraction_method'] == method
+            assert 'race_join_key' not in runner
+        assert [runner['course'] for runner in runners] == ['Ascot', 'Ascot', 'York']
+        assert [runner['going'] for runner in runners] == ['Good', 'Good', 'Soft']
+        assert all(runner['date'] == IMPORT_DATE for runner in runners)
+
+        for race_data, race_runners in zip(db.races, [runners[:2], runners[2:]]):
+            race = {
+                'course': race_data['course'],
+                'distance': race_data['distance'],
+                'race_time': race_data['off_time'],
+            }
+            parse_conf, quality, flags = calculate_race_quality(race, race_runners)
+            assert race_data['parse_confidence'] == pytest.approx(parse_conf)
+            assert race_data['quality_score'] == pytest.approx(quality)
+            assert race_data['quality_flags'] == flags
+
+    def test_unmatched_runners_fail_before_writing(self):
+        stray = {**RUNNERS[0], 'race_join_key': '2026-01-04|Ripon|16:00|M', 'horse_name': 'Delta'}
+
+        db = FakeDb()
+
+        with pytest.raises(ValueError, match="1 unmatched runners"):
+            self.parse(RUNNERS + [stray], db)
+        assert db.races == [] and db.runner_rows == []
@@ -0,0 +1,135 @@
+"""
+Tests for the array-backed Top-4 engine against rank_top4
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from app.core.errors import V12Error
+from app.ml.historical_stats import HistoricalStats
+from app.ml.opponent_models import IntentClass, MarketRole, OpponentProfile, StableTactic
+from app.strategy.top4_engine import (
+    UNKNOWN_ROLE,
+    RunnerArrays,
+    Top4Engine,
+    encode_roles,
+    rank_top4_many,
+)
+from app.strategy.top4_ranker import rank_top4
+
+ROLES = ["ANCHOR", "Liquidity_Anchor", "RELEASE", "Release_Horse", "Steam",
+         "Drift_Bait", "Spoiler", "Noise", "NOISE", "Unknown"]
+
+
+def random_race(rng, race_no):
+    profiles = []
+    for i in range(rng.randint(1, 14)):
+        profile = {
+            "runner_id": f"race{race_no}_r{i}",
+            "market_role": rng.choice(ROLES),
+            # Ties on purpose: few distinct odds
+            "odds_decimal": rng.choice([1.2, 1.5, 2.0, 3.0, 5.0, 8.0, 12.0, 0.0]),
+        }
+        if rng.random() < 0.2:
+            profile["stability_profile"] = {"cluster_id": "STABLE_HIGH_IMPROVING_TOP"}
+        if rng.random() < 0.2:
+            profile["historical_stats"] = HistoricalStats(
+                trainer_win_rate=0.20, jockey_win_rate=0.05, combo_win_rate=0.25,
+                trainer_sample_size=20, jockey_sample_size=20, combo_sample_size=10,
+                track="AYR", distance_band="MILE", surface="Turf", recency_days=365,
+            )
+        profiles.append(profile)
+
+    race_ctx = {"chaos_level": rng.choice([0.3, 0.6, 0.8])}
+    if rng.random() < 0.7:
+        race_ctx["field_size"] = len(profiles)
+    if rng.random() < 0.7:
+        race_ctx["manipulation_risk"] = rng.choice([0.2, 0.44, 0.45, 0.7])
+    return profiles, race_ctx
+
+
+@pytest.fixture
+def races():
+    rng = random.Random(11)
+    return [random_race(rng, i) for i in range(200)]
+
+
+def test_matches_rank_top4(races):
+    results = rank_top4_many(races)
+
+    for (profiles, race_ctx), (top4, breakdowns) in zip(races, results):
+        expected_top4, expected_breakdowns = rank_top4(profiles, race_ctx)
+        assert top4 == expected_top4
+        assert breakdowns == expected_breakdowns
+
+
+def test_object_profiles():
+    profiles = [
+        OpponentProfile(
+            runner_id=f"r{i}", horse_name=f"Horse {i}", intent_class=IntentClass.UNKNOWN,
+            market_role=role, stable_tactic=StableTactic.SOLO, confidence=0.7,
+            evidence={"odds": odds},
+        )
+        for i, (role, odds) in enumerate([
+            (MarketRole.LIQUIDITY_ANCHOR, 1.44), (MarketRole.RELEASE_HORSE, 3.75),
+            (MarketRole.RELEASE_HORSE, 9.0), (MarketRole.NOISE, 19.0), (MarketRole.SPOILER, 29.0),
+        ])
+    ]
+    race_ctx = {"chaos_level": 0.43, "manipulation_risk": 0.3, "field_size": 5}
+
+    [(top4, breakdowns)] = rank_top4_many([(profiles, race_ctx)])
+
+    assert (top4, breakdowns) == rank_top4(profiles, race_ctx)
+
+
+def test_from_columns_matches_profiles(races):
+    plain = [
+        ([{k: v for k, v in p.items() if k in ("runner_id", "market_role", "odds_decimal")} for p in profiles], ctx)
+        for profiles, ctx in races
+    ]
+    from_profiles = Top4Engine(RunnerArrays.from_profiles(plain))
+
+    flat = [p for profiles, _ in plain for p in profiles]
+    arrays = RunnerArrays.from_columns(
+        runner_ids=[p["runner_id"] for p in flat],
+        odds=[p["odds_decimal"] or 10.0 for p in flat],
+        roles=[p["market_role"] for p in flat],
+        offsets=from_profiles.runners.offsets,
+        chaos_level=[ctx["chaos_level"] for _, ctx in plain],
+        field_size=[ctx.get("field_size", 10) for _, ctx in plain],
+        manipulation_risk=[ctx.get("manipulation_risk", 0.5) for _, ctx in plain],
+    )
+    from_columns = Top4Engine(arrays)
+
+    np.testing.assert_array_equal(from_columns.total, from_profiles.total)
+    np.testing.assert_array_equal(from_columns.top4_matrix, from_profiles.top4_matrix)
+
+
+def test_empty_races():
+    arrays = RunnerArrays.from_columns(
+        runner_ids=["a", "b"], odds=[2.0, 4.0], roles=["ANCHOR", "NOISE"], offsets=[0, 0, 2, 2],
+    )
+    engine = Top4Engine(arrays)
+
+    assert engine.top4(0).tolist() == []
+    assert engine.top4(1).tolist() == [0, 1]
+    assert engine.rank_race(2)[1] == {}
+
+
+def test_duplicate_runner_ids_break_contract():
+    profiles = [{"runner_id": "r1", "odds_decimal": 2.0}, {"runner_id": "r1", "odds_decimal": 3.0}]
+    ok = [{"runner_id": "r2", "odds_decimal": 2.0}]
+
+    engine = Top4Engine(RunnerArrays.from_profiles([(ok, {}), (profiles, {})]))
+
+    engine.rank_race(0)
+    with pytest.raises(V12Error):
+        engine.rank_race(1)
+
+
+def test_encode_roles():
+    codes = encode_roles(["ANCHOR", MarketRole.STEAM, None, "bogus"])
+    assert codes[2] == UNKNOWN_ROLE and codes[3] == UNKNOWN_ROLE
+    assert codes[0] != UNKNOWN_ROLE and codes[1] != UNKNOWN_ROLE
@@ -5,6 +5,7 @@ Supabase PostgreSQL operations with service role access
 Date: 2026-01-04
 """
 
+import asyncio
 import logging
 import os
 from datetime import date, datetime, timedelta
@@ -12,10 +13,19 @@ from typing import Any
 
 from supabase import Client, create_client
 
+from .feature_mart import (
+    backfill_feature_mart,
+    fetch_feature_mart_source_supabase,
+    source_date_range,
+    upsert_feature_mart_supabase,
+)
 from .models import BatchStatus, FileType
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT for bulk ingestion (one PostgREST round trip each)
+DEFAULT_INSERT_CHUNK_SIZE = int(os.getenv("INGEST_INSERT_CHUNK_SIZE", "500"))
+
 # ============================================================================
 # DATABASE CLIENT
 # ============================================================================
@@ -219,25 +229,7 @@ class DatabaseClient:
         
         Returns the race_id.
         """
-        data = {
-            "batch_id": batch_id,
-            "import_date": import_date.isoformat(),
-            "course": race_data.get('course'),
-            "off_time": race_data.get('off_time'),
-            "race_name": race_data.get('race_name'),
-            "race_type": race_data.get('race_type'),
-            "distance": race_data.get('distance'),
-            "class_band": race_data.get('class_band'),
-            "going": race_data.get('going'),
-            "field_size": race_data.get('field_size'),
-            "prize": race_data.get('prize'),
-            "join_key": race_data.get('join_key'),
-            "raw": race_data.get('raw', {}),
-            # Quality metadata
-            "parse_confidence": race_data.get('parse_confidence'),
-            "quality_score": race_data.get('quality_score'),
-            "quality_flags": race_data.get('quality_flags', [])
-        }
+        data = self._race_row(batch_id, import_date, race_data)
 
         result = self.client.table('races').insert(data).execute()
 
@@ -282,7 +274,61 @@ class DatabaseClient:
         
         Returns the racecard_id.
         """
-        data = {
+        data = self._runner_row(race_id, runner_data)
+
+        # INSERT INTO racecards (not runners!)
+        result = self.client.table('racecards').insert(data).execute()
+
+        if not result.data:
+            raise ValueError("Failed to insert runner into racecards")
+
+        return result.data[0]['id']
+
+    async def get_race_runners(self, race_id: str) -> list[dict[str, Any]]:
+        """Get all runners for a race from racecards table"""
+        result = self.client.table('racecards')\
+            .select('*')\
+            .eq('race_id', race_id)\
+            .order('draw')\
+            .execute()
+
+        return result.data or []
+
+    # ========================================================================
+    # BULK INGESTION
+    # ========================================================================
+
+    @staticmethod
+    def _race_row(
+        batch_id: str,
+        import_date: date,
+        race_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Build a races table row from parsed race data"""
+        return {
+            "batch_id": batch_id,
+            "import_date": import_date.isoformat(),
+            "course": race_data.get('course'),
+            "off_time": race_data.get('off_time'),
+            "race_name": race_data.get('race_name'),
+            "race_type": race_data.get('race_type'),
+            "distance": race_data.get('distance'),
+            "class_band": race_data.get('class_band'),
+            "going": race_data.get('going'),
+            "field_size": race_data.get('field_size'),
+            "prize": race_data.get('prize'),
+            "join_key": race_data.get('join_key'),
+            "raw": race_data.get('raw', {}),
+            # Quality metadata
+            "parse_confidence": race_data.get('parse_confidence'),
+            "quality_score": race_data.get('quality_score'),
+            "quality_flags": race_data.get('quality_flags', [])
+        }
+
+    @staticmethod
+    def _runner_row(race_id: str, runner_data: dict[str, Any]) -> dict[str, Any]:
+        """Build a racecards table row from parsed runner data"""
+        return {
             # Link to race
             "race_id": race_id,
             
@@ -308,23 +354,109 @@ class DatabaseClient:
             # scraped_at uses database DEFAULT NOW()
         }
 
-        # INSERT INTO racecards (not runners!)
-        result = self.client.table('racecards').insert(data).execute()
+    async def _execute(self, query):
+        """
+        Execute a PostgREST query off the event loop.
 
-        if not result.data:
-            raise ValueError("Failed to insert runner into racecards")
+        The supabase Client is synchronous; running it in a worker thread
+        keeps other requests on the worker responsive during large writes.
+        """
+        return await asyncio.to_thread(query.execute)
 
-        return result.data[0]['id']
+    async def _insert_chunked(
+        self,
+        table: str,
+        rows: list[dict[str, Any]],
+        chunk_size: int,
+        inserted_ids: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Insert rows with one multi-row INSERT per chunk.
 
-    async def get_race_runners(self, race_id: str) -> list[dict[str, Any]]:
-        """Get all runners for a race from racecards table"""
-        result = self.client.table('racecards')\
-            .select('*')\
-            .eq('race_id', race_id)\
-            .order('draw')\
-            .execute()
+        Ids of committed records are appended to inserted_ids chunk by
+        chunk, so they are known even if a later chunk fails.
 
-        return result.data or []
+        Returns the inserted records in input order.
+        """
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+
+        inserted: list[dict[str, Any]] = []
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            result = await self._execute(self.client.table(table).insert(chunk))
+
+            if inserted_ids is not None:
+                inserted_ids.extend(record['id'] for record in result.data or [])
+
+            if not result.data or len(result.data) != len(chunk):
+                raise ValueError(
+                    f"Bulk insert into {table} returned {len(result.data or [])} rows, expected {len(chunk)}"
+                )
+
+            inserted.extend(result.data)
+
+        return inserted
+
+    async def insert_races_bulk(
+        self,
+        batch_id: str,
+        import_date: date,
+        races: list[dict[str, Any]],
+        chunk_size: int = DEFAULT_INSERT_CHUNK_SIZE,
+        inserted_ids: list[str] | None = None
+    ) -> dict[str, str]:
+        """
+        Insert race records with multi-row inserts.
+
+        Args:
+            inserted_ids: Collects the id of every race committed, chunk by
+                chunk, for rollback_batch_rows
+
+        Returns a join_key -> race_id mapping.
+        """
+        rows = [self._race_row(batch_id, import_date, race) for race in races]
+        inserted = await self._insert_chunked('races', rows, chunk_size, inserted_ids)
+
+        return {record['join_key']: record['id'] for record in inserted}
+
+    async def insert_runners_bulk(
+        self,
+        runners: list[tuple[str, dict[str, Any]]],
+        chunk_size: int = DEFAULT_INSERT_CHUNK_SIZE
+    ) -> list[str]:
+        """
+        Insert runners into racecards with multi-row inserts.
+
+        Args:
+            runners: (race_id, runner_data) pairs
+            chunk_size: Rows per INSERT
+
+        Returns the racecard ids in input order.
+        """
+        rows = [self._runner_row(race_id, runner) for race_id, runner in runners]
+        inserted = await self._insert_chunked('racecards', rows, chunk_size)
+
+        return [record['id'] for record in inserted]
+
+    async def rollback_batch_rows(self, batch_id: str, race_ids: list[str]) -> int:
+        """
+        Delete races (and their racecards) written by one parse of a batch.
+
+        PostgREST commits each request on its own, so chunked inserts are
+        made all-or-nothing by compensating deletes: runners first, then races.
+        Only the given race ids are removed, never other rows of the batch
+        (e.g. from an earlier successful parse).
+
+        Returns the number of races removed.
+        """
+        for start in range(0, len(race_ids), DEFAULT_INSERT_CHUNK_SIZE):
+            chunk = race_ids[start:start + DEFAULT_INSERT_CHUNK_SIZE]
+            await self._execute(self.client.table('racecards').delete().in_('race_id', chunk))
+            await self._execute(self.client.table('races').delete().in_('id', chunk))
+
+        logger.info(f"Rolled back {len(race_ids)} races for batch {batch_id}")
+        return len(race_ids)
 
     # ========================================================================
     # FORM LINE OPERATIONS
@@ -441,20 +573,30 @@ class DatabaseClient:
     # FEATURE MART OPERATIONS
     # ========================================================================
     
-    async def build_feature_mart(self, as_of_date: date) -> None:
+    async def build_feature_mart(self, as_of_date: date, end_date: date | None = None) -> None:
         """
-        Build feature mart for a specific as_of_date.
+        Build feature mart for a specific as_of_date, or every as_of_date
+        from as_of_date to end_date.
         
-        Calls the PostgreSQL build_feature_mart function to compute
-        deterministic trainer, jockey, JT combo, and course/distance stats.
+        A single date calls the PostgreSQL build_feature_mart function to
+        compute deterministic trainer, jockey, JT combo, and course/distance
+        stats. A range is backfilled incrementally (feature_mart.py): source
+        rows are read once, the windows slide day by day, and rows are
+        upserted in bulk.
         
         Args:
             as_of_date: Date to use as reference for feature computation
+            end_date: Last as_of_date to backfill (inclusive, optional)
         """
         try:
             # Supabase uses RPC to call PostgreSQL functions
             date_str = as_of_date.isoformat() if isinstance(as_of_date, date) else as_of_date
             
+            if end_date is not None:
+                written = await asyncio.to_thread(self._backfill_feature_mart, as_of_date, end_date)
+                logger.info(f"Feature mart backfilled for {date_str} → {end_date}: {written}")
+                return
+            
             # Note: Supabase RPC requires the function to return something
             # Our function returns VOID, so this might need adjustment
             result = self.client.rpc('build_feature_mart', {
@@ -467,6 +609,12 @@ class DatabaseClient:
             logger.error(f"Failed to build feature mart: {e}")
             raise
 
+    def _backfill_feature_mart(self, start_date: date, end_date: date) -> dict[str, int]:
+        source_start, source_end = source_date_range(start_date, end_date)
+        source = fetch_feature_mart_source_supabase(self.client, source_start, source_end)
+        tables = backfill_feature_mart(source, start_date, end_date)
+        return upsert_feature_mart_supabase(self.client, tables)
+
 # ============================================================================
 # CLIENT FACTORY
 # ============================================================================
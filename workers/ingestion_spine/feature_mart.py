@@ -0,0 +1,533 @@
+"""
+Incremental feature mart backfill
+
+NumPy implementation of build_feature_mart(p_as_of_date) from
+supabase/migrations/005_deterministic_feature_mart.sql for date ranges.
+
+The SQL function rescans every 14/30/90/365/1095-day window for each
+as_of_date. Backfilling walks as_of dates in order instead and keeps
+rolling per-entity sums: each step adds the day entering a window and
+subtracts the day leaving it, so a range costs one pass over the source
+rows plus the emitted rows.
+
+Rows match the SQL function: the same filters, HAVING thresholds and
+NUMERIC rounding (ROUND half away from zero). Odds are summed in integer
+hundredths, so averages and volatility are exact for odds quoted to two
+decimal places.
+
+Usage:
+    start, end = source_date_range('2023-01-01', '2025-12-31')
+    source = await fetch_feature_mart_source(db, start, end)
+    tables = backfill_feature_mart(source, '2023-01-01', '2025-12-31')
+    await write_feature_mart(db, tables)
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRAINER_WINDOWS = (14, 30, 90)
+JOCKEY_WINDOWS = (14, 30, 90)
+JT_COMBO_WINDOW = 365
+COURSE_WINDOW = 1095
+MAX_WINDOW_DAYS = max(TRAINER_WINDOWS + JOCKEY_WINDOWS + (JT_COMBO_WINDOW, COURSE_WINDOW))
+
+# HAVING thresholds in build_feature_mart
+JT_COMBO_MIN_STARTS = 3
+COURSE_MIN_RACES = 5
+
+VALID_BATCH_STATUSES = ('validated', 'ready')
+
+# One row per runner (per matching form line), as joined by build_feature_mart
+SOURCE_COLUMNS = [
+    'import_date', 'race_id', 'course', 'distance', 'race_type',
+    'trainer', 'jockey', 'position', 'odds',
+]
+
+FEATURE_MART_SOURCE_QUERY = """
+SELECT
+    ra.import_date,
+    ra.id AS race_id,
+    ra.course,
+    ra.distance,
+    ra.race_type,
+    r.trainer,
+    r.jockey,
+    fl.position,
+    COALESCE((r.raw->>'odds')::NUMERIC, 0) AS odds
+FROM runners r
+JOIN races ra ON r.race_id = ra.id
+JOIN import_batches b ON ra.batch_id = b.id
+LEFT JOIN runner_form_lines fl ON fl.runner_id = r.id AND fl.run_date = ra.import_date
+WHERE ra.import_date >= $1
+  AND ra.import_date < $2
+  AND b.status IN ('validated', 'ready')
+ORDER BY ra.import_date, ra.id, r.id
+"""
+
+TABLE_COLUMNS = {
+    'trainer_stats_window': [
+        'as_of_date', 'window_days', 'trainer', 'starts', 'wins', 'places',
+        'win_pct', 'place_pct', 'avg_odds', 'last_run_date',
+    ],
+    'jockey_stats_window': [
+        'as_of_date', 'window_days', 'jockey', 'starts', 'wins', 'places',
+        'win_pct', 'place_pct', 'avg_odds', 'last_run_date',
+    ],
+    'jt_combo_stats_window': [
+        'as_of_date', 'window_days', 'jockey', 'trainer', 'starts', 'wins', 'places',
+        'win_pct', 'place_pct', 'avg_odds',
+    ],
+    'course_distance_stats_window': [
+        'as_of_date', 'window_days', 'course', 'distance_band', 'surface',
+        'races', 'avg_winning_odds', 'odds_volatility',
+    ],
+}
+
+CONFLICT_KEYS = {
+    'trainer_stats_window': ('as_of_date', 'window_days', 'trainer'),
+    'jockey_stats_window': ('as_of_date', 'window_days', 'jockey'),
+    'jt_combo_stats_window': ('as_of_date', 'window_days', 'jockey', 'trainer'),
+    'course_distance_stats_window': ('as_of_date', 'window_days', 'course', 'distance_band', 'surface'),
+}
+
+# Local schema for testing against SQLite (Postgres uses migration 005)
+SQLITE_FEATURE_MART_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trainer_stats_window (
+  as_of_date DATE NOT NULL, window_days INTEGER NOT NULL, trainer TEXT NOT NULL,
+  starts INTEGER NOT NULL, wins INTEGER NOT NULL, places INTEGER NOT NULL,
+  win_pct NUMERIC, place_pct NUMERIC, avg_odds NUMERIC, last_run_date DATE,
+  UNIQUE(as_of_date, window_days, trainer)
+);
+CREATE TABLE IF NOT EXISTS jockey_stats_window (
+  as_of_date DATE NOT NULL, window_days INTEGER NOT NULL, jockey TEXT NOT NULL,
+  starts INTEGER NOT NULL, wins INTEGER NOT NULL, places INTEGER NOT NULL,
+  win_pct NUMERIC, place_pct NUMERIC, avg_odds NUMERIC, last_run_date DATE,
+  UNIQUE(as_of_date, window_days, jockey)
+);
+CREATE TABLE IF NOT EXISTS jt_combo_stats_window (
+  as_of_date DATE NOT NULL, window_days INTEGER NOT NULL, jockey TEXT NOT NULL, trainer TEXT NOT NULL,
+  starts INTEGER NOT NULL, wins INTEGER NOT NULL, places INTEGER NOT NULL,
+  win_pct NUMERIC, place_pct NUMERIC, avg_odds NUMERIC,
+  UNIQUE(as_of_date, window_days, jockey, trainer)
+);
+CREATE TABLE IF NOT EXISTS course_distance_stats_window (
+  as_of_date DATE NOT NULL, window_days INTEGER NOT NULL, course TEXT NOT NULL,
+  distance_band TEXT NOT NULL, surface TEXT,
+  races INTEGER NOT NULL, avg_winning_odds NUMERIC, odds_volatility NUMERIC,
+  UNIQUE(as_of_date, window_days, course, distance_band, surface)
+);
+"""
+
+_EPOCH = date(1970, 1, 1)
+
+
+def _day(value) -> int:
+    return (pd.Timestamp(value).date() - _EPOCH).days
+
+
+def _dates(days: np.ndarray) -> List[date]:
+    return [_EPOCH + timedelta(days=int(d)) for d in days]
+
+
+def source_date_range(start_date, end_date) -> Tuple[date, date]:
+    """
+    Source rows [start, end) needed to backfill as_of dates start..end.
+
+    The earliest 1095-day window starts MAX_WINDOW_DAYS before the first
+    as_of date; the last window ends the day before the last as_of date.
+    """
+    start = pd.Timestamp(start_date).date() - timedelta(days=MAX_WINDOW_DAYS)
+    end = pd.Timestamp(end_date).date()
+    return start, end
+
+
+def distance_band(distance: pd.Series) -> pd.Series:
+    """Distance text → band, as in build_feature_mart's CASE expression."""
+    text = distance.astype('string')
+    all_digits = text.str.fullmatch(r'\d+').fillna(False).astype(bool)
+    leading = text.str.extract(r'^(\d+)m', expand=False)
+    metres = pd.to_numeric(text.where(all_digits, leading), errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+    bands = np.select(
+        [metres < 1200, metres < 1600, metres < 2000, metres < 2400, metres >= 2400],
+        ['< 1200m', '1200-1600m', '1600-2000m', '2000-2400m', '2400m+'],
+        default='Unknown',
+    )
+    return pd.Series(bands, index=distance.index)
+
+
+def _round_ratio(numerator: np.ndarray, denominator: np.ndarray, places: int) -> np.ndarray:
+    """ROUND(numerator / denominator, places) for non-negative integers, exactly."""
+    scale = 10 ** places
+    return ((2 * numerator * scale + denominator) // (2 * denominator)) / scale
+
+
+def _round_stddev_cents(n: np.ndarray, total: np.ndarray, total_sq: np.ndarray) -> np.ndarray:
+    """ROUND(STDDEV(x), 2) from integer-cent sums; NaN below two values."""
+    out = np.full(len(n), np.nan)
+    ok = n >= 2
+    n, total, total_sq = n[ok], total[ok], total_sq[ok]
+
+    # Sample variance in cents² is num / den; round(sqrt) = (isqrt(4·num // den) + 1) // 2
+    num = n * total_sq - total * total
+    den = n * (n - 1)
+    v = 4 * num // den
+    root = np.floor(np.sqrt(v.astype(float))).astype(np.int64)
+    root -= (root * root > v)
+    root += ((root + 1) * (root + 1) <= v)
+    out[ok] = ((root + 1) // 2) / 100
+    return out
+
+
+class _RollingSums:
+    """
+    Per-entity sums over the sliding window [as_of - window_days, as_of).
+
+    Rows must be sorted by day. advance() only touches the rows entering
+    and leaving the window since the previous as_of.
+    """
+
+    def __init__(self, days: np.ndarray, ids: np.ndarray, values: Dict[str, np.ndarray],
+                 n_entities: int, window_days: int):
+        self.days = days
+        self.ids = ids
+        self.values = values
+        self.window_days = window_days
+        self.sums = {name: np.zeros(n_entities, dtype=np.int64) for name in values}
+        self.last_day = np.full(n_entities, np.iinfo(np.int64).min, dtype=np.int64)
+        self.as_of = None
+
+    def _rows(self, lo_day: int, hi_day: int) -> slice:
+        lo, hi = np.searchsorted(self.days, [lo_day, hi_day], side='left')
+        return slice(lo, hi)
+
+    def advance(self, as_of: int):
+        previous = self.as_of if self.as_of is not None else as_of - self.window_days
+
+        entering = self._rows(max(previous, as_of - self.window_days), as_of)
+        ids = self.ids[entering]
+        for name, values in self.values.items():
+            np.add.at(self.sums[name], ids, values[entering])
+        np.maximum.at(self.last_day, ids, self.days[entering])
+
+        if self.as_of is not None:
+            leaving = self._rows(previous - self.window_days, min(previous, as_of - self.window_days))
+            ids = self.ids[leaving]
+            for name, values in self.values.items():
+                np.subtract.at(self.sums[name], ids, values[leaving])
+
+        self.as_of = as_of
+
+
+def _prepare_source(source: pd.DataFrame) -> pd.DataFrame:
+    """Source rows sorted by day, with integer outcome and odds columns."""
+    df = source.copy()
+    for column in SOURCE_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+
+    df['day'] = (pd.to_datetime(df['import_date']).to_numpy(dtype='datetime64[D]')
+                 - np.datetime64(_EPOCH, 'D')).astype(np.int64)
+    df = df.sort_values('day', kind='stable').reset_index(drop=True)
+
+    # fl.position is text: wins are exactly '1', places '1'/'2'/'3'
+    position = df['position'].astype('string')
+    df['win'] = (position == '1').fillna(False).to_numpy(dtype=np.int64)
+    df['place'] = position.isin(['1', '2', '3']).fillna(False).to_numpy(dtype=np.int64)
+
+    odds = pd.to_numeric(df['odds'], errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    df['odds_cents'] = np.round(odds * 100).astype(np.int64)
+    return df
+
+
+def _factorize(frame: pd.DataFrame, keys: Sequence[str]) -> Tuple[np.ndarray, pd.DataFrame]:
+    if len(keys) == 1:
+        codes, uniques = pd.factorize(frame[keys[0]])
+        return codes, pd.DataFrame({keys[0]: np.asarray(uniques, dtype=object)})
+    codes, uniques = pd.MultiIndex.from_frame(frame[list(keys)]).factorize()
+    return codes, pd.DataFrame(list(uniques), columns=list(keys), dtype=object)
+
+
+def _rolling_rows(
+    df: pd.DataFrame,
+    keys: Sequence[str],
+    values: Dict[str, np.ndarray],
+    windows: Sequence[int],
+    as_of_days: np.ndarray,
+    active_column: str,
+    min_active: int,
+) -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+    """
+    Slide each window over the as_of days and collect the active entities.
+
+    Returns:
+        (entity key columns per emitted row, summed values per emitted row
+        plus 'as_of', 'window_days' and 'last_day')
+    """
+    codes, uniques = _factorize(df, keys)
+    days = df['day'].to_numpy()
+
+    emitted = {name: [] for name in list(values) + ['as_of', 'window_days', 'last_day', 'entity']}
+    for window_days in windows:
+        rolling = _RollingSums(days, codes, values, len(uniques), window_days)
+        for as_of in as_of_days.tolist():
+            rolling.advance(as_of)
+            active = np.flatnonzero(rolling.sums[active_column] >= min_active)
+            emitted['entity'].append(active)
+            emitted['as_of'].append(np.full(len(active), as_of, dtype=np.int64))
+            emitted['window_days'].append(np.full(len(active), window_days, dtype=np.int64))
+            emitted['last_day'].append(rolling.last_day[active])
+            for name in values:
+                emitted[name].append(rolling.sums[name][active])
+
+    columns = {name: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+               for name, parts in emitted.items()}
+    entity_rows = uniques.iloc[columns.pop('entity')].reset_index(drop=True)
+    return entity_rows, columns
+
+
+def _runner_stats_table(
+    df: pd.DataFrame,
+    keys: Sequence[str],
+    windows: Sequence[int],
+    as_of_days: np.ndarray,
+    min_starts: int,
+    table: str,
+) -> pd.DataFrame:
+    """trainer / jockey / jt_combo rows."""
+    sub = df[df[list(keys)].notna().all(axis=1)]
+    values = {
+        'starts': np.ones(len(sub), dtype=np.int64),
+        'wins': sub['win'].to_numpy(),
+        'places': sub['place'].to_numpy(),
+        'odds_cents': sub['odds_cents'].to_numpy(),
+    }
+    entities, sums = _rolling_rows(sub, keys, values, windows, as_of_days, 'starts', min_starts)
+
+    starts = sums['starts']
+    frame = pd.DataFrame({
+        'as_of_date': _dates(sums['as_of']),
+        'window_days': sums['window_days'],
+        **{key: entities[key].to_numpy() for key in keys},
+        'starts': starts,
+        'wins': sums['wins'],
+        'places': sums['places'],
+        'win_pct': _round_ratio(sums['wins'], starts, 4),
+        'place_pct': _round_ratio(sums['places'], starts, 4),
+        'avg_odds': _round_ratio(sums['odds_cents'], starts, 0) / 100,
+        'last_run_date': _dates(sums['last_day']),
+    })
+    return frame[TABLE_COLUMNS[table]]
+
+
+def _course_stats_table(df: pd.DataFrame, as_of_days: np.ndarray) -> pd.DataFrame:
+    """course_distance rows."""
+    sub = df[df['course'].notna()].copy()
+    sub['distance_band'] = distance_band(sub['distance'])
+    # NULL race_type reports as 'Flat' (and shares its conflict key)
+    sub['surface'] = sub['race_type'].fillna('Flat')
+
+    win = sub['win'].to_numpy()
+    win_cents = sub['odds_cents'].to_numpy() * win
+    values = {
+        # COUNT(DISTINCT ra.id): each race counted on its first runner row
+        'races': (~sub['race_id'].duplicated()).to_numpy(dtype=np.int64),
+        'winners': win,
+        'win_cents': win_cents,
+        'win_cents_sq': win_cents * win_cents,
+    }
+    keys = ('course', 'distance_band', 'surface')
+    entities, sums = _rolling_rows(sub, keys, values, (COURSE_WINDOW,), as_of_days, 'races', COURSE_MIN_RACES)
+
+    winners = sums['winners']
+    has_winner = winners > 0
+    avg_winning = np.full(len(winners), np.nan)
+    avg_winning[has_winner] = _round_ratio(sums['win_cents'][has_winner], winners[has_winner], 0) / 100
+
+    frame = pd.DataFrame({
+        'as_of_date': _dates(sums['as_of']),
+        'window_days': sums['window_days'],
+        **{key: entities[key].to_numpy() for key in keys},
+        'races': sums['races'],
+        'avg_winning_odds': avg_winning,
+        'odds_volatility': _round_stddev_cents(winners, sums['win_cents'], sums['win_cents_sq']),
+    })
+    return frame[TABLE_COLUMNS['course_distance_stats_window']]
+
+
+def backfill_feature_mart(source: pd.DataFrame, start_date, end_date) -> Dict[str, pd.DataFrame]:
+    """
+    Feature mart rows for every as_of_date from start_date to end_date.
+
+    Args:
+        source: Joined runner rows (SOURCE_COLUMNS) from validated/ready
+            batches, covering source_date_range(start_date, end_date)
+        start_date: First as_of_date (inclusive)
+        end_date: Last as_of_date (inclusive)
+
+    Returns:
+        {table name: DataFrame with the table's columns}
+    """
+    start_day, end_day = _day(start_date), _day(end_date)
+    if end_day < start_day:
+        raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+    as_of_days = np.arange(start_day, end_day + 1, dtype=np.int64)
+
+    df = _prepare_source(source)
+    logger.info(
+        f"Backfilling feature mart for {len(as_of_days)} as_of dates "
+        f"({start_date} → {end_date}) from {len(df):,} source rows"
+    )
+
+    tables = {
+        'trainer_stats_window': _runner_stats_table(
+            df, ('trainer',), TRAINER_WINDOWS, as_of_days, 1, 'trainer_stats_window'),
+        'jockey_stats_window': _runner_stats_table(
+            df, ('jockey',), JOCKEY_WINDOWS, as_of_days, 1, 'jockey_stats_window'),
+        'jt_combo_stats_window': _runner_stats_table(
+            df, ('jockey', 'trainer'), (JT_COMBO_WINDOW,), as_of_days, JT_COMBO_MIN_STARTS, 'jt_combo_stats_window'),
+        'course_distance_stats_window': _course_stats_table(df, as_of_days),
+    }
+
+    for table, frame in tables.items():
+        logger.info(f"  ✓ {table}: {len(frame):,} rows")
+    return tables
+
+
+# ============================================================================
+# SOURCE LOADING
+# ============================================================================
+
+def _source_frame(rows) -> pd.DataFrame:
+    return pd.DataFrame([dict(row) for row in rows], columns=SOURCE_COLUMNS)
+
+
+async def fetch_feature_mart_source(db, start_date, end_date) -> pd.DataFrame:
+    """Source rows with import_date in [start_date, end_date) (asyncpg-style client)."""
+    rows = await db.fetch(
+        FEATURE_MART_SOURCE_QUERY,
+        pd.Timestamp(start_date).date(),
+        pd.Timestamp(end_date).date(),
+    )
+    return _source_frame(rows)
+
+
+def fetch_feature_mart_source_supabase(client, start_date, end_date, page_size: int = 1000) -> pd.DataFrame:
+    """
+    Source rows via the feature_mart_source RPC (migration 006), paged.
+
+    PostgREST caps each response at the server's max_rows (1000 on
+    Supabase by default), which may be smaller than page_size, so a short
+    page does not mean the end: paging stops at the first empty page.
+    """
+    rows = []
+    params = {
+        'p_start_date': pd.Timestamp(start_date).date().isoformat(),
+        'p_end_date': pd.Timestamp(end_date).date().isoformat(),
+    }
+    while True:
+        page = client.rpc('feature_mart_source', params).range(len(rows), len(rows) + page_size - 1).execute()
+        if not page.data:
+            break
+        rows.extend(page.data)
+    return _source_frame(rows)
+
+
+# ============================================================================
+# BULK WRITES
+# ============================================================================
+
+def upsert_statement(table: str, paramstyle: str = 'numeric') -> str:
+    """
+    INSERT ... ON CONFLICT DO UPDATE for one feature mart table.
+
+    Args:
+        paramstyle: 'numeric' ($1, asyncpg), 'qmark' (?, sqlite3) or
+            'format' (%s, psycopg)
+    """
+    columns = TABLE_COLUMNS[table]
+    keys = CONFLICT_KEYS[table]
+    if paramstyle == 'numeric':
+        placeholders = [f"${i}" for i in range(1, len(columns) + 1)]
+    elif paramstyle == 'qmark':
+        placeholders = ['?'] * len(columns)
+    elif paramstyle == 'format':
+        placeholders = ['%s'] * len(columns)
+    else:
+        raise ValueError(f"Unsupported paramstyle: {paramstyle}")
+
+    updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in columns if c not in keys)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(placeholders)}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+    )
+
+
+def _records(frame: pd.DataFrame, iso_dates: bool = False) -> List[tuple]:
+    """Row tuples with NaN → None, numpy scalars → Python, optionally ISO dates."""
+    columns = []
+    for name in frame.columns:
+        values = frame[name].astype(object).where(frame[name].notna(), None).tolist()
+        if iso_dates and name in ('as_of_date', 'last_run_date'):
+            values = [v.isoformat() if v is not None else None for v in values]
+        columns.append(values)
+    return list(zip(*columns))
+
+
+async def write_feature_mart(db, tables: Dict[str, pd.DataFrame], chunk_size: int = 5000) -> Dict[str, int]:
+    """Upsert backfilled rows with executemany (asyncpg-style client)."""
+    written = {}
+    for table, frame in tables.items():
+        statement = upsert_statement(table, 'numeric')
+        records = _records(frame)
+        for start in range(0, len(records), chunk_size):
+            await db.executemany(statement, records[start:start + chunk_size])
+        written[table] = len(records)
+    return written
+
+
+def write_feature_mart_dbapi(conn, tables: Dict[str, pd.DataFrame], paramstyle: str = 'qmark') -> Dict[str, int]:
+    """Upsert backfilled rows through a DB-API connection (sqlite3, psycopg)."""
+    written = {}
+    cursor = conn.cursor()
+    for table, frame in tables.items():
+        records = _records(frame, iso_dates=True)
+        cursor.executemany(upsert_statement(table, paramstyle), records)
+        written[table] = len(records)
+    conn.commit()
+    return written
+
+
+def upsert_feature_mart_supabase(client, tables: Dict[str, pd.DataFrame], chunk_size: int = 1000) -> Dict[str, int]:
+    """Upsert backfilled rows through PostgREST, one request per chunk."""
+    written = {}
+    for table, frame in tables.items():
+        columns = list(frame.columns)
+        records = [dict(zip(columns, row)) for row in _records(frame, iso_dates=True)]
+        for start in range(0, len(records), chunk_size):
+            client.table(table).upsert(
+                records[start:start + chunk_size],
+                on_conflict=','.join(CONFLICT_KEYS[table])
+            ).execute()
+        written[table] = len(records)
+    return written
+
+
+async def backfill_feature_mart_range(db, start_date, end_date) -> Dict[str, int]:
+    """
+    Load source rows, backfill as_of dates start..end and write them in bulk
+    (asyncpg-style client).
+
+    Returns:
+        Rows written per table
+    """
+    source_start, source_end = source_date_range(start_date, end_date)
+    source = await fetch_feature_mart_source(db, source_start, source_end)
+    tables = backfill_feature_mart(source, start_date, end_date)
+    return await write_feature_mart(db, tables)
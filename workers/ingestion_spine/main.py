@@ -24,6 +24,8 @@ import os
 from .db import get_db_client, DatabaseClient
 from .storage import get_storage_client, StorageClient
 from .parsers import RacecardsParser, RunnersParser, FormParser
+from .streaming import STREAMING_ENABLED, StreamingBatchParse
+from .race_rows import assign_join_keys, enrich_runner, race_metadata, score_runner_rows, set_race_quality
 from .models import (
     BatchStatus,
     FileType,
@@ -335,6 +337,28 @@ async def register_files(batch_id: str, request: RegisterFilesRequest):
 # POST /imports/{batch_id}/parse
 # ============================================================================
 
+async def _complete_parse(db: DatabaseClient, batch_id: str, counts: dict) -> ParseBatchResponse:
+    """Mark a parsed batch PARSED if it passed the all-or-nothing checks, else raise."""
+    # SUCCESS: All validations passed - set status to PARSED (ready for validation)
+    if counts['races_inserted'] > 0 and counts['runners_inserted'] > 0 and counts['unmatched_runner_rows'] == 0:
+        await db.update_batch_status(
+            batch_id,
+            BatchStatus.PARSED,  # Changed from READY to PARSED
+            counts=counts
+        )
+        
+        logger.info(f"✅ Batch {batch_id} parsed successfully with quality metadata")
+        
+        return ParseBatchResponse(
+            batch_id=batch_id,
+            status=BatchStatus.PARSED,
+            message="Batch parsed successfully with quality metadata",
+            counts=counts
+        )
+    else:
+        raise ValueError("Batch validation failed: insufficient data")
+
+
 @app.post(
     "/imports/{batch_id}/parse",
     response_model=ParseBatchResponse
@@ -402,7 +426,27 @@ async def parse_batch(batch_id: str):
             'parse_errors': []
         }
         
+        # Races this run committed; a failure rolls back exactly these (and
+        # their runners) so there is never partial success
+        inserted_race_ids = []
+        
         try:
+            if STREAMING_ENABLED:
+                # Chunked download -> incremental parse -> bulk insert, bounded queues
+                pipeline = StreamingBatchParse(
+                    db=db,
+                    storage=storage,
+                    batch=batch,
+                    file_map=file_map,
+                    counts=counts,
+                    racecards_parser=RacecardsParser(),
+                    runners_parser_factory=RunnersParser,
+                    form_parser=FormParser(),
+                    inserted_race_ids=inserted_race_ids
+                )
+                await pipeline.run()
+                return await _complete_parse(db, batch_id, counts)
+            
             # STEP 1: Parse racecards
             logger.info("Step 1: Parsing racecards...")
             racecards_file = file_map[FileType.RACECARDS]
@@ -431,116 +475,81 @@ async def parse_batch(batch_id: str):
             
             # STEP 3: Group runners by race and calculate quality
             logger.info("Step 3: Calculating quality metadata...")
-            from .quality import calculate_runner_confidence, calculate_race_quality
+            import pandas as pd
+            from .quality_frame import score_races
+            
+            # Score every runner in one columnar pass
+            runner_frame = score_runner_rows(runners)
             
             # Group runners by race join key
             runners_by_race = {}
             unmatched_runners = []
             
-            for runner_data in runners:
-                runner_join_key = runner_data.pop('race_join_key')
-                
-                # Calculate runner confidence
-                confidence, flags, method = calculate_runner_confidence(runner_data)
-                runner_data['confidence'] = confidence
-                runner_data['extraction_method'] = method
-                runner_data['quality_flags'] = flags
-                
-                # Group by race
+            for runner_join_key, runner_data in zip(runner_frame['race_join_key'].tolist(), runners):
                 if runner_join_key not in runners_by_race:
                     runners_by_race[runner_join_key] = []
                 runners_by_race[runner_join_key].append(runner_data)
             
             # STEP 4: Insert races with quality metadata
             logger.info("Step 4: Inserting races with quality metadata...")
-            race_id_map = {}  # join_key -> race_id
-            race_data_map = {}  # join_key -> race_data (for enriching runners)
-            race_join_key_map = {}  # Store join_key_base -> full join_key mapping
+            race_data_map = assign_join_keys(races, batch['import_date'])  # join_key -> race_data
             
-            for race_data in races:
-                # Build full join_key with import_date
-                join_key_base = race_data.get('join_key_base', '')
-                import_date_str = batch['import_date'].isoformat()
-                full_join_key = f"{import_date_str}|{join_key_base}"
-                race_data['join_key'] = full_join_key
-                race_join_key_map[join_key_base] = full_join_key
-                
-                # Get runners for this race
-                race_runners = runners_by_race.get(full_join_key, [])
-                
-                # Calculate race quality
-                race_metadata = {
-                    'course': race_data.get('course'),
-                    'distance': race_data.get('distance'),
-                    'race_time': race_data.get('off_time')  # off_time is the race time
-                }
-                parse_conf, quality, race_flags = calculate_race_quality(race_metadata, race_runners)
-                
-                # Add quality metadata to race
-                race_data['parse_confidence'] = parse_conf
-                race_data['quality_score'] = quality
-                race_data['quality_flags'] = race_flags
-                
-                # Insert race
-                race_id = await db.insert_race(
-                    batch_id=batch_id,
-                    import_date=batch['import_date'],
-                    race_data=race_data
-                )
-                race_id_map[full_join_key] = race_id
-                race_data_map[full_join_key] = race_data
-                counts['races_inserted'] += 1
+            # Calculate race quality for all races at once
+            race_frame = pd.DataFrame(
+                [{'join_key': race_data['join_key'], **race_metadata(race_data)} for race_data in races],
+                columns=['join_key', 'course', 'distance', 'race_time']
+            )
+            race_quality = score_races(race_frame, runner_frame)
             
-            logger.info(f"✅ Inserted {counts['races_inserted']} races")
+            for race_data, parse_conf, quality, race_flags in zip(
+                races,
+                race_quality['parse_confidence'].tolist(),
+                race_quality['quality_score'].tolist(),
+                race_quality['quality_flags'].tolist()
+            ):
+                set_race_quality(race_data, parse_conf, quality, race_flags)
             
-            # STEP 5: Insert runners with quality metadata
-            logger.info("Step 5: Inserting runners with quality metadata...")
+            # Check for unmatched runners (HARD FAILURE) before writing anything
             for join_key, race_runners in runners_by_race.items():
-                if join_key not in race_id_map:
-                    # Unmatched runners
+                if join_key not in race_data_map:
                     for runner in race_runners:
                         unmatched_runners.append({
                             'horse_name': runner.get('horse_name'),
                             'join_key': join_key
                         })
                         counts['unmatched_runner_rows'] += 1
-                    continue
-                
+            
+            if counts['unmatched_runner_rows'] > 0:
+                error_msg = f"Found {counts['unmatched_runner_rows']} unmatched runners"
+                counts['unmatched_examples'] = unmatched_runners[:5]  # First 5 examples
+                raise ValueError(error_msg)
+            
+            # Multi-row inserts; join keys map back to the returned race ids
+            race_id_map = await db.insert_races_bulk(
+                batch_id=batch_id,
+                import_date=batch['import_date'],
+                races=races,
+                inserted_ids=inserted_race_ids
+            )
+            counts['races_inserted'] = len(inserted_race_ids)
+            
+            logger.info(f"✅ Inserted {counts['races_inserted']} races")
+            
+            # STEP 5: Insert runners with quality metadata
+            logger.info("Step 5: Inserting runners with quality metadata...")
+            runner_rows = []
+            for join_key, race_runners in runners_by_race.items():
                 race_id = race_id_map[join_key]
                 race_data = race_data_map[join_key]
                 
-                # Insert runners with race context fields
+                # Enrich runners with race context fields (avoid mutating original)
                 for runner_data in race_runners:
-                    # Create enriched data with race context (avoid mutating original)
-                    enriched_runner = {
-                        **runner_data,
-                        'date': batch['import_date'],
-                        'course': race_data.get('course'),
-                        'off_time': race_data.get('off_time'),
-                        'race_name': race_data.get('race_name', ''),
-                        'distance': race_data.get('distance'),
-                        'going': race_data.get('going')
-                    }
-                    
-                    # Now insert
-                    await db.insert_runner(race_id=race_id, runner_data=enriched_runner)
-                    counts['runners_inserted'] += 1
+                    runner_rows.append((race_id, enrich_runner(runner_data, race_data, batch['import_date'])))
             
-            logger.info(f"✅ Inserted {counts['runners_inserted']} runners")
+            runner_ids = await db.insert_runners_bulk(runner_rows)
+            counts['runners_inserted'] = len(runner_ids)
             
-            # Check for unmatched runners (HARD FAILURE)
-            if counts['unmatched_runner_rows'] > 0:
-                error_msg = f"Found {counts['unmatched_runner_rows']} unmatched runners"
-                counts['unmatched_examples'] = unmatched_runners[:5]  # First 5 examples
-                
-                await db.update_batch_status(
-                    batch_id,
-                    BatchStatus.FAILED,
-                    error_summary=error_msg,
-                    counts=counts
-                )
-                
-                raise ValueError(error_msg)
+            logger.info(f"✅ Inserted {counts['runners_inserted']} runners")
             
             # STEP 6: Parse form/comments (optional)
             if FileType.FORM in file_map:
@@ -556,30 +565,22 @@ async def parse_batch(batch_id: str):
                 counts['form_lines_inserted'] = len(form_lines)
                 logger.info(f"✅ Parsed {counts['form_lines_inserted']} form lines")
             
-            # SUCCESS: All validations passed - set status to PARSED (ready for validation)
-            if counts['races_inserted'] > 0 and counts['runners_inserted'] > 0 and counts['unmatched_runner_rows'] == 0:
-                await db.update_batch_status(
-                    batch_id,
-                    BatchStatus.PARSED,  # Changed from READY to PARSED
-                    counts=counts
-                )
-                
-                logger.info(f"✅ Batch {batch_id} parsed successfully with quality metadata")
-                
-                return ParseBatchResponse(
-                    batch_id=batch_id,
-                    status=BatchStatus.PARSED,
-                    message="Batch parsed successfully with quality metadata",
-                    counts=counts
-                )
-            else:
-                raise ValueError("Batch validation failed: insufficient data")
+            return await _complete_parse(db, batch_id, counts)
         
         except Exception as parse_error:
             # FAILURE: Set status to failed with error details
             error_msg = str(parse_error)
             logger.error(f"❌ Parse error: {error_msg}")
             
+            if inserted_race_ids:
+                try:
+                    await db.rollback_batch_rows(batch_id, inserted_race_ids)
+                    counts['races_inserted'] = 0
+                    counts['runners_inserted'] = 0
+                except Exception as rollback_error:
+                    logger.error(f"❌ Rollback failed for batch {batch_id}: {rollback_error}")
+                    error_msg = f"{error_msg} (rollback failed: {rollback_error})"
+            
             await db.update_batch_status(
                 batch_id,
                 BatchStatus.FAILED,
@@ -624,7 +625,7 @@ async def validate_batch(batch_id: str):
     Returns validation report with per-race breakdown
     """
     import pandas as pd
-    from .quality import validate_race
+    from .quality_frame import validate_races
     from data_quality.gx_context import get_gx_context, create_races_suite, create_runners_suite
     
     logger.info(f"Validating batch: {batch_id}")
@@ -651,15 +652,20 @@ async def validate_batch(batch_id: str):
             raise HTTPException(status_code=400, detail="Batch has no races")
         
         # --- ORIGINAL RIC+ VALIDATION ---
-        validation_results = []
         valid_count = 0
         needs_review_count = 0
         rejected_count = 0
         
-        for race in races:
-            result = validate_race(race)
-            validation_results.append(result)
-            
+        validation_results = validate_races(pd.DataFrame({
+            "id": [race.get("id", "unknown") for race in races],
+            "course": [race.get("course") for race in races],
+            "distance": [race.get("distance") for race in races],
+            "runner_count": [len(race.get("runners", [])) for race in races],
+            "quality_score": [race.get("quality_score", 0.0) for race in races],
+            "quality_flags": [race.get("quality_flags", []) for race in races]
+        }))
+        
+        for result in validation_results:
             if result["status"] == "valid":
                 valid_count += 1
             elif result["status"] == "needs_review":
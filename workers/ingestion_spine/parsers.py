@@ -8,9 +8,10 @@ Date: 2026-01-04
 import csv
 import io
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Callable, List, Dict, Any, Optional
 from datetime import date, time, datetime
 from .models import RaceData, RunnerData, FormLineData
+from .streaming import iter_csv_batches
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +50,50 @@ class BaseParser:
             logger.error(f"CSV parsing error: {e}")
             raise ValueError(f"Failed to parse CSV: {str(e)}")
     
+    async def parse_rows_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: int,
+        parse_row: Callable[[Dict[str, Any]], Dict[str, Any]],
+        kind: str,
+        strict: bool = True
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Parse CSV bytes arriving in chunks into batches of parsed rows.
+        
+        Row numbers run across batches, so errors read as they do from
+        parse(). Strict parsers fail hard on the first bad row; otherwise
+        bad rows are logged and skipped.
+        
+        Args:
+            chunks: CSV file content in chunks
+            batch_size: Rows per yielded batch (at most)
+            parse_row: Parser for a single row
+            kind: Row kind for messages ("race", "runner", ...)
+            strict: Fail on the first bad row
+        
+        Yields:
+            Lists of parsed row dictionaries
+        """
+        idx = 0
+        async for rows in iter_csv_batches(chunks, batch_size):
+            parsed = []
+            for row in rows:
+                idx += 1
+                try:
+                    parsed.append(parse_row(row))
+                except Exception as e:
+                    error_msg = f"Row {idx}: {str(e)}"
+                    self.errors.append(error_msg)
+                    if strict:
+                        logger.error(error_msg)
+                        raise ValueError(f"Failed to parse {kind} row {idx}: {str(e)}")
+                    logger.warning(error_msg)
+            if parsed:
+                yield parsed
+        
+        logger.info(f"Parsed {idx} rows from CSV (streaming)")
+    
     def safe_int(self, value: Any, default: Optional[int] = None) -> Optional[int]:
         """Safely convert value to int"""
         if value is None or value == '':
@@ -146,6 +191,24 @@ class RacecardsParser(BaseParser):
         logger.info(f"✅ Parsed {len(races)} races from racecards")
         return races
     
+    async def parse_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Parse racecards CSV chunks incrementally into batches of races.
+        
+        Same rows and failures as parse(), without holding the file.
+        """
+        n_races = 0
+        async for races in self.parse_rows_stream(chunks, batch_size, self._parse_race_row, "race"):
+            n_races += len(races)
+            yield races
+        
+        if not n_races:
+            raise ValueError("Racecards file is empty")
+    
     def _parse_race_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a single race row"""
         # Required fields
@@ -244,6 +307,24 @@ class RunnersParser(BaseParser):
         logger.info(f"✅ Parsed {len(runners)} runners")
         return runners
     
+    async def parse_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Parse runners CSV chunks incrementally into batches of runners.
+        
+        Same rows and failures as parse(), without holding the file.
+        """
+        n_runners = 0
+        async for runners in self.parse_rows_stream(chunks, batch_size, self._parse_runner_row, "runner"):
+            n_runners += len(runners)
+            yield runners
+        
+        if not n_runners:
+            raise ValueError("Runners file is empty")
+    
     def _parse_runner_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a single runner row"""
         # Required fields
@@ -356,6 +437,21 @@ class FormParser(BaseParser):
         logger.info(f"✅ Parsed {len(form_lines)} form lines")
         return form_lines
     
+    async def parse_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: int
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Parse form CSV chunks incrementally into batches of form lines.
+        
+        Bad rows are skipped, as in parse().
+        """
+        async for form_lines in self.parse_rows_stream(
+            chunks, batch_size, self._parse_form_row, "form", strict=False
+        ):
+            yield form_lines
+    
     def _parse_form_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
         """Parse a single form row"""
         # Required field
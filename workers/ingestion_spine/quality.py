@@ -68,6 +68,82 @@ def calculate_runner_confidence(runner_data: dict) -> tuple[float, list[str], st
     return confidence, flags, method
 
 
+class RaceQualityAccumulator:
+    """
+    calculate_race_quality over runners added one at a time.
+
+    Keeps only the running sums it needs (count, confidence total, low
+    confidence count, normalized names), so races can be scored while
+    runners stream in without holding the runner dicts.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.confidence_total = 0
+        self.low_confidence_count = 0
+        self.name_count = 0
+        self.names: set[str] = set()
+
+    def add(self, runner: dict):
+        """Add one runner (must include 'confidence' field)"""
+        self.count += 1
+        self.confidence_total += runner.get("confidence", 0.0)
+        if runner.get("confidence", 1.0) < 0.6:
+            self.low_confidence_count += 1
+        if runner.get("horse_name"):
+            self.name_count += 1
+            self.names.add(runner.get("horse_name", "").strip().lower())
+
+    def result(self, race_data: dict) -> tuple[float, float, list[str]]:
+        """(parse_confidence, quality_score, quality_flags) for the runners added"""
+        if not self.count:
+            return 0.0, 0.0, ["no_runners"]
+
+        # Average runner confidence
+        parse_confidence = self.confidence_total / self.count
+
+        # Start with parse confidence
+        quality_score = parse_confidence
+        flags = []
+
+        # Critical race metadata
+        if not race_data.get("course"):
+            quality_score -= 0.2
+            flags.append("missing_course")
+
+        if not race_data.get("distance"):
+            quality_score -= 0.1
+            flags.append("missing_distance")
+
+        if not race_data.get("race_time"):
+            quality_score -= 0.05
+            flags.append("missing_race_time")
+
+        # Runner count sanity checks
+        runner_count = self.count
+        if runner_count < 4:
+            quality_score -= 0.2
+            flags.append("too_few_runners")
+        elif runner_count > 30:
+            quality_score -= 0.1
+            flags.append("too_many_runners")
+
+        # Check for duplicate horse names (data corruption indicator)
+        if self.name_count != len(self.names):
+            quality_score -= 0.3
+            flags.append("duplicate_horse_names")
+
+        # Check runner quality distribution
+        if self.low_confidence_count > self.count * 0.3:  # >30% low confidence
+            quality_score -= 0.15
+            flags.append("many_low_confidence_runners")
+
+        # Clamp to valid range
+        quality_score = max(0.0, min(1.0, quality_score))
+
+        return parse_confidence, quality_score, flags
+
+
 def calculate_race_quality(race_data: dict, runners: list[dict]) -> tuple[float, float, list[str]]:
     """
     Calculate aggregate quality metrics for a race
@@ -82,54 +158,10 @@ def calculate_race_quality(race_data: dict, runners: list[dict]) -> tuple[float,
         - quality_score: overall quality (0.0-1.0)
         - quality_flags: race-level issues
     """
-    if not runners:
-        return 0.0, 0.0, ["no_runners"]
-
-    # Average runner confidence
-    parse_confidence = sum(r.get("confidence", 0.0) for r in runners) / len(runners)
-
-    # Start with parse confidence
-    quality_score = parse_confidence
-    flags = []
-
-    # Critical race metadata
-    if not race_data.get("course"):
-        quality_score -= 0.2
-        flags.append("missing_course")
-
-    if not race_data.get("distance"):
-        quality_score -= 0.1
-        flags.append("missing_distance")
-
-    if not race_data.get("race_time"):
-        quality_score -= 0.05
-        flags.append("missing_race_time")
-
-    # Runner count sanity checks
-    runner_count = len(runners)
-    if runner_count < 4:
-        quality_score -= 0.2
-        flags.append("too_few_runners")
-    elif runner_count > 30:
-        quality_score -= 0.1
-        flags.append("too_many_runners")
-
-    # Check for duplicate horse names (data corruption indicator)
-    names = [r.get("horse_name", "").strip().lower() for r in runners if r.get("horse_name")]
-    if len(names) != len(set(names)):
-        quality_score -= 0.3
-        flags.append("duplicate_horse_names")
-
-    # Check runner quality distribution
-    low_confidence_count = sum(1 for r in runners if r.get("confidence", 1.0) < 0.6)
-    if low_confidence_count > len(runners) * 0.3:  # >30% low confidence
-        quality_score -= 0.15
-        flags.append("many_low_confidence_runners")
-
-    # Clamp to valid range
-    quality_score = max(0.0, min(1.0, quality_score))
-
-    return parse_confidence, quality_score, flags
+    accumulator = RaceQualityAccumulator()
+    for runner in runners:
+        accumulator.add(runner)
+    return accumulator.result(race_data)
 
 
 def validate_race(race: dict) -> dict[str, Any]:
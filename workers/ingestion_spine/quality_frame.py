@@ -0,0 +1,300 @@
+"""
+Columnar parse quality scoring
+
+Vectorized equivalents of calculate_runner_confidence, calculate_race_quality
+and validate_race from quality.py for a whole batch at once. Inputs are
+pandas DataFrames (or anything with to_pandas(), e.g. a pyarrow Table);
+absent keys are NaN/None columns.
+
+Values are identical to the per-row functions: penalties are subtracted
+in the same order, and per-race confidence totals are accumulated in
+runner order (np.bincount), as sum() does.
+
+Usage:
+    scored = score_runners(pd.DataFrame.from_records(runners, columns=RUNNER_COLUMNS))
+    quality = score_races(races_df, runners_df.assign(confidence=scored['confidence']))
+    report = validate_races(races_df)
+"""
+
+from itertools import compress
+from typing import Any, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Runner fields read by calculate_runner_confidence
+RUNNER_COLUMNS = [
+    'horse_name', 'odds', 'jockey', 'trainer', 'weight',
+    'odds_estimated', 'fuzzy_extraction',
+]
+
+# (flag, penalty) in calculate_runner_confidence order
+RUNNER_PENALTIES = [
+    ('missing_horse_name', 0.5),
+    ('missing_odds', 0.3),
+    ('missing_jockey', 0.1),
+    ('missing_trainer', 0.05),
+    ('missing_weight', 0.05),
+    ('estimated_odds', 0.2),
+    ('fuzzy_extraction', 0.15),
+    ('suspicious_odds', 0.2),
+]
+
+# (flag, penalty) in calculate_race_quality order
+RACE_PENALTIES = [
+    ('missing_course', 0.2),
+    ('missing_distance', 0.1),
+    ('missing_race_time', 0.05),
+    ('too_few_runners', 0.2),
+    ('too_many_runners', 0.1),
+    ('duplicate_horse_names', 0.3),
+    ('many_low_confidence_runners', 0.15),
+]
+
+LOW_CONFIDENCE = 0.6
+
+# validate_race issues, in order; FLAG issues only apply to unrejected races
+REJECT_ISSUES = [
+    'REJECT: Missing course',
+    'REJECT: Missing distance',
+    'REJECT: No runners',
+    'REJECT: Duplicate horse names detected',
+]
+FLAG_ISSUES = [
+    'FLAG: Unusually few runners (<4)',
+    'FLAG: Unusually many runners (>30)',
+    'FLAG: Low quality score (<0.5)',
+    'FLAG: Many runners have low extraction confidence',
+]
+
+
+def _as_frame(data: Any) -> pd.DataFrame:
+    """DataFrame view of a DataFrame or Arrow table"""
+    if hasattr(data, 'to_pandas') and not isinstance(data, pd.DataFrame):
+        return data.to_pandas()
+    return data
+
+
+def _column(frame: pd.DataFrame, name: str) -> pd.Series:
+    """Column by name, all-missing if the batch never had the field"""
+    if name in frame.columns:
+        return frame[name]
+    return pd.Series(None, index=frame.index, dtype=object)
+
+
+def _truthy(values: pd.Series) -> np.ndarray:
+    """Python truthiness per value; NaN (an absent key) is falsy"""
+    present = values.notna().to_numpy()
+    if values.dtype == object:
+        truthy = np.fromiter((bool(v) for v in values.to_numpy()), dtype=bool, count=len(values))
+    else:
+        truthy = values.astype(bool).to_numpy()
+    return present & truthy
+
+
+def _flag_lists(masks: np.ndarray, names: Sequence[str]) -> List[List[str]]:
+    """Per-row lists of the names whose mask column is set"""
+    return [list(compress(names, row)) for row in masks.tolist()]
+
+
+def _apply_penalties(score: np.ndarray, masks: np.ndarray, penalties: Sequence[float]) -> np.ndarray:
+    """Subtract each penalty where its mask is set, in order, then clamp to [0, 1]"""
+    for column, penalty in enumerate(penalties):
+        score = np.where(masks[:, column], score - penalty, score)
+    return np.clip(score, 0.0, 1.0)
+
+
+def score_runners(runners: Any) -> pd.DataFrame:
+    """
+    Calculate confidence scores for a batch of runners
+
+    Args:
+        runners: One row per runner with RUNNER_COLUMNS (missing columns
+            count as absent fields)
+
+    Returns:
+        DataFrame on the same index with
+        - confidence: 0.0-1.0 (1.0 = perfect)
+        - quality_flags: list of issues found
+        - extraction_method: "table" | "text" | "fallback"
+    """
+    runners = _as_frame(runners)
+
+    horse_name = _column(runners, 'horse_name')
+    has_name = _truthy(horse_name) & (
+        horse_name.where(horse_name.notna(), '').astype(str).str.strip().ne('').to_numpy()
+    )
+
+    odds = _column(runners, 'odds')
+    has_odds = _truthy(odds)
+    odds_value = pd.to_numeric(odds, errors='coerce').to_numpy(dtype=float)
+    with np.errstate(invalid='ignore'):
+        suspicious = has_odds & ((odds_value < 1.0) | (odds_value > 1000))
+
+    estimated = _truthy(_column(runners, 'odds_estimated'))
+    fuzzy = _truthy(_column(runners, 'fuzzy_extraction'))
+
+    masks = np.column_stack([
+        ~has_name,
+        ~has_odds,
+        ~_truthy(_column(runners, 'jockey')),
+        ~_truthy(_column(runners, 'trainer')),
+        ~_truthy(_column(runners, 'weight')),
+        estimated,
+        fuzzy,
+        suspicious,
+    ]).reshape(len(runners), len(RUNNER_PENALTIES))
+
+    confidence = _apply_penalties(
+        np.ones(len(runners)), masks, [penalty for _, penalty in RUNNER_PENALTIES]
+    )
+
+    # Fuzzy extraction wins over estimated odds, as in the per-runner checks
+    method = np.select([fuzzy, estimated], ['text', 'fallback'], default='table')
+
+    return pd.DataFrame({
+        'confidence': confidence,
+        'quality_flags': _flag_lists(masks, [flag for flag, _ in RUNNER_PENALTIES]),
+        'extraction_method': method.astype(object),
+    }, index=runners.index)
+
+
+def score_races(
+    races: Any,
+    runners: Any,
+    race_key: str = 'join_key',
+    runner_key: str = 'race_join_key'
+) -> pd.DataFrame:
+    """
+    Calculate aggregate quality metrics for a batch of races
+
+    Args:
+        races: One row per race with race_key, course, distance and
+            race_time
+        runners: One row per runner with runner_key, confidence and
+            horse_name; runners whose key matches no race are ignored
+
+    Returns:
+        DataFrame on the races index with
+        - parse_confidence: average runner confidence
+        - quality_score: overall quality (0.0-1.0)
+        - quality_flags: race-level issues
+    """
+    races = _as_frame(races)
+    runners = _as_frame(runners)
+
+    # Aggregate per distinct key; races sharing a key share its runners
+    race_codes, keys = pd.factorize(races[race_key])
+    n_keys = len(keys)
+
+    codes = pd.Index(keys).get_indexer(runners[runner_key])
+    matched = codes >= 0
+    codes = codes[matched]
+
+    confidence = pd.to_numeric(
+        _column(runners, 'confidence'), errors='coerce'
+    ).to_numpy(dtype=float)[matched]
+
+    runner_count = np.bincount(codes, minlength=n_keys)
+    confidence_total = np.bincount(codes, weights=np.nan_to_num(confidence, nan=0.0), minlength=n_keys)
+    low_confidence_count = np.bincount(
+        codes, weights=np.nan_to_num(confidence, nan=1.0) < LOW_CONFIDENCE, minlength=n_keys
+    )
+
+    # Duplicate names: named runners vs distinct normalized names per race
+    horse_name = _column(runners, 'horse_name')[matched]
+    named = _truthy(horse_name)
+    names = pd.DataFrame({
+        'race': codes[named],
+        'name': horse_name[named].astype(str).str.strip().str.lower().to_numpy(),
+    })
+    name_count = np.bincount(names['race'].to_numpy(), minlength=n_keys)
+    distinct_count = np.bincount(names.drop_duplicates()['race'].to_numpy(), minlength=n_keys)
+
+    runner_count = runner_count[race_codes]
+    confidence_total = confidence_total[race_codes]
+    low_confidence_count = low_confidence_count[race_codes]
+    duplicate_names = (name_count != distinct_count)[race_codes]
+    n_races = len(races)
+
+    has_runners = runner_count > 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        parse_confidence = np.where(has_runners, confidence_total / runner_count, 0.0)
+
+    masks = np.column_stack([
+        ~_truthy(_column(races, 'course')),
+        ~_truthy(_column(races, 'distance')),
+        ~_truthy(_column(races, 'race_time')),
+        runner_count < 4,
+        runner_count > 30,
+        duplicate_names,
+        low_confidence_count > runner_count * 0.3,
+    ]).reshape(n_races, len(RACE_PENALTIES))
+
+    quality_score = _apply_penalties(
+        parse_confidence, masks, [penalty for _, penalty in RACE_PENALTIES]
+    )
+    quality_score = np.where(has_runners, quality_score, 0.0)
+
+    flags = _flag_lists(masks, [flag for flag, _ in RACE_PENALTIES])
+    flags = [race_flags if ok else ['no_runners'] for race_flags, ok in zip(flags, has_runners)]
+
+    return pd.DataFrame({
+        'parse_confidence': parse_confidence,
+        'quality_score': quality_score,
+        'quality_flags': flags,
+    }, index=races.index)
+
+
+def validate_races(races: Any) -> List[dict]:
+    """
+    Apply RIC+ validation rules to a batch of races
+
+    Args:
+        races: One row per race with id, course, distance, runner_count,
+            quality_score and quality_flags
+
+    Returns:
+        validate_race results, one per race in order
+    """
+    races = _as_frame(races)
+
+    runner_count = pd.to_numeric(_column(races, 'runner_count'), errors='coerce').fillna(0).to_numpy()
+    quality_score = pd.to_numeric(_column(races, 'quality_score'), errors='coerce').fillna(0.0).to_numpy(dtype=float)
+    quality_flags = [
+        flags if isinstance(flags, (list, tuple, np.ndarray)) else []
+        for flags in _column(races, 'quality_flags').tolist()
+    ]
+    duplicate_names = np.array(['duplicate_horse_names' in flags for flags in quality_flags], dtype=bool)
+    many_low = np.array(['many_low_confidence_runners' in flags for flags in quality_flags], dtype=bool)
+
+    reject = np.column_stack([
+        ~_truthy(_column(races, 'course')),
+        ~_truthy(_column(races, 'distance')),
+        runner_count == 0,
+        duplicate_names,
+    ]).reshape(len(races), len(REJECT_ISSUES))
+    rejected = reject.any(axis=1)
+
+    flag = np.column_stack([
+        runner_count < 4,
+        runner_count > 30,
+        quality_score < 0.5,
+        many_low,
+    ]).reshape(len(races), len(FLAG_ISSUES)) & ~rejected[:, None]
+
+    status = np.select([rejected, flag.any(axis=1)], ['rejected', 'needs_review'], default='valid')
+    issues = _flag_lists(np.hstack([reject, flag]), REJECT_ISSUES + FLAG_ISSUES)
+    race_ids = _column(races, 'id').where(_column(races, 'id').notna(), 'unknown').tolist()
+
+    return [
+        {
+            "race_id": race_id,
+            "status": race_status,
+            "issues": race_issues,
+            "quality_score": round(score, 3)
+        }
+        for race_id, race_status, race_issues, score in zip(
+            race_ids, status.tolist(), issues, quality_score.tolist()
+        )
+    ]
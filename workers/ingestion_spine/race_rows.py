@@ -0,0 +1,88 @@
+"""
+VÉLØ Phase 1: Race and Runner Row Steps
+Per-race build, quality and enrichment steps shared by both ingest paths
+
+parse_batch (whole files in memory) and StreamingBatchParse (chunked) read
+their input differently but must produce identical rows; both build them
+through these helpers.
+
+Date: 2026-01-04
+"""
+
+from datetime import date
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from .quality_frame import RUNNER_COLUMNS, score_runners
+
+
+def assign_join_keys(races: List[Dict[str, Any]], import_date: date) -> Dict[str, Dict[str, Any]]:
+    """
+    Set each race's full join_key (import date + join_key_base).
+
+    Returns a join_key -> race_data mapping.
+    """
+    import_date_str = import_date.isoformat()
+    race_data_map = {}
+    for race_data in races:
+        race_data['join_key'] = f"{import_date_str}|{race_data.get('join_key_base', '')}"
+        race_data_map[race_data['join_key']] = race_data
+    return race_data_map
+
+
+def race_metadata(race_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Race fields read by race quality scoring (off_time is the race time)."""
+    return {
+        'course': race_data.get('course'),
+        'distance': race_data.get('distance'),
+        'race_time': race_data.get('off_time')
+    }
+
+
+def set_race_quality(race_data: Dict[str, Any], parse_confidence: float, quality_score: float, quality_flags: List[str]):
+    """Attach race quality metadata to a race row."""
+    race_data['parse_confidence'] = parse_confidence
+    race_data['quality_score'] = quality_score
+    race_data['quality_flags'] = quality_flags
+
+
+def score_runner_rows(runners: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Score runners in one columnar pass and attach their quality metadata.
+
+    Each runner's race_join_key is popped and confidence, extraction_method
+    and quality_flags are set on it.
+
+    Returns a frame of race_join_key, the scored runner columns and
+    confidence, as score_races reads it.
+    """
+    frame = pd.DataFrame(runners, columns=['race_join_key', *RUNNER_COLUMNS])
+    quality = score_runners(frame)
+    frame['confidence'] = quality['confidence']
+
+    for runner_data, confidence, flags, method in zip(
+        runners,
+        quality['confidence'].tolist(),
+        quality['quality_flags'].tolist(),
+        quality['extraction_method'].tolist()
+    ):
+        runner_data.pop('race_join_key')
+        runner_data['confidence'] = confidence
+        runner_data['extraction_method'] = method
+        runner_data['quality_flags'] = flags
+
+    return frame
+
+
+def enrich_runner(runner_data: Dict[str, Any], race_data: Dict[str, Any], import_date: date) -> Dict[str, Any]:
+    """Runner row with its race's context fields (runner_data is not mutated)."""
+    return {
+        **runner_data,
+        'date': import_date,
+        'course': race_data.get('course'),
+        'off_time': race_data.get('off_time'),
+        'race_name': race_data.get('race_name', ''),
+        'distance': race_data.get('distance'),
+        'going': race_data.get('going')
+    }
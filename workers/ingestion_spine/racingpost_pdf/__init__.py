@@ -7,6 +7,9 @@ Usage:
     
     meeting = parse_meeting(pdf_paths)
     
+    # Fan pages and cards out over 8 processes, caching extracted pages
+    meeting = parse_meeting(pdf_paths, workers=8, cache_dir=".rp_pdf_cache")
+    
 Parse flow:
     1. Parse XX card (identity backbone: races + runners)
     2. Enrich with OR/TS/PM (ratings, speed, prices)
@@ -17,6 +20,8 @@ Parse flow:
 
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from typing import List, Optional
 
@@ -27,15 +32,25 @@ from .parse_ts import parse_ts_card
 from .parse_pm import parse_pm_card
 from .merge import merge_ratings
 from .validate import validate_meeting
+from .pages import PageCache
 
 
-def parse_meeting(pdf_paths: List[str], validate_output: bool = True) -> ParseReport:
+def parse_meeting(
+    pdf_paths: List[str],
+    validate_output: bool = True,
+    workers: int = 1,
+    cache_dir: Optional[str] = None,
+) -> ParseReport:
     """
     Parse Racing Post PDFs and return canonical meeting data.
     
     Args:
         pdf_paths: List of PDF file paths (XX, OR, TS, PM)
         validate_output: Whether to run validation gates (default: True)
+        workers: Processes to fan XX pages and OR/TS/PM cards out over
+            (1 = serial, in-process). Output is identical either way.
+        cache_dir: Extracted-page cache directory, keyed by file content
+            hash (default: $RP_PDF_CACHE_DIR, unset = no cache)
         
     Returns:
         ParseReport with meeting data and any errors
@@ -102,39 +117,53 @@ def parse_meeting(pdf_paths: List[str], validate_output: bool = True) -> ParseRe
             input_files=pdf_paths
         )
     
-    # Parse XX card (identity backbone)
-    races, parse_errors = parse_xx_card(xx_pdf, course_name, str(meeting_date))
-    errors.extend(parse_errors)
+    cache = PageCache(cache_dir) if cache_dir else PageCache.from_env()
     
-    if not races:
-        errors.append(ParseError(
-            severity="error",
-            message="No races parsed from XX card",
-            location="xx_card"
-        ))
-        return ParseReport(
-            success=False,
-            errors=errors,
-            input_files=pdf_paths
+    with (ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext()) as executor:
+        # Enrichment cards (optional); pooled, they run alongside the XX pages
+        cards = [
+            (key, parse_card, pdf_path)
+            for key, parse_card, pdf_path in (
+                ("or", parse_or_card, or_pdf),
+                ("ts", parse_ts_card, ts_pdf),
+                ("pm", parse_pm_card, pm_pdf),
+            )
+            if pdf_path
+        ]
+        if executor:
+            pending = {key: executor.submit(parse_card, pdf_path) for key, parse_card, pdf_path in cards}
+        
+        # Parse XX card (identity backbone)
+        races, parse_errors = parse_xx_card(
+            xx_pdf, course_name, str(meeting_date), executor=executor, cache=cache
         )
+        errors.extend(parse_errors)
+        
+        if not races:
+            errors.append(ParseError(
+                severity="error",
+                message="No races parsed from XX card",
+                location="xx_card"
+            ))
+            return ParseReport(
+                success=False,
+                errors=errors,
+                input_files=pdf_paths
+            )
+        
+        if executor:
+            enrichment = {key: future.result() for key, future in pending.items()}
+        else:
+            enrichment = {key: parse_card(pdf_path) for key, parse_card, pdf_path in cards}
     
-    # Parse OR card (optional)
-    or_ratings = {}
-    if or_pdf:
-        or_ratings, or_errors = parse_or_card(or_pdf)
-        errors.extend(or_errors)
+    or_ratings, or_errors = enrichment.get("or", ({}, []))
+    errors.extend(or_errors)
     
-    # Parse TS card (optional)
-    ts_ratings = {}
-    if ts_pdf:
-        ts_ratings, ts_errors = parse_ts_card(ts_pdf)
-        errors.extend(ts_errors)
+    ts_ratings, ts_errors = enrichment.get("ts", ({}, []))
+    errors.extend(ts_errors)
     
-    # Parse PM card (optional)
-    pm_prices = {}
-    if pm_pdf:
-        pm_prices, pm_errors = parse_pm_card(pm_pdf)
-        errors.extend(pm_errors)
+    pm_prices, pm_errors = enrichment.get("pm", ({}, []))
+    errors.extend(pm_errors)
     
     # Merge ratings into runners
     races = merge_ratings(races, or_ratings, ts_ratings, pm_prices)
@@ -194,5 +223,6 @@ __all__ = [
     "Race",
     "Runner",
     "ParseReport",
+    "PageCache",
     "validate_meeting",
 ]
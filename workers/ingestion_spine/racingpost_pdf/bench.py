@@ -0,0 +1,182 @@
+"""
+Racing Post PDF Parser - Geometry Micro-benchmark
+Times the word helpers on recorded pages against the original per-word loops.
+
+Recorded pages are PageCache files (pages.py): parse with --cache-dir and
+point the benchmark at the cached JSON. Without fixtures it synthesizes a
+dense form page.
+
+Usage:
+    python -m racingpost_pdf parse --inputs WOL_*.pdf --out meeting.json --cache-dir .rp_pdf_cache
+    python -m racingpost_pdf bench-geometry --pages .rp_pdf_cache/*.json
+"""
+
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Sequence
+
+from .extract_words import (
+    cluster_by_x_position,
+    find_runner_anchors,
+    group_words_by_line,
+)
+from .geometry import WordGeometry
+
+
+# ============================================================================
+# ORIGINAL IMPLEMENTATIONS (per-word loops, kept as the timing baseline)
+# ============================================================================
+
+def reference_cluster_by_x_position(words, tolerance=10.0):
+    columns = {}
+    for word in words:
+        x0 = word["x0"]
+        found_column = None
+        for col_x in columns.keys():
+            if abs(x0 - col_x) <= tolerance:
+                found_column = col_x
+                break
+        if found_column is not None:
+            columns[found_column].append(word)
+        else:
+            columns[x0] = [word]
+    return columns
+
+
+def reference_find_runner_anchors(words):
+    anchors = []
+    for word in words:
+        text = word["text"].strip()
+        if text.isdigit() and 1 <= int(text) <= 30:
+            if word["x0"] < 100:
+                anchors.append(word)
+    return anchors
+
+
+def reference_extract_block_words(words, anchor, max_height=50.0):
+    anchor_top = anchor["top"]
+    anchor_bottom = anchor_top + max_height
+    block_words = [
+        word for word in words
+        if anchor_top <= word["top"] <= anchor_bottom and word["x0"] >= anchor["x0"] - 10
+    ]
+    block_words.sort(key=lambda w: (w["top"], w["x0"]))
+    return block_words
+
+
+def reference_group_words_by_line(words, y_tolerance=5.0):
+    if not words:
+        return []
+    sorted_words = sorted(words, key=lambda w: w["top"])
+    lines = []
+    current_line = [sorted_words[0]]
+    current_y = sorted_words[0]["top"]
+    for word in sorted_words[1:]:
+        if abs(word["top"] - current_y) <= y_tolerance:
+            current_line.append(word)
+        else:
+            lines.append(current_line)
+            current_line = [word]
+            current_y = word["top"]
+    lines.append(current_line)
+    return lines
+
+
+# ============================================================================
+# FIXTURES
+# ============================================================================
+
+def load_recorded_pages(paths: Sequence[str]) -> List[List[Dict[str, Any]]]:
+    """Word lists from PageCache JSON files extracted with words=True (one list per page)."""
+    pages = []
+    for path in paths:
+        with open(path) as f:
+            pages.extend(page["words"] for page in json.load(f) if page.get("words"))
+    return pages
+
+
+def synthesize_page(n_runners: int = 120, columns: int = 14, seed: int = 0) -> List[Dict[str, Any]]:
+    """A dense form page: runner blocks of several lines across fixed columns."""
+    rng = random.Random(seed)
+    words = []
+    top = 20.0
+    for runner in range(n_runners):
+        for line in range(4):
+            for col in range(columns):
+                x0 = 30.0 + col * 38.0 + rng.uniform(-3, 3)
+                text = str(runner % 30 + 1) if col == 0 and line == 0 else f"w{runner}.{line}.{col}"
+                words.append({
+                    "text": text,
+                    "x0": round(x0, 3),
+                    "x1": round(x0 + 30.0, 3),
+                    "top": round(top + rng.uniform(-0.8, 0.8), 3),
+                    "bottom": round(top + 9.0, 3),
+                })
+            top += 11.0
+    rng.shuffle(words)
+    return words
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_geometry_benchmark(pages: List[List[Dict[str, Any]]], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Time each helper and its original loop over all pages.
+
+    Returns:
+        {"pages", "words", "helpers": {name: {"ms", "reference_ms", "speedup"}}}
+    """
+    def blocks():
+        # One geometry per page, one interval lookup per anchor
+        for words in pages:
+            geometry = WordGeometry(words)
+            for anchor in geometry.take(geometry.anchors()):
+                geometry.take(geometry.block(anchor))
+
+    def reference_blocks():
+        for words in pages:
+            for anchor in reference_find_runner_anchors(words):
+                reference_extract_block_words(words, anchor)
+
+    cases = {
+        "cluster_by_x_position": (
+            lambda: [cluster_by_x_position(w) for w in pages],
+            lambda: [reference_cluster_by_x_position(w) for w in pages],
+        ),
+        "group_words_by_line": (
+            lambda: [group_words_by_line(w) for w in pages],
+            lambda: [reference_group_words_by_line(w) for w in pages],
+        ),
+        "find_runner_anchors": (
+            lambda: [find_runner_anchors(w) for w in pages],
+            lambda: [reference_find_runner_anchors(w) for w in pages],
+        ),
+        "extract_block_words": (blocks, reference_blocks),
+    }
+
+    helpers = {}
+    for name, (new, reference) in cases.items():
+        new_s, reference_s = _best_of(new, repeat), _best_of(reference, repeat)
+        helpers[name] = {
+            "ms": round(new_s * 1000, 3),
+            "reference_ms": round(reference_s * 1000, 3),
+            "speedup": round(reference_s / new_s, 2) if new_s > 0 else None,
+        }
+
+    return {
+        "pages": len(pages),
+        "words": sum(len(w) for w in pages),
+        "helpers": helpers,
+    }
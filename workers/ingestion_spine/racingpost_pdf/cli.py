@@ -4,10 +4,13 @@ Command-line interface for parsing PDFs.
 
 Usage:
     python -m racingpost_pdf parse --inputs fixtures/WOL_*.pdf --out meeting.json
+    python -m racingpost_pdf parse --inputs fixtures/WOL_*.pdf --out meeting.json --workers 8 --cache-dir .rp_pdf_cache
+    python -m racingpost_pdf bench-geometry --pages .rp_pdf_cache/*.json
 """
 
 import argparse
 import json
+import os
 import sys
 from pathlib import Path
 
@@ -38,6 +41,32 @@ def main():
         action="store_true",
         help="Skip validation gates"
     )
+    parse_parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for page/card fan-out (default: CPU count, 1 = serial)"
+    )
+    parse_parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Extracted-page cache directory (default: $RP_PDF_CACHE_DIR)"
+    )
+    
+    # Geometry micro-benchmark
+    bench_parser = subparsers.add_parser("bench-geometry", help="Time word geometry helpers on recorded pages")
+    bench_parser.add_argument(
+        "--pages",
+        nargs="*",
+        default=[],
+        help="Recorded page files (PageCache JSON with words); default: a synthetic dense page"
+    )
+    bench_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Timing repeats (best of)"
+    )
     
     args = parser.parse_args()
     
@@ -45,7 +74,12 @@ def main():
         # Parse PDFs
         print(f"Parsing {len(args.inputs)} PDF files...")
         
-        report = parse_meeting(args.inputs, validate_output=not args.no_validate)
+        report = parse_meeting(
+            args.inputs,
+            validate_output=not args.no_validate,
+            workers=args.workers,
+            cache_dir=args.cache_dir,
+        )
         
         if report.success:
             print(f"✅ Parse successful!")
@@ -81,6 +115,16 @@ def main():
                     print(f"     Location: {error.location}")
             
             sys.exit(1)
+    elif args.command == "bench-geometry":
+        from .bench import load_recorded_pages, run_geometry_benchmark, synthesize_page
+        
+        pages = load_recorded_pages(args.pages) if args.pages else [synthesize_page()]
+        result = run_geometry_benchmark(pages, repeat=args.repeat)
+        
+        print(f"Geometry benchmark: {result['pages']} pages, {result['words']} words")
+        for name, timing in result["helpers"].items():
+            print(f"   {name:24s} {timing['ms']:9.2f} ms  (loop: {timing['reference_ms']:9.2f} ms, {timing['speedup']}x)")
+        sys.exit(0)
     else:
         parser.print_help()
         sys.exit(1)
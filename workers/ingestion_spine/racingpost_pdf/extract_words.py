@@ -1,11 +1,17 @@
 """
 Racing Post PDF Parser - Word Extraction Helpers
 pdfplumber helpers for word geometry and column clustering.
+
+The helpers take plain word lists and wrap WordGeometry (geometry.py);
+callers doing several lookups on one page should build a WordGeometry
+once and use it directly.
 """
 
 from typing import Dict, List, Tuple, Any
 import pdfplumber
 
+from .geometry import WordGeometry
+
 
 def extract_page_words(page: pdfplumber.page.Page) -> List[Dict[str, Any]]:
     """
@@ -37,22 +43,11 @@ def cluster_by_x_position(words: List[Dict[str, Any]], tolerance: float = 10.0)
     Returns:
         Dictionary mapping x position to list of words in that column
     """
-    columns = {}
+    keys, assignment = WordGeometry(words).column_assignment(tolerance)
     
-    for word in words:
-        x0 = word["x0"]
-        
-        # Find existing column within tolerance
-        found_column = None
-        for col_x in columns.keys():
-            if abs(x0 - col_x) <= tolerance:
-                found_column = col_x
-                break
-        
-        if found_column is not None:
-            columns[found_column].append(word)
-        else:
-            columns[x0] = [word]
+    columns = {col_x: [] for col_x in keys}
+    for word, column in zip(words, assignment.tolist()):
+        columns[keys[column]].append(word)
     
     return columns
 
@@ -69,24 +64,18 @@ def find_runner_anchors(words: List[Dict[str, Any]], y_tolerance: float = 5.0) -
     Returns:
         List of anchor words (runner numbers)
     """
-    anchors = []
-    
-    for word in words:
-        text = word["text"].strip()
-        
-        # Check if word is a small integer (1-30 for runner numbers)
-        if text.isdigit() and 1 <= int(text) <= 30:
-            # Check if this is at the start of a line (low x position)
-            if word["x0"] < 100:  # Arbitrary threshold for "start of line"
-                anchors.append(word)
-    
-    return anchors
+    # Small integers (1-30) near the start of a line (low x position)
+    geometry = WordGeometry(words)
+    return geometry.take(geometry.anchors(max_number=30, max_x0=100))
 
 
 def extract_block_words(words: List[Dict[str, Any]], anchor: Dict[str, Any], max_height: float = 50.0) -> List[Dict[str, Any]]:
     """
     Extract all words in a vertical block starting from an anchor.
     
+    For many anchors on one page, build a WordGeometry once and call
+    block() per anchor instead.
+    
     Args:
         words: List of all words on page
         anchor: Anchor word (e.g., runner number)
@@ -95,23 +84,8 @@ def extract_block_words(words: List[Dict[str, Any]], anchor: Dict[str, Any], max
     Returns:
         List of words in the block
     """
-    block_words = []
-    
-    anchor_top = anchor["top"]
-    anchor_bottom = anchor_top + max_height
-    anchor_x0 = anchor["x0"]
-    
-    for word in words:
-        # Check if word is in vertical range
-        if anchor_top <= word["top"] <= anchor_bottom:
-            # Check if word is to the right of or near anchor
-            if word["x0"] >= anchor_x0 - 10:
-                block_words.append(word)
-    
-    # Sort by top, then x0
-    block_words.sort(key=lambda w: (w["top"], w["x0"]))
-    
-    return block_words
+    geometry = WordGeometry(words)
+    return geometry.take(geometry.block(anchor, max_height=max_height, x_margin=10))
 
 
 def group_words_by_line(words: List[Dict[str, Any]], y_tolerance: float = 5.0) -> List[List[Dict[str, Any]]]:
@@ -125,31 +99,11 @@ def group_words_by_line(words: List[Dict[str, Any]], y_tolerance: float = 5.0) -
     Returns:
         List of lines, where each line is a list of words
     """
-    if not words:
-        return []
-    
-    # Sort by top position
-    sorted_words = sorted(words, key=lambda w: w["top"])
-    
-    lines = []
-    current_line = [sorted_words[0]]
-    current_y = sorted_words[0]["top"]
-    
-    for word in sorted_words[1:]:
-        if abs(word["top"] - current_y) <= y_tolerance:
-            # Same line
-            current_line.append(word)
-        else:
-            # New line
-            lines.append(current_line)
-            current_line = [word]
-            current_y = word["top"]
-    
-    # Add last line
-    if current_line:
-        lines.append(current_line)
+    geometry = WordGeometry(words)
+    sorted_words = geometry.take(geometry.by_top)
+    bounds = geometry.line_bounds(y_tolerance).tolist()
     
-    return lines
+    return [sorted_words[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
 
 
 def extract_text_from_line(line: List[Dict[str, Any]]) -> str:
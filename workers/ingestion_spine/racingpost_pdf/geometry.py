@@ -0,0 +1,181 @@
+"""
+Racing Post PDF Parser - Word Geometry
+Page words loaded into NumPy arrays once, with sorted indexes for line, column and block lookups.
+
+The extract_words helpers used to rescan the full word list per column,
+line or anchor (quadratic on dense form pages). WordGeometry sorts the
+word coordinates once:
+
+- lines: every word's next-line start is one vectorized searchsorted on
+  the top-sorted array; lines are then a pointer walk over those starts
+- columns: column keys are found by sweeping a "covered" mask (one
+  vectorized pass per column), then every word is assigned by an interval
+  lookup on the sorted keys
+- anchor blocks: an interval lookup on the top-sorted array per anchor
+
+Results are identical to the original helpers, including tie order and
+greedy first-column assignment, so those helpers are thin wrappers over it.
+"""
+
+from functools import cached_property
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+class WordGeometry:
+    """Coordinates of one page's words, with a top-sorted index."""
+
+    def __init__(self, words: Sequence[Dict[str, Any]]):
+        """
+        Args:
+            words: Word dictionaries (pdfplumber extract_words), kept as-is
+        """
+        self.words = list(words)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _coordinate(self, key: str) -> np.ndarray:
+        return np.fromiter(map(itemgetter(key), self.words), dtype=float, count=len(self.words))
+
+    @cached_property
+    def x0(self) -> np.ndarray:
+        return self._coordinate("x0")
+
+    @cached_property
+    def top(self) -> np.ndarray:
+        return self._coordinate("top")
+
+    @cached_property
+    def by_top(self) -> np.ndarray:
+        # Stable, so equal tops keep input order (as sorted() does)
+        return np.argsort(self.top, kind="stable")
+
+    @cached_property
+    def sorted_top(self) -> np.ndarray:
+        return self.top[self.by_top]
+
+    def take(self, indices) -> List[Dict[str, Any]]:
+        """Word dictionaries at the given indices."""
+        words = self.words
+        return [words[i] for i in np.asarray(indices).tolist()]
+
+    def line_bounds(self, y_tolerance: float = 5.0) -> np.ndarray:
+        """
+        Line boundaries as positions in by_top: line j is
+        by_top[bounds[j]:bounds[j + 1]].
+
+        A line starts at the highest unassigned word and takes every word
+        within y_tolerance of that first word's top.
+        """
+        tops = self.sorted_top
+        n = len(tops)
+        if n == 0:
+            return np.zeros(1, dtype=np.int64)
+
+        # First word past each word's line if that word started one
+        start = np.arange(n)
+        nxt = np.searchsorted(tops, tops + y_tolerance, side="right")
+        # Settle float rounding at the boundary on the exact test |top - y| <= tol
+        while True:
+            grow = nxt < n
+            grow[grow] = np.abs(tops[nxt[grow]] - tops[grow]) <= y_tolerance
+            if not grow.any():
+                break
+            nxt[grow] += 1
+        while True:
+            shrink = nxt > start + 1
+            shrink[shrink] = np.abs(tops[nxt[shrink] - 1] - tops[shrink]) > y_tolerance
+            if not shrink.any():
+                break
+            nxt[shrink] -= 1
+
+        nxt = nxt.tolist()
+        bounds = [0]
+        while bounds[-1] < n:
+            bounds.append(nxt[bounds[-1]])
+        return np.array(bounds, dtype=np.int64)
+
+    def lines(self, y_tolerance: float = 5.0) -> List[np.ndarray]:
+        """Word indices per line, in top order."""
+        bounds = self.line_bounds(y_tolerance)
+        return np.split(self.by_top, bounds[1:-1]) if len(self.words) else []
+
+    def column_assignment(self, tolerance: float = 10.0) -> tuple:
+        """
+        Greedy column assignment in input order.
+
+        Each word joins the earliest-created column whose key (its first
+        word's x0) is within tolerance, else starts a new column.
+
+        Returns:
+            (keys in creation order, column number per word)
+        """
+        x0 = self.x0
+        n = len(x0)
+        covered = np.zeros(n, dtype=bool)
+        key_positions = []
+
+        # The next key is the first word no existing key covers. Keys are
+        # more than tolerance apart, so there are at most page width /
+        # tolerance + 1 of them.
+        position = 0
+        while position < n:
+            uncovered = np.flatnonzero(~covered[position:])
+            if len(uncovered) == 0:
+                break
+            position += int(uncovered[0])
+            key_positions.append(position)
+            covered[position:] |= np.abs(x0[position:] - x0[position]) <= tolerance
+            position += 1
+
+        keys = x0[key_positions]
+        # A word's column is the earliest-created key in range: any key in
+        # range created after the word implies an earlier one existed, or
+        # the word would have become a key itself
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.searchsorted(sorted_keys, x0 - tolerance, side="left")
+
+        assignment = np.full(n, len(keys), dtype=np.int64)
+        # At most two keys lie in any 2·tolerance range; one extra either
+        # side absorbs float rounding, re-tested on the exact condition
+        for offset in (-1, 0, 1, 2) if len(keys) else ():
+            candidate = np.clip(first + offset, 0, len(keys) - 1)
+            in_range = np.abs(x0 - sorted_keys[candidate]) <= tolerance
+            assignment = np.where(in_range, np.minimum(assignment, order[candidate]), assignment)
+
+        return keys.tolist(), assignment
+
+    def columns(self, tolerance: float = 10.0) -> Dict[float, np.ndarray]:
+        """Word indices per column (input order), keyed by the column's first x0."""
+        keys, assignment = self.column_assignment(tolerance)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(keys) + 1))
+        return {key: order[bounds[k]:bounds[k + 1]] for k, key in enumerate(keys)}
+
+    def block(self, anchor: Dict[str, Any], max_height: float = 50.0, x_margin: float = 10.0) -> np.ndarray:
+        """
+        Word indices in the vertical band [anchor top, anchor top + max_height]
+        starting no further than x_margin left of the anchor, sorted by
+        (top, x0) with ties in input order.
+        """
+        anchor_top = anchor["top"]
+        anchor_bottom = anchor_top + max_height
+
+        lo = int(np.searchsorted(self.sorted_top, anchor_top, side="left"))
+        hi = int(np.searchsorted(self.sorted_top, anchor_bottom, side="right"))
+        band = np.sort(self.by_top[lo:hi])
+        band = band[self.x0[band] >= anchor["x0"] - x_margin]
+
+        return band[np.lexsort((self.x0[band], self.top[band]))]
+
+    def anchors(self, max_number: int = 30, max_x0: float = 100.0) -> np.ndarray:
+        """Indices of runner-number anchors: integers 1..max_number left of max_x0."""
+        left = np.flatnonzero(self.x0 < max_x0)
+        return np.array([
+            i for i in left.tolist()
+            if (text := self.words[i]["text"].strip()).isdigit() and 1 <= int(text) <= max_number
+        ], dtype=np.int64)
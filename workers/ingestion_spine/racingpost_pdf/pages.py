@@ -0,0 +1,159 @@
+"""
+Racing Post PDF Parser - Page Extraction
+pdfplumber page text (and words, on request), fanned out over a process pool and cached by file content hash.
+
+Extraction (pdfplumber's layout analysis) is where parsing spends its time.
+The parsers only read page text, so word geometry (a second layout pass)
+is extracted only when a caller asks for it.
+Each page is extracted independently, so pages are split into contiguous
+chunks and each pool worker opens the PDF itself. Results come back in page
+order, so parsing them gives the same output as the serial walk.
+
+Extracted pages are cached as JSON under the SHA-256 of the file contents
+(plus the pdfplumber version and whether words were extracted), so a
+re-parse after a parser fix or a re-validation skips extraction entirely.
+Files with a page that failed to extract are not cached.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import pdfplumber
+
+
+# Bump when the cached page format changes
+PAGE_CACHE_VERSION = "1"
+
+# Default cache directory (unset = no cache)
+PAGE_CACHE_ENV = "RP_PDF_CACHE_DIR"
+
+# Pages per pool task (each task opens the PDF once)
+DEFAULT_PAGES_PER_TASK = 4
+
+
+@dataclass
+class PageContent:
+    """Text (and words, if requested) extracted from one PDF page."""
+    page_num: int
+    text: Optional[str]
+    words: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PageCache:
+    """Extracted pages on disk, one JSON file per PDF content hash."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["PageCache"]:
+        cache_dir = os.getenv(PAGE_CACHE_ENV)
+        return cls(cache_dir) if cache_dir else None
+
+    def _path(self, digest: str, words: bool) -> str:
+        suffix = "-words" if words else ""
+        return os.path.join(
+            self.cache_dir,
+            f"{digest}.v{PAGE_CACHE_VERSION}-pdfplumber{pdfplumber.__version__}{suffix}.json"
+        )
+
+    def get(self, digest: str, words: bool = False) -> Optional[List[PageContent]]:
+        # Pages extracted with words also serve text-only requests
+        for with_words in ((True,) if words else (False, True)):
+            try:
+                with open(self._path(digest, with_words)) as f:
+                    pages = json.load(f)
+            except (OSError, ValueError):
+                continue
+            return [PageContent(**page) for page in pages]
+        return None
+
+    def put(self, digest: str, pages: List[PageContent], words: bool = False):
+        # Write-then-rename so concurrent parses never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump([page.__dict__ for page in pages], f)
+        os.replace(tmp_path, self._path(digest, words))
+
+
+def _extract_page(page, page_num: int, words: bool = False) -> PageContent:
+    try:
+        return PageContent(
+            page_num=page_num,
+            text=page.extract_text(),
+            words=page.extract_words() if words else [],
+        )
+    except Exception as e:
+        return PageContent(page_num=page_num, text=None, error=str(e))
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int, words: bool = False) -> List[PageContent]:
+    """Extract pages [start, stop) (0-based); runs in pool workers."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_extract_page(pdf.pages[i], i + 1, words) for i in range(start, min(stop, len(pdf.pages)))]
+
+
+def _page_count(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(
+    pdf_path: str,
+    executor: Optional[Executor] = None,
+    cache: Optional[PageCache] = None,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    words: bool = False,
+) -> List[PageContent]:
+    """
+    Extract every page of a PDF, in page order.
+
+    Args:
+        pdf_path: Path to PDF file
+        executor: Pool to fan pages out over (None = serial)
+        cache: Extracted-page cache (None = no cache)
+        pages_per_task: Pages per pool task
+        words: Also extract word geometry (pdfplumber extract_words)
+
+    Returns:
+        One PageContent per page (error set where a page failed to extract)
+
+    Raises:
+        Exception: If the PDF cannot be opened
+    """
+    digest = file_sha256(pdf_path) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(digest, words)
+        if cached is not None:
+            return cached
+
+    if executor is None:
+        pages = _extract_page_range(pdf_path, 0, _page_count(pdf_path), words)
+    else:
+        n_pages = _page_count(pdf_path)
+        futures = [
+            executor.submit(_extract_page_range, pdf_path, start, start + pages_per_task, words)
+            for start in range(0, n_pages, pages_per_task)
+        ]
+        pages = [page for future in futures for page in future.result()]
+
+    # A failed page may be transient: leave the file to be extracted again
+    if cache is not None and all(page.error is None for page in pages):
+        cache.put(digest, pages, words)
+    return pages
@@ -4,6 +4,7 @@ Parse F_0012_XX racecards (identity backbone: races + runners).
 """
 
 import re
+from concurrent.futures import Executor
 from datetime import datetime, time
 from typing import List, Optional, Dict, Any
 
@@ -22,9 +23,16 @@ from .extract_words import (
     group_words_by_line,
     extract_text_from_line,
 )
+from .pages import PageCache, extract_pages
 
 
-def parse_xx_card(pdf_path: str, course_name: str, meeting_date: str) -> tuple[List[Race], List[ParseError]]:
+def parse_xx_card(
+    pdf_path: str,
+    course_name: str,
+    meeting_date: str,
+    executor: Optional[Executor] = None,
+    cache: Optional[PageCache] = None,
+) -> tuple[List[Race], List[ParseError]]:
     """
     Parse XX racecard PDF (F_0012_XX).
     
@@ -37,6 +45,8 @@ def parse_xx_card(pdf_path: str, course_name: str, meeting_date: str) -> tuple[L
         pdf_path: Path to XX PDF file
         course_name: Course name (e.g., "Wolverhampton")
         meeting_date: Meeting date string
+        executor: Process pool for page extraction (None = serial)
+        cache: Extracted-page cache keyed by file content hash
         
     Returns:
         Tuple of (races, errors)
@@ -45,23 +55,27 @@ def parse_xx_card(pdf_path: str, course_name: str, meeting_date: str) -> tuple[L
     errors = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                try:
-                    page_races = _parse_xx_page(page, course_name, meeting_date, page_num + 1)
-                    races.extend(page_races)
-                except Exception as e:
-                    errors.append(ParseError(
-                        severity="error",
-                        message=f"Failed to parse page {page_num + 1}: {str(e)}",
-                        location=f"page_{page_num + 1}"
-                    ))
+        pages = extract_pages(pdf_path, executor=executor, cache=cache)
     except Exception as e:
         errors.append(ParseError(
             severity="error",
             message=f"Failed to open PDF: {str(e)}",
             location="file"
         ))
+        return races, errors
+    
+    for page in pages:
+        try:
+            if page.error is not None:
+                raise RuntimeError(page.error)
+            page_races = _parse_xx_text(page.text, course_name, meeting_date, page.page_num)
+            races.extend(page_races)
+        except Exception as e:
+            errors.append(ParseError(
+                severity="error",
+                message=f"Failed to parse page {page.page_num}: {str(e)}",
+                location=f"page_{page.page_num}"
+            ))
     
     return races, errors
 
@@ -84,10 +98,24 @@ def _parse_xx_page(page: pdfplumber.page.Page, course_name: str, meeting_date: s
     Returns:
         List of races on this page
     """
-    races = []
-    
     # Extract full text for pattern matching
-    full_text = page.extract_text()
+    return _parse_xx_text(page.extract_text(), course_name, meeting_date, page_num)
+
+
+def _parse_xx_text(full_text: Optional[str], course_name: str, meeting_date: str, page_num: int) -> List[Race]:
+    """
+    Parse the extracted text of a single XX racecard page.
+    
+    Args:
+        full_text: Page text (pdfplumber extract_text)
+        course_name: Course name
+        meeting_date: Meeting date
+        page_num: Page number
+        
+    Returns:
+        List of races on this page
+    """
+    races = []
     
     if not full_text:
         return races
@@ -7,7 +7,9 @@ Date: 2026-01-04
 
 import os
 import logging
-from typing import Optional, BinaryIO
+from typing import AsyncIterator, Optional, BinaryIO
+
+import httpx
 from supabase import create_client, Client
 
 logger = logging.getLogger(__name__)
@@ -116,6 +118,45 @@ class StorageClient:
             logger.error(f"Error downloading file {path}: {e}")
             raise
     
+    async def stream_file(self, path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+        """
+        Stream a file from storage in chunks.
+        
+        Reads the object over the Storage REST API instead of downloading
+        it whole, so callers can parse while the rest is still in flight.
+        
+        Args:
+            path: Full path in bucket (e.g., "rp_imports/2026-01-04/racecards.csv")
+            chunk_size: Bytes per chunk
+        
+        Yields:
+            File content chunks
+        """
+        # Remove bucket prefix if present
+        if path.startswith(f"{self.BUCKET_NAME}/"):
+            path = path[len(f"{self.BUCKET_NAME}/"):]
+        
+        url = f"{self.url.rstrip('/')}/storage/v1/object/{self.BUCKET_NAME}/{path}"
+        headers = {"Authorization": f"Bearer {self.key}", "apikey": self.key}
+        
+        try:
+            total = 0
+            async with httpx.AsyncClient(timeout=httpx.Timeout(30.0, read=120.0)) as client:
+                async with client.stream("GET", url, headers=headers) as response:
+                    if response.status_code == 404:
+                        raise ValueError(f"File not found: {path}")
+                    response.raise_for_status()
+                    
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        total += len(chunk)
+                        yield chunk
+            
+            logger.info(f"Streamed file: {path} ({total} bytes)")
+        
+        except Exception as e:
+            logger.error(f"Error streaming file {path}: {e}")
+            raise
+    
     async def upload_file(
         self,
         path: str,
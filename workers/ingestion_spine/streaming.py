@@ -0,0 +1,382 @@
+"""
+VÉLØ Phase 1: Streaming Batch Ingestion
+Parse batch files chunk by chunk and insert them as a bounded async pipeline
+
+parse_batch downloads each file whole, parses it into a full list of dicts
+and only then starts inserting. In streaming mode files are read from
+storage in chunks and parsed incrementally into row batches, so peak memory
+is a few batches rather than the file, and parsing overlaps network I/O:
+
+    storage chunks ─▶ CSV record batches ─▶ runner confidence ─▶ bulk insert
+                 (bounded queue)                         (bounded queue)
+
+The all-or-nothing rules are unchanged. Race quality needs every runner of
+a race, and unmatched runners must fail the batch before anything is
+written, so runners are read twice: pass 1 scores them into per-race
+accumulators while the download is spooled to a local temp file, and
+pass 2 re-parses the spool and inserts. Nothing but the accumulators is
+kept between passes.
+
+Date: 2026-01-04
+"""
+
+import asyncio
+import codecs
+import csv
+import logging
+import os
+import tempfile
+from collections import deque
+from contextlib import suppress
+from typing import Any, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, TypeVar
+
+from .db import DEFAULT_INSERT_CHUNK_SIZE
+from .models import FileType
+from .quality import RaceQualityAccumulator
+from .race_rows import assign_join_keys, enrich_runner, race_metadata, score_runner_rows, set_race_quality
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Set INGEST_STREAMING=true to parse batches through the streaming pipeline
+STREAMING_ENABLED = os.getenv("INGEST_STREAMING", "false").lower() in ("1", "true", "yes")
+
+# Bytes per storage read
+DEFAULT_STREAM_CHUNK_SIZE = int(os.getenv("INGEST_STREAM_CHUNK_SIZE", str(1 << 16)))
+
+# Batches buffered between pipeline stages
+DEFAULT_QUEUE_DEPTH = 4
+
+# Unmatched runner examples reported in counts
+UNMATCHED_EXAMPLES = 5
+
+# ============================================================================
+# ASYNC STREAM HELPERS
+# ============================================================================
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+async def prefetch(source: AsyncIterator[T], maxsize: int = DEFAULT_QUEUE_DEPTH) -> AsyncIterator[T]:
+    """
+    Run an async iterator ahead of its consumer through a bounded queue.
+
+    The producer runs as its own task, so it keeps reading/parsing while the
+    consumer awaits (e.g. an insert), and blocks once maxsize items wait.
+    Producer errors are re-raised in the consumer.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    done = object()
+
+    async def pump():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            await queue.put(_Failure(e))
+        else:
+            await queue.put(done)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+async def spool(chunks: AsyncIterator[bytes], file: BinaryIO) -> AsyncIterator[bytes]:
+    """Pass chunks through while appending them to file (off the event loop)."""
+    async for chunk in chunks:
+        await asyncio.to_thread(file.write, chunk)
+        yield chunk
+
+
+async def iter_file_chunks(file: BinaryIO, chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a local file from the start in chunks (off the event loop)."""
+    await asyncio.to_thread(file.seek, 0)
+    while chunk := await asyncio.to_thread(file.read, chunk_size):
+        yield chunk
+
+
+class _NeedMoreData(Exception):
+    """Raised to csv.reader when a record continues past the data received so far."""
+
+
+class _LineFeed:
+    """
+    Line iterator for csv.reader that can run dry mid-stream.
+
+    When a record needs lines that have not arrived yet, the lines it
+    consumed are put back and the next read starts the record again.
+    """
+
+    def __init__(self):
+        self.lines = deque()
+        self.consumed = []
+        self.final = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if self.final:
+                raise StopIteration
+            raise _NeedMoreData
+        line = self.lines.popleft()
+        self.consumed.append(line)
+        return line
+
+    def commit(self):
+        self.consumed.clear()
+
+    def rewind(self):
+        self.lines.extendleft(reversed(self.consumed))
+        self.consumed.clear()
+
+
+async def iter_csv_batches(chunks: AsyncIterator[bytes], batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Parse CSV bytes arriving in chunks into batches of row dictionaries.
+
+    Rows are identical to csv.DictReader over the whole decoded file
+    (UTF-8, BOM stripped): the same reader consumes the lines as they
+    arrive, and a record spanning lines not yet received (a quoted field
+    with newlines) is re-read once they are.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be positive: {batch_size}")
+
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    feed = _LineFeed()
+    reader = csv.DictReader(feed)
+    partial = ''
+    batch: List[Dict[str, Any]] = []
+
+    def drain():
+        """Read every complete row received so far."""
+        # Header first, committed on its own so a rewind never replays it
+        try:
+            reader.fieldnames
+        except _NeedMoreData:
+            feed.rewind()
+            return
+        feed.commit()
+
+        while True:
+            try:
+                row = next(reader)
+            except _NeedMoreData:
+                feed.rewind()
+                return
+            except StopIteration:
+                return
+            feed.commit()
+            batch.append(row)
+
+    try:
+        async for chunk in chunks:
+            # Lines split on \n only, as io.StringIO(text) reads them
+            parts = (partial + decoder.decode(chunk)).split('\n')
+            partial = parts.pop()
+            feed.lines.extend(part + '\n' for part in parts)
+            drain()
+            while len(batch) >= batch_size:
+                yield batch[:batch_size]
+                del batch[:batch_size]
+
+        partial += decoder.decode(b'', final=True)
+        if partial:
+            feed.lines.append(partial)
+        feed.final = True
+        drain()
+    except (UnicodeDecodeError, csv.Error) as e:
+        logger.error(f"CSV parsing error: {e}")
+        raise ValueError(f"Failed to parse CSV: {str(e)}")
+
+    for start in range(0, len(batch), batch_size):
+        yield batch[start:start + batch_size]
+
+# ============================================================================
+# STREAMING BATCH PARSE
+# ============================================================================
+
+class StreamingBatchParse:
+    """
+    Streaming equivalent of parse_batch steps 1-6.
+
+    Fills the caller's counts like the in-memory path does. Committed race
+    ids are collected in inserted_race_ids as they are written, so the
+    caller can roll back exactly those on failure.
+    """
+
+    def __init__(
+        self,
+        db,
+        storage,
+        batch: Dict[str, Any],
+        file_map: Dict[str, Dict[str, Any]],
+        counts: Dict[str, Any],
+        racecards_parser,
+        runners_parser_factory,
+        form_parser=None,
+        chunk_size: int = DEFAULT_STREAM_CHUNK_SIZE,
+        batch_rows: int = DEFAULT_INSERT_CHUNK_SIZE,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        inserted_race_ids: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            db: DatabaseClient (insert_races_bulk / insert_runners_bulk)
+            storage: StorageClient (stream_file)
+            batch: Batch record (id, import_date)
+            file_map: file_type -> registered file (storage_path)
+            counts: parse_batch counts, updated in place
+            racecards_parser: RacecardsParser
+            runners_parser_factory: Callable returning a fresh RunnersParser
+                (one per pass)
+            form_parser: FormParser (optional form file)
+            chunk_size: Bytes per storage read
+            batch_rows: Rows per parsed batch (and per runner INSERT)
+            queue_depth: Batches buffered between stages
+            inserted_race_ids: List to collect committed race ids in
+                (default: a new one)
+        """
+        self.db = db
+        self.storage = storage
+        self.batch = batch
+        self.file_map = file_map
+        self.counts = counts
+        self.racecards_parser = racecards_parser
+        self.runners_parser_factory = runners_parser_factory
+        self.form_parser = form_parser
+        self.chunk_size = chunk_size
+        self.batch_rows = batch_rows
+        self.queue_depth = queue_depth
+        self.inserted_race_ids = inserted_race_ids if inserted_race_ids is not None else []
+
+    def _stream(self, file_type: str) -> AsyncIterator[bytes]:
+        path = self.file_map[file_type]['storage_path']
+        return self.storage.stream_file(path, chunk_size=self.chunk_size)
+
+    async def run(self):
+        # STEP 1: Parse racecards
+        logger.info("Step 1: Parsing racecards (streaming)...")
+        races = []
+        async for parsed in self.racecards_parser.parse_stream(
+            prefetch(self._stream(FileType.RACECARDS), self.queue_depth), self.batch_rows
+        ):
+            races.extend(parsed)
+
+        if not races:
+            raise ValueError("No races found in racecards file")
+
+        logger.info(f"✅ Parsed {len(races)} races from racecards")
+
+        race_data_map = assign_join_keys(races, self.batch['import_date'])
+
+        with tempfile.TemporaryFile() as spool_file:
+            # STEPS 2-3: Score runners into per-race quality (no writes yet)
+            logger.info("Steps 2-3: Parsing runners and calculating quality (streaming)...")
+            accumulators, n_runners = await self._scan_runners(spool_file, race_data_map)
+
+            if not n_runners:
+                raise ValueError("No runners found in runners file")
+
+            logger.info(f"✅ Parsed {n_runners} runners")
+
+            if self.counts['unmatched_runner_rows'] > 0:
+                raise ValueError(f"Found {self.counts['unmatched_runner_rows']} unmatched runners")
+
+            # STEP 4: Insert races with quality metadata
+            logger.info("Step 4: Inserting races with quality metadata...")
+            for join_key, race_data in race_data_map.items():
+                accumulator = accumulators.get(join_key, RaceQualityAccumulator())
+                set_race_quality(race_data, *accumulator.result(race_metadata(race_data)))
+
+            race_id_map = await self.db.insert_races_bulk(
+                batch_id=self.batch['id'],
+                import_date=self.batch['import_date'],
+                races=races,
+                inserted_ids=self.inserted_race_ids
+            )
+            self.counts['races_inserted'] = len(self.inserted_race_ids)
+            logger.info(f"✅ Inserted {self.counts['races_inserted']} races")
+
+            # STEP 5: Re-parse the spooled runners and insert as they parse
+            logger.info("Step 5: Inserting runners with quality metadata (streaming)...")
+            async for runner_rows in prefetch(
+                self._runner_rows(spool_file, race_id_map, race_data_map), self.queue_depth
+            ):
+                runner_ids = await self.db.insert_runners_bulk(runner_rows, chunk_size=self.batch_rows)
+                self.counts['runners_inserted'] += len(runner_ids)
+
+            logger.info(f"✅ Inserted {self.counts['runners_inserted']} runners")
+
+        # STEP 6: Parse form/comments (optional)
+        if FileType.FORM in self.file_map and self.form_parser is not None:
+            logger.info("Step 6: Parsing form (streaming)...")
+            async for form_lines in self.form_parser.parse_stream(
+                prefetch(self._stream(FileType.FORM), self.queue_depth), self.batch_rows
+            ):
+                self.counts['form_lines_inserted'] += len(form_lines)
+            logger.info(f"✅ Parsed {self.counts['form_lines_inserted']} form lines")
+
+    async def _scan_runners(
+        self,
+        spool_file: BinaryIO,
+        race_data_map: Dict[str, Dict[str, Any]]
+    ) -> Tuple[Dict[str, RaceQualityAccumulator], int]:
+        """Pass 1: runner confidence into per-race accumulators, spooling the download."""
+        accumulators: Dict[str, RaceQualityAccumulator] = {}
+        unmatched: Dict[str, List[Dict[str, Any]]] = {}
+        n_runners = 0
+
+        chunks = prefetch(spool(self._stream(FileType.RUNNERS), spool_file), self.queue_depth)
+        async for runners in self.runners_parser_factory().parse_stream(chunks, self.batch_rows):
+            n_runners += len(runners)
+            join_keys = score_runner_rows(runners)['race_join_key'].tolist()
+            for runner_data, join_key in zip(runners, join_keys):
+                if join_key in race_data_map:
+                    accumulators.setdefault(join_key, RaceQualityAccumulator()).add(runner_data)
+                    continue
+
+                # Examples are reported grouped by join key, as the in-memory path does
+                self.counts['unmatched_runner_rows'] += 1
+                if join_key in unmatched or len(unmatched) < UNMATCHED_EXAMPLES:
+                    examples = unmatched.setdefault(join_key, [])
+                    if len(examples) < UNMATCHED_EXAMPLES:
+                        examples.append({'horse_name': runner_data.get('horse_name'), 'join_key': join_key})
+
+        if unmatched:
+            self.counts['unmatched_examples'] = [
+                example for examples in unmatched.values() for example in examples
+            ][:UNMATCHED_EXAMPLES]
+
+        return accumulators, n_runners
+
+    async def _runner_rows(
+        self,
+        spool_file: BinaryIO,
+        race_id_map: Dict[str, str],
+        race_data_map: Dict[str, Dict[str, Any]]
+    ) -> AsyncIterator[List[Tuple[str, Dict[str, Any]]]]:
+        """Pass 2: (race_id, enriched runner) batches from the spooled runners file."""
+        chunks = iter_file_chunks(spool_file, self.chunk_size)
+        async for runners in self.runners_parser_factory().parse_stream(chunks, self.batch_rows):
+            join_keys = score_runner_rows(runners)['race_join_key'].tolist()
+            yield [
+                (race_id_map[join_key], enrich_runner(runner_data, race_data_map[join_key], self.batch['import_date']))
+                for runner_data, join_key in zip(runners, join_keys)
+            ]